@@ -0,0 +1,107 @@
+"""Benchmark per-pattern scans against MultiPatternMatcher on synthetic logs.
+
+Usage:
+    python scripts/benchmark_log_matching.py [--lines 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from collections.abc import Callable
+
+from heisenberg.parsers.job_logs import JobLogsProcessor
+from heisenberg.utils.compression import ERROR_KEYWORDS, NOISE_PATTERNS
+from heisenberg.utils.matching import MultiPatternMatcher, keyword_matcher
+
+TEMPLATES = [
+    "2024-01-15T10:30:{s:02d}.123Z INFO GET /api/users/{n} 200 in {n}ms",
+    "2024-01-15T10:30:{s:02d}.123Z DEBUG cache hit for key session:{n}",
+    "2024-01-15T10:30:{s:02d}.123Z INFO health check ok",
+    "2024-01-15T10:30:{s:02d}.123Z DEBUG heartbeat sent to worker-{n}",
+    "  ✓ should render dashboard widget {n} ({n}ms)",
+    "2024-01-15T10:30:{s:02d}.123Z ERROR TimeoutError: query {n} exceeded 30000ms",
+    "##[error]Process completed with exit code 1",
+]
+WEIGHTS = [40, 30, 10, 10, 8, 1, 1]
+
+
+def generate_lines(count: int, seed: int = 42) -> list[str]:
+    """Generate synthetic CI/container log lines (about 2% errors)."""
+    rng = random.Random(seed)  # noqa: S311 - reproducible test data
+    templates = rng.choices(TEMPLATES, weights=WEIGHTS, k=count)
+    return [t.format(s=i % 60, n=rng.randrange(10_000)) for i, t in enumerate(templates)]
+
+
+def naive_noise(lines: list[str]) -> int:
+    regexes = [re.compile(p, re.IGNORECASE) for p in NOISE_PATTERNS]
+    return sum(1 for line in lines if any(r.search(line) for r in regexes))
+
+
+def naive_priority(lines: list[str]) -> int:
+    total = 0
+    for line in lines:
+        lower = line.lower()
+        total += sum(1 for keyword in ERROR_KEYWORDS if keyword in lower)
+    return total
+
+
+def naive_job_keywords(lines: list[str]) -> int:
+    keywords = JobLogsProcessor().error_keywords
+    found = 0
+    for line in lines:
+        lower = line.lower()
+        for keyword in keywords:
+            if keyword.lower() in lower:
+                found += 1
+                break
+    return found
+
+
+def matcher_noise(lines: list[str]) -> int:
+    matcher = MultiPatternMatcher({p: p for p in NOISE_PATTERNS}, re.IGNORECASE)
+    return sum(1 for _ in matcher.iter_first_matches(lines))
+
+
+def matcher_priority(lines: list[str]) -> int:
+    matcher = keyword_matcher(ERROR_KEYWORDS)
+    return sum(len(matched) for _, matched in matcher.iter_matches(lines))
+
+
+def matcher_job_keywords(lines: list[str]) -> int:
+    return len(JobLogsProcessor()._find_error_lines(lines))
+
+
+def _time(func: Callable[[list[str]], int], lines: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    result = func(lines)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    lines = generate_lines(args.lines)
+    print(f"{len(lines):,} lines")
+    print(f"{'check':<14}{'per-pattern':>14}{'matcher':>12}{'speedup':>10}")
+
+    cases = [
+        ("noise", naive_noise, matcher_noise),
+        ("priority", naive_priority, matcher_priority),
+        ("job keywords", naive_job_keywords, matcher_job_keywords),
+    ]
+    for name, naive, fast in cases:
+        naive_seconds, expected = _time(naive, lines)
+        fast_seconds, actual = _time(fast, lines)
+        if actual != expected:
+            raise SystemExit(f"{name}: results differ ({actual} != {expected})")
+        speedup = naive_seconds / fast_seconds
+        print(f"{name:<14}{naive_seconds:>13.2f}s{fast_seconds:>11.2f}s{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,14 @@ from heisenberg.analysis.ai_analyzer import (
     analyze_unified_run,
     analyze_with_ai,
 )
+from heisenberg.analysis.batch import analyze_reports_in_batches
 from heisenberg.analysis.pipeline import (
     AnalysisResult,
     Analyzer,
     format_pr_comment,
     run_analysis,
 )
+from heisenberg.llm.cache import ResponseCache
 
 __all__ = [
     # AI analysis
@@ -23,9 +25,12 @@ __all__ = [
     "HEISENBERG_AI_MARKER",
     "analyze_unified_run",
     "analyze_with_ai",
+    "analyze_reports_in_batches",
     # Pipeline
     "AnalysisResult",
     "Analyzer",
     "format_pr_comment",
     "run_analysis",
+    # LLM response caching
+    "ResponseCache",
 ]
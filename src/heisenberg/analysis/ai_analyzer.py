@@ -2,20 +2,34 @@
 
 from __future__ import annotations
 
+import logging
 import os
+from collections.abc import Callable
+from contextlib import closing
 from dataclasses import dataclass
+from functools import partial
 from types import SimpleNamespace
 from typing import TYPE_CHECKING
 
-from heisenberg.core.diagnosis import Diagnosis, parse_diagnosis
+from heisenberg.core.diagnosis import (
+    Diagnosis,
+    DiagnosisSection,
+    DiagnosisStreamParser,
+    parse_diagnosis,
+)
 from heisenberg.core.models import PlaywrightTransformer
 from heisenberg.integrations.docker import ContainerLogs
-from heisenberg.llm.config import PROVIDER_CONFIGS, calculate_cost
+from heisenberg.llm.config import DEFAULT_INPUT_TOKEN_BUDGET, PROVIDER_CONFIGS, calculate_cost
 
 if TYPE_CHECKING:
     from heisenberg.core.models import UnifiedTestRun
+    from heisenberg.llm.cache import ResponseCache
+    from heisenberg.llm.models import LLMAnalysis
+    from heisenberg.llm.providers.base import LLMProvider
     from heisenberg.parsers.playwright import PlaywrightReport
 
+logger = logging.getLogger(__name__)
+
 # Marker for AI-generated content
 HEISENBERG_AI_MARKER = "## Heisenberg AI Analysis"
 
@@ -29,18 +43,32 @@ class AIAnalysisResult:
     output_tokens: int
     provider: str = "google"
     model: str | None = None
+    # Diagnosis reused from the LLM response cache at no cost
+    cached: bool = False
+    # Part of input_tokens read from the provider's prompt cache
+    cached_input_tokens: int = 0
+    # Answered through the provider's batch API, at its batch discount
+    batch: bool = False
+    # Fast-model result this one replaced after escalation
+    first_pass: AIAnalysisResult | None = None
+    # Failure groups analyzed by separate map-reduce calls (0 for one prompt)
+    groups: int = 0
 
     @property
     def total_tokens(self) -> int:
-        """Total tokens used."""
-        return self.input_tokens + self.output_tokens
+        """Total tokens used, including an escalated first pass."""
+        total = self.input_tokens + self.output_tokens
+        if self.first_pass is not None:
+            total += self.first_pass.total_tokens
+        return total
 
     @property
     def estimated_cost(self) -> float:
         """Estimate cost in USD based on model pricing.
 
         Uses centralized pricing from llm/config.py. Falls back to provider's
-        default model if specific model not set.
+        default model if specific model not set. An escalated first pass is
+        priced at its own model; batched results at the batch discount.
         """
         # Determine model for pricing lookup
         model = self.model
@@ -49,7 +77,19 @@ class AIAnalysisResult:
             config = PROVIDER_CONFIGS.get(self.provider)
             model = config.default_model if config else "gemini-3-pro-preview"
 
-        return float(calculate_cost(model, self.input_tokens, self.output_tokens))
+        cost = float(
+            calculate_cost(
+                model,
+                self.input_tokens,
+                self.output_tokens,
+                cached_input_tokens=self.cached_input_tokens,
+                provider=self.provider,
+                batch=self.batch,
+            )
+        )
+        if self.first_pass is not None:
+            cost += self.first_pass.estimated_cost
+        return cost
 
     def to_markdown(self) -> str:
         """Format result as markdown for PR comment."""
@@ -84,7 +124,10 @@ class AIAnalysisResult:
             [
                 "",
                 "---",
-                f"*Tokens: {self.total_tokens} | Est. cost: ${self.estimated_cost:.4f}*",
+                f"*Tokens: {self.total_tokens} | Est. cost: ${self.estimated_cost:.4f}"
+                f"{' (cached)' if self.cached else ''}"
+                f"{f' | Map-reduce over {self.groups} groups' if self.groups else ''}"
+                f"{f' | Escalated from {self.first_pass.model}' if self.first_pass else ''}*",
             ]
         )
 
@@ -97,6 +140,10 @@ def analyze_with_ai(
     api_key: str | None = None,
     provider: str = "google",
     model: str | None = None,
+    response_cache: ResponseCache | None = None,
+    on_section: Callable[[DiagnosisSection], None] | None = None,
+    map_reduce: bool | None = None,
+    escalate: bool = False,
 ) -> AIAnalysisResult:
     """
     Convenience function for AI analysis.
@@ -111,6 +158,13 @@ def analyze_with_ai(
         api_key: Optional API key. If None, reads from environment.
         provider: LLM provider to use (anthropic, openai, google).
         model: Specific model to use (provider-dependent).
+        response_cache: Optional cache answering repeated prompts without
+            an LLM call.
+        on_section: Optional callback receiving diagnosis sections while the
+            response streams in; see :func:`analyze_unified_run`.
+        map_reduce: Analyze failures in groups; see :func:`analyze_unified_run`.
+        escalate: Try the provider's fast model first; see
+            :func:`analyze_unified_run`.
 
     Returns:
         AIAnalysisResult with diagnosis.
@@ -132,6 +186,10 @@ def analyze_with_ai(
         api_key=api_key,
         provider=provider,
         model=model,
+        response_cache=response_cache,
+        on_section=on_section,
+        map_reduce=map_reduce,
+        escalate=escalate,
     )
 
 
@@ -144,6 +202,11 @@ def analyze_unified_run(
     job_logs_context: str | None = None,
     screenshot_context: str | None = None,
     trace_context: str | None = None,
+    input_token_budget: int | None = None,
+    response_cache: ResponseCache | None = None,
+    on_section: Callable[[DiagnosisSection], None] | None = None,
+    map_reduce: bool | None = None,
+    escalate: bool = False,
 ) -> AIAnalysisResult:
     """
     Analyze test failures using the unified model.
@@ -160,41 +223,175 @@ def analyze_unified_run(
         job_logs_context: Optional pre-formatted job logs snippets.
         screenshot_context: Optional pre-formatted screenshot descriptions.
         trace_context: Optional pre-formatted Playwright trace analysis.
+        input_token_budget: Prompt size target in tokens. Defaults to the
+            provider's configured ``input_token_budget``.
+        response_cache: Optional cache answering repeated prompts without
+            an LLM call.
+        on_section: Optional callback receiving each diagnosis section as
+            soon as it is complete. The response is then streamed and
+            generation stops once all required sections have arrived.
+        map_reduce: Analyze failures in concurrent groups and merge the
+            group diagnoses (see :mod:`heisenberg.analysis.map_reduce`).
+            Defaults to doing so for runs with more than
+            ``DEFAULT_MAP_REDUCE_THRESHOLD`` distinct failure clusters.
+        escalate: Analyze with the provider's fast model first and re-run
+            with the default model only if the diagnosis has LOW/UNKNOWN
+            confidence or is malformed (see
+            :mod:`heisenberg.analysis.escalation`). Ignored when ``model``
+            is given.
 
     Returns:
         AIAnalysisResult with diagnosis.
     """
-    from heisenberg.llm.prompts import build_unified_prompt
+    from heisenberg.analysis.map_reduce import DEFAULT_MAP_REDUCE_THRESHOLD, analyze_in_groups
+    from heisenberg.utils.failure_clusters import cluster_failures
+
+    if escalate and model is None:
+        from heisenberg.analysis.escalation import analyze_with_escalation
+
+        analyze = partial(
+            analyze_unified_run,
+            run,
+            container_logs,
+            api_key,
+            provider,
+            job_logs_context=job_logs_context,
+            screenshot_context=screenshot_context,
+            trace_context=trace_context,
+            input_token_budget=input_token_budget,
+            response_cache=response_cache,
+            map_reduce=map_reduce,
+        )
+        return analyze_with_escalation(analyze, provider=provider, on_section=on_section)
+
+    if map_reduce is None:
+        map_reduce = len(cluster_failures(run.failures)) > DEFAULT_MAP_REDUCE_THRESHOLD
+    if map_reduce:
+        return analyze_in_groups(
+            run,
+            _get_llm_client_for_provider(provider, api_key, model, response_cache),
+            provider=provider,
+            model=model,
+            container_logs=container_logs,
+            job_logs_context=job_logs_context,
+            screenshot_context=screenshot_context,
+            trace_context=trace_context,
+            input_token_budget=input_token_budget,
+            on_section=on_section,
+        )
 
-    # Build prompts from unified model
-    system_prompt, user_prompt = build_unified_prompt(
-        run, container_logs, job_logs_context, screenshot_context, trace_context
+    system_prompt, user_prompt = _build_unified_prompts(
+        run,
+        container_logs,
+        job_logs_context,
+        screenshot_context,
+        trace_context,
+        provider=provider,
+        model=model,
+        input_token_budget=input_token_budget,
     )
 
     # Get LLM client
-    llm = _get_llm_client_for_provider(provider, api_key, model)
+    llm = _get_llm_client_for_provider(provider, api_key, model, response_cache)
+
+    # Call LLM and parse diagnosis
+    if on_section is not None:
+        diagnosis, response = _stream_diagnosis(llm, user_prompt, system_prompt, on_section)
+    else:
+        response = llm.analyze(user_prompt, system_prompt=system_prompt)
+        diagnosis = parse_diagnosis(response.content)
 
-    # Call LLM
-    response = llm.analyze(user_prompt, system_prompt=system_prompt)
+    return _to_result(response, diagnosis, provider, model)
 
-    # Parse diagnosis
-    diagnosis = parse_diagnosis(response.content)
 
+def _build_unified_prompts(
+    run: UnifiedTestRun,
+    container_logs: dict[str, ContainerLogs] | None,
+    job_logs_context: str | None,
+    screenshot_context: str | None,
+    trace_context: str | None,
+    *,
+    provider: str,
+    model: str | None,
+    input_token_budget: int | None,
+) -> tuple[str, str]:
+    """Build (system, user) prompts fitted into the provider's token budget."""
+    from heisenberg.llm.prompts import build_unified_prompt
+    from heisenberg.llm.tokens import get_token_counter
+
+    # Build prompts from unified model, fitting every section into one budget
+    # measured with the provider's tokenizer
+    return build_unified_prompt(
+        run,
+        container_logs,
+        job_logs_context,
+        screenshot_context,
+        trace_context,
+        token_counter=get_token_counter(provider, model),
+        input_token_budget=_input_token_budget(provider, input_token_budget),
+    )
+
+
+def _input_token_budget(provider: str, input_token_budget: int | None) -> int:
+    """Prompt size target, defaulting to the provider's configured budget."""
+    if input_token_budget is not None:
+        return input_token_budget
+    config = PROVIDER_CONFIGS.get(provider)
+    return config.input_token_budget if config else DEFAULT_INPUT_TOKEN_BUDGET
+
+
+def _to_result(
+    response: LLMAnalysis,
+    diagnosis: Diagnosis,
+    provider: str,
+    model: str | None,
+) -> AIAnalysisResult:
+    """Combine an LLM response and its parsed diagnosis into a result."""
+    cached_input_tokens = getattr(response, "cached_input_tokens", 0)
     return AIAnalysisResult(
         diagnosis=diagnosis,
         input_tokens=response.input_tokens,
         output_tokens=response.output_tokens,
         provider=provider,
         model=getattr(response, "model", model),
+        cached=getattr(response, "cached", False) is True,
+        cached_input_tokens=cached_input_tokens if isinstance(cached_input_tokens, int) else 0,
     )
 
 
+def _stream_diagnosis(
+    llm: LLMProvider,
+    user_prompt: str,
+    system_prompt: str,
+    on_section: Callable[[DiagnosisSection], None],
+) -> tuple[Diagnosis, LLMAnalysis]:
+    """Stream the response, reporting sections and stopping once all arrived."""
+    from heisenberg.llm.streaming import StreamCollector
+
+    parser = DiagnosisStreamParser()
+    collector = StreamCollector(llm.name, getattr(llm, "model", None) or "unknown")
+    with closing(llm.stream(user_prompt, system_prompt=system_prompt)) as chunks:
+        for chunk in chunks:
+            for section in parser.feed(collector.add(chunk)):
+                on_section(section)
+            if parser.is_complete:
+                logger.info("llm_stream_stopped_early: provider=%s", llm.name)
+                break
+        else:
+            # The last section ends with the response
+            for section in parser.close():
+                on_section(section)
+    return parser.diagnosis(), collector.result()
+
+
 def _get_llm_client_for_provider(
     provider: str,
     api_key: str | None = None,
     model: str | None = None,
+    response_cache: ResponseCache | None = None,
 ):
-    """Get LLM client for the specified provider."""
+    """Get LLM client for the specified provider, behind the cache if given."""
+    from heisenberg.llm.cache import CachedProvider
     from heisenberg.llm.providers import create_provider
 
     # Get config for environment variable lookup
@@ -208,4 +405,7 @@ def _get_llm_client_for_provider(
     if not resolved_api_key:
         raise ValueError(f"{config.env_var} environment variable is not set.")
 
-    return create_provider(provider, resolved_api_key, model=model)
+    llm = create_provider(provider, resolved_api_key, model=model)
+    if response_cache is not None:
+        return CachedProvider(llm, response_cache)
+    return llm
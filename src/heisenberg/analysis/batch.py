@@ -0,0 +1,123 @@
+"""Batch AI analysis of many reports through provider batch APIs."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING
+
+from heisenberg.analysis.ai_analyzer import (
+    AIAnalysisResult,
+    _build_unified_prompts,
+    _get_llm_client_for_provider,
+    _to_result,
+)
+from heisenberg.core.diagnosis import parse_diagnosis
+from heisenberg.core.models import PlaywrightTransformer
+from heisenberg.llm.batch import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_POLL_INTERVAL,
+    BatchProvider,
+    BatchRequest,
+    BatchResult,
+    run_batches,
+)
+
+if TYPE_CHECKING:
+    from heisenberg.llm.cache import ResponseCache
+    from heisenberg.parsers.playwright import PlaywrightReport
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_reports_in_batches(
+    reports: Mapping[str, PlaywrightReport],
+    on_result: Callable[[str, AIAnalysisResult | Exception], None],
+    *,
+    api_key: str | None = None,
+    provider: str = "anthropic",
+    model: str | None = None,
+    response_cache: ResponseCache | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    poll_interval: float | None = None,
+) -> None:
+    """
+    Analyze many reports through the provider's batch API.
+
+    Prompts are built exactly as in :func:`analyze_with_ai`. Cached answers
+    are delivered right away; the remaining reports are submitted in
+    batches and delivered as each batch ends.
+
+    Args:
+        reports: Playwright reports by caller-chosen key. Keys are sent as
+            batch custom IDs, so they must match ``CUSTOM_ID_PATTERN``
+            (1-64 letters, digits, ``_`` or ``-``).
+        on_result: Called once per key with the result, or with the error
+            if that request failed.
+        api_key: Optional API key. If None, reads from environment.
+        provider: LLM provider with a batch API (anthropic, openai).
+        model: Specific model to use (provider-dependent).
+        response_cache: Optional cache answering repeated prompts without
+            a batch request; batched answers are stored in it.
+        batch_size: Maximum requests per submitted batch.
+        poll_interval: Delay before the first batch status check, in seconds.
+            Defaults to ``DEFAULT_POLL_INTERVAL``.
+
+    Raises:
+        ValueError: If the provider has no batch API or a key is not a
+            valid custom ID.
+        TimeoutError: If batches do not finish within the batch API window.
+    """
+    llm = _get_llm_client_for_provider(provider, api_key, model)
+    if not isinstance(llm, BatchProvider):
+        raise ValueError(f"Batch analysis is not supported for provider: {provider}")
+
+    # Custom ID -> request, to cache answers under their prompts
+    pending: dict[str, BatchRequest] = {}
+    for key, report in reports.items():
+        system_prompt, user_prompt = _build_unified_prompts(
+            PlaywrightTransformer.transform_report(report),
+            None,
+            None,
+            None,
+            None,
+            provider=provider,
+            model=model,
+            input_token_budget=None,
+        )
+        if response_cache is not None:
+            cached = response_cache.get(response_cache.key_for(llm, user_prompt, system_prompt))
+            if cached is not None:
+                on_result(key, _to_result(cached, parse_diagnosis(cached.content), provider, model))
+                continue
+        pending[key] = BatchRequest(key, user_prompt, system_prompt)
+
+    logger.info(
+        "batch_analysis_started: provider=%s, reports=%d, pending=%d",
+        provider,
+        len(reports),
+        len(pending),
+    )
+
+    def deliver(result: BatchResult) -> None:
+        if result.analysis is None:
+            on_result(result.custom_id, RuntimeError(result.error or "Batch request failed"))
+            return
+        if response_cache is not None:
+            request = pending[result.custom_id]
+            response_cache.put(
+                response_cache.key_for(llm, request.user_prompt, request.system_prompt),
+                result.analysis,
+            )
+        diagnosis = parse_diagnosis(result.analysis.content)
+        analysis = _to_result(result.analysis, diagnosis, provider, model)
+        analysis.batch = True
+        on_result(result.custom_id, analysis)
+
+    run_batches(
+        llm,
+        list(pending.values()),
+        deliver,
+        batch_size=batch_size,
+        poll_interval=DEFAULT_POLL_INTERVAL if poll_interval is None else poll_interval,
+    )
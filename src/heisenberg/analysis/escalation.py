@@ -0,0 +1,105 @@
+"""Confidence-driven model escalation.
+
+Most failures (a timeout at a selector, an assertion on a changed text)
+are diagnosed just as well by a provider's fast model as by its default
+one, at a fraction of the price and latency. With escalation the fast
+model (``ProviderConfig.fast_model``) answers first, and the run is sent
+to the default model only when that diagnosis is unusable: LOW or UNKNOWN
+confidence, or required sections missing from the response.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from heisenberg.core.diagnosis import (
+    REQUIRED_SECTIONS,
+    ConfidenceLevel,
+    DiagnosisSection,
+    DiagnosisStreamParser,
+)
+from heisenberg.llm.config import PROVIDER_CONFIGS
+
+if TYPE_CHECKING:
+    from heisenberg.analysis.ai_analyzer import AIAnalysisResult
+    from heisenberg.core.diagnosis import Diagnosis
+
+logger = logging.getLogger(__name__)
+
+# Fast-model confidence levels that send the run to the default model
+ESCALATION_LEVELS = frozenset({ConfidenceLevel.LOW, ConfidenceLevel.UNKNOWN})
+
+
+def _sections(diagnosis: Diagnosis) -> list[DiagnosisSection]:
+    """Sections of a complete response, as a stream would report them."""
+    parser = DiagnosisStreamParser()
+    sections = parser.feed(diagnosis.raw_response or "")
+    return sections + parser.close()
+
+
+def escalation_reason(diagnosis: Diagnosis) -> str | None:
+    """
+    Tell why a fast-model diagnosis should be redone by the default model.
+
+    Args:
+        diagnosis: Diagnosis parsed from the fast model's response.
+
+    Returns:
+        Short reason, or None if the diagnosis can be kept.
+    """
+    received = {section.name for section in _sections(diagnosis)}
+    missing = [name for name in REQUIRED_SECTIONS if name not in received]
+    if missing:
+        return f"missing sections: {', '.join(missing)}"
+    if diagnosis.confidence in ESCALATION_LEVELS:
+        return f"confidence {diagnosis.confidence.value}"
+    return None
+
+
+def analyze_with_escalation(
+    analyze: Callable[..., AIAnalysisResult],
+    *,
+    provider: str,
+    on_section: Callable[[DiagnosisSection], None] | None = None,
+) -> AIAnalysisResult:
+    """
+    Analyze with the provider's fast model, escalating unusable diagnoses.
+
+    Args:
+        analyze: Runs the analysis; called with ``model`` (None for the
+            provider's default model) and ``on_section`` keyword arguments.
+        provider: Provider name.
+        on_section: Optional callback receiving the sections of the kept
+            diagnosis. Fast-model sections are reported once the diagnosis
+            is accepted; an escalated analysis is streamed.
+
+    Returns:
+        The fast model's result, or the default model's result with the
+        fast model's attempt as ``first_pass``.
+    """
+    config = PROVIDER_CONFIGS.get(provider)
+    fast_model = config.fast_model if config else None
+    if fast_model is None or fast_model == config.default_model:
+        return analyze(model=None, on_section=on_section)
+
+    first = analyze(model=fast_model, on_section=None)
+    reason = escalation_reason(first.diagnosis)
+    if reason is None:
+        logger.info("escalation_not_needed: provider=%s, model=%s", provider, fast_model)
+        if on_section is not None:
+            for section in _sections(first.diagnosis):
+                on_section(section)
+        return first
+
+    logger.info(
+        "escalation_started: provider=%s, from=%s, to=%s, reason=%s",
+        provider,
+        fast_model,
+        config.default_model,
+        reason,
+    )
+    result = analyze(model=None, on_section=on_section)
+    result.first_pass = first
+    return result
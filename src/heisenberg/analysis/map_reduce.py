@@ -0,0 +1,228 @@
+"""Map-reduce analysis of runs with many failures.
+
+One prompt holding every failure of a large run is slow, may not fit the
+input budget (trailing failures are then dropped) and models tend to
+ignore most of what they are shown. Instead, failure clusters are packed
+into groups, every group is analyzed concurrently, and a short reduce call
+merges the group diagnoses into one verdict for the run. Wall time then
+tracks the slowest group instead of the size of the whole run.
+
+Group prompts hold only their failures; the run's shared context (logs,
+screenshots, traces) is sent once, with the reduce call, so the input
+tokens of an analysis stay close to those of a single prompt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from heisenberg.analysis.ai_analyzer import (
+    AIAnalysisResult,
+    _build_unified_prompts,
+    _input_token_budget,
+    _stream_diagnosis,
+    _to_result,
+)
+from heisenberg.core.diagnosis import Diagnosis, DiagnosisSection, parse_diagnosis
+from heisenberg.llm.prompts import build_merge_prompt
+from heisenberg.utils.failure_clusters import cluster_failures
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+
+    from heisenberg.core.models import UnifiedFailure, UnifiedTestRun
+    from heisenberg.integrations.docker import ContainerLogs
+    from heisenberg.llm.models import LLMAnalysis
+    from heisenberg.llm.providers.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Runs with more distinct failures (clusters) are analyzed in groups unless
+# map_reduce is set
+DEFAULT_MAP_REDUCE_THRESHOLD = 20
+# Failure clusters per group prompt
+DEFAULT_GROUP_SIZE = 10
+# Group prompts sent at the same time
+DEFAULT_MAP_CONCURRENCY = 4
+
+T = TypeVar("T")
+
+
+def group_failures(
+    failures: list[UnifiedFailure], max_group_size: int = DEFAULT_GROUP_SIZE
+) -> list[list[UnifiedFailure]]:
+    """
+    Split failures into groups of whole failure clusters.
+
+    Failures sharing an error (see :func:`cluster_failures`) stay in one
+    group, where the prompt shows them as a single block. Clusters are
+    packed in run order, ``max_group_size`` per group.
+
+    Args:
+        failures: Failures of a run.
+        max_group_size: Maximum failure clusters per group.
+
+    Returns:
+        Groups in a deterministic order.
+    """
+    clusters = cluster_failures(failures)
+    return [
+        [
+            failure
+            for cluster in clusters[start : start + max_group_size]
+            for failure in cluster.members
+        ]
+        for start in range(0, len(clusters), max_group_size)
+    ]
+
+
+def analyze_in_groups(
+    run: UnifiedTestRun,
+    llm: LLMProvider,
+    *,
+    provider: str,
+    model: str | None = None,
+    container_logs: dict[str, ContainerLogs] | None = None,
+    job_logs_context: str | None = None,
+    screenshot_context: str | None = None,
+    trace_context: str | None = None,
+    input_token_budget: int | None = None,
+    on_section: Callable[[DiagnosisSection], None] | None = None,
+    max_group_size: int = DEFAULT_GROUP_SIZE,
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+) -> AIAnalysisResult:
+    """
+    Analyze a run's failures in concurrent groups and merge the diagnoses.
+
+    Group prompts carry only their failures and the reduce prompt carries
+    the context sections (a single group is analyzed with them directly). Groups that fail are reported to the reduce call
+    as not analyzed; the analysis only fails if every group does.
+
+    Args:
+        run: Test run with failures.
+        llm: Provider answering the group and reduce prompts.
+        provider: Provider name (for token budgets and results).
+        model: Specific model to use (provider-dependent).
+        container_logs: Optional container logs for context.
+        job_logs_context: Optional pre-formatted job logs snippets.
+        screenshot_context: Optional pre-formatted screenshot descriptions.
+        trace_context: Optional pre-formatted Playwright trace analysis.
+        input_token_budget: Prompt size target of each group prompt and of
+            the reduce prompt.
+        on_section: Optional callback receiving the merged diagnosis
+            sections while the reduce response streams in.
+        max_group_size: Maximum failure clusters per group.
+        max_concurrency: Maximum group prompts in flight.
+
+    Returns:
+        AIAnalysisResult with the merged diagnosis and the tokens of all calls.
+
+    Raises:
+        Exception: The first group's error if no group could be analyzed.
+    """
+    from heisenberg.llm.tokens import get_token_counter
+
+    groups = group_failures(run.failures, max_group_size)
+    # A single group is a regular analysis; otherwise context goes to the reduce call
+    context = (container_logs, job_logs_context, screenshot_context, trace_context)
+    group_context = context if len(groups) == 1 else (None, None, None, None)
+    prompts = [
+        _build_unified_prompts(
+            dataclasses.replace(run, failures=group),
+            *group_context,
+            provider=provider,
+            model=model,
+            input_token_budget=input_token_budget,
+        )
+        for group in groups
+    ]
+    logger.info(
+        "map_reduce_started: failures=%d, groups=%d, concurrency=%d",
+        len(run.failures),
+        len(groups),
+        max_concurrency,
+    )
+    responses = _run(_map(llm, prompts, max_concurrency))
+
+    analyzed = [r for r in responses if not isinstance(r, BaseException)]
+    if not analyzed:
+        raise responses[0]
+    if len(groups) == 1:
+        response = analyzed[0]
+        return _to_result(response, parse_diagnosis(response.content), provider, model)
+
+    group_diagnoses = []
+    for group, response in zip(groups, responses, strict=True):
+        titles = [failure.test_title for failure in group]
+        if isinstance(response, BaseException):
+            logger.warning("map_reduce_group_failed: tests=%d, error=%s", len(group), response)
+            group_diagnoses.append((titles, None))
+        else:
+            group_diagnoses.append((titles, _format_group(parse_diagnosis(response.content))))
+
+    # Reduce: merge the group diagnoses into one verdict
+    system_prompt, user_prompt = build_merge_prompt(
+        run,
+        group_diagnoses,
+        *context,
+        token_counter=get_token_counter(provider, model),
+        input_token_budget=_input_token_budget(provider, input_token_budget),
+    )
+    if on_section is not None:
+        diagnosis, merged = _stream_diagnosis(llm, user_prompt, system_prompt, on_section)
+    else:
+        merged = llm.analyze(user_prompt, system_prompt=system_prompt)
+        diagnosis = parse_diagnosis(merged.content)
+
+    result = _to_result(merged, diagnosis, provider, model)
+    result.groups = len(groups)
+    for response in analyzed:
+        result.input_tokens += response.input_tokens
+        result.output_tokens += response.output_tokens
+        cached_input_tokens = getattr(response, "cached_input_tokens", 0)
+        if isinstance(cached_input_tokens, int):
+            result.cached_input_tokens += cached_input_tokens
+        result.cached = result.cached and getattr(response, "cached", False) is True
+    return result
+
+
+async def _map(
+    llm: LLMProvider, prompts: list[tuple[str, str]], max_concurrency: int
+) -> list[LLMAnalysis | BaseException]:
+    """Send group prompts with bounded concurrency, keeping errors per group."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze(system_prompt: str, user_prompt: str) -> LLMAnalysis:
+        async with semaphore:
+            return await llm.analyze_async(user_prompt, system_prompt=system_prompt)
+
+    return list(
+        await asyncio.gather(
+            *(analyze(system, user) for system, user in prompts), return_exceptions=True
+        )
+    )
+
+
+def _run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine from sync code, also when called inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Sync API called from async code (e.g. fetch-github): use a private loop
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _format_group(diagnosis: Diagnosis) -> str:
+    """Render a group diagnosis compactly for the reduce prompt."""
+    lines = [f"Root cause: {diagnosis.root_cause}"]
+    lines.extend(f"- {item}" for item in diagnosis.evidence)
+    lines.append(f"Suggested fix: {diagnosis.suggested_fix}")
+    lines.append(f"Confidence: {diagnosis.confidence.value}")
+    return "\n".join(lines)
@@ -5,7 +5,9 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from heisenberg.integrations.docker import ContainerLogs, DockerLogsCollector
+from heisenberg.integrations.docker import CompactContainerLogs, ContainerLogs, DockerLogsCollector
+from heisenberg.integrations.docker_json import DockerJsonFileCollector
+from heisenberg.integrations.log_buffer import LogRingBuffer
 from heisenberg.parsers.playwright import FailedTest, PlaywrightReport, parse_playwright_report
 
 # =============================================================================
@@ -145,7 +147,7 @@ class AnalysisResult:
     """Result of analyzing test failures."""
 
     report: PlaywrightReport
-    container_logs: dict[str, ContainerLogs] = field(default_factory=dict)
+    container_logs: dict[str, ContainerLogs | CompactContainerLogs] = field(default_factory=dict)
 
     @property
     def has_failures(self) -> bool:
@@ -199,6 +201,8 @@ class Analyzer:
         report_path: Path,
         docker_services: str = "",
         log_window_seconds: int = 30,
+        log_buffer_dir: Path | None = None,
+        docker_logs_dir: Path | None = None,
     ):
         """
         Initialize analyzer.
@@ -207,10 +211,17 @@ class Analyzer:
             report_path: Path to Playwright JSON report.
             docker_services: Comma-separated list of Docker service names.
             log_window_seconds: Time window for log collection.
+            log_buffer_dir: Directory written by ``heisenberg logs follow``.
+                When set, logs are read from the buffer instead of docker.
+            docker_logs_dir: Docker containers directory
+                (e.g. ``/var/lib/docker/containers``). When set, json-file
+                logs are read directly instead of via ``docker logs``.
         """
         self.report_path = report_path
         self.docker_services = docker_services
         self.log_window_seconds = log_window_seconds
+        self.log_buffer_dir = log_buffer_dir
+        self.docker_logs_dir = docker_logs_dir
 
     def analyze(self) -> AnalysisResult:
         """
@@ -223,9 +234,9 @@ class Analyzer:
         report = parse_playwright_report(self.report_path)
 
         # Step 2: Collect Docker logs if configured
-        container_logs: dict[str, ContainerLogs] = {}
+        container_logs: dict[str, ContainerLogs | CompactContainerLogs] = {}
 
-        if self.docker_services and report.has_failures:
+        if (self.docker_services or self.log_buffer_dir) and report.has_failures:
             container_logs = self._collect_docker_logs(report)
 
         return AnalysisResult(
@@ -233,10 +244,36 @@ class Analyzer:
             container_logs=container_logs,
         )
 
-    def _collect_docker_logs(self, report: PlaywrightReport) -> dict[str, ContainerLogs]:
+    def _read_buffered_logs(self) -> dict[str, ContainerLogs | CompactContainerLogs]:
+        """Read logs captured by ``heisenberg logs follow``."""
+        if self.log_buffer_dir is None:
+            return {}
+        services = [s.strip() for s in self.docker_services.split(",") if s.strip()] or None
+        return dict(LogRingBuffer(self.log_buffer_dir).read_all(services))
+
+    def _read_json_file_logs(
+        self, report: PlaywrightReport
+    ) -> dict[str, ContainerLogs | CompactContainerLogs]:
+        """Read only the failure window from Docker's json-file logs."""
+        if self.docker_logs_dir is None:
+            return {}
+        services = [s.strip() for s in self.docker_services.split(",") if s.strip()]
+        failure_times = [t.start_time for t in report.failed_tests if t.start_time is not None]
+        collector = DockerJsonFileCollector(services, containers_dir=self.docker_logs_dir)
+        center = min(failure_times) if failure_times else None
+        return dict(collector.collect_all(center, self.log_window_seconds))
+
+    def _collect_docker_logs(
+        self, report: PlaywrightReport
+    ) -> dict[str, ContainerLogs | CompactContainerLogs]:
         """Collect and filter Docker logs around failure timestamps."""
-        collector = DockerLogsCollector.from_string(self.docker_services)
-        all_logs = collector.collect_all()
+        if self.log_buffer_dir is not None:
+            all_logs = self._read_buffered_logs()
+        elif self.docker_logs_dir is not None:
+            all_logs = self._read_json_file_logs(report)
+        else:
+            collector = DockerLogsCollector.from_string(self.docker_services)
+            all_logs = collector.collect_all()
 
         if not all_logs:
             return {}
@@ -253,7 +290,7 @@ class Analyzer:
         # Use the earliest failure time as center point
         earliest_failure = min(failure_times)
 
-        filtered_logs: dict[str, ContainerLogs] = {}
+        filtered_logs: dict[str, ContainerLogs | CompactContainerLogs] = {}
         for name, logs in all_logs.items():
             filtered = logs.filter_by_time_window(earliest_failure, self.log_window_seconds)
             if filtered.entries:
@@ -266,6 +303,8 @@ def run_analysis(
     report_path: Path,
     docker_services: str = "",
     log_window_seconds: int = 30,
+    log_buffer_dir: Path | None = None,
+    docker_logs_dir: Path | None = None,
 ) -> AnalysisResult:
     """
     Convenience function to run analysis.
@@ -274,6 +313,8 @@ def run_analysis(
         report_path: Path to Playwright JSON report.
         docker_services: Comma-separated list of Docker service names.
         log_window_seconds: Time window for log collection.
+        log_buffer_dir: Optional buffer directory from ``heisenberg logs follow``.
+        docker_logs_dir: Optional Docker containers directory to read json-file logs from.
 
     Returns:
         AnalysisResult with parsed report and collected logs.
@@ -282,5 +323,7 @@ def run_analysis(
         report_path=report_path,
         docker_services=docker_services,
         log_window_seconds=log_window_seconds,
+        log_buffer_dir=log_buffer_dir,
+        docker_logs_dir=docker_logs_dir,
     )
     return analyzer.analyze()
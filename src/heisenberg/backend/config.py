@@ -48,6 +48,13 @@ class Settings(BaseSettings):
     # LLM Configuration
     llm_primary_provider: str = "google"
     llm_fallback_provider: str | None = None
+    # Hedge slow primary calls to the fallback after this latency percentile
+    # (e.g. 0.95); None disables hedging
+    llm_hedge_percentile: float | None = None
+    # Maximum fraction of requests that may be hedged (each hedge is paid twice)
+    llm_hedge_max_ratio: float = 0.1
+    # Skip providers whose recent calls mostly failed until a probe succeeds
+    llm_circuit_breaker: bool = True
 
     # External Services
     anthropic_api_key: str | None = None
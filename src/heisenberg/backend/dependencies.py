@@ -8,6 +8,8 @@ from heisenberg.backend.config import get_settings
 from heisenberg.backend.llm.adapter import LLMRouterAdapter
 from heisenberg.backend.services import create_llm_service
 from heisenberg.backend.services.analyze import AnalyzeService
+from heisenberg.llm.health import CircuitBreakerPolicy
+from heisenberg.llm.hedging import HedgingPolicy
 from heisenberg.llm.router import LLMRouter
 
 
@@ -21,11 +23,20 @@ def get_llm_service() -> LLMRouter:
     """
     settings = get_settings()
 
+    hedging = None
+    if settings.llm_hedge_percentile is not None:
+        hedging = HedgingPolicy(
+            percentile=settings.llm_hedge_percentile,
+            max_hedge_ratio=settings.llm_hedge_max_ratio,
+        )
+
     return create_llm_service(
         primary_provider=settings.llm_primary_provider,
         fallback_provider=settings.llm_fallback_provider,
         anthropic_api_key=settings.anthropic_api_key,
         openai_api_key=settings.openai_api_key,
+        hedging=hedging,
+        circuit_breaker=CircuitBreakerPolicy() if settings.llm_circuit_breaker else None,
     )
 
 
@@ -8,6 +8,8 @@ from uuid import UUID
 
 from heisenberg.backend.cost_tracking import CostCalculator
 from heisenberg.backend.models import UsageRecord
+from heisenberg.llm.health import CircuitBreakerPolicy
+from heisenberg.llm.hedging import HedgingPolicy
 from heisenberg.llm.providers import create_provider
 from heisenberg.llm.router import LLMRouter
 
@@ -50,6 +52,8 @@ def create_llm_service(
     anthropic_api_key: str | None = None,
     openai_api_key: str | None = None,
     google_api_key: str | None = None,
+    hedging: HedgingPolicy | None = None,
+    circuit_breaker: CircuitBreakerPolicy | None = None,
 ) -> LLMRouter:
     """
     Create an LLM service with optional fallback.
@@ -60,6 +64,8 @@ def create_llm_service(
         anthropic_api_key: Anthropic API key (or from env).
         openai_api_key: OpenAI API key (or from env).
         google_api_key: Google API key (or from env).
+        hedging: Optional policy for hedging slow primary calls to the fallback.
+        circuit_breaker: Optional policy for skipping unhealthy providers.
 
     Returns:
         Configured LLMRouter with providers.
@@ -74,7 +80,7 @@ def create_llm_service(
     if fallback_provider:
         providers.append(_create_single_provider(fallback_provider, api_keys))
 
-    return LLMRouter(providers=providers)
+    return LLMRouter(providers=providers, hedging=hedging, circuit_breaker=circuit_breaker)
 
 
 async def record_usage(
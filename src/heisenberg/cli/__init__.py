@@ -8,6 +8,7 @@ from heisenberg.cli.commands import (
     run_fetch_github,
     run_freeze,
     run_generate_manifest,
+    run_logs_follow,
     run_validate_cases,
 )
 from heisenberg.cli.parsers import create_parser
@@ -30,6 +31,8 @@ def main() -> int:
         return run_generate_manifest(args)
     elif args.command == "validate-cases":
         return run_validate_cases(args)
+    elif args.command == "logs" and args.logs_command == "follow":
+        return run_logs_follow(args)
 
     return 1
 
@@ -40,5 +43,6 @@ __all__ = [
     "run_analyze_case",
     "run_freeze",
     "run_generate_manifest",
+    "run_logs_follow",
     "run_validate_cases",
 ]
@@ -5,15 +5,24 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import signal
 import sys
 import tempfile
+import threading
 from pathlib import Path
 
 from heisenberg.analysis import analyze_unified_run, analyze_with_ai, run_analysis
 from heisenberg.cli import formatters, github_fetch
+from heisenberg.core.diagnosis import DiagnosisSection
 from heisenberg.core.models import PlaywrightTransformer, UnifiedTestRun
 from heisenberg.integrations.github_client import post_pr_comment
-from heisenberg.playground.analyze import AnalyzeConfig, ScenarioAnalyzer
+from heisenberg.llm.cache import ResponseCache
+from heisenberg.playground.analyze import (
+    AnalysisResult,
+    AnalyzeConfig,
+    ScenarioAnalyzer,
+    analyze_cases_in_batches,
+)
 from heisenberg.playground.freeze import CaseFreezer, FreezeConfig
 from heisenberg.playground.manifest import GeneratorConfig, ManifestGenerator
 from heisenberg.playground.validate import CaseValidator, ValidatorConfig
@@ -64,6 +73,23 @@ def _load_container_logs(args, result):
     return container_logs
 
 
+def _response_cache(args) -> ResponseCache | None:
+    """Get the local LLM response cache unless disabled with --no-llm-cache."""
+    if getattr(args, "no_llm_cache", False):
+        return None
+    return ResponseCache.default()
+
+
+def _print_section(section: DiagnosisSection) -> None:
+    """Print a streamed diagnosis section to stderr."""
+    print(f"## {section.title}\n{section.content}\n", file=sys.stderr, flush=True)
+
+
+def _section_printer(args):
+    """Get the streamed-section callback if --stream was given."""
+    return _print_section if getattr(args, "stream", False) else None
+
+
 def _run_ai_analysis(args, result, container_logs):
     """Run AI analysis if requested and there are failures."""
     if not (getattr(args, "ai_analysis", False) and result.has_failures):
@@ -75,6 +101,10 @@ def _run_ai_analysis(args, result, container_logs):
             container_logs=container_logs,
             provider=getattr(args, "provider", "google"),
             model=getattr(args, "model", None),
+            response_cache=_response_cache(args),
+            on_section=_section_printer(args),
+            escalate=getattr(args, "escalate", False),
+            map_reduce=getattr(args, "map_reduce", None),
         )
     except Exception as e:
         print(f"Warning: AI analysis failed: {e}", file=sys.stderr)
@@ -143,6 +173,8 @@ def run_analyze(args: argparse.Namespace) -> int:
             report_path=args.report,
             docker_services=args.docker_services,
             log_window_seconds=args.log_window,
+            log_buffer_dir=getattr(args, "log_buffer", None),
+            docker_logs_dir=getattr(args, "docker_logs_dir", None),
         )
     except ValueError as e:
         print(f"Error analyzing report: {e}", file=sys.stderr)
@@ -184,6 +216,10 @@ def _run_junit_analyze(args: argparse.Namespace) -> int:
                 unified_run,
                 provider=args.provider,
                 model=getattr(args, "model", None),
+                response_cache=_response_cache(args),
+                on_section=_section_printer(args),
+                escalate=getattr(args, "escalate", False),
+                map_reduce=getattr(args, "map_reduce", None),
             )
         except Exception as e:
             print(f"Warning: AI analysis failed: {e}", file=sys.stderr)
@@ -230,12 +266,20 @@ def _analyze_report_data(
                         job_logs_context=job_logs_context,
                         screenshot_context=screenshot_context,
                         trace_context=trace_context,
+                        response_cache=_response_cache(args),
+                        on_section=_section_printer(args),
+                        escalate=getattr(args, "escalate", False),
+                        map_reduce=getattr(args, "map_reduce", None),
                     )
                 else:
                     ai_result = analyze_with_ai(
                         report=result.report,
                         provider=getattr(args, "provider", "google"),
                         model=getattr(args, "model", None),
+                        response_cache=_response_cache(args),
+                        on_section=_section_printer(args),
+                        escalate=getattr(args, "escalate", False),
+                        map_reduce=getattr(args, "map_reduce", None),
                     )
             except Exception as e:
                 print(f"Warning: AI analysis failed: {e}", file=sys.stderr)
@@ -286,7 +330,7 @@ async def _fetch_optional_context(
         )
     if getattr(args, "include_screenshots", False):
         screenshot_context = await github_fetch.fetch_and_analyze_screenshots(
-            token, owner, repo, args.run_id, args.artifact_name
+            token, owner, repo, args.run_id, args.artifact_name, cache=_response_cache(args)
         )
     if getattr(args, "include_traces", False):
         trace_context = await github_fetch.fetch_and_analyze_traces(
@@ -415,10 +459,14 @@ def run_analyze_case(args: argparse.Namespace) -> int:
         print(f"Error: Case directory not found: {args.case_dir}", file=sys.stderr)
         return 1
 
+    if getattr(args, "batch", False):
+        return _run_analyze_cases_in_batches(args, provider)
+
     config = AnalyzeConfig(
         case_dir=args.case_dir,
         provider=provider,
         model=getattr(args, "model", None),
+        response_cache=_response_cache(args),
     )
 
     analyzer = ScenarioAnalyzer(config)
@@ -442,6 +490,46 @@ def run_analyze_case(args: argparse.Namespace) -> int:
         return 1
 
 
+def _run_analyze_cases_in_batches(args: argparse.Namespace, provider: str) -> int:
+    """Analyze every pending case below args.case_dir through the batch API."""
+    case_dirs = sorted(
+        path
+        for path in args.case_dir.iterdir()
+        if (path / "report.json").exists()
+        and (getattr(args, "force", False) or not (path / "diagnosis.json").exists())
+    )
+    if not case_dirs:
+        print(f"No cases to analyze in: {args.case_dir}")
+        return 0
+    print(f"Submitting {len(case_dirs)} case(s) to the {provider} batch API...")
+
+    def report(case_dir: Path, outcome: AnalysisResult | Exception) -> None:
+        if isinstance(outcome, Exception):
+            print(f"  [FAILED] {case_dir.name}: {outcome}", file=sys.stderr)
+        else:
+            print(f"  [{outcome.confidence}] {case_dir.name}: {outcome.root_cause[:60]}")
+
+    try:
+        outcomes = analyze_cases_in_batches(
+            case_dirs,
+            provider=provider,
+            model=getattr(args, "model", None),
+            response_cache=_response_cache(args),
+            poll_interval=getattr(args, "poll_interval", None),
+            on_case=report,
+        )
+    except (ValueError, TimeoutError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error analyzing cases: {e}", file=sys.stderr)
+        return 1
+
+    failed = sum(isinstance(outcome, Exception) for outcome in outcomes.values())
+    print(f"Batch analysis complete: {len(outcomes) - failed} analyzed, {failed} failed")
+    return 1 if failed else 0
+
+
 def run_generate_manifest(args: argparse.Namespace) -> int:
     """Run the generate-manifest command."""
     if not args.cases_dir.exists():
@@ -521,3 +609,46 @@ def run_validate_cases(args: argparse.Namespace) -> int:
     except Exception as e:
         print(f"Error validating cases: {e}", file=sys.stderr)
         return 1
+
+
+def run_logs_follow(args: argparse.Namespace) -> int:
+    """Run the logs follow command until interrupted or all containers exit."""
+    from heisenberg.integrations.log_buffer import DockerLogsFollower, LogRingBuffer
+
+    services = [s.strip() for s in args.services.split(",") if s.strip()]
+    if not services:
+        print("Error: --services must name at least one service", file=sys.stderr)
+        return 1
+
+    mib = 1024 * 1024
+    try:
+        buffer = LogRingBuffer(
+            directory=args.buffer_dir,
+            max_bytes=args.max_mb * mib,
+            segment_bytes=args.segment_mb * mib,
+            max_age_seconds=args.max_age,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    follower = DockerLogsFollower(services, buffer)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    try:
+        follower.start()
+    except FileNotFoundError:
+        print("Error: docker command not found", file=sys.stderr)
+        return 1
+
+    print(f"Following logs for {', '.join(services)} into {args.buffer_dir}", file=sys.stderr)
+    try:
+        while follower.running and not stop.wait(1.0):
+            buffer.evict_expired()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.stop()
+
+    return 0
@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
 import sys
 import zipfile
+from contextlib import closing
+from functools import partial
+from typing import TYPE_CHECKING
 
 from heisenberg.cli.formatters import format_size
 
+if TYPE_CHECKING:
+    from heisenberg.llm.cache import ResponseCache
+
 
 async def _resolve_run_id(client, owner: str, repo: str, run_id: int | None) -> int | None:
     """Get the latest failed run ID if none is provided.
@@ -45,6 +52,53 @@ async def fetch_report_from_run(client, owner: str, repo: str, run_id: int, arti
     return client.extract_playwright_report(zip_data)
 
 
+# Job logs downloaded at the same time when the run archive does not cover a job
+MAX_CONCURRENT_JOB_LOGS = 8
+
+
+async def _stream_job_snippets(client, owner: str, repo: str, job: dict, processor) -> list:
+    """Extract snippets from one job log while it downloads."""
+    from contextlib import aclosing
+
+    from heisenberg.integrations.github_artifacts import GitHubAPIError
+
+    extractor = processor.extractor()
+    snippets = []
+    try:
+        async with aclosing(client.stream_job_logs(owner, repo, job.get("id"))) as lines:
+            async for line in lines:
+                snippets.extend(extractor.feed(line))
+                if extractor.done:
+                    # Closing the stream stops the download
+                    break
+    except GitHubAPIError as e:
+        print(f"Could not fetch logs for job {job.get('name')}: {e}", file=sys.stderr)
+    snippets.extend(extractor.finish())
+    return snippets
+
+
+async def _fetch_job_snippets(
+    client,
+    owner: str,
+    repo: str,
+    jobs: list[dict],
+    processor,
+    max_concurrency: int = MAX_CONCURRENT_JOB_LOGS,
+) -> list[list]:
+    """Stream job logs concurrently over the client's shared connection pool.
+
+    Returns:
+        Snippets per job, in the order of ``jobs``.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(job: dict) -> list:
+        async with semaphore:
+            return await _stream_job_snippets(client, owner, repo, job, processor)
+
+    return list(await asyncio.gather(*(fetch(job) for job in jobs)))
+
+
 async def fetch_and_process_job_logs(
     token: str,
     owner: str,
@@ -53,6 +107,10 @@ async def fetch_and_process_job_logs(
 ) -> str | None:
     """Fetch and process job logs from GitHub Actions.
 
+    Failed jobs are read from the run-level log archive. Jobs it does not
+    cover are downloaded concurrently through the jobs API and scanned as
+    they stream in. The gh CLI is only used when the API is unavailable.
+
     Args:
         token: GitHub token.
         owner: Repository owner.
@@ -62,32 +120,83 @@ async def fetch_and_process_job_logs(
     Returns:
         Formatted job logs context string, or None if no logs available.
     """
-    from heisenberg.integrations.github_artifacts import GitHubArtifactClient
-    from heisenberg.integrations.github_logs import GitHubLogsFetcher
+    from heisenberg.integrations.github_artifacts import GitHubAPIError, GitHubArtifactClient
+    from heisenberg.integrations.github_logs import RunLogsArchive
     from heisenberg.parsers.job_logs import JobLogsProcessor
 
+    processor = JobLogsProcessor()
     client = GitHubArtifactClient(token=token)
-    actual_run_id = await _resolve_run_id(client, owner, repo, run_id)
+    async with client:
+        actual_run_id = await _resolve_run_id(client, owner, repo, run_id)
 
-    if actual_run_id is None:
-        return None
+        if actual_run_id is None:
+            return None
+
+        print(f"Fetching job logs for run {actual_run_id}...", file=sys.stderr)
 
-    print(f"Fetching job logs for run {actual_run_id}...", file=sys.stderr)
+        try:
+            jobs = await client.get_workflow_jobs(owner, repo, actual_run_id)
+        except GitHubAPIError as e:
+            print(f"Job list unavailable ({e}), using gh.", file=sys.stderr)
+            return _process_job_logs_with_gh(owner, repo, actual_run_id, processor)
+
+        failed_jobs = [job for job in jobs if job.get("conclusion") == "failure"]
+        if not failed_jobs:
+            print("No job logs found.", file=sys.stderr)
+            return None
+
+        # One archive download covers every job
+        archive: RunLogsArchive | None = None
+        try:
+            archive = RunLogsArchive(await client.download_run_logs(owner, repo, actual_run_id))
+        except (GitHubAPIError, zipfile.BadZipFile) as e:
+            print(f"Run log archive unavailable ({e}).", file=sys.stderr)
+
+        snippets_by_job: list[list] = [[] for _ in failed_jobs]
+        pending: list[int] = []
+        for index, job in enumerate(failed_jobs):
+            if archive is not None and (sources := archive.logs_for_job(job)):
+                # Failed steps are read straight from the archive; full job
+                # logs are indexed first so only relevant steps are scanned
+                for _label, member in sources:
+                    snippets_by_job[index].extend(
+                        processor.iter_relevant_snippets(partial(archive.iter_lines, member))
+                    )
+            else:
+                pending.append(index)
+
+        if pending:
+            fetched = await _fetch_job_snippets(
+                client, owner, repo, [failed_jobs[i] for i in pending], processor
+            )
+            for index, snippets in zip(pending, fetched, strict=True):
+                snippets_by_job[index] = snippets
+
+    return _format_job_snippets(processor, [s for job in snippets_by_job for s in job])
+
+
+def _process_job_logs_with_gh(owner: str, repo: str, run_id: int, processor) -> str | None:
+    """Fetch and process failed job logs one by one with the gh CLI."""
+    from heisenberg.integrations.github_logs import GitHubLogsFetcher
 
     fetcher = GitHubLogsFetcher()
-    logs_by_job = fetcher.fetch_logs_for_run(f"{owner}/{repo}", str(actual_run_id))
+    failed_jobs = fetcher.get_failed_jobs(f"{owner}/{repo}", str(run_id))
 
-    if not logs_by_job:
+    if not failed_jobs:
         print("No job logs found.", file=sys.stderr)
         return None
 
-    processor = JobLogsProcessor()
     all_snippets = []
+    for job in failed_jobs:
+        # Logs are processed as they stream in and the download stops once
+        # the snippet line limit is reached
+        with closing(fetcher.stream_job_logs(f"{owner}/{repo}", str(job.get("id")))) as lines:
+            all_snippets.extend(processor.iter_snippets(lines))
+    return _format_job_snippets(processor, all_snippets)
 
-    for _job_name, log_content in logs_by_job.items():
-        snippets = processor.extract_snippets(log_content)
-        all_snippets.extend(snippets)
 
+def _format_job_snippets(processor, all_snippets: list) -> str | None:
+    """Report and format extracted job log snippets."""
     if not all_snippets:
         print("No error snippets found in job logs.", file=sys.stderr)
         return None
@@ -102,15 +211,20 @@ async def fetch_and_analyze_screenshots(
     repo: str,
     run_id: int | None,
     artifact_name: str,
+    cache: ResponseCache | None = None,
 ) -> str | None:
     """Fetch and analyze screenshots from Playwright artifacts.
 
+    Near-identical screenshots (e.g. of retries) are collapsed and the rest
+    downscaled, then described together in one vision request.
+
     Args:
         token: GitHub token.
         owner: Repository owner.
         repo: Repository name.
         run_id: Optional specific workflow run ID.
         artifact_name: Pattern to match artifact name.
+        cache: Optional cache of screenshot descriptions.
 
     Returns:
         Formatted screenshot analysis string, or None if no screenshots.
@@ -118,9 +232,11 @@ async def fetch_and_analyze_screenshots(
     from heisenberg.integrations.github_artifacts import GitHubArtifactClient
     from heisenberg.llm.vision import (
         ScreenshotAnalyzer,
-        extract_screenshots_from_artifact,
         format_screenshots_for_prompt,
+        iter_screenshots_from_artifact,
+        prepare_screenshots,
     )
+    from heisenberg.llm.vision.screenshots import DEFAULT_IMAGES_PER_REQUEST
 
     try:
         client = GitHubArtifactClient(token=token)
@@ -139,17 +255,23 @@ async def fetch_and_analyze_screenshots(
         for artifact in matching[:1]:  # Only first matching artifact
             print(f"Extracting screenshots from: {artifact.name}...", file=sys.stderr)
             zip_data = await client.download_artifact(owner, repo, artifact.id)
-            screenshots = extract_screenshots_from_artifact(zip_data)
+            screenshots = prepare_screenshots(iter_screenshots_from_artifact(zip_data))
             all_screenshots.extend(screenshots)
 
         if not all_screenshots:
             print("No screenshots found in artifacts.", file=sys.stderr)
             return None
 
-        print(f"Found {len(all_screenshots)} screenshot(s). Analyzing...", file=sys.stderr)
+        found = sum(1 + len(s.duplicate_tests) for s in all_screenshots)
+        print(
+            f"Found {found} screenshot(s), {len(all_screenshots)} distinct. Analyzing...",
+            file=sys.stderr,
+        )
 
-        analyzer = ScreenshotAnalyzer(provider="google")
-        analyzed = analyzer.analyze_batch(all_screenshots, max_screenshots=5)
+        analyzer = ScreenshotAnalyzer(provider="google", cache=cache)
+        analyzed = await analyzer.analyze_batch_async(
+            all_screenshots, max_screenshots=5, images_per_request=DEFAULT_IMAGES_PER_REQUEST
+        )
 
         return format_screenshots_for_prompt(analyzed)
     except Exception as e:
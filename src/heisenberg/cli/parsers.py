@@ -7,6 +7,16 @@ from pathlib import Path
 
 # Shared help text constants
 _PROVIDER_HELP = "LLM provider to use (default: google)"
+_NO_LLM_CACHE_HELP = "Always call the LLM instead of reusing a cached response for the same prompt"
+_STREAM_HELP = "Print AI diagnosis sections to stderr as soon as the model has written them"
+_ESCALATE_HELP = (
+    "Analyze with the provider's fast model first and re-run with the default model "
+    "only on LOW/UNKNOWN confidence (ignored with --model)"
+)
+_MAP_REDUCE_HELP = (
+    "Analyze failures in concurrent groups and merge the group diagnoses "
+    "(default: only for runs with more than 20 distinct errors)"
+)
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -23,6 +33,7 @@ def create_parser() -> argparse.ArgumentParser:
     _add_analyze_case_parser(subparsers)
     _add_generate_manifest_parser(subparsers)
     _add_validate_cases_parser(subparsers)
+    _add_logs_parser(subparsers)
 
     return parser
 
@@ -86,6 +97,27 @@ def _add_analyze_parser(subparsers) -> None:
         default=None,
         help="Specific model to use (provider-dependent)",
     )
+    analyze_parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help=_NO_LLM_CACHE_HELP,
+    )
+    analyze_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=_STREAM_HELP,
+    )
+    analyze_parser.add_argument(
+        "--escalate",
+        action="store_true",
+        help=_ESCALATE_HELP,
+    )
+    analyze_parser.add_argument(
+        "--map-reduce",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=_MAP_REDUCE_HELP,
+    )
     analyze_parser.add_argument(
         "--container-logs",
         "-l",
@@ -93,6 +125,19 @@ def _add_analyze_parser(subparsers) -> None:
         default=None,
         help="Path to container logs file for additional context",
     )
+    analyze_parser.add_argument(
+        "--log-buffer",
+        type=Path,
+        default=None,
+        help="Read container logs from a 'heisenberg logs follow' buffer directory",
+    )
+    analyze_parser.add_argument(
+        "--docker-logs-dir",
+        type=Path,
+        default=None,
+        help="Read json-file logs directly from this directory "
+        "(e.g. /var/lib/docker/containers) instead of 'docker logs'",
+    )
     analyze_parser.add_argument(
         "--report-format",
         choices=["playwright", "junit"],
@@ -177,6 +222,27 @@ def _add_fetch_github_parser(subparsers) -> None:
         action="store_true",
         help="Extract and analyze Playwright traces (console logs, network, actions)",
     )
+    fetch_parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help=_NO_LLM_CACHE_HELP,
+    )
+    fetch_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=_STREAM_HELP,
+    )
+    fetch_parser.add_argument(
+        "--escalate",
+        action="store_true",
+        help=_ESCALATE_HELP,
+    )
+    fetch_parser.add_argument(
+        "--map-reduce",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=_MAP_REDUCE_HELP,
+    )
 
 
 def _add_freeze_parser(subparsers) -> None:
@@ -223,7 +289,7 @@ def _add_analyze_case_parser(subparsers) -> None:
     parser.add_argument(
         "case_dir",
         type=Path,
-        help="Path to the frozen case directory",
+        help="Path to the frozen case directory (with --batch: directory of cases)",
     )
     parser.add_argument(
         "--provider",
@@ -239,6 +305,30 @@ def _add_analyze_case_parser(subparsers) -> None:
         default=None,
         help="Specific model to use (provider-dependent)",
     )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help=_NO_LLM_CACHE_HELP,
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=(
+            "Analyze every case in CASE_DIR through the provider's batch API "
+            "(anthropic or openai; half price, results within 24h)"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="With --batch, also re-analyze cases that already have a diagnosis.json",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="With --batch, seconds before the first batch status check (default: 10)",
+    )
 
 
 def _add_generate_manifest_parser(subparsers) -> None:
@@ -293,3 +383,49 @@ def _add_validate_cases_parser(subparsers) -> None:
         action="store_true",
         help="Output results as JSON",
     )
+
+
+def _add_logs_parser(subparsers) -> None:
+    """Add the logs subcommand parser."""
+    parser = subparsers.add_parser(
+        "logs",
+        help="Capture container logs during the test run",
+    )
+    logs_subparsers = parser.add_subparsers(dest="logs_command", required=True)
+
+    follow_parser = logs_subparsers.add_parser(
+        "follow",
+        help="Stream docker logs into an on-disk ring buffer until interrupted",
+    )
+    follow_parser.add_argument(
+        "--services",
+        "-s",
+        type=str,
+        required=True,
+        help="Comma-separated list of Docker services to follow",
+    )
+    follow_parser.add_argument(
+        "--buffer-dir",
+        "-o",
+        type=Path,
+        default=Path(".heisenberg/logs"),
+        help="Buffer directory (default: .heisenberg/logs)",
+    )
+    follow_parser.add_argument(
+        "--max-mb",
+        type=int,
+        default=64,
+        help="Maximum buffered megabytes per service (default: 64)",
+    )
+    follow_parser.add_argument(
+        "--segment-mb",
+        type=int,
+        default=4,
+        help="Segment size in megabytes (default: 4)",
+    )
+    follow_parser.add_argument(
+        "--max-age",
+        type=int,
+        default=None,
+        help="Evict segments older than this many seconds (default: no age limit)",
+    )
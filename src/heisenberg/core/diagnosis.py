@@ -3,9 +3,21 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass
 from enum import Enum
 
+# Canonical section names and the header prefixes that introduce them
+SECTION_HEADERS: dict[str, str] = {
+    "root_cause": "root cause",
+    "evidence": "evidence",
+    "suggested_fix": "suggested fix",
+    "confidence": "confidence",
+}
+REQUIRED_SECTIONS: tuple[str, ...] = tuple(SECTION_HEADERS)
+
+_HEADER_LINE = re.compile(r"^\s*#{2,}\s*(.*?)\s*#*\s*$")
+
 
 class ConfidenceLevel(Enum):
     """Confidence level for AI diagnosis."""
@@ -53,6 +65,148 @@ def parse_diagnosis(response: str) -> Diagnosis:
     )
 
 
+@dataclass
+class DiagnosisSection:
+    """A completed section of a streamed diagnosis."""
+
+    # Canonical name from SECTION_HEADERS, or the lowercased header otherwise
+    name: str
+    # Header as written by the model
+    title: str
+    content: str
+
+
+class DiagnosisStreamParser:
+    """Incremental diagnosis parser for streamed LLM responses.
+
+    Text is fed as it arrives. A section is complete once the next header
+    line starts (or the stream ends), so the root cause is available while
+    the model is still writing the evidence. The confidence section, which
+    the prompt asks for last, is complete once its level line and the
+    explanation paragraph after it (ended by a blank line) have arrived.
+    ``is_complete`` reports when every required section has arrived, at
+    which point the caller can stop generation; ``diagnosis()`` parses
+    everything received with ``parse_diagnosis``. The result matches a
+    non-streamed call for the text received, but a caller stopping early
+    never receives text the model would have written after the
+    explanation paragraph, which a non-streamed call would have appended
+    to ``confidence_explanation``.
+    """
+
+    def __init__(self, required: Iterable[str] = REQUIRED_SECTIONS):
+        """
+        Initialize parser.
+
+        Args:
+            required: Section names that must arrive before is_complete.
+        """
+        self.required = frozenset(required)
+        self._parts: list[str] = []
+        # Text after the last newline, which may still be a header
+        self._partial = ""
+        self._section: tuple[str, str] | None = None
+        self._lines: list[str] = []
+        self._completed: set[str] = set()
+
+    @property
+    def text(self) -> str:
+        """Response text received so far."""
+        return "".join(self._parts)
+
+    @property
+    def is_complete(self) -> bool:
+        """True once every required section has been completed."""
+        return self.required <= self._completed
+
+    def feed(self, text: str) -> list[DiagnosisSection]:
+        """
+        Add streamed text.
+
+        Args:
+            text: Newly received text (any split, not necessarily whole lines).
+
+        Returns:
+            Sections completed by this text, in order.
+        """
+        self._parts.append(text)
+        *lines, self._partial = (self._partial + text).split("\n")
+        return self._consume(lines)
+
+    def close(self) -> list[DiagnosisSection]:
+        """
+        Finish the stream.
+
+        Returns:
+            The sections still open at the end of the response.
+        """
+        lines = [self._partial] if self._partial else []
+        self._partial = ""
+        sections = self._consume(lines)
+        if self._section is not None:
+            sections.append(self._finish(*self._section))
+        return sections
+
+    def diagnosis(self) -> Diagnosis:
+        """
+        Parse the response received so far.
+
+        Returns:
+            Diagnosis, as parse_diagnosis would return for the same text.
+        """
+        return parse_diagnosis(self.text)
+
+    def _consume(self, lines: list[str]) -> list[DiagnosisSection]:
+        """Process complete lines, returning sections closed by headers."""
+        sections = []
+        for line in lines:
+            header = _HEADER_LINE.match(line)
+            if header is None:
+                if self._section is not None:
+                    self._lines.append(line)
+                    # Nothing follows the last section to close it
+                    if self._section[0] == "confidence" and _has_confidence_explanation(
+                        self._lines
+                    ):
+                        sections.append(self._finish(*self._section))
+                continue
+            if self._section is not None:
+                sections.append(self._finish(*self._section))
+            title = header.group(1)
+            self._section = (_section_name(title), title)
+        return sections
+
+    def _finish(self, name: str, title: str) -> DiagnosisSection:
+        """Close the current section."""
+        section = DiagnosisSection(name=name, title=title, content="\n".join(self._lines).strip())
+        self._section = None
+        self._lines = []
+        self._completed.add(name)
+        return section
+
+
+def _has_confidence_explanation(lines: list[str]) -> bool:
+    """Check if a confidence level line is followed by a finished explanation paragraph."""
+    for index, line in enumerate(lines):
+        if _line_contains_level(line):
+            explanation = False
+            for later in lines[index + 1 :]:
+                if later.strip():
+                    explanation = True
+                elif explanation:
+                    return True
+            return False
+    return False
+
+
+def _section_name(title: str) -> str:
+    """Map a section header to its canonical name."""
+    lowered = title.lower()
+    for name, prefix in SECTION_HEADERS.items():
+        if lowered.startswith(prefix):
+            return name
+    return lowered
+
+
 def _extract_section(response: str, start_header: str, end_header: str) -> str:
     """Extract content between two section headers."""
     # Pattern to match section content
@@ -3,8 +3,19 @@
 from __future__ import annotations
 
 import subprocess
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+from typing import overload
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_NS_PER_SECOND = 1_000_000_000
+
+# Stream flags used by CompactContainerLogs
+_STDOUT = 0
+_STDERR = 1
 
 
 @dataclass
@@ -62,43 +73,296 @@ class ContainerLogs:
         return "\n".join(lines)
 
 
+def datetime_to_ns(timestamp: datetime) -> int:
+    """Convert a datetime to integer nanoseconds since the Unix epoch (naive = UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * _NS_PER_SECOND + delta.microseconds * 1_000
+
+
+def ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert integer nanoseconds since the Unix epoch to a UTC datetime."""
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1_000)
+
+
+def parse_docker_timestamp_ns(timestamp_str: str) -> int:
+    """
+    Parse a docker RFC 3339 timestamp into nanoseconds since the Unix epoch.
+
+    Keeps full nanosecond precision. Timezone suffixes are dropped and the
+    value is treated as UTC, matching ``docker logs --timestamps`` output.
+
+    Raises:
+        ValueError: If the timestamp cannot be parsed.
+    """
+    timestamp_str = timestamp_str.rstrip("Z")
+    if "+" in timestamp_str:
+        timestamp_str = timestamp_str.split("+")[0]
+
+    fraction_ns = 0
+    if "." in timestamp_str:
+        head, fraction = timestamp_str.split(".", 1)
+        digits = len(fraction) - len(fraction.lstrip("0123456789"))
+        if digits == 0:
+            raise ValueError(f"Invalid fractional seconds: {fraction}")
+        fraction_ns = int(fraction[:digits][:9].ljust(9, "0"))
+        timestamp_str = head + fraction[digits:]
+
+    seconds = datetime.fromisoformat(timestamp_str).replace(tzinfo=UTC)
+    return datetime_to_ns(seconds) + fraction_ns
+
+
+class CompactEntries(Sequence[LogEntry]):
+    """Read-only sequence view that materializes LogEntry objects on access."""
+
+    __slots__ = ("_logs",)
+
+    def __init__(self, logs: CompactContainerLogs):
+        self._logs = logs
+
+    @property
+    def logs(self) -> CompactContainerLogs:
+        """The columnar collection behind this view."""
+        return self._logs
+
+    def __len__(self) -> int:
+        return len(self._logs)
+
+    @overload
+    def __getitem__(self, index: int) -> LogEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LogEntry]: ...
+
+    def __getitem__(self, index: int | slice) -> LogEntry | list[LogEntry]:
+        if isinstance(index, slice):
+            return [self._logs.entry(i) for i in range(*index.indices(len(self._logs)))]
+        if index < 0:
+            index += len(self._logs)
+        if not 0 <= index < len(self._logs):
+            raise IndexError("log entry index out of range")
+        return self._logs.entry(index)
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        for i in range(len(self._logs)):
+            yield self._logs.entry(i)
+
+
+class CompactContainerLogs:
+    """
+    Columnar collection of log entries from a container.
+
+    Timestamps are kept as epoch nanoseconds in an ``array('q')``, streams as
+    a ``bytearray`` of flags and messages as offsets into one shared UTF-8
+    buffer, so a line costs ~17 bytes plus its text instead of a dataclass and
+    a datetime. The read API mirrors :class:`ContainerLogs` (``entries``,
+    ``has_errors``, ``filter_by_time_window``, ``to_markdown``), which lets the
+    compressor and prompt builder consume it unchanged; ``LogEntry`` objects
+    are only built for the entries actually read.
+    """
+
+    __slots__ = ("container_name", "_timestamps", "_streams", "_offsets", "_buffer", "_sorted")
+
+    def __init__(self, container_name: str):
+        """
+        Initialize an empty collection.
+
+        Args:
+            container_name: Name of the container the logs belong to.
+        """
+        self.container_name = container_name
+        self._timestamps = array("q")
+        self._streams = bytearray()
+        self._offsets = array("q", [0])
+        self._buffer = bytearray()
+        self._sorted = True
+
+    @classmethod
+    def from_container_logs(cls, logs: ContainerLogs) -> CompactContainerLogs:
+        """Build a compact collection from a regular ContainerLogs."""
+        compact = cls(logs.container_name)
+        for entry in logs.entries:
+            compact.append(datetime_to_ns(entry.timestamp), entry.message, entry.stream)
+        return compact
+
+    def to_container_logs(self) -> ContainerLogs:
+        """Materialize as a regular ContainerLogs."""
+        return ContainerLogs(container_name=self.container_name, entries=list(self.entries))
+
+    def append(self, timestamp_ns: int, message: str, stream: str = "stdout") -> None:
+        """
+        Append a log line.
+
+        Args:
+            timestamp_ns: Timestamp in nanoseconds since the Unix epoch.
+            message: Log message.
+            stream: "stdout" or "stderr".
+        """
+        if self._timestamps and timestamp_ns < self._timestamps[-1]:
+            self._sorted = False
+        self._timestamps.append(timestamp_ns)
+        self._streams.append(_STDERR if stream == "stderr" else _STDOUT)
+        self._buffer += message.encode("utf-8")
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, other: CompactContainerLogs) -> None:
+        """Append all entries of another compact collection."""
+        if not len(other):
+            return
+        if self._timestamps and other._timestamps[0] < self._timestamps[-1]:
+            self._sorted = False
+        self._sorted = self._sorted and other._sorted
+        base = len(self._buffer)
+        self._timestamps.extend(other._timestamps)
+        self._streams += other._streams
+        self._buffer += other._buffer
+        self._offsets.extend(array("q", (base + o for o in other._offsets[1:])))
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def timestamp_ns(self, index: int) -> int:
+        """Return the timestamp of entry ``index`` in epoch nanoseconds."""
+        return self._timestamps[index]
+
+    def message(self, index: int) -> str:
+        """Return the message of entry ``index``."""
+        return self._buffer[self._offsets[index] : self._offsets[index + 1]].decode(
+            "utf-8", errors="replace"
+        )
+
+    def stream(self, index: int) -> str:
+        """Return the stream name of entry ``index``."""
+        return "stderr" if self._streams[index] == _STDERR else "stdout"
+
+    def entry(self, index: int) -> LogEntry:
+        """Materialize entry ``index`` as a LogEntry."""
+        return LogEntry(
+            timestamp=ns_to_datetime(self._timestamps[index]),
+            message=self.message(index),
+            stream=self.stream(index),
+        )
+
+    @property
+    def timestamp_column(self) -> memoryview:
+        """Read-only view of all timestamps (int64 epoch nanoseconds)."""
+        return memoryview(self._timestamps).toreadonly()
+
+    @property
+    def stderr_column(self) -> memoryview:
+        """Read-only view of per-entry stream flags (1 for stderr, 0 for stdout)."""
+        return memoryview(self._streams).toreadonly()
+
+    def iter_messages(self) -> Iterator[str]:
+        """Iterate over messages without building LogEntry objects."""
+        for i in range(len(self._timestamps)):
+            yield self.message(i)
+
+    @property
+    def entries(self) -> Sequence[LogEntry]:
+        """Sequence view over entries, compatible with ``ContainerLogs.entries``."""
+        return CompactEntries(self)
+
+    @property
+    def has_errors(self) -> bool:
+        """Check if any entries are from stderr."""
+        return _STDERR in self._streams
+
+    def sort(self) -> None:
+        """Sort entries by timestamp in place (stable)."""
+        if self._sorted:
+            return
+        order = sorted(range(len(self._timestamps)), key=self._timestamps.__getitem__)
+        self._rebuild(order)
+        self._sorted = True
+
+    def select(self, indices: Sequence[int]) -> CompactContainerLogs:
+        """Return a new collection with the entries at ``indices``, in that order."""
+        result = CompactContainerLogs(self.container_name)
+        result._rebuild(indices, source=self)
+        return result
+
+    def _rebuild(self, indices: Sequence[int], source: CompactContainerLogs | None = None) -> None:
+        """Replace columns with the entries of ``source`` (default: self) at ``indices``."""
+        source = source or self
+        timestamps = array("q", (source._timestamps[i] for i in indices))
+        streams = bytearray(source._streams[i] for i in indices)
+        offsets = array("q", [0])
+        buffer = bytearray()
+        for i in indices:
+            buffer += source._buffer[source._offsets[i] : source._offsets[i + 1]]
+            offsets.append(len(buffer))
+
+        self._timestamps = timestamps
+        self._streams = streams
+        self._offsets = offsets
+        self._buffer = buffer
+        self._sorted = all(timestamps[i] <= timestamps[i + 1] for i in range(len(timestamps) - 1))
+
+    def filter_by_time_window(
+        self, center: datetime, window_seconds: int = 30
+    ) -> CompactContainerLogs:
+        """Filter entries within time window around center timestamp."""
+        center_ns = datetime_to_ns(center)
+        delta_ns = window_seconds * _NS_PER_SECOND
+        start, end = center_ns - delta_ns, center_ns + delta_ns
+
+        if self._sorted:
+            # Binary search the timestamp column instead of scanning it
+            lo = bisect_left(self._timestamps, start)
+            hi = bisect_right(self._timestamps, end)
+            return self.select(range(lo, hi))
+
+        return self.select([i for i, ts in enumerate(self._timestamps) if start <= ts <= end])
+
+    def to_markdown(self) -> str:
+        """Format logs as markdown."""
+        return self.to_container_logs().to_markdown()
+
+
 class DockerLogsCollector:
     """Collects logs from Docker containers."""
 
-    def __init__(self, services: list[str] | None = None):
+    def __init__(self, services: list[str] | None = None, compact: bool = False):
         """
         Initialize collector with service names.
 
         Args:
             services: List of Docker container/service names to collect logs from.
+            compact: Store collected logs as CompactContainerLogs instead of
+                ContainerLogs (lower memory for large collections).
         """
         self.services = services or []
+        self.compact = compact
 
     @classmethod
-    def from_string(cls, services_string: str) -> DockerLogsCollector:
+    def from_string(cls, services_string: str, compact: bool = False) -> DockerLogsCollector:
         """
         Create collector from comma-separated service string.
 
         Args:
             services_string: Comma-separated list of service names.
+            compact: Store collected logs in columnar form.
 
         Returns:
             DockerLogsCollector instance.
         """
         if not services_string or not services_string.strip():
-            return cls(services=[])
+            return cls(services=[], compact=compact)
 
         services = [s.strip() for s in services_string.split(",") if s.strip()]
-        return cls(services=services)
+        return cls(services=services, compact=compact)
 
-    def collect_all(self) -> dict[str, ContainerLogs]:
+    def collect_all(self) -> dict[str, ContainerLogs | CompactContainerLogs]:
         """
         Collect logs from all configured services.
 
         Returns:
-            Dictionary mapping service name to ContainerLogs.
+            Dictionary mapping service name to ContainerLogs
+            (or CompactContainerLogs when ``compact`` is enabled).
         """
-        results: dict[str, ContainerLogs] = {}
+        results: dict[str, ContainerLogs | CompactContainerLogs] = {}
 
         for service in self.services:
             try:
@@ -111,7 +375,7 @@ class DockerLogsCollector:
 
         return results
 
-    def _collect_from_container(self, container_name: str) -> ContainerLogs:
+    def _collect_from_container(self, container_name: str) -> ContainerLogs | CompactContainerLogs:
         """Collect logs from a single container."""
         try:
             result = subprocess.run(
@@ -131,8 +395,13 @@ class DockerLogsCollector:
             # Docker not installed
             raise
         except subprocess.TimeoutExpired:
+            if self.compact:
+                return CompactContainerLogs(container_name)
             return ContainerLogs(container_name=container_name, entries=[])
 
+        if self.compact:
+            return self._build_compact(container_name, result)
+
         entries: list[LogEntry] = []
 
         # Parse stdout
@@ -150,6 +419,27 @@ class DockerLogsCollector:
 
         return ContainerLogs(container_name=container_name, entries=entries)
 
+    def _build_compact(
+        self, container_name: str, result: subprocess.CompletedProcess
+    ) -> CompactContainerLogs:
+        """Parse docker logs output straight into columnar storage."""
+        logs = CompactContainerLogs(container_name)
+
+        outputs = [(result.stdout, "stdout")]
+        if result.returncode == 0:
+            outputs.append((result.stderr, "stderr"))
+
+        for output, stream in outputs:
+            if not output:
+                continue
+            for line in output.strip().split("\n"):
+                parsed = parse_docker_log_line(line)
+                if parsed:
+                    logs.append(parsed[0], parsed[1], stream)
+
+        logs.sort()
+        return logs
+
     def _parse_log_lines(self, output: str, stream: str) -> list[LogEntry]:
         """Parse docker logs output into LogEntry objects."""
         entries: list[LogEntry] = []
@@ -166,48 +456,46 @@ class DockerLogsCollector:
 
     def _parse_log_line(self, line: str, stream: str) -> LogEntry | None:
         """Parse a single log line with timestamp."""
-        # Docker logs format with --timestamps:
-        # 2024-01-15T10:30:00.123456789Z Message content
-        # or
-        # 2024-01-15T10:30:00.123456789+00:00 Message content
-
-        if len(line) < 30:  # Too short to have timestamp
+        parsed = parse_docker_log_line(line)
+        if parsed is None:
             return None
 
-        # Try to find the timestamp (ISO format)
-        space_idx = line.find(" ")
-        if space_idx == -1:
-            return None
+        timestamp_ns, message = parsed
+        return LogEntry(timestamp=ns_to_datetime(timestamp_ns), message=message, stream=stream)
 
-        timestamp_str = line[:space_idx]
-        message = line[space_idx + 1 :]
 
-        try:
-            # Handle various timestamp formats
-            timestamp_str = timestamp_str.rstrip("Z")
-            if "+" in timestamp_str:
-                timestamp_str = timestamp_str.split("+")[0]
-
-            # Truncate nanoseconds to microseconds (Python only supports microseconds)
-            if "." in timestamp_str:
-                parts = timestamp_str.split(".")
-                if len(parts[1]) > 6:
-                    parts[1] = parts[1][:6]
-                timestamp_str = ".".join(parts)
-
-            timestamp = datetime.fromisoformat(timestamp_str).replace(tzinfo=UTC)
-
-            return LogEntry(timestamp=timestamp, message=message, stream=stream)
-        except ValueError:
-            # Couldn't parse timestamp, skip this line
-            return None
+def parse_docker_log_line(line: str) -> tuple[int, str] | None:
+    """
+    Split a ``docker logs --timestamps`` line into (epoch nanoseconds, message).
+
+    Returns:
+        Tuple of timestamp and message, or None if the line has no valid timestamp.
+    """
+    # Docker logs format with --timestamps:
+    # 2024-01-15T10:30:00.123456789Z Message content
+    # or
+    # 2024-01-15T10:30:00.123456789+00:00 Message content
+
+    if len(line) < 30:  # Too short to have timestamp
+        return None
+
+    # Try to find the timestamp (ISO format)
+    space_idx = line.find(" ")
+    if space_idx == -1:
+        return None
+
+    try:
+        return parse_docker_timestamp_ns(line[:space_idx]), line[space_idx + 1 :]
+    except ValueError:
+        # Couldn't parse timestamp, skip this line
+        return None
 
 
 def collect_logs_around_timestamp(
     services: str,
     timestamp: datetime,
     window_seconds: int = 30,
-) -> dict[str, ContainerLogs]:
+) -> dict[str, ContainerLogs | CompactContainerLogs]:
     """
     Convenience function to collect and filter logs around a timestamp.
 
@@ -222,7 +510,7 @@ def collect_logs_around_timestamp(
     collector = DockerLogsCollector.from_string(services)
     all_logs = collector.collect_all()
 
-    filtered: dict[str, ContainerLogs] = {}
+    filtered: dict[str, ContainerLogs | CompactContainerLogs] = {}
     for name, logs in all_logs.items():
         filtered[name] = logs.filter_by_time_window(timestamp, window_seconds)
 
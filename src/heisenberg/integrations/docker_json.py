@@ -0,0 +1,254 @@
+"""Direct reader for Docker json-file container logs.
+
+When the runner can read ``/var/lib/docker/containers``, going through the
+daemon is unnecessary: each container's ``<id>-json.log`` (plus rotated
+``.1``, ``.2``, ... files) holds one JSON object per line with a ``time``
+field in increasing order. The reader memory-maps each file, binary-searches
+byte offsets for the first line inside the failure window and decodes only
+the lines within it, so extraction cost depends on the window size rather
+than on the size of the log.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+from datetime import datetime
+from pathlib import Path
+
+from heisenberg.integrations.docker import (
+    CompactContainerLogs,
+    datetime_to_ns,
+    parse_docker_timestamp_ns,
+)
+
+DEFAULT_CONTAINERS_DIR = Path("/var/lib/docker/containers")
+
+_TIME_KEY = b'"time"'
+_COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+
+
+def _line_start(data: mmap.mmap, pos: int) -> int:
+    """Return the offset of the first line starting at or after ``pos``."""
+    if pos <= 0:
+        return 0
+    newline = data.find(b"\n", pos - 1)
+    return len(data) if newline == -1 else newline + 1
+
+
+def _line_end(data: mmap.mmap, start: int) -> int:
+    """Return the offset of the newline ending the line at ``start`` (or EOF)."""
+    newline = data.find(b"\n", start)
+    return len(data) if newline == -1 else newline
+
+
+def _line_time_ns(data: mmap.mmap, start: int) -> int | None:
+    """Extract the ``time`` field of the line at ``start`` without decoding JSON."""
+    end = _line_end(data, start)
+    key = data.find(_TIME_KEY, start, end)
+    if key == -1:
+        return None
+    # The value is the next quoted string (Docker writes no space after the colon)
+    value_start = data.find(b'"', key + len(_TIME_KEY), end) + 1
+    value_end = data.find(b'"', value_start, end) if value_start else -1
+    if value_end == -1:
+        return None
+    try:
+        return parse_docker_timestamp_ns(data[value_start:value_end].decode("ascii"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def _seek_time(data: mmap.mmap, start_ns: int) -> int:
+    """Binary search for the offset of the first line with time >= ``start_ns``."""
+    size = len(data)
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line = _line_start(data, mid)
+        line_time = _line_time_ns(data, line) if line < size else None
+        if line >= size or (line_time is not None and line_time >= start_ns):
+            hi = mid
+        else:
+            lo = mid + 1
+    return _line_start(data, lo)
+
+
+def _decode_line(raw: bytes) -> tuple[int, str, str] | None:
+    """Decode one json-file line into (epoch nanoseconds, message, stream)."""
+    try:
+        record = json.loads(raw)
+        timestamp_ns = parse_docker_timestamp_ns(record["time"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    message = str(record.get("log", "")).rstrip("\n")
+    return timestamp_ns, message, record.get("stream", "stdout")
+
+
+class JsonFileLogReader:
+    """Reads time windows and tails from a single json-file log."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize reader.
+
+        Args:
+            path: Path to a ``*-json.log`` file (or a rotated ``.N`` file).
+        """
+        self.path = path
+
+    def read_window(self, logs: CompactContainerLogs, start_ns: int, end_ns: int) -> None:
+        """Append lines with ``start_ns <= time <= end_ns`` to ``logs``."""
+        with self.path.open("rb") as f:
+            if self.path.stat().st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                # Files entirely outside the window are skipped after two lookups
+                first = _line_time_ns(data, 0)
+                if first is not None and first > end_ns:
+                    return
+                last = _line_time_ns(data, data.rfind(b"\n", 0, size - 1) + 1)
+                if last is not None and last < start_ns:
+                    return
+
+                offset = _seek_time(data, start_ns)
+                while offset < size:
+                    end = _line_end(data, offset)
+                    decoded = _decode_line(data[offset:end])
+                    offset = end + 1
+                    if decoded is None:
+                        continue
+                    if decoded[0] > end_ns:
+                        break
+                    logs.append(*decoded)
+
+    def read_tail(self, logs: CompactContainerLogs, max_lines: int) -> None:
+        """Append the last ``max_lines`` lines to ``logs``."""
+        with self.path.open("rb") as f:
+            if self.path.stat().st_size == 0 or max_lines <= 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                end = len(data)
+                start = end
+                for _ in range(max_lines):
+                    if start <= 0:
+                        break
+                    start = data.rfind(b"\n", 0, start - 1) + 1
+                for raw in data[start:end].splitlines():
+                    decoded = _decode_line(raw)
+                    if decoded is not None:
+                        logs.append(*decoded)
+
+
+class DockerJsonFileCollector:
+    """Collects container logs straight from Docker's json-file log files."""
+
+    def __init__(self, services: list[str], containers_dir: Path = DEFAULT_CONTAINERS_DIR):
+        """
+        Initialize collector.
+
+        Args:
+            services: Container names, compose service names or ID prefixes.
+            containers_dir: Docker's containers directory.
+        """
+        self.services = services
+        self.containers_dir = containers_dir
+
+    def find_log_files(self, service: str) -> list[Path]:
+        """
+        Find the json-file logs of a container, oldest rotation first.
+
+        Returns:
+            Paths like ``<id>-json.log.2``, ``<id>-json.log.1``, ``<id>-json.log``.
+            Compressed rotations (``.gz``) are not supported and are skipped.
+        """
+        container_dir = self._find_container_dir(service)
+        if container_dir is None:
+            return []
+
+        base = f"{container_dir.name}-json.log"
+        files: list[tuple[int, Path]] = []
+        for path in container_dir.glob(f"{base}*"):
+            suffix = path.name[len(base) :]
+            if not suffix:
+                files.append((0, path))
+            elif suffix[1:].isdigit():
+                files.append((int(suffix[1:]), path))
+        return [path for _, path in sorted(files, reverse=True)]
+
+    def _find_container_dir(self, service: str) -> Path | None:
+        """Resolve a service/container name or ID prefix to its directory."""
+        try:
+            container_dirs = [p for p in self.containers_dir.iterdir() if p.is_dir()]
+        except OSError:
+            return None
+
+        for container_dir in container_dirs:
+            try:
+                config = json.loads((container_dir / "config.v2.json").read_text())
+            except (OSError, ValueError):
+                continue
+            labels = (config.get("Config") or {}).get("Labels") or {}
+            if service in (config.get("Name", "").lstrip("/"), labels.get(_COMPOSE_SERVICE_LABEL)):
+                return container_dir
+
+        # Fall back to container ID prefixes (as accepted by `docker logs`)
+        if len(service) >= 12 and all(c in "0123456789abcdef" for c in service):
+            for container_dir in container_dirs:
+                if container_dir.name.startswith(service):
+                    return container_dir
+        return None
+
+    def collect_window(
+        self, service: str, center: datetime, window_seconds: int = 30
+    ) -> CompactContainerLogs:
+        """Read only the lines within ``window_seconds`` of ``center``."""
+        center_ns = datetime_to_ns(center)
+        delta_ns = window_seconds * 1_000_000_000
+        logs = CompactContainerLogs(service)
+        for path in self.find_log_files(service):
+            JsonFileLogReader(path).read_window(logs, center_ns - delta_ns, center_ns + delta_ns)
+        logs.sort()
+        return logs
+
+    def collect_tail(self, service: str, max_lines: int = 1000) -> CompactContainerLogs:
+        """Read the last ``max_lines`` lines across rotations (like ``docker logs --tail``)."""
+        logs = CompactContainerLogs(service)
+        for path in reversed(self.find_log_files(service)):
+            chunk = CompactContainerLogs(service)
+            JsonFileLogReader(path).read_tail(chunk, max_lines - len(logs))
+            # Older rotations go in front of what was already read
+            chunk.extend(logs)
+            logs = chunk
+            if len(logs) >= max_lines:
+                break
+        logs.sort()
+        return logs
+
+    def collect_all(
+        self, center: datetime | None = None, window_seconds: int = 30
+    ) -> dict[str, CompactContainerLogs]:
+        """
+        Collect logs for all configured services.
+
+        Args:
+            center: Failure timestamp. Without it, the last 1000 lines are read.
+            window_seconds: Time window around ``center``.
+
+        Returns:
+            Dictionary mapping service name to logs, omitting empty results.
+        """
+        results: dict[str, CompactContainerLogs] = {}
+        for service in self.services:
+            try:
+                if center is None:
+                    logs = self.collect_tail(service)
+                else:
+                    logs = self.collect_window(service, center, window_seconds)
+            except OSError:
+                # Unreadable files (permissions, rotation races) are skipped
+                continue
+            if len(logs):
+                results[service] = logs
+        return results
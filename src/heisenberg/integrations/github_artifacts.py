@@ -11,6 +11,8 @@ from __future__ import annotations
 import io
 import json
 import zipfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from typing import Any
 
@@ -63,6 +65,12 @@ class GitHubArtifactClient:
         artifacts = await client.get_artifacts("owner", "repo", run_id=runs[0].id)
         zip_data = await client.download_artifact("owner", "repo", artifact_id=artifacts[0].id)
         report = client.extract_playwright_report(zip_data)
+
+    Used as an async context manager, all requests share one pooled HTTP
+    connection instead of opening a new one per call:
+
+        async with GitHubArtifactClient(token="ghp_xxx") as client:
+            ...
     """
 
     BASE_URL = "https://api.github.com"
@@ -81,6 +89,29 @@ class GitHubArtifactClient:
             "Authorization": f"Bearer {token}",
             "X-GitHub-Api-Version": "2022-11-28",
         }
+        self._http: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> GitHubArtifactClient:
+        self._http = httpx.AsyncClient()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled connection, if any."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the pooled client, or a one-off client outside ``async with``."""
+        if self._http is not None:
+            yield self._http
+            return
+        async with httpx.AsyncClient() as client:
+            yield client
 
     async def _request(
         self,
@@ -103,7 +134,7 @@ class GitHubArtifactClient:
         """
         url = f"{self.BASE_URL}{endpoint}"
 
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
                 response = await client.request(
                     method,
@@ -142,12 +173,13 @@ class GitHubArtifactClient:
         Raises:
             GitHubAPIError: On download errors
         """
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self._client() as client:
             try:
                 response = await client.get(
                     url,
                     headers=self._headers,
                     timeout=60.0,
+                    follow_redirects=True,
                 )
 
                 if response.status_code >= 400:
@@ -257,6 +289,93 @@ class GitHubArtifactClient:
         url = f"{self.BASE_URL}/repos/{owner}/{repo}/actions/artifacts/{artifact_id}/zip"
         return await self._download(url)
 
+    async def get_workflow_jobs(
+        self,
+        owner: str,
+        repo: str,
+        run_id: int,
+    ) -> list[dict[str, Any]]:
+        """Get the jobs of a workflow run, including their steps.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            run_id: Workflow run ID
+
+        Returns:
+            Job dictionaries as returned by the API (name, conclusion, steps, ...)
+        """
+        data = await self._request(
+            "GET",
+            f"/repos/{owner}/{repo}/actions/runs/{run_id}/jobs",
+            params={"per_page": 100},
+        )
+        return data.get("jobs", [])
+
+    async def download_run_logs(
+        self,
+        owner: str,
+        repo: str,
+        run_id: int,
+    ) -> bytes:
+        """Download the logs of every job in a run as one zip file.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            run_id: Workflow run ID
+
+        Returns:
+            Zip file content as bytes (see ``RunLogsArchive``)
+        """
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
+        return await self._download(url)
+
+    async def stream_job_logs(
+        self,
+        owner: str,
+        repo: str,
+        job_id: int,
+    ) -> AsyncIterator[str]:
+        """Stream the log of a single job line by line.
+
+        The API answers with a redirect to a short-lived download URL, which
+        is followed on the same connection pool. Lines are yielded as they
+        arrive, so callers can process a log while it downloads and stop
+        early by closing the generator.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            job_id: Job ID
+
+        Yields:
+            Log lines without line endings
+
+        Raises:
+            GitHubAPIError: On download errors
+        """
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/actions/jobs/{job_id}/logs"
+        async with self._client() as client:
+            try:
+                async with client.stream(
+                    "GET",
+                    url,
+                    headers=self._headers,
+                    timeout=60.0,
+                    follow_redirects=True,
+                ) as response:
+                    if response.status_code >= 400:
+                        raise GitHubAPIError(
+                            f"Download failed: {response.status_code}",
+                            status_code=response.status_code,
+                        )
+                    async for line in response.aiter_lines():
+                        yield line
+
+            except httpx.RequestError as e:
+                raise GitHubAPIError(f"Download failed: {e}") from e
+
     @staticmethod
     def _is_playwright_report(data: Any) -> bool:
         """Check if data looks like a Playwright report."""
@@ -1,14 +1,28 @@
 """GitHub Actions job logs fetcher.
 
 This module provides functionality to fetch job logs from GitHub Actions
-using the gh CLI tool.
+using the gh CLI tool, and to read run-level log archives downloaded
+over HTTP.
 """
 
 from __future__ import annotations
 
+import io
 import json
+import re
 import subprocess
+import threading
+import zipfile
+from collections.abc import Iterator
 from dataclasses import dataclass
+from typing import Any
+
+# Streaming a large log can take much longer than a buffered API call
+STREAM_TIMEOUT_SECONDS = 600
+
+# Characters GitHub drops from job and step names in log archive paths
+_ARCHIVE_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|]')
+_JOB_FILE = re.compile(r"^(\d+)_(.+)\.txt$")
 
 
 @dataclass
@@ -59,6 +73,58 @@ class GitHubLogsFetcher:
         except (subprocess.TimeoutExpired, FileNotFoundError):
             return None
 
+    def stream_job_logs(
+        self,
+        repo: str,
+        job_id: str,
+        timeout: float = STREAM_TIMEOUT_SECONDS,
+    ) -> Iterator[str]:
+        """Stream logs for a specific job line by line.
+
+        Unlike ``fetch_job_logs``, the log is never held in memory as a
+        whole. The ``gh`` process is stopped as soon as the caller stops
+        iterating (close the generator, e.g. with ``contextlib.closing``),
+        so consumers that only need part of a log do not download the rest.
+
+        Args:
+            repo: Repository in owner/repo format.
+            job_id: GitHub job ID.
+            timeout: Seconds after which the download is aborted.
+
+        Yields:
+            Log lines without trailing newlines. Nothing is yielded if gh is
+            not installed; a failed or timed-out request ends the stream.
+        """
+        try:
+            process = subprocess.Popen(
+                [
+                    "gh",
+                    "api",
+                    "-H",
+                    "Accept: application/vnd.github+json",
+                    f"/repos/{repo}/actions/jobs/{job_id}/logs",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                errors="replace",
+            )
+        except FileNotFoundError:
+            return
+
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            for line in process.stdout or ():
+                yield line.rstrip("\n")
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+            if process.stdout is not None:
+                process.stdout.close()
+            process.wait()
+
     def get_failed_jobs(
         self,
         repo: str,
@@ -127,3 +193,90 @@ class GitHubLogsFetcher:
                 logs[job_name] = log_content
 
         return logs
+
+
+def _archive_key(name: str) -> str:
+    """Normalize a job name the way it appears in log archive paths."""
+    return " ".join(_ARCHIVE_UNSAFE_CHARS.sub("", name).split())
+
+
+class RunLogsArchive:
+    """Log archive of a whole workflow run (``/actions/runs/{run_id}/logs``).
+
+    The zip holds one ``<n>_<job name>.txt`` file with the full log of each
+    job and, where GitHub provides them, a ``<job name>/`` directory with
+    one ``<step number>_<step name>.txt`` file per step. Downloading it
+    replaces one request (and one gh process) per failed job, and the step
+    files let failed steps be scanned without the rest of the job log.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Open an archive.
+
+        Args:
+            data: Zip file content.
+
+        Raises:
+            zipfile.BadZipFile: If the data is not a zip file.
+        """
+        self._zip = zipfile.ZipFile(io.BytesIO(data))
+        self._job_files: dict[str, str] = {}
+        self._step_files: dict[str, dict[int, str]] = {}
+        for name in self._zip.namelist():
+            directory, _, filename = name.rpartition("/")
+            match = _JOB_FILE.match(filename)
+            if match is None:
+                continue
+            if directory:
+                steps = self._step_files.setdefault(_archive_key(directory), {})
+                steps[int(match.group(1))] = name
+            else:
+                self._job_files[_archive_key(match.group(2))] = name
+
+    def logs_for_job(self, job: dict[str, Any]) -> list[tuple[str, str]]:
+        """
+        Select the archive files to scan for a failed job.
+
+        The files of the job's failed steps are used. If the archive has no
+        step files for the job, or no step is marked as failed, the full job
+        log is used instead.
+
+        Args:
+            job: Job dictionary from the workflow jobs API (with steps).
+
+        Returns:
+            List of (label, archive member) pairs, label being ``"<job>"``
+            or ``"<job> / <step>"``. Empty if the job is not in the archive.
+        """
+        job_name = job.get("name", "")
+        key = _archive_key(job_name)
+
+        step_files = self._step_files.get(key, {})
+        steps = [
+            (f"{job_name} / {step.get('name', '')}", step_files[step["number"]])
+            for step in job.get("steps") or []
+            if step.get("conclusion") == "failure" and step.get("number") in step_files
+        ]
+        if steps:
+            return steps
+        if key in self._job_files:
+            return [(job_name, self._job_files[key])]
+        return []
+
+    def iter_lines(self, member: str) -> Iterator[str]:
+        """
+        Stream the lines of one log file without extracting it.
+
+        Args:
+            member: Archive member name (see ``logs_for_job``).
+
+        Yields:
+            Log lines without trailing newlines.
+        """
+        with (
+            self._zip.open(member) as raw,
+            io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace") as text,
+        ):
+            for line in text:
+                yield line.rstrip("\n")
@@ -0,0 +1,288 @@
+"""On-disk ring buffer and background follower for container logs.
+
+``heisenberg logs follow`` streams ``docker logs --follow`` for each service
+into a bounded, segmented buffer while the tests are running. Logs survive
+container teardown and log rotation, and a later ``heisenberg analyze
+--log-buffer`` reads them straight from disk instead of querying the daemon.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from heisenberg.integrations.docker import CompactContainerLogs, parse_docker_log_line
+
+DEFAULT_BUFFER_DIR = Path(".heisenberg/logs")
+
+# Per-service budget: 64 MiB split into 4 MiB segments
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+
+_SEGMENT_SUFFIX = ".log"
+_STREAM_MARKERS = {"stdout": b"O", "stderr": b"E"}
+
+
+@dataclass
+class _ServiceBuffer:
+    """Write state for a single service."""
+
+    directory: Path
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    handle: IO[bytes] | None = None
+    segment_size: int = 0
+    next_sequence: int = 0
+
+
+class LogRingBuffer:
+    """Bounded on-disk buffer of container log lines, one directory per service.
+
+    Lines are appended to numbered segment files. When the active segment
+    reaches ``segment_bytes`` a new one is started, and the oldest segments
+    are evicted once the service exceeds ``max_bytes`` or a segment is older
+    than ``max_age_seconds``. Each stored line is the raw ``docker logs
+    --timestamps`` line prefixed with a stream marker (``O``/``E``).
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_BUFFER_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_age_seconds: float | None = None,
+    ):
+        """
+        Initialize the buffer.
+
+        Args:
+            directory: Root directory for buffered logs.
+            max_bytes: Maximum bytes kept per service.
+            segment_bytes: Size at which the active segment is rotated.
+            max_age_seconds: Optional age after which closed segments are evicted.
+
+        Raises:
+            ValueError: If the size limits are not positive.
+        """
+        if max_bytes <= 0 or segment_bytes <= 0:
+            raise ValueError("max_bytes and segment_bytes must be positive")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = min(segment_bytes, max_bytes)
+        self.max_age_seconds = max_age_seconds
+        self._services: dict[str, _ServiceBuffer] = {}
+        self._registry_lock = threading.Lock()
+
+    def _service_dir(self, service: str) -> Path:
+        if not service or "/" in service or "\\" in service or service in (".", ".."):
+            raise ValueError(f"Invalid service name: {service!r}")
+        return self.directory / service
+
+    def _segments(self, directory: Path) -> list[Path]:
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob(f"*{_SEGMENT_SUFFIX}"))
+
+    def _get_service(self, service: str) -> _ServiceBuffer:
+        with self._registry_lock:
+            state = self._services.get(service)
+            if state is None:
+                directory = self._service_dir(service)
+                directory.mkdir(parents=True, exist_ok=True)
+                existing = self._segments(directory)
+                next_sequence = int(existing[-1].stem) + 1 if existing else 0
+                state = _ServiceBuffer(directory=directory, next_sequence=next_sequence)
+                self._services[service] = state
+            return state
+
+    def append(self, service: str, line: str, stream: str = "stdout") -> None:
+        """
+        Append a raw ``docker logs --timestamps`` line for a service.
+
+        Args:
+            service: Service/container name.
+            line: Log line including its docker timestamp.
+            stream: "stdout" or "stderr".
+        """
+        data = _STREAM_MARKERS.get(stream, b"O") + b" " + line.rstrip("\n").encode() + b"\n"
+        state = self._get_service(service)
+
+        with state.lock:
+            handle = state.handle
+            if handle is None or state.segment_size + len(data) > self.segment_bytes:
+                handle = self._rotate(state)
+            handle.write(data)
+            handle.flush()
+            state.segment_size += len(data)
+
+    def _rotate(self, state: _ServiceBuffer) -> IO[bytes]:
+        """Close the active segment, open a new one and evict old segments."""
+        if state.handle is not None:
+            state.handle.close()
+        path = state.directory / f"{state.next_sequence:010d}{_SEGMENT_SUFFIX}"
+        state.next_sequence += 1
+        state.handle = path.open("ab")
+        state.segment_size = 0
+        self._evict(state.directory, keep=path)
+        return state.handle
+
+    def _evict(self, directory: Path, keep: Path | None = None) -> None:
+        """Delete the oldest segments beyond the size or age limits."""
+        segments = self._segments(directory)
+        sizes = {segment: segment.stat().st_size for segment in segments}
+        total = sum(sizes.values())
+        cutoff = time.time() - self.max_age_seconds if self.max_age_seconds else None
+
+        for segment in segments:
+            if segment == keep:
+                break
+            expired = cutoff is not None and segment.stat().st_mtime < cutoff
+            if total <= self.max_bytes and not expired:
+                break
+            total -= sizes[segment]
+            segment.unlink(missing_ok=True)
+
+    def evict_expired(self) -> None:
+        """Apply size/age eviction to every service (safe to call periodically)."""
+        with self._registry_lock:
+            states = list(self._services.values())
+        for state in states:
+            with state.lock:
+                keep = Path(state.handle.name) if state.handle is not None else None
+                self._evict(state.directory, keep=keep)
+
+    def close(self) -> None:
+        """Close all open segment files."""
+        with self._registry_lock:
+            states = list(self._services.values())
+        for state in states:
+            with state.lock:
+                if state.handle is not None:
+                    state.handle.close()
+                    state.handle = None
+
+    def services(self) -> list[str]:
+        """List services that have buffered logs."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(p.name for p in self.directory.iterdir() if self._segments(p))
+
+    def read(self, service: str) -> CompactContainerLogs:
+        """
+        Read all buffered lines for a service.
+
+        Args:
+            service: Service/container name.
+
+        Returns:
+            CompactContainerLogs sorted by timestamp.
+        """
+        logs = CompactContainerLogs(service)
+        for segment in self._segments(self._service_dir(service)):
+            try:
+                data = segment.read_bytes()
+            except FileNotFoundError:
+                # Evicted by a concurrent follower between listing and reading
+                continue
+            for raw in data.splitlines():
+                marker, _, rest = raw.partition(b" ")
+                parsed = parse_docker_log_line(rest.decode("utf-8", errors="replace"))
+                if parsed is None:
+                    continue
+                stream = "stderr" if marker == b"E" else "stdout"
+                logs.append(parsed[0], parsed[1], stream)
+        logs.sort()
+        return logs
+
+    def read_all(self, services: list[str] | None = None) -> dict[str, CompactContainerLogs]:
+        """
+        Read buffered logs for several services.
+
+        Args:
+            services: Services to read. Defaults to every buffered service.
+
+        Returns:
+            Dictionary mapping service name to logs, omitting empty services.
+        """
+        results: dict[str, CompactContainerLogs] = {}
+        for service in services if services is not None else self.services():
+            logs = self.read(service)
+            if len(logs):
+                results[service] = logs
+        return results
+
+
+class DockerLogsFollower:
+    """Streams ``docker logs --follow`` for each service into a LogRingBuffer."""
+
+    def __init__(self, services: list[str], buffer: LogRingBuffer):
+        """
+        Initialize follower.
+
+        Args:
+            services: Docker container/service names to follow.
+            buffer: Buffer that receives the log lines.
+        """
+        self.services = services
+        self.buffer = buffer
+        self._processes: list[subprocess.Popen] = []
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start one ``docker logs --follow`` process per service.
+
+        Raises:
+            FileNotFoundError: If docker is not installed.
+        """
+        for service in self.services:
+            process = subprocess.Popen(
+                ["docker", "logs", "--follow", "--timestamps", service],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                bufsize=1,
+            )
+            self._processes.append(process)
+            for pipe, stream in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+                thread = threading.Thread(
+                    target=self._pump,
+                    args=(service, pipe, stream),
+                    name=f"heisenberg-follow-{service}-{stream}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _pump(self, service: str, pipe: IO[str] | None, stream: str) -> None:
+        """Copy lines from a docker pipe into the buffer."""
+        if pipe is None:
+            return
+        for line in pipe:
+            # Lines without a docker timestamp are messages from the docker CLI
+            # itself (e.g. "No such container"), not container output
+            if parse_docker_log_line(line.rstrip("\n")) is not None:
+                self.buffer.append(service, line, stream)
+
+    @property
+    def running(self) -> bool:
+        """True while at least one follow process is alive."""
+        return any(process.poll() is None for process in self._processes)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Terminate follow processes, drain their output and close the buffer."""
+        for process in self._processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self.buffer.close()
@@ -1,7 +1,17 @@
 """Unified LLM models, providers and utilities."""
 
+from heisenberg.llm.budget import SectionDemand, plan_budget
+from heisenberg.llm.cache import (
+    CacheBackend,
+    CachedProvider,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    prompt_fingerprint,
+)
 from heisenberg.llm.config import (
     DEFAULT_INPUT_COST,
+    DEFAULT_INPUT_TOKEN_BUDGET,
     DEFAULT_OUTPUT_COST,
     MODEL_PRICING,
     PROVIDER_CONFIGS,
@@ -9,7 +19,9 @@ from heisenberg.llm.config import (
     calculate_cost,
     get_model_pricing,
 )
-from heisenberg.llm.models import PRICING, LLMAnalysis
+from heisenberg.llm.health import CircuitBreakerPolicy, CircuitState, ProviderHealth
+from heisenberg.llm.hedging import HedgingPolicy
+from heisenberg.llm.models import PRICING, LLMAnalysis, StreamChunk
 from heisenberg.llm.providers import (
     AnthropicProvider,
     GeminiProvider,
@@ -18,10 +30,13 @@ from heisenberg.llm.providers import (
     create_provider,
 )
 from heisenberg.llm.router import LLM_RECOVERABLE_ERRORS, LLMRouter
+from heisenberg.llm.streaming import StreamCollector
+from heisenberg.llm.tokens import TokenCounter, get_token_counter
 
 __all__ = [
     # Models
     "LLMAnalysis",
+    "StreamChunk",
     # Config
     "PRICING",
     "MODEL_PRICING",
@@ -29,6 +44,7 @@ __all__ = [
     "ProviderConfig",
     "DEFAULT_INPUT_COST",
     "DEFAULT_OUTPUT_COST",
+    "DEFAULT_INPUT_TOKEN_BUDGET",
     "get_model_pricing",
     "calculate_cost",
     # Providers
@@ -40,4 +56,23 @@ __all__ = [
     # Router
     "LLMRouter",
     "LLM_RECOVERABLE_ERRORS",
+    "HedgingPolicy",
+    "CircuitBreakerPolicy",
+    "CircuitState",
+    "ProviderHealth",
+    # Token counting
+    "TokenCounter",
+    "get_token_counter",
+    # Prompt budgeting
+    "SectionDemand",
+    "plan_budget",
+    # Response caching
+    "ResponseCache",
+    "CachedProvider",
+    "CacheBackend",
+    "DiskCacheBackend",
+    "MemoryCacheBackend",
+    "prompt_fingerprint",
+    # Streaming
+    "StreamCollector",
 ]
@@ -0,0 +1,194 @@
+"""Bulk analysis through provider batch APIs.
+
+Re-scoring a corpus of frozen cases one synchronous call at a time is slow
+and billed at full price. Anthropic's Message Batches and OpenAI's Batch
+API accept many requests at once, process them asynchronously (usually
+within minutes, at most 24 hours) and charge half the regular price.
+
+``run_batches`` splits requests into batches, submits them all up front and
+then polls them with a growing interval, since batch processing takes
+minutes rather than seconds. Results of each batch are passed to a
+callback as soon as that batch has ended, so callers can persist them
+while later batches are still running. Requests missing from a finished
+batch's results are reported as errors rather than dropped.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Protocol, runtime_checkable
+
+from heisenberg.llm.models import LLMAnalysis
+
+logger = logging.getLogger(__name__)
+
+# Requests per submitted batch: small enough that results of the first
+# batches arrive while later ones are still processing
+DEFAULT_BATCH_SIZE = 100
+# First poll delay in seconds, growing by POLL_BACKOFF up to the maximum
+DEFAULT_POLL_INTERVAL = 10.0
+DEFAULT_MAX_POLL_INTERVAL = 120.0
+POLL_BACKOFF = 1.5
+# Batch APIs complete within 24 hours
+DEFAULT_BATCH_TIMEOUT = 24 * 3600.0
+# Custom IDs accepted by Anthropic Message Batches (OpenAI accepts these too)
+CUSTOM_ID_PATTERN = re.compile(r"[a-zA-Z0-9_-]{1,64}")
+
+
+@dataclass
+class BatchRequest:
+    """One analysis request in a batch."""
+
+    # Caller-chosen ID used to match the result (unique within the batch,
+    # matching CUSTOM_ID_PATTERN)
+    custom_id: str
+    user_prompt: str
+    system_prompt: str | None = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batched request."""
+
+    custom_id: str
+    # Set when the request succeeded
+    analysis: LLMAnalysis | None = None
+    # Set when the request failed, expired or was canceled
+    error: str | None = None
+
+
+@runtime_checkable
+class BatchProvider(Protocol):
+    """Protocol for LLM providers with an asynchronous batch API."""
+
+    @property
+    def name(self) -> str:
+        """Return the provider name."""
+        ...
+
+    def submit_batch(self, requests: Sequence[BatchRequest]) -> str:
+        """
+        Submit requests as one batch.
+
+        Args:
+            requests: Requests with unique custom IDs.
+
+        Returns:
+            Provider batch ID.
+        """
+        ...
+
+    def is_batch_done(self, batch_id: str) -> bool:
+        """
+        Check whether a batch has stopped processing.
+
+        Args:
+            batch_id: Provider batch ID.
+
+        Returns:
+            True once results (or errors) can be retrieved.
+        """
+        ...
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[BatchResult]:
+        """
+        Read the results of a finished batch.
+
+        Args:
+            batch_id: Provider batch ID.
+
+        Yields:
+            BatchResult per request, in no particular order.
+        """
+        ...
+
+
+def run_batches(
+    provider: BatchProvider,
+    requests: Sequence[BatchRequest],
+    on_result: Callable[[BatchResult], None],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+    timeout: float = DEFAULT_BATCH_TIMEOUT,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Run requests through a provider's batch API.
+
+    Args:
+        provider: Provider implementing the batch API.
+        requests: Requests to run (custom IDs must be unique).
+        on_result: Called once per request as soon as its batch has ended.
+        batch_size: Maximum requests per submitted batch.
+        poll_interval: Delay before the first status check, in seconds.
+        max_poll_interval: Upper bound of the growing poll delay.
+        timeout: Give up on batches still running after this many seconds.
+        sleep: Sleep function (injectable for tests).
+        clock: Monotonic clock (injectable for tests).
+
+    Raises:
+        ValueError: If custom IDs are not unique or do not match
+            ``CUSTOM_ID_PATTERN``.
+        TimeoutError: If batches are still running after the timeout. Results
+            of batches that ended before are delivered first.
+    """
+    ids = [request.custom_id for request in requests]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Batch request custom IDs must be unique")
+    invalid = [custom_id for custom_id in ids if not CUSTOM_ID_PATTERN.fullmatch(custom_id)]
+    if invalid:
+        raise ValueError(
+            f"Invalid batch request custom ID {invalid[0]!r}: use 1-64 letters, digits, _ or -"
+        )
+
+    # Batch ID -> custom IDs still waiting for a result
+    expected: dict[str, set[str]] = {}
+    for start in range(0, len(requests), batch_size):
+        chunk = requests[start : start + batch_size]
+        batch_id = provider.submit_batch(chunk)
+        expected[batch_id] = {request.custom_id for request in chunk}
+        logger.info(
+            "llm_batch_submitted: provider=%s, batch_id=%s, requests=%d",
+            provider.name,
+            batch_id,
+            len(chunk),
+        )
+
+    deadline = clock() + timeout
+    delay = poll_interval
+    while expected:
+        if clock() >= deadline:
+            raise TimeoutError(f"LLM batches still running after {timeout:.0f}s: {list(expected)}")
+        sleep(delay)
+        delay = min(delay * POLL_BACKOFF, max_poll_interval)
+        for batch_id in [b for b in expected if provider.is_batch_done(b)]:
+            _deliver(provider, batch_id, expected.pop(batch_id), on_result)
+
+
+def _deliver(
+    provider: BatchProvider,
+    batch_id: str,
+    pending: set[str],
+    on_result: Callable[[BatchResult], None],
+) -> None:
+    """Pass a finished batch's results on, reporting missing requests as errors."""
+    for result in provider.iter_batch_results(batch_id):
+        if result.custom_id not in pending:
+            continue
+        pending.discard(result.custom_id)
+        on_result(result)
+    for custom_id in sorted(pending):
+        on_result(BatchResult(custom_id, error=f"No result in batch {batch_id}"))
+    logger.info(
+        "llm_batch_ended: provider=%s, batch_id=%s, missing=%d",
+        provider.name,
+        batch_id,
+        len(pending),
+    )
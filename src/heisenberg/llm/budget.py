@@ -0,0 +1,129 @@
+"""Token budget planning across prompt sections.
+
+The unified prompt is assembled from independent sections (failures,
+container logs, job logs, screenshot descriptions, trace context). Each
+one is sized without knowing about the others, so a large job log can
+crowd the prompt while small sections waste their headroom. The planner
+splits one input-token target between sections by weight, using
+water-filling: a section that needs less than its share keeps only what
+it needs and the rest is redistributed among the sections that still want
+more.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from heisenberg.llm.tokens import TokenCounter
+
+OMITTED_LINES_NOTE = "... ({count} lines omitted to fit token budget)"
+
+_FENCE = "```"
+
+
+@dataclass
+class SectionDemand:
+    """How much budget a prompt section wants and how much it matters."""
+
+    name: str
+    # Tokens needed to include the section in full
+    demand: int
+    # Relative value of a token spent on this section
+    weight: float = 1.0
+    # Tokens granted before anything is shared (capped at demand)
+    minimum: int = 0
+
+
+def plan_budget(sections: Sequence[SectionDemand], total: int) -> dict[str, int]:
+    """
+    Split a token budget between sections by weight (water-filling).
+
+    Minimums are granted first. The remaining budget is then offered to
+    the unsatisfied sections in proportion to their weights; sections whose
+    remaining demand fits in their share are filled completely and drop
+    out, and the leftover is offered again to the rest. When no section
+    can be filled, the remainder is split by weight and planning stops.
+
+    Args:
+        sections: Section demands. Names must be unique.
+        total: Total tokens available to these sections.
+
+    Returns:
+        Mapping of section name to allocated tokens. Allocations never
+        exceed a section's demand; they exceed ``total`` only when the
+        minimums alone do.
+    """
+    allocation = {s.name: min(s.demand, max(s.minimum, 0)) for s in sections}
+    remaining = total - sum(allocation.values())
+    active = [s for s in sections if allocation[s.name] < s.demand and s.weight > 0]
+
+    while active and remaining > 0:
+        total_weight = sum(s.weight for s in active)
+        shares = {s.name: remaining * s.weight / total_weight for s in active}
+        satisfied = [s for s in active if s.demand - allocation[s.name] <= shares[s.name]]
+        if not satisfied:
+            for s in active:
+                allocation[s.name] += int(shares[s.name])
+            break
+        for s in satisfied:
+            remaining -= s.demand - allocation[s.name]
+            allocation[s.name] = s.demand
+        active = [s for s in active if allocation[s.name] < s.demand]
+
+    return allocation
+
+
+def count_tokens(lines: Sequence[str], counter: TokenCounter) -> int:
+    """
+    Count tokens of lines joined with newlines.
+
+    Each line costs roughly one extra token for its newline.
+
+    Args:
+        lines: Text lines.
+        counter: Token counter for the target provider.
+
+    Returns:
+        Token count.
+    """
+    return sum(counter.count(line) + 1 for line in lines)
+
+
+def fit_lines(lines: Sequence[str], budget: int, counter: TokenCounter) -> list[str]:
+    """
+    Keep leading lines that fit in a token budget.
+
+    Dropped lines are replaced by a single note. If the cut falls inside a
+    Markdown code fence, the fence is closed so later sections render
+    normally.
+
+    Args:
+        lines: Text lines in display order.
+        budget: Maximum tokens for the result, including the note.
+        counter: Token counter for the target provider.
+
+    Returns:
+        Kept lines, followed by an omission note if anything was dropped.
+    """
+    if count_tokens(lines, counter) <= budget:
+        return list(lines)
+
+    # Reserve room for the note (and a closing fence) before filling
+    budget -= count_tokens([_FENCE, OMITTED_LINES_NOTE.format(count=len(lines))], counter)
+    kept: list[str] = []
+    used = 0
+    in_fence = False
+    for shown, line in enumerate(lines):
+        used += counter.count(line) + 1
+        if used > budget:
+            if in_fence:
+                kept.append(_FENCE)
+            kept.append(OMITTED_LINES_NOTE.format(count=len(lines) - shown))
+            break
+        kept.append(line)
+        if line.lstrip().startswith(_FENCE):
+            in_fence = not in_fence
+    return kept
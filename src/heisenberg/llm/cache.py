@@ -0,0 +1,569 @@
+"""Response cache for LLM analysis calls.
+
+Re-running an analysis on the same report (GitHub "re-run jobs", refreshed
+PR comments, ``analyze-case`` on a frozen case) sends the same prompt again
+and pays for it again. ``ResponseCache`` stores responses under a
+fingerprint of everything that determines the answer: provider, model,
+temperature, system prompt and the user prompt with volatile run IDs and
+timestamps replaced by placeholders.
+
+Entries live in one or more backends, checked in order: typically a local
+``DiskCacheBackend`` first and an optional shared backend (any object
+implementing ``CacheBackend``, e.g. backed by Redis or a database) after
+it. A hit in a later backend is copied into the earlier ones. Cache
+failures are logged and treated as misses, never as analysis errors.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import aclosing, closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+from heisenberg.llm.models import LLMAnalysis, StreamChunk
+from heisenberg.llm.streaming import StreamCollector
+
+if TYPE_CHECKING:
+    from heisenberg.llm.providers.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key or entry format changes so old entries are ignored
+CACHE_KEY_VERSION = 1
+
+DEFAULT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_MEMORY_CACHE_ENTRIES = 256
+
+# Volatile values that differ between runs of the same failure, in the order
+# they are replaced (timestamps before the digit runs they contain)
+_VOLATILE_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = (
+    (
+        re.compile(r"\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:[.,]\d+)?(?:Z|[+-]\d\d:?\d\d)?"),
+        "<ts>",
+    ),
+    (re.compile(r"\b\d\d:\d\d:\d\d(?:[.,]\d+)?\b"), "<ts>"),
+    (
+        re.compile(
+            r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE
+        ),
+        "<id>",
+    ),
+    # Commit SHAs, request and trace IDs
+    (re.compile(r"\b[0-9a-f]{16,}\b", re.IGNORECASE), "<id>"),
+    # Run and job IDs, epoch timestamps
+    (re.compile(r"\b\d{9,}\b"), "<id>"),
+)
+
+_TRAILING_WHITESPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Replace volatile IDs and timestamps so reruns produce the same text.
+
+    Args:
+        text: Prompt text.
+
+    Returns:
+        Text with timestamps as ``<ts>``, long IDs as ``<id>`` and trailing
+        whitespace removed.
+    """
+    for pattern, placeholder in _VOLATILE_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return _TRAILING_WHITESPACE.sub("", text).strip()
+
+
+def prompt_fingerprint(
+    provider: str,
+    model: str | None,
+    temperature: float | None,
+    user_prompt: str,
+    system_prompt: str | None = None,
+) -> str:
+    """
+    Compute the cache key of an LLM request.
+
+    Args:
+        provider: Provider name.
+        model: Model name.
+        temperature: Sampling temperature.
+        user_prompt: User prompt (normalized before hashing).
+        system_prompt: Optional system prompt (hashed as given).
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        [
+            CACHE_KEY_VERSION,
+            provider,
+            model,
+            temperature,
+            system_prompt or "",
+            normalize_prompt(user_prompt),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """Protocol for response cache storage."""
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Load an entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Stored entry, or None if absent.
+        """
+        ...
+
+    def set(self, key: str, entry: dict[str, Any]) -> None:
+        """
+        Store an entry, evicting others if the backend is full.
+
+        Args:
+            key: Cache key.
+            entry: JSON-serializable entry.
+        """
+        ...
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present.
+
+        Args:
+            key: Cache key.
+        """
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend (thread-safe)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_CACHE_ENTRIES):
+        """
+        Initialize backend.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Load an entry and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict[str, Any]) -> None:
+        """Store an entry, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskCacheBackend:
+    """One JSON file per entry in a local directory.
+
+    Files are written atomically, so several processes (parallel CI jobs
+    on one runner) can share the directory. Reads touch the file's
+    modification time, and writes evict the least recently used files once
+    the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize backend. The directory is created on first write.
+
+        Args:
+            directory: Cache directory.
+            max_bytes: Total size of entries kept before eviction.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        """Entry file, sharded by key prefix to keep directories small."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Load an entry and mark it as recently used."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("llm_cache_disk_read_failed: path=%s, error=%s", path, e)
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def set(self, key: str, entry: dict[str, Any]) -> None:
+        """Write an entry atomically, then evict to stay under max_bytes."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the size limit holds."""
+        files = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def get_default_response_cache_dir() -> Path:
+    """Get the default response cache directory (XDG-compliant).
+
+    Returns:
+        Path to ~/.cache/heisenberg/llm
+    """
+    return Path.home() / ".cache" / "heisenberg" / "llm"
+
+
+class ResponseCache:
+    """TTL cache of LLM responses over one or more backends."""
+
+    def __init__(
+        self,
+        backends: Sequence[CacheBackend],
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            backends: Backends checked in order (fastest first). Every
+                backend receives new entries.
+            ttl_seconds: Age after which entries are ignored and removed.
+        """
+        self.backends = list(backends)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls, directory: str | os.PathLike[str] | None = None) -> ResponseCache:
+        """
+        Create the standard local cache used by the CLI.
+
+        Args:
+            directory: Cache directory. Defaults to
+                ``get_default_response_cache_dir()``.
+
+        Returns:
+            Cache backed by a disk directory.
+        """
+        return cls([DiskCacheBackend(directory or get_default_response_cache_dir())])
+
+    def key_for(
+        self, provider: LLMProvider, user_prompt: str, system_prompt: str | None = None
+    ) -> str:
+        """
+        Compute the cache key of a request to a provider.
+
+        Args:
+            provider: Provider that would answer the request.
+            user_prompt: User prompt.
+            system_prompt: Optional system prompt.
+
+        Returns:
+            Cache key.
+        """
+        return prompt_fingerprint(
+            provider.name,
+            getattr(provider, "model", None),
+            getattr(provider, "temperature", None),
+            user_prompt,
+            system_prompt,
+        )
+
+    def get(self, key: str) -> LLMAnalysis | None:
+        """
+        Look up a response.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached response with zero token usage (nothing was billed), or
+            None on a miss.
+        """
+        for position, backend in enumerate(self.backends):
+            entry = self._load(backend, key)
+            if entry is None:
+                continue
+            for earlier in self.backends[:position]:
+                self._store(earlier, key, entry)
+            self.hits += 1
+            return LLMAnalysis(
+                content=entry["content"],
+                input_tokens=0,
+                output_tokens=0,
+                model=entry["model"],
+                provider=entry["provider"],
+                cached=True,
+            )
+        self.misses += 1
+        return None
+
+    def put(self, key: str, analysis: LLMAnalysis) -> None:
+        """
+        Store a response in every backend.
+
+        Args:
+            key: Cache key.
+            analysis: Response to store.
+        """
+        entry = {
+            "version": CACHE_KEY_VERSION,
+            "created_at": time.time(),
+            "content": analysis.content,
+            "model": analysis.model,
+            "provider": analysis.provider,
+            "input_tokens": analysis.input_tokens,
+            "output_tokens": analysis.output_tokens,
+        }
+        for backend in self.backends:
+            self._store(backend, key, entry)
+
+    def _load(self, backend: CacheBackend, key: str) -> dict[str, Any] | None:
+        """Read a valid, unexpired entry from one backend."""
+        try:
+            entry = backend.get(key)
+            if entry is None:
+                return None
+            expired = time.time() - float(entry["created_at"]) > self.ttl_seconds
+            if expired or entry.get("version") != CACHE_KEY_VERSION:
+                backend.delete(key)
+                return None
+            if not isinstance(entry["content"], str):
+                return None
+        except Exception as e:  # a broken cache must not fail analysis
+            logger.warning("llm_cache_read_failed: backend=%s, error=%s", type(backend).__name__, e)
+            return None
+        return entry
+
+    def _store(self, backend: CacheBackend, key: str, entry: dict[str, Any]) -> None:
+        """Write an entry to one backend, logging failures."""
+        try:
+            backend.set(key, entry)
+        except Exception as e:  # a broken cache must not fail analysis
+            logger.warning(
+                "llm_cache_write_failed: backend=%s, error=%s", type(backend).__name__, e
+            )
+
+
+class CachedProvider:
+    """LLM provider wrapper that answers repeated requests from a cache."""
+
+    def __init__(self, provider: LLMProvider, cache: ResponseCache) -> None:
+        """
+        Initialize wrapper.
+
+        Args:
+            provider: Provider to call on cache misses.
+            cache: Response cache.
+        """
+        self._provider = provider
+        self._cache = cache
+
+    @property
+    def name(self) -> str:
+        """Return the wrapped provider's name."""
+        return self._provider.name
+
+    @property
+    def model(self) -> str | None:
+        """Return the wrapped provider's model."""
+        return getattr(self._provider, "model", None)
+
+    @property
+    def temperature(self) -> float | None:
+        """Return the wrapped provider's temperature."""
+        return getattr(self._provider, "temperature", None)
+
+    def analyze(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> LLMAnalysis:
+        """
+        Analyze using the cache, calling the provider on a miss (synchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Returns:
+            LLMAnalysis, with ``cached`` set when served from the cache.
+        """
+        key = self._cache.key_for(self._provider, user_prompt, system_prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("llm_cache_hit: provider=%s", self.name)
+            return cached
+
+        result = self._provider.analyze(user_prompt, system_prompt=system_prompt)
+        self._cache.put(key, result)
+        return result
+
+    async def analyze_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> LLMAnalysis:
+        """
+        Analyze using the cache, calling the provider on a miss (asynchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Returns:
+            LLMAnalysis, with ``cached`` set when served from the cache.
+        """
+        key = self._cache.key_for(self._provider, user_prompt, system_prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("llm_cache_hit: provider=%s", self.name)
+            return cached
+
+        result = await self._provider.analyze_async(user_prompt, system_prompt=system_prompt)
+        self._cache.put(key, result)
+        return result
+
+    def stream(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream from the cache, or from the provider on a miss (synchronous).
+
+        Only streams that run to completion are cached, so a caller that
+        stops early does not store a truncated answer.
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            The cached response as one chunk, or the provider's chunks.
+        """
+        key = self._cache.key_for(self._provider, user_prompt, system_prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("llm_cache_hit: provider=%s", self.name)
+            yield _replay(cached)
+            return
+
+        collector = self._collector()
+        with closing(self._provider.stream(user_prompt, system_prompt=system_prompt)) as chunks:
+            for chunk in chunks:
+                collector.add(chunk)
+                yield chunk
+        self._cache.put(key, collector.result())
+
+    async def stream_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream from the cache, or from the provider on a miss (asynchronous).
+
+        Only streams that run to completion are cached.
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            The cached response as one chunk, or the provider's chunks.
+        """
+        key = self._cache.key_for(self._provider, user_prompt, system_prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("llm_cache_hit: provider=%s", self.name)
+            yield _replay(cached)
+            return
+
+        collector = self._collector()
+        stream = self._provider.stream_async(user_prompt, system_prompt=system_prompt)
+        async with aclosing(stream) as chunks:
+            async for chunk in chunks:
+                collector.add(chunk)
+                yield chunk
+        self._cache.put(key, collector.result())
+
+    def _collector(self) -> StreamCollector:
+        """Create a collector for a streamed response of the wrapped provider."""
+        return StreamCollector(self.name, self.model or "unknown")
+
+
+def _replay(analysis: LLMAnalysis) -> StreamChunk:
+    """Turn a cached analysis into a single stream chunk."""
+    return StreamChunk(
+        text=analysis.content,
+        input_tokens=analysis.input_tokens,
+        output_tokens=analysis.output_tokens,
+        cached=True,
+    )
@@ -6,6 +6,9 @@ from dataclasses import dataclass
 from decimal import Decimal
 from types import MappingProxyType
 
+# Default input-token target for a single analysis prompt
+DEFAULT_INPUT_TOKEN_BUDGET = 24_000
+
 
 @dataclass(frozen=True)
 class ProviderConfig:
@@ -15,6 +18,18 @@ class ProviderConfig:
     max_tokens: int = 4096
     temperature: float = 0.3
     env_var: str = ""
+    # Target size of the analysis prompt, well below the context window:
+    # prompt length drives both latency and cost
+    input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET
+    # Price of input tokens served from the provider's prompt cache,
+    # relative to the regular input price
+    cached_input_ratio: float = 1.0
+    # Price of requests answered through the provider's batch API,
+    # relative to regular requests
+    batch_ratio: float = 1.0
+    # Cheaper, faster model tried first when analysis escalates on low
+    # confidence (see heisenberg.analysis.escalation)
+    fast_model: str | None = None
 
 
 # Provider configurations - single source of truth
@@ -23,14 +38,22 @@ PROVIDER_CONFIGS: MappingProxyType[str, ProviderConfig] = MappingProxyType(
         "anthropic": ProviderConfig(
             default_model="claude-sonnet-4-20250514",
             env_var="ANTHROPIC_API_KEY",
+            cached_input_ratio=0.1,
+            batch_ratio=0.5,
+            fast_model="claude-3-5-haiku-20241022",
         ),
         "openai": ProviderConfig(
             default_model="gpt-5",
             env_var="OPENAI_API_KEY",
+            cached_input_ratio=0.5,
+            batch_ratio=0.5,
+            fast_model="gpt-4o-mini",
         ),
         "google": ProviderConfig(
             default_model="gemini-3-pro-preview",
             env_var="GOOGLE_API_KEY",
+            cached_input_ratio=0.25,
+            fast_model="gemini-2.0-flash",
         ),
     }
 )
@@ -91,21 +114,66 @@ def get_model_pricing(model: str) -> tuple[Decimal, Decimal]:
     return input_cost, output_cost
 
 
-def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> Decimal:
+def get_cached_input_ratio(provider: str | None) -> float:
+    """
+    Get the relative price of prompt-cache reads for a provider.
+
+    Args:
+        provider: Provider name, or None if unknown.
+
+    Returns:
+        Ratio to the regular input price (1.0 for unknown providers).
+    """
+    config = PROVIDER_CONFIGS.get(provider) if provider else None
+    return config.cached_input_ratio if config else 1.0
+
+
+def get_batch_ratio(provider: str | None) -> float:
+    """
+    Get the relative price of batch API requests for a provider.
+
+    Args:
+        provider: Provider name, or None if unknown.
+
+    Returns:
+        Ratio to the regular price (1.0 for unknown providers).
+    """
+    config = PROVIDER_CONFIGS.get(provider) if provider else None
+    return config.batch_ratio if config else 1.0
+
+
+def calculate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cached_input_tokens: int = 0,
+    provider: str | None = None,
+    batch: bool = False,
+) -> Decimal:
     """
     Calculate cost for a given model and token usage.
 
     Args:
         model: Model name.
-        input_tokens: Number of input tokens.
+        input_tokens: Number of input tokens, including cached ones.
         output_tokens: Number of output tokens.
+        cached_input_tokens: Input tokens read from the provider's prompt
+            cache, billed at the provider's ``cached_input_ratio``.
+        provider: Provider name used to look up the cache and batch discounts.
+        batch: Whether the request went through the provider's batch API,
+            billed at the provider's ``batch_ratio``.
 
     Returns:
         Cost in USD as Decimal.
     """
     input_cost_per_million, output_cost_per_million = get_model_pricing(model)
 
-    input_cost = (Decimal(input_tokens) * input_cost_per_million) / Decimal("1000000")
+    ratio = Decimal(str(get_cached_input_ratio(provider)))
+    billed_input = Decimal(input_tokens - cached_input_tokens) + cached_input_tokens * ratio
+    input_cost = (billed_input * input_cost_per_million) / Decimal("1000000")
     output_cost = (Decimal(output_tokens) * output_cost_per_million) / Decimal("1000000")
 
-    return input_cost + output_cost
+    cost = input_cost + output_cost
+    if batch:
+        cost *= Decimal(str(get_batch_ratio(provider)))
+    return cost
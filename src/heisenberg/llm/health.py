@@ -0,0 +1,179 @@
+"""Circuit breakers and health scores for LLM providers.
+
+Without them, a provider outage makes every request wait for the failing
+provider to time out before the router falls back. ``ProviderHealth``
+tracks the recent outcomes of one provider in a rolling window. When the
+error rate (slow calls count as errors) crosses a threshold the circuit
+opens and the provider is skipped. After a cool-down the circuit turns
+half-open and lets a single probe request through: success closes it,
+failure opens it again. An outage then costs one timeout per cool-down
+instead of one per request.
+
+The router also orders providers by health score, so a degraded primary
+drops behind a healthy fallback until it recovers.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+
+
+class CircuitState(Enum):
+    """State of a provider's circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    """Thresholds shared by the circuit breakers of one router."""
+
+    # Number of recent calls the error rate is computed from
+    window: int = 20
+    # Outcomes older than this many seconds are ignored
+    window_seconds: float = 300.0
+    # Calls needed in the window before the circuit may open
+    min_calls: int = 5
+    # Error rate at which the circuit opens
+    failure_rate_threshold: float = 0.5
+    # Successful calls slower than this count as errors
+    slow_call_seconds: float = 60.0
+    # Time an open circuit waits before letting a probe through
+    open_seconds: float = 30.0
+
+
+class ProviderHealth:
+    """Rolling health window and circuit breaker of one provider (thread-safe)."""
+
+    def __init__(
+        self,
+        policy: CircuitBreakerPolicy,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize health tracking.
+
+        Args:
+            policy: Circuit breaker thresholds.
+            clock: Monotonic clock in seconds (injectable for tests).
+        """
+        self.policy = policy
+        self._clock = clock
+        # (time, failed) of recent calls
+        self._calls: deque[tuple[float, bool]] = deque(maxlen=policy.window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current circuit state (an open circuit turns half-open after cool-down)."""
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent, reserving the probe if half-open.
+
+        Returns:
+            True if the provider should be called. A half-open circuit admits
+            one request at a time until it closes or reopens.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state is CircuitState.CLOSED:
+                return True
+            if self._state is CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a successful call.
+
+        Args:
+            latency: Call duration in seconds.
+        """
+        self._record(latency > self.policy.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._record(True)
+
+    def release(self) -> None:
+        """Release a probe whose call ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def score(self) -> float:
+        """
+        Health score between 0 (unusable) and 1 (no recent errors).
+
+        Returns:
+            0 while the circuit is open, otherwise the success rate of the
+            window (1 with no recent calls).
+        """
+        with self._lock:
+            self._refresh()
+            if self._state is CircuitState.OPEN:
+                return 0.0
+            calls = self._recent()
+            if not calls:
+                return 1.0
+            return 1.0 - sum(failed for _, failed in calls) / len(calls)
+
+    def _record(self, failed: bool) -> None:
+        """Add an outcome and update the circuit state."""
+        policy = self.policy
+        with self._lock:
+            now = self._clock()
+            self._calls.append((now, failed))
+            if self._state is CircuitState.OPEN:
+                # Late result of a call sent before the circuit opened
+                return
+            if self._probing or self._state is CircuitState.HALF_OPEN:
+                # The probe decides whether the provider is back
+                self._probing = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CircuitState.CLOSED
+                    self._calls.clear()
+                return
+
+            calls = self._recent()
+            failures = sum(failed for _, failed in calls)
+            if (
+                len(calls) >= policy.min_calls
+                and failures / len(calls) >= policy.failure_rate_threshold
+            ):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        """Open the circuit."""
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+
+    def _refresh(self) -> None:
+        """Turn an open circuit half-open once the cool-down has passed."""
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.policy.open_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probing = False
+
+    def _recent(self) -> list[tuple[float, bool]]:
+        """Outcomes within the time window."""
+        cutoff = self._clock() - self.policy.window_seconds
+        return [call for call in self._calls if call[0] >= cutoff]
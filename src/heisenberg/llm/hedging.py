@@ -0,0 +1,103 @@
+"""Hedged LLM requests.
+
+A provider can be healthy but slow: most calls finish in seconds while a
+few take a minute or more. Fallback only helps once the primary raises, so
+these slow calls stall the whole analysis. With hedging, the router waits
+for the primary up to a delay taken from its own recent latencies (e.g.
+the 95th percentile) and then sends the same request to the next provider,
+keeping whichever answer arrives first. A hedge doubles the cost of that
+request, so ``Hedger`` only allows one for a configured fraction of
+requests.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """When and how often the router may hedge a request."""
+
+    # Percentile of recent primary latencies to wait before hedging
+    percentile: float = 0.95
+    # Delay in seconds used until min_samples latencies have been observed
+    initial_delay: float = 20.0
+    # Bounds of the hedge delay in seconds
+    min_delay: float = 1.0
+    max_delay: float = 120.0
+    min_samples: int = 20
+    # Number of recent latencies the percentile is computed from
+    window: int = 200
+    # Cost cap: hedges may not exceed this fraction of requests...
+    max_hedge_ratio: float = 0.1
+    # ...plus this many, so that rarely used routers can still hedge
+    burst: int = 1
+
+
+class Hedger:
+    """Latency tracking and hedge budget for one router (thread-safe)."""
+
+    def __init__(self, policy: HedgingPolicy):
+        """
+        Initialize hedger.
+
+        Args:
+            policy: Hedging policy.
+        """
+        self.policy = policy
+        self.requests = 0
+        self.hedges = 0
+        self._latencies: deque[float] = deque(maxlen=policy.window)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """
+        Get the time to wait for the primary before hedging.
+
+        Returns:
+            Delay in seconds.
+        """
+        policy = self.policy
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < policy.min_samples:
+            delay = policy.initial_delay
+        else:
+            rank = math.ceil(policy.percentile * len(samples)) - 1
+            delay = samples[min(max(rank, 0), len(samples) - 1)]
+        return min(max(delay, policy.min_delay), policy.max_delay)
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record how long the primary provider took to answer.
+
+        Args:
+            seconds: Latency of a successful primary call, or the time a
+                primary call cancelled after losing to a hedge had run
+                (a lower bound of its latency).
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def start_request(self) -> None:
+        """Count a request toward the hedge budget."""
+        with self._lock:
+            self.requests += 1
+
+    def try_hedge(self) -> bool:
+        """
+        Reserve a hedge if the cost cap allows one.
+
+        Returns:
+            True if the request may be hedged.
+        """
+        policy = self.policy
+        with self._lock:
+            if self.hedges + 1 > policy.max_hedge_ratio * self.requests + policy.burst:
+                return False
+            self.hedges += 1
+            return True
@@ -9,6 +9,7 @@ from heisenberg.llm.config import (
     DEFAULT_INPUT_COST,
     DEFAULT_OUTPUT_COST,
     MODEL_PRICING,
+    get_cached_input_ratio,
 )
 
 # Pricing per million tokens - float version of MODEL_PRICING for LLMAnalysis
@@ -32,6 +33,10 @@ class LLMAnalysis:
     output_tokens: int
     model: str
     provider: str
+    # Served from the response cache; token counts are then zero
+    cached: bool = False
+    # Part of input_tokens read from the provider's prompt cache
+    cached_input_tokens: int = 0
 
     @property
     def total_tokens(self) -> int:
@@ -45,6 +50,25 @@ class LLMAnalysis:
         input_cost_per_million = pricing.get("input", float(DEFAULT_INPUT_COST))
         output_cost_per_million = pricing.get("output", float(DEFAULT_OUTPUT_COST))
 
-        input_cost = self.input_tokens * input_cost_per_million / 1_000_000
+        billed_input = (
+            self.input_tokens
+            - self.cached_input_tokens
+            + self.cached_input_tokens * get_cached_input_ratio(self.provider)
+        )
+        input_cost = billed_input * input_cost_per_million / 1_000_000
         output_cost = self.output_tokens * output_cost_per_million / 1_000_000
         return input_cost + output_cost
+
+
+@dataclass
+class StreamChunk:
+    """Piece of a streamed LLM response."""
+
+    # Text generated since the previous chunk
+    text: str = ""
+    # Token totals reported so far, if this chunk carries usage
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cached_input_tokens: int | None = None
+    # Replays a response from the response cache
+    cached: bool = False
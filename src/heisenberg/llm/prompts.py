@@ -4,10 +4,68 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from heisenberg.integrations.docker import ContainerLogs
+from heisenberg.integrations.docker import ContainerLogs, LogEntry
+from heisenberg.llm.budget import SectionDemand, count_tokens, fit_lines, plan_budget
+from heisenberg.llm.config import DEFAULT_INPUT_TOKEN_BUDGET
+from heisenberg.utils.failure_clusters import FailureCluster, cluster_failures
+from heisenberg.utils.log_templates import collapse_entries
 
 if TYPE_CHECKING:
     from heisenberg.core.models import UnifiedFailure, UnifiedTestRun
+    from heisenberg.llm.tokens import TokenCounter
+
+# Maximum log lines shown per container
+MAX_LOG_ENTRIES_PER_CONTAINER = 50
+
+# Other tests named per failure cluster; the rest are only counted
+MAX_CLUSTER_MEMBERS_LISTED = 10
+
+# Relative value of a prompt token spent on each context section. Failures
+# are the subject of the analysis; logs and traces carry most of the
+# evidence; screenshot descriptions are the least specific.
+SECTION_WEIGHTS: dict[str, float] = {
+    "failures": 4.0,
+    "container_logs": 2.0,
+    "job_logs": 2.0,
+    "traces": 2.0,
+    "screenshots": 1.0,
+}
+
+
+# Fixed opening of every user prompt, kept identical across requests so it
+# is part of the cacheable prefix
+ANALYSIS_INSTRUCTIONS = """# Test Failure Analysis Request
+
+## Analysis Request
+
+Please analyze the test failure(s) below and provide:
+1. Root cause analysis
+2. Supporting evidence from errors and logs
+3. Suggested fix or investigation steps
+4. Your confidence level in the diagnosis"""
+
+
+# Opening of the reduce prompt of map-reduce analysis
+MERGE_INSTRUCTIONS = """# Test Failure Analysis Request
+
+## Merge Request
+
+The failed tests of this run were too many for one analysis, so they were
+analyzed in groups. Merge the group diagnoses below into one diagnosis of
+the whole run:
+1. Root cause: the cause shared by most groups, or the most impactful one
+   if the groups disagree (mention the others)
+2. Evidence: the strongest evidence across groups, naming affected tests
+3. Suggested fix covering the root cause
+4. Your confidence level, lower if groups disagree or were not analyzed"""
+
+# Test titles listed per group in the reduce prompt
+MAX_TITLES_PER_GROUP = 5
+
+# Heading of the run summary closing every analysis prompt. Everything
+# before it is stable across runs of the same failures (see
+# split_cacheable_prefix).
+RUN_SUMMARY_HEADING = "## Summary"
 
 
 def get_system_prompt() -> str:
@@ -54,6 +112,8 @@ def build_unified_prompt(
     job_logs_context: str | None = None,
     screenshot_context: str | None = None,
     trace_context: str | None = None,
+    token_counter: TokenCounter | None = None,
+    input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET,
 ) -> tuple[str, str]:
     """
     Build analysis prompts from UnifiedTestRun.
@@ -67,24 +127,128 @@ def build_unified_prompt(
         job_logs_context: Optional pre-formatted job logs snippets.
         screenshot_context: Optional pre-formatted screenshot descriptions.
         trace_context: Optional pre-formatted Playwright trace analysis.
+        token_counter: Optional counter for the target provider. When given,
+            the prompts are fitted to ``input_token_budget`` tokens.
+        input_token_budget: Total input tokens for both prompts.
 
     Returns:
         Tuple of (system_prompt, user_prompt).
     """
 
     system_prompt = get_system_prompt()
+    user_token_budget = None
+    if token_counter is not None:
+        user_token_budget = input_token_budget - count_tokens(
+            system_prompt.split("\n"), token_counter
+        )
     user_prompt = _build_unified_user_prompt(
-        run, container_logs, job_logs_context, screenshot_context, trace_context
+        run,
+        container_logs,
+        job_logs_context,
+        screenshot_context,
+        trace_context,
+        token_counter=token_counter,
+        token_budget=user_token_budget,
     )
     return system_prompt, user_prompt
 
 
-def _build_prompt_header(run: UnifiedTestRun) -> str:
-    """Build the header section with summary information."""
-    summary = run.summary()
-    header = f"""# Test Failure Analysis Request
+def build_merge_prompt(
+    run: UnifiedTestRun,
+    group_diagnoses: list[tuple[list[str], str | None]],
+    container_logs: dict[str, ContainerLogs] | None = None,
+    job_logs_context: str | None = None,
+    screenshot_context: str | None = None,
+    trace_context: str | None = None,
+    token_counter: TokenCounter | None = None,
+    input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET,
+) -> tuple[str, str]:
+    """
+    Build the reduce prompt merging group diagnoses into a run verdict.
+
+    The run's context sections (logs, screenshots, traces) are shown here
+    once instead of in every group prompt.
+
+    Args:
+        run: The whole test run (for its summary).
+        group_diagnoses: Per group, the failed test titles and the group's
+            formatted diagnosis, or None if the group could not be analyzed.
+        container_logs: Optional container logs for context.
+        job_logs_context: Optional pre-formatted job logs snippets.
+        screenshot_context: Optional pre-formatted screenshot descriptions.
+        trace_context: Optional pre-formatted Playwright trace analysis.
+        token_counter: Optional counter for the target provider. When given,
+            the context sections are fitted to what is left of
+            ``input_token_budget`` after the group diagnoses.
+        input_token_budget: Total input tokens for both prompts.
+
+    Returns:
+        Tuple of (system_prompt, user_prompt).
+    """
+    system_prompt = get_system_prompt()
+    groups = []
+    for index, (titles, diagnosis) in enumerate(group_diagnoses, 1):
+        shown = ", ".join(titles[:MAX_TITLES_PER_GROUP])
+        if len(titles) > MAX_TITLES_PER_GROUP:
+            shown += f" (+{len(titles) - MAX_TITLES_PER_GROUP} more)"
+        lines = [f"## Group {index}: {len(titles)} failed tests", f"Tests: {shown}", ""]
+        lines.append(diagnosis if diagnosis is not None else "*Analysis of this group failed.*")
+        groups.append("\n".join(lines))
+    header = _build_run_summary(run)
+
+    context: dict[str, str] = {}
+    if container_logs:
+        context["container_logs"] = _build_container_logs_section(container_logs)
+    if job_logs_context:
+        context["job_logs"] = job_logs_context
+    if screenshot_context:
+        context["screenshots"] = screenshot_context
+    if trace_context:
+        context["traces"] = trace_context
+
+    if token_counter is not None and context:
+        fixed = (
+            count_tokens([system_prompt, MERGE_INSTRUCTIONS, *groups, header], token_counter)
+            + len(groups)
+            + len(context)
+            + 1
+        )
+        context = _plan_context_sections(
+            context,
+            token_counter,
+            max(0, input_token_budget - fixed),
+            container_logs,
+            [],
+        )
 
-## Summary
+    return system_prompt, "\n\n".join([MERGE_INSTRUCTIONS, *groups, *context.values(), header])
+
+
+def split_cacheable_prefix(user_prompt: str) -> tuple[str, str]:
+    """
+    Split a user prompt into its stable prefix and the run summary.
+
+    Providers mark the end of the prefix as a prompt-cache breakpoint, so a
+    repeated analysis of the same failures reads the instructions, failures
+    and context from the cache even though the run ID and counts differ.
+
+    Args:
+        user_prompt: User prompt built by this module.
+
+    Returns:
+        Tuple of (prefix, run summary). The summary is empty if the prompt
+        has none.
+    """
+    index = user_prompt.rfind(f"\n\n{RUN_SUMMARY_HEADING}\n")
+    if index <= 0:
+        return user_prompt, ""
+    return user_prompt[:index], user_prompt[index + 2 :]
+
+
+def _build_run_summary(run: UnifiedTestRun) -> str:
+    """Build the summary section with run counts and identifiers."""
+    summary = run.summary()
+    header = f"""{RUN_SUMMARY_HEADING}
 - Total tests: {summary["total"]}
 - Passed: {summary["passed"]}
 - Failed: {summary["failed"]}
@@ -136,64 +300,201 @@ def _format_failure_for_prompt(failure: UnifiedFailure, index: int) -> list[str]
     return lines
 
 
-def _build_container_logs_section(container_logs: dict[str, ContainerLogs]) -> str:
-    """Build container logs section for prompt."""
+def _format_cluster_for_prompt(cluster: FailureCluster, index: int) -> list[str]:
+    """Format a failure cluster: its representative plus the other tests' names."""
+    lines = _format_failure_for_prompt(cluster.representative, index)
+    others = cluster.others
+    if others:
+        named = [f"{failure.test_title} ({failure.file_path})" for failure in others]
+        listed = ", ".join(named[:MAX_CLUSTER_MEMBERS_LISTED])
+        if len(named) > MAX_CLUSTER_MEMBERS_LISTED:
+            listed += f" (+{len(named) - MAX_CLUSTER_MEMBERS_LISTED} more)"
+        lines.append(f"- **Same error in {len(others)} other tests:** {listed}")
+    return lines
+
+
+def _build_container_logs_section(
+    container_logs: dict[str, ContainerLogs],
+    token_counter: TokenCounter | None = None,
+    token_budget: int | None = None,
+) -> str:
+    """Build container logs section for prompt.
+
+    Near-duplicate lines are collapsed into one line per template with
+    repeat counts and sample values. With a token counter and budget, the
+    budget is water-filled across containers (quiet containers leave their
+    unused share to busy ones) and each container keeps its first lines
+    that fit.
+    """
     lines = [
         "## Backend Container Logs",
         "Logs collected from containers around the time of test failure:\n",
     ]
+    rendered: dict[str, list[str]] = {}
     for name, logs in container_logs.items():
+        entries = logs.entries
+        # Plain-text logs passed to analyze_with_ai are shown as-is
+        if entries and isinstance(entries[0], LogEntry):
+            entries = collapse_entries(entries)[0]
+        rendered[name] = [str(entry) for entry in entries[:MAX_LOG_ENTRIES_PER_CONTAINER]]
+
+    if token_counter is not None and token_budget is not None:
+        allocation = plan_budget(
+            [
+                SectionDemand(name, count_tokens(entry_lines, token_counter))
+                for name, entry_lines in rendered.items()
+            ],
+            token_budget,
+        )
+        rendered = {
+            name: fit_lines(entry_lines, allocation[name], token_counter)
+            for name, entry_lines in rendered.items()
+        }
+
+    for name, entry_lines in rendered.items():
         lines.append(f"### Container: {name}")
-        if not logs.entries:
+        if not entry_lines:
             lines.append("*No logs available*")
             continue
-        lines.append("```")
-        entries = logs.entries[:50] if len(logs.entries) > 50 else logs.entries
-        lines.extend(str(entry) for entry in entries)
-        lines.append("```")
+        lines.extend(["```", *entry_lines, "```"])
+    return "\n".join(lines)
+
+
+def _build_failures_section(
+    clusters: list[FailureCluster],
+    token_counter: TokenCounter | None = None,
+    token_budget: int | None = None,
+) -> str:
+    """Build failed tests section with one block per failure cluster.
+
+    Failures sharing an error are shown once with the names of the other
+    affected tests. With a budget, trailing clusters that do not fit are
+    dropped.
+    """
+    lines = ["## Failed Tests"]
+    blocks = [_format_cluster_for_prompt(cluster, i) for i, cluster in enumerate(clusters, 1)]
+    if token_counter is None or token_budget is None:
+        for block in blocks:
+            lines.extend(block)
+        return "\n".join(lines)
+
+    omitted_note = "\n... ({count} more failed tests omitted to fit token budget)"
+    total = sum(cluster.count for cluster in clusters)
+    used = count_tokens([*lines, omitted_note.format(count=total)], token_counter)
+    shown = 0
+    for block in blocks:
+        cost = count_tokens(block, token_counter)
+        if used + cost > token_budget:
+            break
+        lines.extend(block)
+        used += cost
+        shown += 1
+
+    if shown == 0 and blocks:
+        # Always show (the start of) the first failure
+        lines.extend(fit_lines(blocks[0], token_budget - used, token_counter))
+        shown = 1
+    if shown < len(blocks):
+        omitted = sum(cluster.count for cluster in clusters[shown:])
+        lines.append(omitted_note.format(count=omitted))
     return "\n".join(lines)
 
 
+def _plan_context_sections(
+    sections: dict[str, str],
+    token_counter: TokenCounter,
+    token_budget: int,
+    container_logs: dict[str, ContainerLogs] | None,
+    clusters: list[FailureCluster],
+) -> dict[str, str]:
+    """Fit context sections into a shared budget (see ``plan_budget``).
+
+    ``sections`` holds each section rendered in full; only sections that
+    receive less than they need are rebuilt or trimmed.
+    """
+    lines = {name: text.split("\n") for name, text in sections.items()}
+    demands = []
+    for name, section_lines in lines.items():
+        demand = count_tokens(section_lines, token_counter)
+        # The failures header and first failure are always worth including
+        minimum = 0
+        if name == "failures" and clusters:
+            minimum = count_tokens(
+                ["## Failed Tests", *_format_cluster_for_prompt(clusters[0], 1)], token_counter
+            )
+        demands.append(SectionDemand(name, demand, SECTION_WEIGHTS.get(name, 1.0), minimum))
+    allocation = plan_budget(demands, token_budget)
+
+    fitted: dict[str, str] = {}
+    for demand in demands:
+        name, budget = demand.name, allocation[demand.name]
+        if budget >= demand.demand:
+            fitted[name] = sections[name]
+        elif name == "failures":
+            fitted[name] = _build_failures_section(clusters, token_counter, budget)
+        elif name == "container_logs" and container_logs:
+            # Headings and fences are not part of the entries' budget
+            layout = lines[name][:2]
+            for container in container_logs:
+                layout.extend([f"### Container: {container}", "```", "```"])
+            fitted[name] = _build_container_logs_section(
+                container_logs, token_counter, max(0, budget - count_tokens(layout, token_counter))
+            )
+        else:
+            fitted[name] = "\n".join(fit_lines(lines[name], budget, token_counter))
+    return fitted
+
+
 def _build_unified_user_prompt(
     run: UnifiedTestRun,
     container_logs: dict[str, ContainerLogs] | None = None,
     job_logs_context: str | None = None,
     screenshot_context: str | None = None,
     trace_context: str | None = None,
+    token_counter: TokenCounter | None = None,
+    token_budget: int | None = None,
 ) -> str:
-    """Build user prompt from UnifiedTestRun."""
-    sections = [_build_prompt_header(run)]
+    """Build user prompt from UnifiedTestRun.
 
-    # Failed tests section
-    failed_tests_lines = ["## Failed Tests"]
-    for i, failure in enumerate(run.failures, 1):
-        failed_tests_lines.extend(_format_failure_for_prompt(failure, i))
-    sections.append("\n".join(failed_tests_lines))
+    Content is ordered from most to least stable so that provider prompt
+    caches (which match on prefixes) can reuse as much as possible: the
+    fixed instructions first, then failures and context, which repeat when
+    the same failure is analyzed again, and the run summary with its run
+    ID and counts last.
 
-    if container_logs:
-        sections.append(_build_container_logs_section(container_logs))
+    With a token counter and budget, the instructions and summary are kept
+    in full and the rest of the budget is planned across the context
+    sections in ``SECTION_WEIGHTS``.
+    """
+    header = _build_run_summary(run)
+    instructions = ANALYSIS_INSTRUCTIONS
+
+    # Failures with the same error are shown once
+    clusters = cluster_failures(run.failures)
 
+    # Context sections in prompt order
+    context = {"failures": _build_failures_section(clusters)}
+    if container_logs:
+        context["container_logs"] = _build_container_logs_section(container_logs)
     # Job logs context (GitHub Actions logs)
     if job_logs_context:
-        sections.append(job_logs_context)
-
+        context["job_logs"] = job_logs_context
     # Screenshot context (visual analysis)
     if screenshot_context:
-        sections.append(screenshot_context)
-
+        context["screenshots"] = screenshot_context
     # Trace context (Playwright traces - console, network, actions)
     if trace_context:
-        sections.append(trace_context)
-
-    # Analysis instructions
-    instructions = """## Analysis Request
-
-Please analyze the test failure(s) above and provide:
-1. Root cause analysis
-2. Supporting evidence from errors and logs
-3. Suggested fix or investigation steps
-4. Your confidence level in the diagnosis"""
-
-    sections.append(instructions)
+        context["traces"] = trace_context
+
+    if token_counter is not None and token_budget is not None:
+        # Sections are joined by a blank line, which costs about one token each
+        fixed = count_tokens([header, instructions], token_counter) + len(context) + 1
+        context = _plan_context_sections(
+            context,
+            token_counter,
+            max(0, token_budget - fixed),
+            container_logs,
+            clusters,
+        )
 
-    return "\n\n".join(sections)
+    return "\n\n".join([instructions, *context.values(), header])
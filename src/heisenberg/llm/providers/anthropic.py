@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+from heisenberg.llm.batch import BatchRequest, BatchResult
 from heisenberg.llm.config import PROVIDER_CONFIGS
-from heisenberg.llm.models import LLMAnalysis
+from heisenberg.llm.models import LLMAnalysis, StreamChunk
+from heisenberg.llm.prompts import split_cacheable_prefix
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator, Sequence
+
     from anthropic import Anthropic, AsyncAnthropic
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,8 @@ class AnthropicProvider:
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        prompt_caching: bool = True,
+        base_url: str | None = None,
     ) -> None:
         """
         Initialize Anthropic provider.
@@ -32,12 +38,21 @@ class AnthropicProvider:
             model: Model name to use. Defaults to config default.
             max_tokens: Maximum tokens in response. Defaults to config default.
             temperature: Temperature for sampling. Defaults to config default.
+            prompt_caching: Mark the system prompt and the stable part of
+                the user prompt (everything before the run summary) as
+                prompt-cache breakpoints so repeated requests read them from
+                Anthropic's cache. Prefixes below the model's minimum (1024
+                tokens for most models) are silently not cached.
+            base_url: API base URL (e.g. a proxy or local stub). Defaults to
+                the SDK default.
         """
         config = PROVIDER_CONFIGS["anthropic"]
         self._api_key = api_key
         self._model = model or config.default_model
         self._max_tokens = max_tokens if max_tokens is not None else config.max_tokens
         self._temperature = temperature if temperature is not None else config.temperature
+        self._prompt_caching = prompt_caching
+        self._base_url = base_url
         self._sync_client: Anthropic | None = None
         self._async_client: AsyncAnthropic | None = None
 
@@ -51,12 +66,17 @@ class AnthropicProvider:
         """Return the model name."""
         return self._model
 
+    @property
+    def temperature(self) -> float:
+        """Return the sampling temperature."""
+        return self._temperature
+
     def _get_sync_client(self) -> Anthropic:
         """Get or create synchronous Anthropic client."""
         if self._sync_client is None:
             from anthropic import Anthropic
 
-            self._sync_client = Anthropic(api_key=self._api_key)
+            self._sync_client = Anthropic(api_key=self._api_key, base_url=self._base_url)
         return self._sync_client
 
     def _get_async_client(self) -> AsyncAnthropic:
@@ -64,9 +84,48 @@ class AnthropicProvider:
         if self._async_client is None:
             from anthropic import AsyncAnthropic
 
-            self._async_client = AsyncAnthropic(api_key=self._api_key)
+            self._async_client = AsyncAnthropic(api_key=self._api_key, base_url=self._base_url)
         return self._async_client
 
+    def _build_kwargs(self, user_prompt: str, system_prompt: str | None) -> dict[str, Any]:
+        """Build request arguments for the Messages API."""
+        content: str | list[dict[str, Any]] = user_prompt
+        prefix, summary = split_cacheable_prefix(user_prompt)
+        if self._prompt_caching and summary:
+            # The system prompt alone is below the minimum cacheable prefix;
+            # the breakpoint after the failures and context reaches it
+            content = [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": summary},
+            ]
+        kwargs: dict[str, Any] = {
+            "model": self._model,
+            "max_tokens": self._max_tokens,
+            "temperature": self._temperature,
+            "messages": [{"role": "user", "content": content}],
+        }
+
+        if system_prompt and self._prompt_caching:
+            kwargs["system"] = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+        elif system_prompt:
+            kwargs["system"] = system_prompt
+
+        return kwargs
+
+    def _to_analysis(self, message: Any) -> LLMAnalysis:
+        """Convert a Messages API response."""
+        input_tokens, cached_input_tokens = _input_tokens(message.usage)
+        return LLMAnalysis(
+            content=message.content[0].text,
+            input_tokens=input_tokens,
+            output_tokens=message.usage.output_tokens,
+            model=self._model,
+            provider=self.name,
+            cached_input_tokens=cached_input_tokens,
+        )
+
     def analyze(
         self,
         user_prompt: str,
@@ -91,25 +150,10 @@ class AnthropicProvider:
             self._max_tokens,
         )
 
-        kwargs: dict = {
-            "model": self._model,
-            "max_tokens": self._max_tokens,
-            "temperature": self._temperature,
-            "messages": [{"role": "user", "content": user_prompt}],
-        }
-
-        if system_prompt:
-            kwargs["system"] = system_prompt
-
+        kwargs = self._build_kwargs(user_prompt, system_prompt)
         response = client.messages.create(**kwargs)
 
-        result = LLMAnalysis(
-            content=response.content[0].text,
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-            model=self._model,
-            provider=self.name,
-        )
+        result = self._to_analysis(response)
 
         logger.debug(
             "anthropic_analyze_response: input_tokens=%d, output_tokens=%d",
@@ -143,25 +187,10 @@ class AnthropicProvider:
             self._max_tokens,
         )
 
-        kwargs: dict = {
-            "model": self._model,
-            "max_tokens": self._max_tokens,
-            "temperature": self._temperature,
-            "messages": [{"role": "user", "content": user_prompt}],
-        }
-
-        if system_prompt:
-            kwargs["system"] = system_prompt
-
+        kwargs = self._build_kwargs(user_prompt, system_prompt)
         response = await client.messages.create(**kwargs)
 
-        result = LLMAnalysis(
-            content=response.content[0].text,
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-            model=self._model,
-            provider=self.name,
-        )
+        result = self._to_analysis(response)
 
         logger.debug(
             "anthropic_analyze_async_response: input_tokens=%d, output_tokens=%d",
@@ -170,3 +199,145 @@ class AnthropicProvider:
         )
 
         return result
+
+    def stream(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream the response from Claude (synchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and any token usage reported so far.
+        """
+        client = self._get_sync_client()
+
+        logger.debug("anthropic_stream_request: model=%s", self._model)
+
+        kwargs = self._build_kwargs(user_prompt, system_prompt)
+        # Leaving the block (also when the caller stops early) closes the connection
+        with client.messages.create(**kwargs, stream=True) as events:
+            for event in events:
+                chunk = _event_chunk(event)
+                if chunk is not None:
+                    yield chunk
+
+    async def stream_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream the response from Claude (asynchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and any token usage reported so far.
+        """
+        client = self._get_async_client()
+
+        logger.debug("anthropic_stream_async_request: model=%s", self._model)
+
+        kwargs = self._build_kwargs(user_prompt, system_prompt)
+        async with await client.messages.create(**kwargs, stream=True) as events:
+            async for event in events:
+                chunk = _event_chunk(event)
+                if chunk is not None:
+                    yield chunk
+
+    def submit_batch(self, requests: Sequence[BatchRequest]) -> str:
+        """
+        Submit requests as a Message Batch.
+
+        Args:
+            requests: Requests with unique custom IDs.
+
+        Returns:
+            Message Batch ID.
+        """
+        batch = self._get_sync_client().messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": self._build_kwargs(request.user_prompt, request.system_prompt),
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    def is_batch_done(self, batch_id: str) -> bool:
+        """
+        Check whether a Message Batch has ended.
+
+        Args:
+            batch_id: Message Batch ID.
+
+        Returns:
+            True once the batch's results are available.
+        """
+        batch = self._get_sync_client().messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[BatchResult]:
+        """
+        Stream the results of an ended Message Batch.
+
+        Args:
+            batch_id: Message Batch ID.
+
+        Yields:
+            BatchResult per request.
+        """
+        for entry in self._get_sync_client().messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                yield BatchResult(entry.custom_id, analysis=self._to_analysis(result.message))
+            else:
+                error = getattr(result, "error", None)
+                detail = getattr(getattr(error, "error", None), "message", None)
+                yield BatchResult(
+                    entry.custom_id, error=f"{result.type}: {detail}" if detail else result.type
+                )
+
+
+def _event_chunk(event: Any) -> StreamChunk | None:
+    """Convert a Messages API stream event into a chunk (None if irrelevant)."""
+    if event.type == "message_start":
+        # Output usage here is a placeholder (usually 1); the real count comes
+        # with message_delta, and is estimated if the stream closes before it
+        input_tokens, cached_input_tokens = _input_tokens(event.message.usage)
+        return StreamChunk(input_tokens=input_tokens, cached_input_tokens=cached_input_tokens)
+    if event.type == "content_block_delta" and event.delta.type == "text_delta":
+        return StreamChunk(text=event.delta.text)
+    if event.type == "message_delta":
+        return StreamChunk(output_tokens=event.usage.output_tokens)
+    return None
+
+
+def _input_tokens(usage: Any) -> tuple[int, int]:
+    """
+    Get total and cache-read input tokens from a usage report.
+
+    The API counts cache reads and cache writes separately from
+    ``input_tokens``; all three are input. Cache writes (billed at a
+    premium) are counted as regular input.
+    """
+    read = _token_count(getattr(usage, "cache_read_input_tokens", None))
+    written = _token_count(getattr(usage, "cache_creation_input_tokens", None))
+    return usage.input_tokens + read + written, read
+
+
+def _token_count(value: Any) -> int:
+    """Token count of an optional usage field."""
+    return value if isinstance(value, int) else 0
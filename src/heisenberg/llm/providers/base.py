@@ -5,7 +5,9 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
-    from heisenberg.llm.models import LLMAnalysis
+    from collections.abc import AsyncIterator, Iterator
+
+    from heisenberg.llm.models import LLMAnalysis, StreamChunk
 
 
 @runtime_checkable
@@ -52,3 +54,43 @@ class LLMProvider(Protocol):
             LLMAnalysis with response content and token usage.
         """
         ...
+
+    def stream(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream the response as it is generated (synchronous).
+
+        Closing the iterator early stops generation.
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and any token usage reported so far.
+        """
+        ...
+
+    def stream_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream the response as it is generated (asynchronous).
+
+        Closing the iterator early stops generation.
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and any token usage reported so far.
+        """
+        ...
@@ -2,17 +2,33 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import threading
+import time
 from typing import TYPE_CHECKING, Any
 
 from heisenberg.llm.config import PROVIDER_CONFIGS
-from heisenberg.llm.models import LLMAnalysis
+from heisenberg.llm.models import LLMAnalysis, StreamChunk
+from heisenberg.llm.prompts import split_cacheable_prefix
+from heisenberg.llm.tokens import get_token_counter
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator, Sequence
+
     from google.genai import Client
 
 logger = logging.getLogger(__name__)
 
+# Explicit context caches must hold at least this many tokens (the limit of
+# the Pro models); smaller prompts rely on Gemini's implicit caching
+GEMINI_MIN_CACHED_TOKENS = 4096
+# Prompt prefixes remembered as seen once; a cache is created on the second use
+_MAX_SEEN_PREFIXES = 1024
+GEMINI_CACHE_TTL_SECONDS = 3600
+# Stop using a cache this long before it expires on the server
+_CACHE_EXPIRY_MARGIN_SECONDS = 60
+
 
 class GeminiProvider:
     """LLM provider for Google's Gemini models with sync + async support."""
@@ -23,6 +39,7 @@ class GeminiProvider:
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        prompt_caching: bool = True,
     ) -> None:
         """
         Initialize Gemini provider.
@@ -32,13 +49,26 @@ class GeminiProvider:
             model: Model name to use. Defaults to config default.
             max_tokens: Maximum tokens in response. Defaults to config default.
             temperature: Temperature for sampling. Defaults to config default.
+            prompt_caching: Store the system prompt together with the
+                stable part of the user prompt (everything before the run
+                summary) as cached contents once the same prefix of at least
+                ``GEMINI_MIN_CACHED_TOKENS`` tokens is sent a second time,
+                and reference it instead of resending the prefix. Caches are
+                not created on first use because their storage costs more
+                than a single uncached request.
         """
         config = PROVIDER_CONFIGS["google"]
         self._api_key = api_key
         self._model = model or config.default_model
         self._max_tokens = max_tokens if max_tokens is not None else config.max_tokens
         self._temperature = temperature if temperature is not None else config.temperature
+        self._prompt_caching = prompt_caching
         self._client: Client | None = None
+        # Prompt prefix digest -> (cached content name or None, local expiry)
+        self._prompt_caches: dict[str, tuple[str | None, float]] = {}
+        # Digests of prefixes sent once without a cache
+        self._seen_prefixes: set[str] = set()
+        self._prompt_caches_lock = threading.Lock()
 
     @property
     def name(self) -> str:
@@ -50,6 +80,11 @@ class GeminiProvider:
         """Return the model name."""
         return self._model
 
+    @property
+    def temperature(self) -> float:
+        """Return the sampling temperature."""
+        return self._temperature
+
     def is_available(self) -> bool:
         """Check if the provider is available."""
         return bool(self._api_key)
@@ -62,16 +97,109 @@ class GeminiProvider:
             self._client = genai.Client(api_key=self._api_key)
         return self._client
 
-    def _get_config(self, system_prompt: str | None) -> Any:
-        """Create generate content config."""
+    def _get_config(self, system_prompt: str | None, cached_content: str | None = None) -> Any:
+        """Create generate content config (referencing a cached system prompt if given)."""
         from google.genai import types
 
+        if cached_content is not None:
+            return types.GenerateContentConfig(
+                cached_content=cached_content,
+                max_output_tokens=self._max_tokens,
+                temperature=self._temperature,
+            )
         return types.GenerateContentConfig(
             system_instruction=system_prompt or "",
             max_output_tokens=self._max_tokens,
             temperature=self._temperature,
         )
 
+    def _get_cached_config(self, system_prompt: str | None, user_prompt: str) -> tuple[Any, str]:
+        """Create config and contents, caching the prompt prefix if worthwhile (synchronous)."""
+        prefix, summary = split_cacheable_prefix(user_prompt)
+        key = self._prompt_cache_key(system_prompt, prefix, summary)
+        if key is None:
+            return self._get_config(system_prompt), user_prompt
+        found, name = self._lookup_prompt_cache(key)
+        if not found:
+            try:
+                cache = self._get_client().caches.create(
+                    model=self._model, config=self._cache_config(system_prompt, prefix)
+                )
+                name = cache.name
+            except Exception as e:  # fall back to sending the prompt
+                logger.warning("gemini_prompt_cache_failed: model=%s, error=%s", self._model, e)
+            self._remember_prompt_cache(key, name)
+        if name is None:
+            return self._get_config(system_prompt), user_prompt
+        return self._get_config(system_prompt, name), summary
+
+    async def _get_cached_config_async(
+        self, system_prompt: str | None, user_prompt: str
+    ) -> tuple[Any, str]:
+        """Create config and contents, caching the prompt prefix if worthwhile (asynchronous)."""
+        prefix, summary = split_cacheable_prefix(user_prompt)
+        key = self._prompt_cache_key(system_prompt, prefix, summary)
+        if key is None:
+            return self._get_config(system_prompt), user_prompt
+        found, name = self._lookup_prompt_cache(key)
+        if not found:
+            try:
+                cache = await self._get_client().aio.caches.create(
+                    model=self._model, config=self._cache_config(system_prompt, prefix)
+                )
+                name = cache.name
+            except Exception as e:  # fall back to sending the prompt
+                logger.warning("gemini_prompt_cache_failed: model=%s, error=%s", self._model, e)
+            self._remember_prompt_cache(key, name)
+        if name is None:
+            return self._get_config(system_prompt), user_prompt
+        return self._get_config(system_prompt, name), summary
+
+    def _prompt_cache_key(self, system_prompt: str | None, prefix: str, summary: str) -> str | None:
+        """Digest of a prompt prefix worth an explicit cache, None to send it inline."""
+        if not (self._prompt_caching and summary):
+            return None
+        key = hashlib.sha256(f"{self._model}\n{system_prompt or ''}\n{prefix}".encode()).hexdigest()
+        with self._prompt_caches_lock:
+            if key in self._prompt_caches:
+                return key
+            # First use: the prefix may never be sent again
+            if key not in self._seen_prefixes:
+                if len(self._seen_prefixes) >= _MAX_SEEN_PREFIXES:
+                    self._seen_prefixes.clear()
+                self._seen_prefixes.add(key)
+                return None
+        counter = get_token_counter(self.name, self._model)
+        if counter.count(system_prompt or "") + counter.count(prefix) < GEMINI_MIN_CACHED_TOKENS:
+            return None
+        return key
+
+    def _lookup_prompt_cache(self, key: str) -> tuple[bool, str | None]:
+        """Return (found, cached content name); failed creations are remembered as None."""
+        with self._prompt_caches_lock:
+            entry = self._prompt_caches.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return False, None
+        return True, entry[0]
+
+    def _remember_prompt_cache(self, key: str, name: str | None) -> None:
+        """Record a created cache (or a failed attempt, retried after the TTL)."""
+        expires = time.monotonic() + GEMINI_CACHE_TTL_SECONDS - _CACHE_EXPIRY_MARGIN_SECONDS
+        with self._prompt_caches_lock:
+            self._prompt_caches[key] = (name, expires)
+        if name is not None:
+            logger.info("gemini_prompt_cache_created: model=%s, name=%s", self._model, name)
+
+    def _cache_config(self, system_prompt: str | None, prefix: str) -> Any:
+        """Create the cached content config holding a system prompt and prompt prefix."""
+        from google.genai import types
+
+        return types.CreateCachedContentConfig(
+            system_instruction=system_prompt,
+            contents=[types.Content(role="user", parts=[types.Part(text=prefix)])],
+            ttl=f"{GEMINI_CACHE_TTL_SECONDS}s",
+        )
+
     def _extract_token_counts(self, response: Any) -> tuple[int, int]:
         """Extract token counts from response metadata."""
         input_tokens = 0
@@ -81,6 +209,12 @@ class GeminiProvider:
             output_tokens = getattr(response.usage_metadata, "candidates_token_count", 0) or 0
         return input_tokens, output_tokens
 
+    def _extract_cached_tokens(self, response: Any) -> int:
+        """Prompt tokens served from explicit or implicit caches."""
+        usage = getattr(response, "usage_metadata", None)
+        cached = getattr(usage, "cached_content_token_count", None) if usage else None
+        return cached if isinstance(cached, int) else 0
+
     def analyze(
         self,
         user_prompt: str,
@@ -98,7 +232,7 @@ class GeminiProvider:
             LLMAnalysis with response content and token usage.
         """
         client = self._get_client()
-        config = self._get_config(system_prompt)
+        config, contents = self._get_cached_config(system_prompt, user_prompt)
 
         logger.debug(
             "gemini_analyze_request: model=%s, max_tokens=%d",
@@ -108,7 +242,7 @@ class GeminiProvider:
 
         response = client.models.generate_content(
             model=self._model,
-            contents=user_prompt,
+            contents=contents,
             config=config,
         )
 
@@ -120,6 +254,7 @@ class GeminiProvider:
             output_tokens=output_tokens,
             model=self._model,
             provider=self.name,
+            cached_input_tokens=self._extract_cached_tokens(response),
         )
 
         logger.debug(
@@ -147,7 +282,7 @@ class GeminiProvider:
             LLMAnalysis with response content and token usage.
         """
         client = self._get_client()
-        config = self._get_config(system_prompt)
+        config, contents = await self._get_cached_config_async(system_prompt, user_prompt)
 
         logger.debug(
             "gemini_analyze_async_request: model=%s, max_tokens=%d",
@@ -157,7 +292,7 @@ class GeminiProvider:
 
         response = await client.aio.models.generate_content(
             model=self._model,
-            contents=user_prompt,
+            contents=contents,
             config=config,
         )
 
@@ -169,6 +304,7 @@ class GeminiProvider:
             output_tokens=output_tokens,
             model=self._model,
             provider=self.name,
+            cached_input_tokens=self._extract_cached_tokens(response),
         )
 
         logger.debug(
@@ -179,6 +315,70 @@ class GeminiProvider:
 
         return result
 
+    def stream(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream the response from Gemini (synchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and the token totals reported so far.
+        """
+        client = self._get_client()
+        config, contents = self._get_cached_config(system_prompt, user_prompt)
+
+        logger.debug("gemini_stream_request: model=%s", self._model)
+
+        for response in client.models.generate_content_stream(
+            model=self._model,
+            contents=contents,
+            config=config,
+        ):
+            yield self._response_chunk(response)
+
+    async def stream_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream the response from Gemini (asynchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text and the token totals reported so far.
+        """
+        client = self._get_client()
+        config, contents = await self._get_cached_config_async(system_prompt, user_prompt)
+
+        logger.debug("gemini_stream_async_request: model=%s", self._model)
+
+        async for response in await client.aio.models.generate_content_stream(
+            model=self._model,
+            contents=contents,
+            config=config,
+        ):
+            yield self._response_chunk(response)
+
+    def _response_chunk(self, response: Any) -> StreamChunk:
+        """Convert a streamed response (usage metadata holds running totals)."""
+        chunk = StreamChunk(text=response.text or "")
+        if getattr(response, "usage_metadata", None):
+            chunk.input_tokens, chunk.output_tokens = self._extract_token_counts(response)
+            chunk.cached_input_tokens = self._extract_cached_tokens(response)
+        return chunk
+
     def analyze_with_image(
         self,
         user_prompt: str,
@@ -242,6 +442,166 @@ class GeminiProvider:
 
         return result
 
+    async def analyze_with_image_async(
+        self,
+        user_prompt: str,
+        image_data: bytes,
+        mime_type: str = "image/png",
+        *,
+        system_prompt: str | None = None,
+    ) -> LLMAnalysis:
+        """
+        Analyze with an image using Gemini's vision capability (asynchronous).
+
+        Args:
+            user_prompt: User prompt describing what to analyze.
+            image_data: Raw image bytes.
+            mime_type: Image MIME type (default: image/png).
+            system_prompt: Optional system prompt for context.
+
+        Returns:
+            LLMAnalysis with response content and token usage.
+        """
+        from google.genai import types
+
+        client = self._get_client()
+        config = self._get_config(system_prompt)
+
+        # Build multimodal content: text prompt + image
+        image_part = types.Part.from_bytes(data=image_data, mime_type=mime_type)
+        contents = [user_prompt, image_part]
+
+        logger.debug(
+            "gemini_vision_async_request: model=%s, mime_type=%s, image_size=%d",
+            self._model,
+            mime_type,
+            len(image_data),
+        )
+
+        response = await client.aio.models.generate_content(
+            model=self._model,
+            contents=contents,
+            config=config,
+        )
+
+        input_tokens, output_tokens = self._extract_token_counts(response)
+
+        result = LLMAnalysis(
+            content=response.text or "",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            model=self._model,
+            provider=self.name,
+        )
+
+        logger.debug(
+            "gemini_vision_async_response: input_tokens=%d, output_tokens=%d",
+            result.input_tokens,
+            result.output_tokens,
+        )
+
+        return result
+
+    def analyze_with_images(
+        self,
+        user_prompt: str,
+        images: Sequence[tuple[str, bytes, str]],
+        *,
+        system_prompt: str | None = None,
+    ) -> LLMAnalysis:
+        """
+        Analyze several labelled images in one request (synchronous).
+
+        Args:
+            user_prompt: User prompt describing what to analyze.
+            images: (label, raw image bytes, MIME type) per image. Each
+                label is sent as text right before its image.
+            system_prompt: Optional system prompt for context.
+
+        Returns:
+            LLMAnalysis with response content and token usage.
+        """
+        client = self._get_client()
+        config = self._get_config(system_prompt)
+
+        logger.debug(
+            "gemini_vision_request: model=%s, images=%d, image_size=%d",
+            self._model,
+            len(images),
+            sum(len(data) for _, data, _ in images),
+        )
+
+        response = client.models.generate_content(
+            model=self._model,
+            contents=self._image_contents(user_prompt, images),
+            config=config,
+        )
+        return self._vision_result(response)
+
+    async def analyze_with_images_async(
+        self,
+        user_prompt: str,
+        images: Sequence[tuple[str, bytes, str]],
+        *,
+        system_prompt: str | None = None,
+    ) -> LLMAnalysis:
+        """
+        Analyze several labelled images in one request (asynchronous).
+
+        Args:
+            user_prompt: User prompt describing what to analyze.
+            images: (label, raw image bytes, MIME type) per image. Each
+                label is sent as text right before its image.
+            system_prompt: Optional system prompt for context.
+
+        Returns:
+            LLMAnalysis with response content and token usage.
+        """
+        client = self._get_client()
+        config = self._get_config(system_prompt)
+
+        logger.debug(
+            "gemini_vision_async_request: model=%s, images=%d, image_size=%d",
+            self._model,
+            len(images),
+            sum(len(data) for _, data, _ in images),
+        )
+
+        response = await client.aio.models.generate_content(
+            model=self._model,
+            contents=self._image_contents(user_prompt, images),
+            config=config,
+        )
+        return self._vision_result(response)
+
+    def _image_contents(
+        self, user_prompt: str, images: Sequence[tuple[str, bytes, str]]
+    ) -> list[Any]:
+        """Build multimodal content: text prompt, then each label and image."""
+        from google.genai import types
+
+        contents: list[Any] = [user_prompt]
+        for label, image_data, mime_type in images:
+            contents.append(label)
+            contents.append(types.Part.from_bytes(data=image_data, mime_type=mime_type))
+        return contents
+
+    def _vision_result(self, response: Any) -> LLMAnalysis:
+        """Convert a multi-image response to an LLMAnalysis."""
+        input_tokens, output_tokens = self._extract_token_counts(response)
+        logger.debug(
+            "gemini_vision_response: input_tokens=%d, output_tokens=%d",
+            input_tokens,
+            output_tokens,
+        )
+        return LLMAnalysis(
+            content=response.text or "",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            model=self._model,
+            provider=self.name,
+        )
+
     async def _call_api(
         self,
         user_prompt: str,
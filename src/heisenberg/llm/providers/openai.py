@@ -2,17 +2,26 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+from heisenberg.llm.batch import BatchRequest, BatchResult
 from heisenberg.llm.config import PROVIDER_CONFIGS
-from heisenberg.llm.models import LLMAnalysis
+from heisenberg.llm.models import LLMAnalysis, StreamChunk
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator, Sequence
+
     from openai import AsyncOpenAI, OpenAI
 
 logger = logging.getLogger(__name__)
 
+_BATCH_ENDPOINT = "/v1/chat/completions"
+# Batch statuses after which no more results will appear
+_FINAL_BATCH_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
 
 class OpenAIProvider:
     """LLM provider for OpenAI's GPT models with sync + async support."""
@@ -23,6 +32,8 @@ class OpenAIProvider:
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        prompt_caching: bool = True,
+        base_url: str | None = None,
     ) -> None:
         """
         Initialize OpenAI provider.
@@ -32,12 +43,20 @@ class OpenAIProvider:
             model: Model name to use. Defaults to config default.
             max_tokens: Maximum tokens in response. Defaults to config default.
             temperature: Temperature for sampling. Defaults to config default.
+            prompt_caching: Send a ``prompt_cache_key`` derived from the
+                system prompt so requests sharing it are routed to the same
+                cache. OpenAI caches prompt prefixes of 1024+ tokens
+                automatically either way.
+            base_url: API base URL (e.g. a proxy or local stub). Defaults to
+                the SDK default.
         """
         config = PROVIDER_CONFIGS["openai"]
         self._api_key = api_key
         self._model = model or config.default_model
         self._max_tokens = max_tokens if max_tokens is not None else config.max_tokens
         self._temperature = temperature if temperature is not None else config.temperature
+        self._prompt_caching = prompt_caching
+        self._base_url = base_url
         self._sync_client: OpenAI | None = None
         self._async_client: AsyncOpenAI | None = None
 
@@ -51,12 +70,17 @@ class OpenAIProvider:
         """Return the model name."""
         return self._model
 
+    @property
+    def temperature(self) -> float:
+        """Return the sampling temperature."""
+        return self._temperature
+
     def _get_sync_client(self) -> OpenAI:
         """Get or create synchronous OpenAI client."""
         if self._sync_client is None:
             from openai import OpenAI
 
-            self._sync_client = OpenAI(api_key=self._api_key)
+            self._sync_client = OpenAI(api_key=self._api_key, base_url=self._base_url)
         return self._sync_client
 
     def _get_async_client(self) -> AsyncOpenAI:
@@ -64,7 +88,7 @@ class OpenAIProvider:
         if self._async_client is None:
             from openai import AsyncOpenAI
 
-            self._async_client = AsyncOpenAI(api_key=self._api_key)
+            self._async_client = AsyncOpenAI(api_key=self._api_key, base_url=self._base_url)
         return self._async_client
 
     def _build_messages(self, user_prompt: str, system_prompt: str | None) -> list[dict[str, str]]:
@@ -75,6 +99,20 @@ class OpenAIProvider:
         messages.append({"role": "user", "content": user_prompt})
         return messages
 
+    def _request_kwargs(self, user_prompt: str, system_prompt: str | None) -> dict[str, Any]:
+        """Build request arguments for the Chat Completions API."""
+        kwargs: dict[str, Any] = {
+            "model": self._model,
+            "max_tokens": self._max_tokens,
+            "temperature": self._temperature,
+            "messages": self._build_messages(user_prompt, system_prompt),
+        }
+        if system_prompt and self._prompt_caching:
+            # Passed as extra body so older SDKs without the parameter work too
+            digest = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+            kwargs["extra_body"] = {"prompt_cache_key": f"heisenberg-{digest}"}
+        return kwargs
+
     def analyze(
         self,
         user_prompt: str,
@@ -100,10 +138,7 @@ class OpenAIProvider:
         )
 
         response = client.chat.completions.create(
-            model=self._model,
-            max_tokens=self._max_tokens,
-            temperature=self._temperature,
-            messages=self._build_messages(user_prompt, system_prompt),
+            **self._request_kwargs(user_prompt, system_prompt)
         )
 
         result = LLMAnalysis(
@@ -112,6 +147,7 @@ class OpenAIProvider:
             output_tokens=response.usage.completion_tokens if response.usage else 0,
             model=self._model,
             provider=self.name,
+            cached_input_tokens=_cached_tokens(response.usage),
         )
 
         logger.debug(
@@ -147,10 +183,7 @@ class OpenAIProvider:
         )
 
         response = await client.chat.completions.create(
-            model=self._model,
-            max_tokens=self._max_tokens,
-            temperature=self._temperature,
-            messages=self._build_messages(user_prompt, system_prompt),
+            **self._request_kwargs(user_prompt, system_prompt)
         )
 
         result = LLMAnalysis(
@@ -159,6 +192,7 @@ class OpenAIProvider:
             output_tokens=response.usage.completion_tokens if response.usage else 0,
             model=self._model,
             provider=self.name,
+            cached_input_tokens=_cached_tokens(response.usage),
         )
 
         logger.debug(
@@ -168,3 +202,160 @@ class OpenAIProvider:
         )
 
         return result
+
+    def stream(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream the response from OpenAI (synchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text; the last one carries token usage.
+        """
+        client = self._get_sync_client()
+
+        logger.debug("openai_stream_request: model=%s", self._model)
+
+        # Leaving the block (also when the caller stops early) closes the connection
+        with client.chat.completions.create(
+            **self._request_kwargs(user_prompt, system_prompt),
+            stream=True,
+            stream_options={"include_usage": True},
+        ) as chunks:
+            for chunk in chunks:
+                yield _completion_chunk(chunk)
+
+    async def stream_async(
+        self,
+        user_prompt: str,
+        *,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream the response from OpenAI (asynchronous).
+
+        Args:
+            user_prompt: User prompt containing the analysis request.
+            system_prompt: Optional system prompt for context.
+
+        Yields:
+            StreamChunk with new text; the last one carries token usage.
+        """
+        client = self._get_async_client()
+
+        logger.debug("openai_stream_async_request: model=%s", self._model)
+
+        async with await client.chat.completions.create(
+            **self._request_kwargs(user_prompt, system_prompt),
+            stream=True,
+            stream_options={"include_usage": True},
+        ) as chunks:
+            async for chunk in chunks:
+                yield _completion_chunk(chunk)
+
+    def submit_batch(self, requests: Sequence[BatchRequest]) -> str:
+        """
+        Upload requests as a JSONL file and start a Batch API job.
+
+        Args:
+            requests: Requests with unique custom IDs.
+
+        Returns:
+            Batch ID.
+        """
+        client = self._get_sync_client()
+        lines = []
+        for request in requests:
+            body = self._request_kwargs(request.user_prompt, request.system_prompt)
+            body.update(body.pop("extra_body", {}))
+            line = {"custom_id": request.custom_id, "method": "POST", "url": _BATCH_ENDPOINT}
+            lines.append(json.dumps({**line, "body": body}))
+
+        upload = client.files.create(
+            file=("heisenberg-batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=upload.id, endpoint=_BATCH_ENDPOINT, completion_window="24h"
+        )
+        return batch.id
+
+    def is_batch_done(self, batch_id: str) -> bool:
+        """
+        Check whether a batch has completed, failed, expired or been cancelled.
+
+        Args:
+            batch_id: Batch ID.
+
+        Returns:
+            True once no more results will appear.
+        """
+        return self._get_sync_client().batches.retrieve(batch_id).status in _FINAL_BATCH_STATUSES
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[BatchResult]:
+        """
+        Read the output and error files of a finished batch.
+
+        Args:
+            batch_id: Batch ID.
+
+        Yields:
+            BatchResult per request found in the files.
+        """
+        client = self._get_sync_client()
+        batch = client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield self._batch_result(json.loads(line))
+
+    def _batch_result(self, entry: dict[str, Any]) -> BatchResult:
+        """Convert one line of a batch output or error file."""
+        custom_id = entry["custom_id"]
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") == 200 and body.get("choices"):
+            usage = body.get("usage") or {}
+            details = usage.get("prompt_tokens_details") or {}
+            return BatchResult(
+                custom_id,
+                analysis=LLMAnalysis(
+                    content=body["choices"][0]["message"].get("content") or "",
+                    input_tokens=usage.get("prompt_tokens", 0),
+                    output_tokens=usage.get("completion_tokens", 0),
+                    model=self._model,
+                    provider=self.name,
+                    cached_input_tokens=details.get("cached_tokens") or 0,
+                ),
+            )
+        error = entry.get("error") or body.get("error") or {}
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        return BatchResult(custom_id, error=message or f"HTTP {response.get('status_code')}")
+
+
+def _completion_chunk(chunk: Any) -> StreamChunk:
+    """Convert a chat completion chunk (the final one has usage and no choices)."""
+    text = (chunk.choices[0].delta.content or "") if chunk.choices else ""
+    if chunk.usage:
+        return StreamChunk(
+            text=text,
+            input_tokens=chunk.usage.prompt_tokens,
+            output_tokens=chunk.usage.completion_tokens,
+            cached_input_tokens=_cached_tokens(chunk.usage),
+        )
+    return StreamChunk(text=text)
+
+
+def _cached_tokens(usage: Any) -> int:
+    """Prompt tokens served from OpenAI's prompt cache (part of prompt_tokens)."""
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    cached = getattr(details, "cached_tokens", None)
+    return cached if isinstance(cached, int) else 0
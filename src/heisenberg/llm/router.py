@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from typing import TYPE_CHECKING
 
 import httpx
 from anthropic import APIError as AnthropicAPIError
 from openai import APIError as OpenAIAPIError
 
+from heisenberg.llm.health import CircuitBreakerPolicy, ProviderHealth
+from heisenberg.llm.hedging import Hedger, HedgingPolicy
 from heisenberg.llm.models import LLMAnalysis
 
 if TYPE_CHECKING:
+    from heisenberg.llm.cache import ResponseCache
     from heisenberg.llm.providers.base import LLMProvider
 
 logger = logging.getLogger(__name__)
@@ -37,12 +42,26 @@ except ImportError:
 class LLMRouter:
     """Routes LLM requests with automatic fallback on failure (sync + async)."""
 
-    def __init__(self, providers: list[LLMProvider]) -> None:
+    def __init__(
+        self,
+        providers: list[LLMProvider],
+        cache: ResponseCache | None = None,
+        hedging: HedgingPolicy | None = None,
+        circuit_breaker: CircuitBreakerPolicy | None = None,
+    ) -> None:
         """
         Initialize the router with ordered providers.
 
         Args:
             providers: List of providers in priority order (first is primary).
+            cache: Optional response cache. A cached answer from any provider
+                is returned before calling one.
+            hedging: Optional hedging policy for ``analyze_async``. A request
+                still running after the policy's delay is also sent to the
+                next provider and the first answer wins.
+            circuit_breaker: Optional circuit breaker policy. Providers with
+                an open circuit are skipped, and providers are tried in order
+                of health score (ties keep the configured order).
 
         Raises:
             ValueError: If no providers are provided.
@@ -51,12 +70,83 @@ class LLMRouter:
             raise ValueError("At least one provider is required")
 
         self._providers = providers
+        self._cache = cache
+        self._hedger = Hedger(hedging) if hedging is not None else None
+        self._health = (
+            [ProviderHealth(circuit_breaker) for _ in providers]
+            if circuit_breaker is not None
+            else None
+        )
 
     @property
     def providers(self) -> list[LLMProvider]:
         """Return the list of providers."""
         return self._providers
 
+    @property
+    def health(self) -> list[ProviderHealth] | None:
+        """Return per-provider health (aligned with providers), if enabled."""
+        return self._health
+
+    def _cache_keys(self, user_prompt: str, system_prompt: str | None) -> list[str]:
+        """Compute each provider's cache key (empty without a cache)."""
+        if self._cache is None:
+            return []
+        return [self._cache.key_for(p, user_prompt, system_prompt) for p in self._providers]
+
+    def _cached(self, keys: list[str]) -> LLMAnalysis | None:
+        """Return the first cached response in provider order."""
+        if self._cache is None:
+            return None
+        for provider, key in zip(self._providers, keys, strict=True):
+            result = self._cache.get(key)
+            if result is not None:
+                logger.info("llm_router_cache_hit: provider=%s", provider.name)
+                return result
+        return None
+
+    def _order(self) -> list[int]:
+        """Provider indices in the order to try them."""
+        indices = list(range(len(self._providers)))
+        if self._health is None:
+            return indices
+        health = self._health
+        return sorted(indices, key=lambda index: -health[index].score())
+
+    def _admit(self, index: int) -> bool:
+        """Check the provider's circuit (reserving the probe when half-open)."""
+        if self._health is None or self._health[index].allow_request():
+            return True
+        logger.info("llm_router_circuit_open: provider=%s", self._providers[index].name)
+        return False
+
+    def _record(self, index: int, latency: float | None, failed: bool = False) -> None:
+        """Record a call outcome; no latency means the call ended without one."""
+        if self._health is None:
+            return
+        health = self._health[index]
+        if failed:
+            health.record_failure()
+        elif latency is None:
+            health.release()
+        else:
+            health.record_success(latency)
+
+    def _all_failed(self, event: str, last_error: Exception | None, attempted: bool) -> Exception:
+        """Log that no provider answered and return the error to raise."""
+        logger.error(
+            "%s: providers=%s, last_error=%s",
+            event,
+            [p.name for p in self._providers],
+            str(last_error),
+        )
+
+        if last_error:
+            return last_error
+        if not attempted:
+            return RuntimeError("All LLM providers are unavailable (circuits open)")
+        return RuntimeError("All LLM providers failed")
+
     def analyze(
         self,
         user_prompt: str,
@@ -76,9 +166,20 @@ class LLMRouter:
         Raises:
             Exception: If all providers fail.
         """
+        keys = self._cache_keys(user_prompt, system_prompt)
+        cached = self._cached(keys)
+        if cached is not None:
+            return cached
+
         last_error: Exception | None = None
+        attempted = False
 
-        for provider in self._providers:
+        for index in self._order():
+            provider = self._providers[index]
+            if not self._admit(index):
+                continue
+            attempted = True
+            started = time.monotonic()
             try:
                 logger.info("llm_router_attempt: provider=%s", provider.name)
 
@@ -86,6 +187,7 @@ class LLMRouter:
                     user_prompt,
                     system_prompt=system_prompt,
                 )
+                self._record(index, time.monotonic() - started)
 
                 logger.info(
                     "llm_router_success: provider=%s, input_tokens=%d, output_tokens=%d",
@@ -94,9 +196,12 @@ class LLMRouter:
                     result.output_tokens,
                 )
 
+                if self._cache is not None:
+                    self._cache.put(keys[index], result)
                 return result
 
             except LLM_RECOVERABLE_ERRORS as e:
+                self._record(index, None, failed=True)
                 last_error = e
                 logger.warning(
                     "llm_router_fallback: failed_provider=%s, error=%s",
@@ -104,17 +209,12 @@ class LLMRouter:
                     str(e),
                 )
                 continue
+            except BaseException:
+                self._record(index, None)
+                raise
 
         # All providers failed
-        logger.error(
-            "llm_router_all_failed: providers=%s, last_error=%s",
-            [p.name for p in self._providers],
-            str(last_error),
-        )
-
-        if last_error:
-            raise last_error
-        raise RuntimeError("All LLM providers failed")
+        raise self._all_failed("llm_router_all_failed", last_error, attempted)
 
     async def analyze_async(
         self,
@@ -135,9 +235,23 @@ class LLMRouter:
         Raises:
             Exception: If all providers fail.
         """
+        keys = self._cache_keys(user_prompt, system_prompt)
+        cached = self._cached(keys)
+        if cached is not None:
+            return cached
+
+        if self._hedger is not None:
+            return await self._analyze_hedged(self._hedger, user_prompt, system_prompt, keys)
+
         last_error: Exception | None = None
+        attempted = False
 
-        for provider in self._providers:
+        for index in self._order():
+            provider = self._providers[index]
+            if not self._admit(index):
+                continue
+            attempted = True
+            started = time.monotonic()
             try:
                 logger.info("llm_router_async_attempt: provider=%s", provider.name)
 
@@ -145,6 +259,7 @@ class LLMRouter:
                     user_prompt,
                     system_prompt=system_prompt,
                 )
+                self._record(index, time.monotonic() - started)
 
                 logger.info(
                     "llm_router_async_success: provider=%s, input_tokens=%d, output_tokens=%d",
@@ -153,9 +268,12 @@ class LLMRouter:
                     result.output_tokens,
                 )
 
+                if self._cache is not None:
+                    self._cache.put(keys[index], result)
                 return result
 
             except LLM_RECOVERABLE_ERRORS as e:
+                self._record(index, None, failed=True)
                 last_error = e
                 logger.warning(
                     "llm_router_async_fallback: failed_provider=%s, error=%s",
@@ -163,14 +281,124 @@ class LLMRouter:
                     str(e),
                 )
                 continue
+            except BaseException:
+                self._record(index, None)
+                raise
 
         # All providers failed
-        logger.error(
-            "llm_router_async_all_failed: providers=%s, last_error=%s",
-            [p.name for p in self._providers],
-            str(last_error),
-        )
+        raise self._all_failed("llm_router_async_all_failed", last_error, attempted)
 
-        if last_error:
-            raise last_error
-        raise RuntimeError("All LLM providers failed")
+    async def _analyze_hedged(
+        self,
+        hedger: Hedger,
+        user_prompt: str,
+        system_prompt: str | None,
+        keys: list[str],
+    ) -> LLMAnalysis:
+        """
+        Run providers in order, hedging once when the running one is slow.
+
+        Failures fall back to the next provider as in the unhedged path.
+        When the running request exceeds the hedge delay and the cost cap
+        allows it, the next provider is started as well. The first success
+        wins and requests still running are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        hedger.start_request()
+        order = self._order()
+        pending: dict[asyncio.Future[LLMAnalysis], int] = {}
+        started: dict[int, float] = {}
+        next_position = 0
+        hedged = False
+        last_error: Exception | None = None
+
+        def start_next() -> bool:
+            """Start the next provider whose circuit admits a request."""
+            nonlocal next_position
+            while next_position < len(order):
+                index = order[next_position]
+                next_position += 1
+                if not self._admit(index):
+                    continue
+                provider = self._providers[index]
+                logger.info("llm_router_async_attempt: provider=%s", provider.name)
+                task = asyncio.ensure_future(
+                    provider.analyze_async(user_prompt, system_prompt=system_prompt)
+                )
+                pending[task] = index
+                started[index] = loop.time()
+                return True
+            return False
+
+        try:
+            while pending or next_position < len(order):
+                if not pending:
+                    if not start_next():
+                        break
+                    continue
+
+                timeout = None
+                if not hedged and next_position < len(order):
+                    oldest = min(started[index] for index in pending.values())
+                    timeout = max(oldest + hedger.delay() - loop.time(), 0.0)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Hedge at most once per request, and only within the cost cap
+                    hedged = True
+                    if hedger.try_hedge():
+                        slow = ", ".join(self._providers[i].name for i in pending.values())
+                        if start_next():
+                            logger.info(
+                                "llm_router_hedge: slow_provider=%s, hedge_provider=%s",
+                                slow,
+                                self._providers[order[next_position - 1]].name,
+                            )
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    provider = self._providers[index]
+                    latency = loop.time() - started[index]
+                    try:
+                        result = task.result()
+                    except LLM_RECOVERABLE_ERRORS as e:
+                        self._record(index, None, failed=True)
+                        last_error = e
+                        logger.warning(
+                            "llm_router_async_fallback: failed_provider=%s, error=%s",
+                            provider.name,
+                            str(e),
+                        )
+                        continue
+                    except BaseException:
+                        self._record(index, None)
+                        raise
+
+                    self._record(index, latency)
+                    if index == order[0]:
+                        hedger.observe(latency)
+                    logger.info(
+                        "llm_router_async_success: provider=%s, input_tokens=%d, output_tokens=%d",
+                        provider.name,
+                        result.input_tokens,
+                        result.output_tokens,
+                    )
+                    if self._cache is not None:
+                        self._cache.put(keys[index], result)
+                    return result
+        finally:
+            # Cancel the losing requests and wait for them to wind down
+            for task, index in pending.items():
+                task.cancel()
+                self._record(index, None)
+                if index == order[0]:
+                    # A primary that lost took at least this long; leaving it
+                    # out would bias the hedge delay toward the fast answers
+                    hedger.observe(loop.time() - started[index])
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise self._all_failed("llm_router_async_all_failed", last_error, bool(started))
@@ -0,0 +1,82 @@
+"""Collecting streamed LLM responses.
+
+Providers stream a response as ``StreamChunk`` objects so callers can act
+on the text while it is generated, e.g. show the root cause before the
+rest of the diagnosis is written or stop generation early. Usage arrives
+at different points per provider (Anthropic reports input tokens first and
+output tokens last, OpenAI and Gemini report totals with the final chunk),
+so ``StreamCollector`` keeps the latest totals and estimates output tokens
+when the stream was closed before they were reported.
+"""
+
+from __future__ import annotations
+
+from heisenberg.llm.models import LLMAnalysis, StreamChunk
+from heisenberg.llm.tokens import get_token_counter
+
+
+class StreamCollector:
+    """Accumulates streamed chunks into an LLMAnalysis."""
+
+    def __init__(self, provider: str, model: str):
+        """
+        Initialize collector.
+
+        Args:
+            provider: Provider name reported in the result.
+            model: Model name reported in the result.
+        """
+        self.provider = provider
+        self.model = model
+        self._parts: list[str] = []
+        self._input_tokens: int | None = None
+        self._output_tokens: int | None = None
+        self._cached_input_tokens = 0
+        self._cached = False
+
+    def add(self, chunk: StreamChunk) -> str:
+        """
+        Record a chunk.
+
+        Args:
+            chunk: Chunk received from the provider.
+
+        Returns:
+            The chunk's text.
+        """
+        self._parts.append(chunk.text)
+        if chunk.input_tokens is not None:
+            self._input_tokens = chunk.input_tokens
+        if chunk.output_tokens is not None:
+            self._output_tokens = chunk.output_tokens
+        if chunk.cached_input_tokens is not None:
+            self._cached_input_tokens = chunk.cached_input_tokens
+        self._cached = self._cached or chunk.cached
+        return chunk.text
+
+    @property
+    def text(self) -> str:
+        """Text received so far."""
+        return "".join(self._parts)
+
+    def result(self) -> LLMAnalysis:
+        """
+        Build the analysis from the chunks received so far.
+
+        Returns:
+            LLMAnalysis. Output tokens not reported by the provider (stream
+            closed early) are estimated from the text received.
+        """
+        content = self.text
+        output_tokens = self._output_tokens
+        if output_tokens is None and not self._cached:
+            output_tokens = get_token_counter(self.provider, self.model).count(content)
+        return LLMAnalysis(
+            content=content,
+            input_tokens=self._input_tokens or 0,
+            output_tokens=output_tokens or 0,
+            model=self.model,
+            provider=self.provider,
+            cached=self._cached,
+            cached_input_tokens=self._cached_input_tokens,
+        )
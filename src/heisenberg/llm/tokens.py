@@ -0,0 +1,202 @@
+"""Token counting for prompt budgeting.
+
+``len(text) // 4`` is a poor fit for CI logs: timestamps, hex IDs, paths and
+stack frames tokenize far denser than prose. This module provides counters
+that track provider tokenizers more closely:
+
+- ``TiktokenCounter`` uses OpenAI's BPE tables when ``tiktoken`` is installed
+  and its encoding files are available locally (or downloadable).
+- ``HeuristicTokenCounter`` mimics BPE pre-tokenization (letter runs, digit
+  groups, punctuation) and applies a per-provider scale. It needs no
+  dependencies and is the fallback for every provider.
+
+Counts are memoized per line by ``CachingTokenCounter`` because prompts are
+assembled from log lines that repeat heavily across containers and retries.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Protocol, runtime_checkable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 65_536
+
+# Per-provider multipliers for the heuristic estimate. Claude's tokenizer
+# produces noticeably more tokens than OpenAI's o200k for code and logs.
+HEURISTIC_SCALES: dict[str, float] = {
+    "openai": 1.0,
+    "anthropic": 1.15,
+    "google": 1.0,
+}
+
+_DEFAULT_TIKTOKEN_ENCODING = "o200k_base"
+
+# Approximates the GPT-4/o200k pre-tokenizer: words with an optional leading
+# space, digits in groups of up to three, punctuation runs, whitespace runs
+_PIECE_PATTERN = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|_+|\s+")
+
+
+@runtime_checkable
+class TokenCounter(Protocol):
+    """Protocol for token counters."""
+
+    @property
+    def name(self) -> str:
+        """Return a short identifier (e.g., 'tiktoken:o200k_base')."""
+        ...
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Text to count, typically a single prompt line.
+
+        Returns:
+            Number of tokens.
+        """
+        ...
+
+
+class HeuristicTokenCounter:
+    """Dependency-free estimate modelled on BPE pre-tokenization."""
+
+    def __init__(self, scale: float = 1.0):
+        """
+        Initialize counter.
+
+        Args:
+            scale: Multiplier applied to the raw estimate for a provider.
+        """
+        self.scale = scale
+
+    @property
+    def name(self) -> str:
+        """Return counter identifier."""
+        return f"heuristic:{self.scale:g}"
+
+    def count(self, text: str) -> int:
+        """Estimate tokens in text."""
+        tokens = 0
+        for piece in _PIECE_PATTERN.findall(text):
+            stripped = piece.lstrip(" ")
+            if not stripped or stripped[0].isspace():
+                # Whitespace runs (indentation) merge into a single token
+                tokens += 1
+            elif stripped[0].isalpha():
+                # Common words are one token; long identifiers split into chunks
+                tokens += 1 if len(stripped) <= 8 else math.ceil(len(stripped) / 6)
+            elif stripped[0].isdigit():
+                tokens += 1
+            else:
+                tokens += math.ceil(len(stripped) / 2)
+        return math.ceil(tokens * self.scale)
+
+
+class TiktokenCounter:
+    """Exact counts for OpenAI models via tiktoken."""
+
+    def __init__(self, model: str | None = None):
+        """
+        Initialize counter.
+
+        Args:
+            model: OpenAI model name. Unknown models use ``o200k_base``.
+
+        Raises:
+            ImportError: If tiktoken is not installed.
+            OSError: If the encoding files cannot be loaded.
+        """
+        import tiktoken
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            self._encoding = tiktoken.get_encoding(_DEFAULT_TIKTOKEN_ENCODING)
+
+    @property
+    def name(self) -> str:
+        """Return counter identifier."""
+        return f"tiktoken:{self._encoding.name}"
+
+    def count(self, text: str) -> int:
+        """Count tokens in text."""
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class CachingTokenCounter:
+    """LRU-memoizing wrapper around another counter.
+
+    Entries are keyed by the hash of the text rather than the text itself,
+    so the cache does not keep large log lines alive.
+    """
+
+    def __init__(self, counter: TokenCounter, maxsize: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize wrapper.
+
+        Args:
+            counter: Counter that performs the actual counting.
+            maxsize: Maximum number of cached lines.
+        """
+        self.counter = counter
+        self.maxsize = maxsize
+        self._cache: OrderedDict[int, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Return the wrapped counter's identifier."""
+        return self.counter.name
+
+    def count(self, text: str) -> int:
+        """Count tokens in text, reusing earlier results for identical text."""
+        key = hash(text)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        tokens = self.counter.count(text)
+
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return tokens
+
+
+@lru_cache(maxsize=16)
+def get_token_counter(provider: str, model: str | None = None) -> CachingTokenCounter:
+    """
+    Get a cached token counter for a provider.
+
+    OpenAI uses tiktoken when it is installed and its encoding can be loaded;
+    every other case falls back to the scaled heuristic. Counters are shared
+    per (provider, model) so their line caches persist across prompts.
+
+    Args:
+        provider: Provider name (anthropic, openai, google).
+        model: Optional model name.
+
+    Returns:
+        Memoizing token counter.
+    """
+    counter: TokenCounter | None = None
+    if provider == "openai":
+        try:
+            counter = TiktokenCounter(model)
+        except (ImportError, OSError, ValueError) as e:
+            logger.debug("token_counter_fallback: provider=%s error=%s", provider, e)
+
+    if counter is None:
+        counter = HeuristicTokenCounter(HEURISTIC_SCALES.get(provider, 1.0))
+    return CachingTokenCounter(counter)
@@ -4,16 +4,26 @@ This module uses vision-capable LLMs to analyze visual artifacts
 like screenshots from test failures.
 """
 
+from heisenberg.llm.vision.preprocess import (
+    downscale_image,
+    perceptual_hash,
+    prepare_screenshots,
+)
 from heisenberg.llm.vision.screenshots import (
     ScreenshotAnalyzer,
     ScreenshotContext,
     extract_screenshots_from_artifact,
     format_screenshots_for_prompt,
+    iter_screenshots_from_artifact,
 )
 
 __all__ = [
     "ScreenshotAnalyzer",
     "ScreenshotContext",
+    "downscale_image",
     "extract_screenshots_from_artifact",
     "format_screenshots_for_prompt",
+    "iter_screenshots_from_artifact",
+    "perceptual_hash",
+    "prepare_screenshots",
 ]
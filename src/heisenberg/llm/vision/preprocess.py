@@ -0,0 +1,221 @@
+"""Screenshot pre-processing before vision calls.
+
+Playwright keeps a screenshot per attempt, so a retried test leaves two or
+three near-identical images, and full-page captures are often several
+megabytes. Before screenshots are described by a vision model they are
+collapsed with a perceptual hash (difference hash over a grayscale
+thumbnail, compared by Hamming distance) and downscaled and re-encoded to
+a size the model bills as a single image tile.
+
+Decoding and resizing use Pillow (``pip install heisenberg[vision]``).
+Without it, only byte-identical screenshots are collapsed and images are
+sent as they are.
+
+Reference: Krawetz, "Kind of Like That" (dHash), hackerfactor.com (2013).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+# Pillow is optional; without it only exact duplicates are collapsed
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+if TYPE_CHECKING:
+    from heisenberg.llm.vision.screenshots import ScreenshotContext
+
+logger = logging.getLogger(__name__)
+
+# Difference hash of HASH_SIZE x HASH_SIZE bits
+HASH_SIZE = 16
+# Hash bits that may differ between two screenshots of the same screen
+# (spinner frames, blinking cursors, timestamps)
+DEFAULT_DUPLICATE_DISTANCE = 4
+# Gemini bills an image up to 768x768 as one 258-token tile
+DEFAULT_MAX_DIMENSION = 768
+DEFAULT_JPEG_QUALITY = 80
+
+
+def image_mime_type(image_data: bytes) -> str:
+    """
+    Detect the MIME type of PNG and JPEG data.
+
+    Args:
+        image_data: Encoded image.
+
+    Returns:
+        ``image/jpeg`` for JPEG data, ``image/png`` otherwise.
+    """
+    if image_data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    return "image/png"
+
+
+def image_digest(image_data: bytes) -> str:
+    """
+    Exact digest of encoded image data.
+
+    Args:
+        image_data: Encoded image.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def perceptual_hash(image_data: bytes) -> int | None:
+    """
+    Compute the difference hash of an image.
+
+    Each bit tells whether a pixel of a small grayscale thumbnail is
+    brighter than its right neighbour, so the hash survives re-encoding,
+    rescaling and small changes of the page.
+
+    Args:
+        image_data: Encoded image.
+
+    Returns:
+        HASH_SIZE * HASH_SIZE bit hash, or None if Pillow is not installed
+        or the image cannot be decoded.
+    """
+    if Image is None:
+        return None
+    width = HASH_SIZE + 1
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            # Lets the JPEG decoder skip most of the full-size image
+            image.draft("L", (width * 8, HASH_SIZE * 8))
+            thumbnail = image.convert("L").resize((width, HASH_SIZE), Image.Resampling.BILINEAR)
+            pixels = thumbnail.tobytes()
+    except (OSError, ValueError):
+        return None
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * width + col]
+            bits = bits << 1 | (left > pixels[row * width + col + 1])
+    return bits
+
+
+def hash_distance(first: int, second: int) -> int:
+    """
+    Number of differing bits of two perceptual hashes.
+
+    Args:
+        first: First hash.
+        second: Second hash.
+
+    Returns:
+        Hamming distance.
+    """
+    return (first ^ second).bit_count()
+
+
+def downscale_image(
+    image_data: bytes,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    quality: int = DEFAULT_JPEG_QUALITY,
+) -> tuple[bytes, str]:
+    """
+    Shrink an image to fit max_dimension and re-encode it compactly.
+
+    A shrunk image is encoded as PNG and as JPEG and the smaller one is
+    kept (flat UI screenshots often compress better as PNG). An image that
+    already fits is only replaced by a smaller JPEG. The original is kept
+    when it cannot be decoded or Pillow is not installed.
+
+    Args:
+        image_data: Encoded image.
+        max_dimension: Maximum width and height in pixels.
+        quality: JPEG quality of the re-encoded image.
+
+    Returns:
+        Tuple of (image data, MIME type).
+    """
+    mime_type = image_mime_type(image_data)
+    if Image is None:
+        return image_data, mime_type
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            resized = max(image.size) > max_dimension
+            image.draft("RGB", (max_dimension, max_dimension))
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            rgb = image.convert("RGB")
+            candidates = [(_encode(rgb, "JPEG", quality=quality, optimize=True), "image/jpeg")]
+            if resized:
+                candidates.append((_encode(rgb, "PNG", optimize=True), "image/png"))
+    except (OSError, ValueError):
+        return image_data, mime_type
+    if not resized:
+        candidates.append((image_data, mime_type))
+    return min(candidates, key=lambda candidate: len(candidate[0]))
+
+
+def _encode(image: Any, image_format: str, **options: Any) -> bytes:
+    """Encode a Pillow image."""
+    output = io.BytesIO()
+    image.save(output, format=image_format, **options)
+    return output.getvalue()
+
+
+def prepare_screenshots(
+    screenshots: Iterable[ScreenshotContext],
+    max_distance: int = DEFAULT_DUPLICATE_DISTANCE,
+    max_dimension: int | None = DEFAULT_MAX_DIMENSION,
+) -> list[ScreenshotContext]:
+    """
+    Collapse near-duplicate screenshots and downscale the rest.
+
+    Screenshots are consumed one at a time, so with a lazy iterable such
+    as :func:`iter_screenshots_from_artifact` only the kept, downscaled
+    images stay in memory. A duplicate is dropped and its test name is
+    recorded on the first screenshot of the same screen.
+
+    Args:
+        screenshots: Screenshots in artifact order.
+        max_distance: Maximum perceptual hash distance of duplicates
+            (0 collapses identical hashes only).
+        max_dimension: Maximum width and height of kept screenshots, or
+            None to keep their original size.
+
+    Returns:
+        Distinct screenshots in their original order.
+    """
+    kept: list[ScreenshotContext] = []
+    digests: dict[str, ScreenshotContext] = {}
+    hashes: list[tuple[int, ScreenshotContext]] = []
+    total = 0
+
+    for screenshot in screenshots:
+        total += 1
+        image_data = screenshot.image_data
+        digest = image_digest(image_data)
+        original = digests.get(digest)
+        phash = None
+        if original is None:
+            phash = perceptual_hash(image_data)
+            if phash is not None:
+                original = next(
+                    (s for h, s in hashes if hash_distance(h, phash) <= max_distance), None
+                )
+        if original is not None:
+            original.duplicate_tests.append(screenshot.test_name)
+            continue
+
+        digests[digest] = screenshot
+        if phash is not None:
+            hashes.append((phash, screenshot))
+        if max_dimension is not None:
+            screenshot.image_data, screenshot.mime_type = downscale_image(image_data, max_dimension)
+        kept.append(screenshot)
+
+    logger.info("screenshots_prepared: total=%d, distinct=%d", total, len(kept))
+    return kept
@@ -2,23 +2,63 @@
 
 This module extracts screenshots from Playwright artifacts and uses
 vision-capable LLMs to describe what's visible, providing additional
-context for failure diagnosis.
+context for failure diagnosis. Descriptions can be cached by image
+digest, so a screenshot that reappears in a later run is not described
+again.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import io
+import json
+import logging
 import os
+import re
 import zipfile
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 
+from heisenberg.llm.cache import CACHE_KEY_VERSION, ResponseCache
+from heisenberg.llm.models import LLMAnalysis
 from heisenberg.llm.providers.gemini import GeminiProvider
+from heisenberg.llm.vision.preprocess import image_digest, image_mime_type
 from heisenberg.utils.artifacts import extract_spec_file_from_path, extract_test_name_from_path
 
+logger = logging.getLogger(__name__)
+
 # Default model for screenshot analysis (vision-capable)
 DEFAULT_VISION_MODEL = "gemini-2.0-flash"
 
+# Vision calls in flight at once in analyze_batch_async
+DEFAULT_VISION_CONCURRENCY = 5
+# Seconds a single screenshot may take before it is reported as timed out
+DEFAULT_VISION_TIMEOUT = 60.0
+
+# Test names of collapsed duplicates listed per screenshot in prompts
+MAX_DUPLICATE_TESTS_LISTED = 5
+
+# Screenshots packed into one request when analyze_batch combines them
+# (each answer is a few sentences, so this also bounds the response size)
+DEFAULT_IMAGES_PER_REQUEST = 5
+# Inline image bytes per request; Gemini rejects requests over 20 MB
+MAX_REQUEST_IMAGE_BYTES = 15 * 1024 * 1024
+
+# Section starts of a combined answer: a markdown heading line ("### Screenshot 2"),
+# a bold label ("**Screenshot 2:** text", "**Screenshot 2: checkout**") or a colon
+# label ("Screenshot 2 (checkout): text"). Text after a label starts the description;
+# a sentence such as "Screenshot 2 shows ..." is not a heading.
+_SECTION_HEADING = re.compile(
+    r"^[ \t]*(?:"
+    r"#+[ \t]*\**[ \t]*Screenshot[ \t]+(?P<heading>\d+)\b[^\n]*"
+    r"|\*\*[ \t]*Screenshot[ \t]+(?P<bold>\d+)\b[^*\n]*\*\*(?:[ \t]*:)?"
+    r"|Screenshot[ \t]+(?P<label>\d+)(?:[ \t]*\([^)\n]*\)|[ \t]+[-\u2013\u2014][^:\n]*)?[ \t]*:"
+    r")[ \t]*",
+    re.MULTILINE | re.IGNORECASE,
+)
+
 
 @dataclass
 class ScreenshotContext:
@@ -28,6 +68,9 @@ class ScreenshotContext:
     file_path: str
     image_data: bytes
     description: str | None
+    mime_type: str = "image/png"
+    # Tests whose near-identical screenshots were collapsed into this one
+    duplicate_tests: list[str] = field(default_factory=list)
 
     def to_base64(self) -> str:
         """Convert image data to base64 string."""
@@ -40,20 +83,30 @@ class ScreenshotContext:
             lines.append(self.description)
         else:
             lines.append("*Screenshot available but not analyzed*")
+        if self.duplicate_tests:
+            names = list(dict.fromkeys(self.duplicate_tests))
+            listed = ", ".join(names[:MAX_DUPLICATE_TESTS_LISTED])
+            if len(names) > MAX_DUPLICATE_TESTS_LISTED:
+                listed += f" (+{len(names) - MAX_DUPLICATE_TESTS_LISTED} more)"
+            lines.append(
+                f"*Same screen in {len(self.duplicate_tests)} other screenshot(s): {listed}*"
+            )
         return "\n".join(lines)
 
 
-def extract_screenshots_from_artifact(zip_data: bytes) -> list[ScreenshotContext]:
-    """Extract screenshot files from Playwright artifact ZIP.
+def iter_screenshots_from_artifact(zip_data: bytes) -> Iterator[ScreenshotContext]:
+    """Lazily extract screenshot files from Playwright artifact ZIP.
+
+    Each image is decompressed only when it is reached, so consumers such
+    as ``prepare_screenshots`` can drop duplicates without holding every
+    image in memory.
 
     Args:
         zip_data: Raw bytes of the artifact ZIP file.
 
-    Returns:
-        List of ScreenshotContext objects with image data.
+    Yields:
+        ScreenshotContext objects with image data.
     """
-    screenshots = []
-
     try:
         with zipfile.ZipFile(io.BytesIO(zip_data), "r") as zf:
             for file_info in zf.filelist:
@@ -77,19 +130,28 @@ def extract_screenshots_from_artifact(zip_data: bytes) -> list[ScreenshotContext
                 # Read image data
                 image_data = zf.read(file_info.filename)
 
-                screenshots.append(
-                    ScreenshotContext(
-                        test_name=test_name,
-                        file_path=file_path,
-                        image_data=image_data,
-                        description=None,
-                    )
+                yield ScreenshotContext(
+                    test_name=test_name,
+                    file_path=file_path,
+                    image_data=image_data,
+                    description=None,
+                    mime_type=image_mime_type(image_data),
                 )
 
     except zipfile.BadZipFile:
-        pass
+        return
 
-    return screenshots
+
+def extract_screenshots_from_artifact(zip_data: bytes) -> list[ScreenshotContext]:
+    """Extract screenshot files from Playwright artifact ZIP.
+
+    Args:
+        zip_data: Raw bytes of the artifact ZIP file.
+
+    Returns:
+        List of ScreenshotContext objects with image data.
+    """
+    return list(iter_screenshots_from_artifact(zip_data))
 
 
 class ScreenshotAnalyzer:
@@ -108,11 +170,25 @@ Describe what you see on the page:
 
 Keep your description concise (2-4 sentences) and focus on details relevant to debugging."""
 
+    COMBINED_PROMPT = """Analyze these {count} screenshots from failed Playwright tests.
+Each screenshot follows a line "Screenshot N: <test name>".
+
+For every screenshot, describe what you see on the page:
+1. What UI elements are visible?
+2. Are there any error messages, alerts, or unexpected states?
+3. Does the page appear to be loading, blank, or broken?
+4. Any visible text that might indicate the failure cause?
+
+Answer with one section per screenshot, in order, each starting with a line \
+"### Screenshot N". Keep each description concise (2-4 sentences), describe \
+only that screenshot, and focus on details relevant to debugging."""
+
     def __init__(
         self,
         provider: str = "google",
         api_key: str | None = None,
         model: str | None = None,
+        cache: ResponseCache | None = None,
     ):
         """Initialize the analyzer.
 
@@ -120,10 +196,12 @@ Keep your description concise (2-4 sentences) and focus on details relevant to d
             provider: LLM provider (only 'google' supported for vision).
             api_key: Optional API key (falls back to GOOGLE_API_KEY env var).
             model: Optional specific model name.
+            cache: Optional cache of descriptions, keyed by image digest.
         """
         self._provider_name = provider
         self._api_key = api_key
         self._model = model or DEFAULT_VISION_MODEL
+        self._cache = cache
         self._gemini_provider: GeminiProvider | None = None
 
     def _get_provider(self) -> GeminiProvider | None:
@@ -145,6 +223,30 @@ Keep your description concise (2-4 sentences) and focus on details relevant to d
         """Get the prompt used for screenshot analysis."""
         return self.DEFAULT_PROMPT
 
+    def _cache_key(self, screenshot: ScreenshotContext) -> str:
+        """Cache key of a screenshot's description (model, prompt and image)."""
+        payload = json.dumps(
+            [
+                CACHE_KEY_VERSION,
+                "vision",
+                self._model,
+                self.get_analysis_prompt(),
+                image_digest(screenshot.image_data),
+            ]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _describe_from_cache(self, screenshot: ScreenshotContext) -> bool:
+        """Fill in a cached description; return whether there was one."""
+        if self._cache is None:
+            return False
+        cached = self._cache.get(self._cache_key(screenshot))
+        if cached is None:
+            return False
+        logger.info("vision_cache_hit: test=%s", screenshot.test_name)
+        screenshot.description = cached.content
+        return True
+
     def analyze(self, screenshot: ScreenshotContext) -> ScreenshotContext:
         """Analyze a single screenshot.
 
@@ -155,6 +257,9 @@ Keep your description concise (2-4 sentences) and focus on details relevant to d
             ScreenshotContext with description filled in.
         """
         try:
+            if self._describe_from_cache(screenshot):
+                return screenshot
+
             provider = self._get_provider()
             if provider is None:
                 screenshot.description = "[Screenshot analysis skipped: No API key]"
@@ -164,35 +269,85 @@ Keep your description concise (2-4 sentences) and focus on details relevant to d
             result = provider.analyze_with_image(
                 user_prompt=self.get_analysis_prompt(),
                 image_data=screenshot.image_data,
-                mime_type="image/png",
+                mime_type=screenshot.mime_type,
             )
 
             screenshot.description = result.content
+            if self._cache is not None:
+                self._cache.put(self._cache_key(screenshot), result)
 
         except Exception as e:
             screenshot.description = f"[Screenshot analysis failed: {e}]"
 
         return screenshot
 
+    async def analyze_async(
+        self,
+        screenshot: ScreenshotContext,
+        timeout: float | None = DEFAULT_VISION_TIMEOUT,
+    ) -> ScreenshotContext:
+        """Analyze a single screenshot without blocking the event loop.
+
+        Args:
+            screenshot: ScreenshotContext with image data.
+            timeout: Seconds before the call is abandoned (None waits forever).
+
+        Returns:
+            ScreenshotContext with description filled in.
+        """
+        try:
+            if self._describe_from_cache(screenshot):
+                return screenshot
+
+            provider = self._get_provider()
+            if provider is None:
+                screenshot.description = "[Screenshot analysis skipped: No API key]"
+                return screenshot
+
+            async with asyncio.timeout(timeout):
+                result = await provider.analyze_with_image_async(
+                    user_prompt=self.get_analysis_prompt(),
+                    image_data=screenshot.image_data,
+                    mime_type=screenshot.mime_type,
+                )
+
+            screenshot.description = result.content
+            if self._cache is not None:
+                self._cache.put(self._cache_key(screenshot), result)
+
+        except TimeoutError:
+            screenshot.description = f"[Screenshot analysis timed out after {timeout:.0f}s]"
+        except Exception as e:
+            screenshot.description = f"[Screenshot analysis failed: {e}]"
+
+        return screenshot
+
     def analyze_batch(
         self,
         screenshots: list[ScreenshotContext],
         max_screenshots: int = 5,
+        images_per_request: int = 1,
     ) -> list[ScreenshotContext]:
         """Analyze multiple screenshots.
 
         Args:
             screenshots: List of ScreenshotContext objects.
             max_screenshots: Maximum number to analyze (to control costs).
+            images_per_request: Screenshots described by one vision request
+                (see ``analyze_combined``).
 
         Returns:
             List of ScreenshotContext with descriptions.
         """
         results = []
 
-        for screenshot in screenshots[:max_screenshots]:
-            result = self.analyze(screenshot)
-            results.append(result)
+        if images_per_request > 1:
+            for group in self._pack(screenshots[:max_screenshots], images_per_request):
+                results.extend(self.analyze_combined(group))
+        else:
+            for screenshot in screenshots[:max_screenshots]:
+                result = self.analyze(screenshot)
+                results.append(result)
 
         # Add remaining screenshots without analysis
         for screenshot in screenshots[max_screenshots:]:
@@ -201,6 +356,218 @@ Keep your description concise (2-4 sentences) and focus on details relevant to d
 
         return results
 
+    async def analyze_batch_async(
+        self,
+        screenshots: list[ScreenshotContext],
+        max_screenshots: int = 5,
+        max_concurrency: int = DEFAULT_VISION_CONCURRENCY,
+        timeout: float | None = DEFAULT_VISION_TIMEOUT,
+        images_per_request: int = 1,
+    ) -> list[ScreenshotContext]:
+        """Analyze multiple screenshots concurrently.
+
+        With the default concurrency, the batch takes about as long as the
+        slowest single vision call instead of the sum of all of them.
+
+        Args:
+            screenshots: List of ScreenshotContext objects.
+            max_screenshots: Maximum number to analyze (to control costs).
+            max_concurrency: Maximum vision calls in flight.
+            timeout: Seconds each vision request may take (None waits forever).
+            images_per_request: Screenshots described by one vision request
+                (see ``analyze_combined_async``).
+
+        Returns:
+            List of ScreenshotContext with descriptions, in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(group: list[ScreenshotContext]) -> list[ScreenshotContext]:
+            async with semaphore:
+                if len(group) == 1:
+                    return [await self.analyze_async(group[0], timeout=timeout)]
+                return await self.analyze_combined_async(group, timeout=timeout)
+
+        groups = self._pack(screenshots[:max_screenshots], images_per_request)
+        results = [
+            screenshot
+            for group in await asyncio.gather(*(analyze(group) for group in groups))
+            for screenshot in group
+        ]
+
+        # Add remaining screenshots without analysis
+        for screenshot in screenshots[max_screenshots:]:
+            screenshot.description = "[Screenshot not analyzed: limit reached]"
+            results.append(screenshot)
+
+        return results
+
+    def analyze_combined(self, screenshots: list[ScreenshotContext]) -> list[ScreenshotContext]:
+        """Describe several screenshots with one vision request.
+
+        Each image is sent after its label and the answer is split back into
+        per-screenshot descriptions. Cached screenshots are not sent, and
+        screenshots missing from the answer are analyzed one by one.
+
+        Args:
+            screenshots: Screenshots within the request limits (see
+                ``DEFAULT_IMAGES_PER_REQUEST`` and ``MAX_REQUEST_IMAGE_BYTES``).
+
+        Returns:
+            The screenshots with descriptions filled in.
+        """
+        pending = [s for s in screenshots if not self._describe_from_cache(s)]
+        provider = self._get_provider()
+        if len(pending) < 2 or provider is None:
+            for screenshot in pending:
+                self.analyze(screenshot)
+            return screenshots
+
+        try:
+            result = provider.analyze_with_images(
+                self.COMBINED_PROMPT.format(count=len(pending)), self._labelled_images(pending)
+            )
+        except Exception as e:
+            for screenshot in pending:
+                screenshot.description = f"[Screenshot analysis failed: {e}]"
+            return screenshots
+
+        for screenshot in self._apply_sections(pending, result):
+            self.analyze(screenshot)
+        return screenshots
+
+    async def analyze_combined_async(
+        self,
+        screenshots: list[ScreenshotContext],
+        timeout: float | None = DEFAULT_VISION_TIMEOUT,
+    ) -> list[ScreenshotContext]:
+        """Describe several screenshots with one vision request (asynchronous).
+
+        Args:
+            screenshots: Screenshots within the request limits (see
+                ``DEFAULT_IMAGES_PER_REQUEST`` and ``MAX_REQUEST_IMAGE_BYTES``).
+            timeout: Seconds the request may take (None waits forever).
+
+        Returns:
+            The screenshots with descriptions filled in.
+        """
+        pending = [s for s in screenshots if not self._describe_from_cache(s)]
+        provider = self._get_provider()
+        if len(pending) < 2 or provider is None:
+            for screenshot in pending:
+                await self.analyze_async(screenshot, timeout=timeout)
+            return screenshots
+
+        try:
+            async with asyncio.timeout(timeout):
+                result = await provider.analyze_with_images_async(
+                    self.COMBINED_PROMPT.format(count=len(pending)),
+                    self._labelled_images(pending),
+                )
+        except TimeoutError:
+            for screenshot in pending:
+                screenshot.description = f"[Screenshot analysis timed out after {timeout:.0f}s]"
+            return screenshots
+        except Exception as e:
+            for screenshot in pending:
+                screenshot.description = f"[Screenshot analysis failed: {e}]"
+            return screenshots
+
+        missing = self._apply_sections(pending, result)
+        await asyncio.gather(*(self.analyze_async(s, timeout=timeout) for s in missing))
+        return screenshots
+
+    def _pack(
+        self, screenshots: list[ScreenshotContext], images_per_request: int
+    ) -> list[list[ScreenshotContext]]:
+        """Split screenshots into requests within the image count and size limits."""
+        groups: list[list[ScreenshotContext]] = []
+        size = 0
+        for screenshot in screenshots:
+            image_size = len(screenshot.image_data)
+            if (
+                not groups
+                or len(groups[-1]) >= images_per_request
+                or size + image_size > MAX_REQUEST_IMAGE_BYTES
+            ):
+                groups.append([])
+                size = 0
+            groups[-1].append(screenshot)
+            size += image_size
+        return groups
+
+    def _labelled_images(
+        self, screenshots: list[ScreenshotContext]
+    ) -> list[tuple[str, bytes, str]]:
+        """Label, data and MIME type of each screenshot of a combined request."""
+        return [
+            (
+                f"Screenshot {index}: {screenshot.test_name} ({screenshot.file_path})",
+                screenshot.image_data,
+                screenshot.mime_type,
+            )
+            for index, screenshot in enumerate(screenshots, 1)
+        ]
+
+    def _apply_sections(
+        self, screenshots: list[ScreenshotContext], result: LLMAnalysis
+    ) -> list[ScreenshotContext]:
+        """Fill in descriptions from a combined answer; return the ones it lacks."""
+        sections = parse_screenshot_sections(result.content, len(screenshots))
+        missing = []
+        for index, screenshot in enumerate(screenshots, 1):
+            description = sections.get(index)
+            if not description:
+                missing.append(screenshot)
+                continue
+            screenshot.description = description
+            if self._cache is not None:
+                self._cache.put(
+                    self._cache_key(screenshot),
+                    LLMAnalysis(
+                        content=description,
+                        input_tokens=0,
+                        output_tokens=0,
+                        model=result.model,
+                        provider=result.provider,
+                    ),
+                )
+        if missing:
+            logger.warning(
+                "vision_combined_sections_missing: missing=%d, screenshots=%d",
+                len(missing),
+                len(screenshots),
+            )
+        return missing
+
+
+def parse_screenshot_sections(text: str, count: int) -> dict[int, str]:
+    """Split a combined vision answer into per-screenshot descriptions.
+
+    Args:
+        text: Answer with sections headed "Screenshot N".
+        count: Number of screenshots in the request.
+
+    Returns:
+        Mapping of screenshot number (1-based) to its description. Numbers
+        outside 1..count and repeated headings are ignored.
+    """
+    headings: list[tuple[int, re.Match[str]]] = []
+    for match in _SECTION_HEADING.finditer(text):
+        number = int(match.group("heading") or match.group("bold") or match.group("label"))
+        # A label restating the open section ("### Screenshot 1" then
+        # "Screenshot 1: ...") belongs to its description
+        if headings and headings[-1][0] == number:
+            continue
+        headings.append((number, match))
+    sections: dict[int, str] = {}
+    for position, (number, heading) in enumerate(headings):
+        end = headings[position + 1][1].start() if position + 1 < len(headings) else len(text)
+        description = text[heading.end() : end].strip()
+        if 1 <= number <= count and number not in sections and description:
+            sections[number] = description
+    return sections
+
 
 def format_screenshots_for_prompt(screenshots: list[ScreenshotContext]) -> str:
     """Format screenshot contexts for inclusion in AI prompt.
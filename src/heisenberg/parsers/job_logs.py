@@ -3,11 +3,45 @@
 This module extracts relevant log snippets from GitHub Actions job logs
 to enhance AI-powered failure diagnosis. It filters logs intelligently
 to include only error-relevant context, avoiding prompt bloat.
+
+Job logs are split into steps by ``##[group]Run ...`` headers. Setup,
+install and cache steps make up most of a log and are full of words like
+"failed" that mean nothing for the test failure, so ``index_steps`` maps
+the steps in one pass and the processor can scan only the steps that
+failed or ran the test command.
 """
 
 from __future__ import annotations
 
+import io
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from itertools import islice
+
+from heisenberg.utils.matching import MultiPatternMatcher, keyword_matcher
+
+# Runner timestamp that prefixes each line of logs downloaded from the API
+_TIMESTAMP = re.compile(r"\d{4}-\d\d-\d\dT[\d:.]+Z ")
+
+_GROUP = "##[group]"
+_ENDGROUP = "##[endgroup]"
+_ERROR = "##[error]"
+# Header opening the first group of every step, for run and uses steps alike
+_STEP_HEADER = "##[group]Run "
+# First line of the post-job steps, which have no group header
+_POST_JOB = "Post job cleanup."
+
+# Commands that run a test suite (matched case-insensitively)
+DEFAULT_TEST_COMMAND_PATTERNS = [
+    r"playwright test",
+    r"cypress run",
+    r"\b(?:jest|vitest|mocha|pytest|tox|nox)\b",
+    r"\b(?:npm|yarn|pnpm|bun)\b.*\btest\b",
+    r"\b(?:go|cargo|dotnet|mix) test\b",
+    r"\b(?:mvn|gradle|gradlew|make)\b.*\b(?:test|e2e)\b",
+]
 
 
 @dataclass
@@ -28,6 +62,82 @@ class LogSnippet:
         return "\n".join(formatted_lines)
 
 
+@dataclass
+class LogStep:
+    """A step of a GitHub Actions job log."""
+
+    name: str
+    # Line range, 0-based with an exclusive end
+    first_line: int
+    end_line: int
+    # Character offsets of the step's text, end exclusive (byte offsets for
+    # ASCII logs); the final newline belongs to the step
+    start: int
+    end: int
+    # Header line and the command lines shown in the header group
+    command: str = ""
+    # True if the step logged an ##[error] annotation
+    failed: bool = False
+
+
+def _strip_timestamp(line: str) -> str:
+    """Remove the runner timestamp and line ending from a log line."""
+    line = line.rstrip("\r\n")
+    match = _TIMESTAMP.match(line)
+    return line[match.end() :] if match else line
+
+
+def index_steps(lines: Iterable[str]) -> list[LogStep]:
+    """Find step boundaries in a job log in one pass.
+
+    A step starts at a top-level ``##[group]Run ...`` header (or the
+    ``Post job cleanup.`` line of post steps) and ends where the next one
+    starts. Lines before the first header form a "Set up job" step. Only
+    lines that contain a marker are inspected beyond a substring check.
+
+    Args:
+        lines: Log lines, with or without trailing newlines.
+
+    Returns:
+        Steps in log order, or an empty list if the log has no step headers.
+    """
+    steps: list[LogStep] = []
+    current = LogStep(name="Set up job", first_line=0, end_line=0, start=0, end=0)
+    depth = 0
+    in_header = False
+    offset = number = 0
+    found_header = False
+
+    for number, line in enumerate(lines):
+        if in_header or "##[" in line or _POST_JOB in line:
+            text = _strip_timestamp(line)
+            if depth == 0 and (text.startswith(_STEP_HEADER) or text == _POST_JOB):
+                found_header = True
+                if number > current.first_line:
+                    current.end_line, current.end = number, offset
+                    steps.append(current)
+                name = text.removeprefix(_GROUP)
+                current = LogStep(name, number, number, offset, offset, command=name)
+                depth = 1 if text.startswith(_GROUP) else 0
+                in_header = depth == 1
+            elif text.startswith(_ENDGROUP):
+                depth = max(depth - 1, 0)
+                in_header = in_header and depth > 0
+            elif text.startswith(_GROUP):
+                depth += 1
+            elif text.startswith(_ERROR):
+                current.failed = True
+            elif in_header:
+                current.command += "\n" + text
+        offset += len(line) if line.endswith("\n") else len(line) + 1
+
+    if not found_header:
+        return []
+    current.end_line, current.end = number + 1, offset
+    steps.append(current)
+    return steps
+
+
 @dataclass
 class JobLogsProcessor:
     """Processor for extracting relevant snippets from job logs."""
@@ -64,6 +174,15 @@ class JobLogsProcessor:
     # Maximum total lines to extract (to prevent prompt bloat)
     max_total_lines: int = 200
 
+    # Scan only steps that failed or ran the test command when the log has
+    # step headers (see index_steps)
+    relevant_steps_only: bool = False
+
+    # Regexes identifying test commands in step headers
+    test_command_patterns: list[str] = field(
+        default_factory=lambda: list(DEFAULT_TEST_COMMAND_PATTERNS)
+    )
+
     def _find_error_lines(self, lines: list[str]) -> list[tuple[int, str]]:
         """Find all lines containing error keywords.
 
@@ -73,14 +192,8 @@ class JobLogsProcessor:
         Returns:
             List of (line_index, keyword) tuples.
         """
-        error_line_indices: list[tuple[int, str]] = []
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            for keyword in self.error_keywords:
-                if keyword.lower() in line_lower:
-                    error_line_indices.append((i, keyword))
-                    break
-        return error_line_indices
+        # One case-insensitive scan per line; the first keyword in list order wins
+        return list(keyword_matcher(tuple(self.error_keywords)).iter_first_matches(lines))
 
     def extract_snippets(
         self,
@@ -97,86 +210,117 @@ class JobLogsProcessor:
         Returns:
             List of LogSnippet objects with error-relevant content.
         """
-        lines = log_content.split("\n")
-        error_line_indices = self._find_error_lines(lines)
-
-        if not error_line_indices:
-            return []
+        if self.relevant_steps_only:
+            steps = self.select_steps(index_steps(io.StringIO(log_content)))
+            if steps:
+                # Only the selected steps are split into lines and scanned
+                step_lines = ((step, _split_step(log_content, step)) for step in steps)
+                return list(self.iter_step_snippets(step_lines, filter_tests))
+        return list(self.iter_snippets(log_content.split("\n"), filter_tests))
 
-        # Build snippet regions (with context)
-        regions: list[tuple[int, int, str]] = []
-        for line_idx, keyword in error_line_indices:
-            start = max(0, line_idx - self.context_before)
-            end = min(len(lines), line_idx + self.context_after + 1)
-            regions.append((start, end, keyword))
+    def select_steps(self, steps: Sequence[LogStep]) -> list[LogStep]:
+        """Choose the steps worth scanning for errors.
 
-        # Merge overlapping regions
-        merged_regions = self._merge_regions(regions)
+        Args:
+            steps: Steps of one job log (see ``index_steps``).
 
-        # Extract snippets
-        snippets: list[LogSnippet] = []
-        total_lines = 0
+        Returns:
+            Steps that logged an error or ran a test command, in log order.
+        """
+        test_commands = MultiPatternMatcher(
+            {pattern: pattern for pattern in self.test_command_patterns}, re.IGNORECASE
+        )
+        return [step for step in steps if step.failed or test_commands.search(step.command)]
 
-        for start, end, keyword in merged_regions:
-            if total_lines >= self.max_total_lines:
-                break
+    def iter_step_snippets(
+        self,
+        step_lines: Iterable[tuple[LogStep, Iterable[str]]],
+        filter_tests: list[str] | None = None,
+    ) -> Iterator[LogSnippet]:
+        """Extract snippets from selected steps of one log.
 
-            # Calculate how many lines we can include
-            available_lines = self.max_total_lines - total_lines
-            actual_end = min(end, start + available_lines)
+        Line numbers refer to the whole log, and ``max_total_lines`` applies
+        across all steps. Context never reaches into skipped lines.
 
-            snippet_lines = lines[start:actual_end]
-            snippet_content = "\n".join(snippet_lines)
+        Args:
+            step_lines: (step, lines of that step) pairs in log order.
+            filter_tests: Optional list of test names to filter by.
 
-            # Apply test name filter if provided
-            if filter_tests and not any(test in snippet_content for test in filter_tests):
-                continue
+        Yields:
+            LogSnippet objects in log order.
+        """
+        extractor = self.extractor(filter_tests)
+        for step, lines in step_lines:
+            yield from extractor.skip_to(step.first_line)
+            yield from extractor.feed_lines(lines)
+            if extractor.done:
+                return
+        yield from extractor.finish()
+
+    def iter_relevant_snippets(
+        self,
+        open_lines: Callable[[], Iterable[str]],
+        filter_tests: list[str] | None = None,
+    ) -> Iterator[LogSnippet]:
+        """Extract snippets from a re-readable log, scanning relevant steps only.
 
-            snippets.append(
-                LogSnippet(
-                    content=snippet_content,
-                    line_number=start + 1,  # 1-indexed for human readability
-                    keyword=keyword,
-                )
-            )
-            total_lines += len(snippet_lines)
+        The log is read twice: once to index its steps and once to scan the
+        selected ones. Both passes stream, so memory stays constant. Logs
+        without step headers, or with no relevant step, are scanned whole.
 
-        return snippets
+        Args:
+            open_lines: Returns a fresh iterator over the log lines.
+            filter_tests: Optional list of test names to filter by.
 
-    def _merge_regions(
+        Yields:
+            LogSnippet objects in log order.
+        """
+        steps = self.select_steps(index_steps(open_lines()))
+        lines = open_lines()
+        try:
+            if steps:
+                yield from self.iter_step_snippets(_slice_steps(lines, steps), filter_tests)
+            else:
+                yield from self.iter_snippets(lines, filter_tests)
+        finally:
+            # Release the source (e.g. an open archive member) when stopping early
+            close = getattr(lines, "close", None)
+            if close is not None:
+                close()
+
+    def iter_snippets(
         self,
-        regions: list[tuple[int, int, str]],
-    ) -> list[tuple[int, int, str]]:
-        """Merge overlapping regions.
+        lines: Iterable[str],
+        filter_tests: list[str] | None = None,
+    ) -> Iterator[LogSnippet]:
+        """Extract snippets from a stream of log lines.
+
+        Lines are read once and not retained (see ``SnippetExtractor``), and
+        reading stops as soon as ``max_total_lines`` is reached, so memory
+        stays constant however long the log is. Results are the same as
+        ``extract_snippets`` on the joined text.
 
         Args:
-            regions: List of (start, end, keyword) tuples.
+            lines: Log lines (a trailing newline on each line is ignored).
+            filter_tests: Optional list of test names to filter by.
 
-        Returns:
-            Merged list of regions.
+        Yields:
+            LogSnippet objects in log order.
         """
-        if not regions:
-            return []
-
-        # Sort by start index
-        sorted_regions = sorted(regions, key=lambda r: r[0])
-        merged: list[tuple[int, int, str]] = []
+        extractor = self.extractor(filter_tests)
+        yield from extractor.feed_lines(lines)
+        yield from extractor.finish()
 
-        current_start, current_end, current_keyword = sorted_regions[0]
-
-        for start, end, keyword in sorted_regions[1:]:
-            if start <= current_end:
-                # Overlapping - extend current region
-                current_end = max(current_end, end)
-            else:
-                # No overlap - save current and start new
-                merged.append((current_start, current_end, current_keyword))
-                current_start, current_end, current_keyword = start, end, keyword
+    def extractor(self, filter_tests: list[str] | None = None) -> SnippetExtractor:
+        """Create an incremental extractor for one log.
 
-        # Don't forget the last region
-        merged.append((current_start, current_end, current_keyword))
+        Args:
+            filter_tests: Optional list of test names to filter by.
 
-        return merged
+        Returns:
+            Extractor that lines can be pushed into as they arrive.
+        """
+        return SnippetExtractor(self, filter_tests)
 
     def format_for_prompt(self, snippets: list[LogSnippet]) -> str:
         """Format snippets for inclusion in AI prompt.
@@ -196,3 +340,192 @@ class JobLogsProcessor:
             parts.append(snippet.format_for_prompt())
 
         return "\n".join(parts)
+
+
+def _split_step(log_content: str, step: LogStep) -> list[str]:
+    """Split one step's text into lines."""
+    text = log_content[step.start : step.end]
+    return text.removesuffix("\n").split("\n") if step.end > step.start else []
+
+
+def _slice_steps(
+    lines: Iterable[str], steps: Sequence[LogStep]
+) -> Iterator[tuple[LogStep, Iterator[str]]]:
+    """Pair steps (in log order) with their lines from one pass over a log."""
+    remaining = iter(lines)
+    position = 0
+    for step in steps:
+        # Skip the lines between the previous step and this one
+        next(islice(remaining, step.first_line - position, step.first_line - position), None)
+        chunk = islice(remaining, step.end_line - step.first_line)
+        yield step, chunk
+        for _ in chunk:
+            pass
+        position = step.end_line
+
+
+class SnippetExtractor:
+    """Incremental snippet extraction for a single log.
+
+    Lines are pushed one at a time with ``feed`` so logs can be processed
+    while they download. Only the last ``context_before`` lines (in a ring
+    buffer) and the lines of the current region are kept. Overlapping
+    regions are merged as lines arrive, and a region is emitted once no
+    later keyword line can reach it.
+    """
+
+    def __init__(self, processor: JobLogsProcessor, filter_tests: list[str] | None = None):
+        """
+        Initialize extractor.
+
+        Args:
+            processor: Processor providing keywords, context and line limits.
+            filter_tests: Optional list of test names to filter by.
+        """
+        self.processor = processor
+        self.filter_tests = filter_tests
+        self._matcher = keyword_matcher(tuple(processor.error_keywords))
+        # True once max_total_lines is reached; later lines are ignored
+        self.done = processor.max_total_lines <= 0
+
+        self._before: deque[str] = deque(maxlen=processor.context_before)
+        self._index = 0
+        self._total_lines = 0
+        # Current region: first line index, end index (exclusive, extended by
+        # later keyword lines), first keyword and kept lines (capped at the
+        # remaining line budget). keyword is None while no region is open.
+        self._start = self._end = 0
+        self._keyword: str | None = None
+        self._region: list[str] = []
+
+    def feed(self, line: str) -> list[LogSnippet]:
+        """
+        Process the next line of the log.
+
+        Args:
+            line: Log line (a trailing newline is ignored).
+
+        Returns:
+            Snippets completed by this line (usually none).
+        """
+        return self._feed(line, self._matcher.first_match(line))
+
+    def feed_lines(self, lines: Iterable[str]) -> Iterator[LogSnippet]:
+        """
+        Process many lines, stopping as soon as the line limit is reached.
+
+        Args:
+            lines: Log lines; not consumed past the point where ``done``.
+
+        Yields:
+            Completed snippets.
+        """
+        if self.done:
+            return
+        for line, keyword in self._matcher.label_lines(lines):
+            yield from self._feed(line, keyword)
+            if self.done:
+                return
+
+    def _feed(self, line: str, keyword: str | None) -> list[LogSnippet]:
+        """Process one line already classified by the keyword matcher."""
+        if self.done:
+            return []
+
+        emitted: list[LogSnippet] = []
+        index = self._index
+        self._index += 1
+        line = line.rstrip("\n")
+        context_before = self.processor.context_before
+        in_region = self._keyword is not None and index < self._end
+        full = False
+
+        if self._keyword is not None and not in_region:
+            if keyword is not None and index - context_before <= self._end:
+                # Overlaps the open region: the gap is still in the ring buffer
+                gap = index - self._end
+                full = self._take(list(self._before)[len(self._before) - gap :] if gap else [])
+                in_region = True
+            elif keyword is not None or index - context_before > self._end:
+                # No later keyword can reach this region any more
+                emitted.extend(self._close())
+                if self.done:
+                    return emitted
+
+        if in_region:
+            full = self._take([line]) or full
+            if keyword is not None:
+                self._end = max(self._end, index + self.processor.context_after + 1)
+        elif keyword is not None:
+            self._keyword = keyword
+            self._start = index - len(self._before)
+            self._end = index + self.processor.context_after + 1
+            self._region = []
+            full = self._take([*self._before, line])
+
+        # A full region cannot change any more; emit it unless filtered out
+        if full and self._keyword is not None:
+            snippet = self._snippet()
+            if snippet is not None:
+                emitted.append(snippet)
+                self.done = True
+                return emitted
+
+        self._before.append(line)
+        return emitted
+
+    def skip_to(self, index: int) -> list[LogSnippet]:
+        """
+        Continue at a later line without reading the lines in between.
+
+        The open region is closed and no context is carried over the gap.
+
+        Args:
+            index: 0-based index of the next line that will be fed.
+
+        Returns:
+            The closed snippet, if any.
+        """
+        if self.done or index <= self._index:
+            return []
+        emitted = self._close() if self._keyword is not None else []
+        self._before.clear()
+        self._index = index
+        return emitted
+
+    def _close(self) -> list[LogSnippet]:
+        """Emit the open region and count it against the line limit."""
+        snippet = self._snippet()
+        self._keyword = None
+        if snippet is None:
+            return []
+        self._total_lines += len(self._region)
+        if self._total_lines >= self.processor.max_total_lines:
+            self.done = True
+        return [snippet]
+
+    def finish(self) -> list[LogSnippet]:
+        """
+        Signal the end of the log.
+
+        Returns:
+            The last open snippet, if any.
+        """
+        snippet = None if self.done or self._keyword is None else self._snippet()
+        self.done = True
+        return [snippet] if snippet is not None else []
+
+    def _snippet(self) -> LogSnippet | None:
+        """Build the current region's snippet, or None if filtered out."""
+        content = "\n".join(self._region)
+        if self.filter_tests and not any(test in content for test in self.filter_tests):
+            return None
+        return LogSnippet(content=content, line_number=self._start + 1, keyword=self._keyword or "")
+
+    def _take(self, new_lines: list[str]) -> bool:
+        """Add lines to the region; return True when this fills it."""
+        available = self.processor.max_total_lines - self._total_lines
+        if len(self._region) >= available:
+            return False
+        self._region.extend(new_lines[: available - len(self._region)])
+        return len(self._region) >= available
@@ -7,14 +7,18 @@ and saves the diagnosis for use in the demo playground.
 from __future__ import annotations
 
 import json
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from heisenberg.analysis import analyze_with_ai
+from heisenberg.analysis import analyze_reports_in_batches, analyze_with_ai
 from heisenberg.parsers.playwright import parse_playwright_report
 
+if TYPE_CHECKING:
+    from heisenberg.analysis import AIAnalysisResult, ResponseCache
+
 
 @dataclass
 class AnalyzeConfig:
@@ -24,6 +28,8 @@ class AnalyzeConfig:
     provider: str = "google"
     model: str | None = None
     api_key: str | None = None
+    # Reuses the diagnosis when the same case is analyzed again
+    response_cache: ResponseCache | None = None
 
 
 @dataclass
@@ -42,6 +48,8 @@ class AnalysisResult:
     provider: str
     model: str | None
     analyzed_at: str | None = None
+    # Estimated cost in USD (batched analyses at the batch discount)
+    estimated_cost: float | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -60,6 +68,7 @@ class AnalysisResult:
                 "output": self.output_tokens,
                 "total": self.input_tokens + self.output_tokens,
             },
+            "estimated_cost": self.estimated_cost,
             "provider": self.provider,
             "model": self.model,
             "analyzed_at": self.analyzed_at,
@@ -132,11 +141,29 @@ class ScenarioAnalyzer:
             provider=self.config.provider,
             model=self.config.model,
             api_key=self.config.api_key,
+            response_cache=self.config.response_cache,
         )
 
-        # Build result
-        analyzed_at = datetime.now(UTC).isoformat()
-        result = AnalysisResult(
+        result = self._build_result(metadata, ai_result)
+
+        # Save diagnosis to file
+        self._save_diagnosis(result)
+
+        return result
+
+    def _build_result(
+        self, metadata: dict[str, Any], ai_result: AIAnalysisResult
+    ) -> AnalysisResult:
+        """Combine case metadata and an AI result into an AnalysisResult.
+
+        Args:
+            metadata: Parsed metadata.json of the case.
+            ai_result: AI analysis of the case's report.
+
+        Returns:
+            AnalysisResult stamped with the current time.
+        """
+        return AnalysisResult(
             repo=metadata["repo"],
             run_id=metadata["run_id"],
             root_cause=ai_result.diagnosis.root_cause,
@@ -148,14 +175,10 @@ class ScenarioAnalyzer:
             output_tokens=ai_result.output_tokens,
             provider=ai_result.provider,
             model=ai_result.model,
-            analyzed_at=analyzed_at,
+            analyzed_at=datetime.now(UTC).isoformat(),
+            estimated_cost=ai_result.estimated_cost,
         )
 
-        # Save diagnosis to file
-        self._save_diagnosis(result)
-
-        return result
-
     def _save_diagnosis(self, result: AnalysisResult) -> Path:
         """Save diagnosis to diagnosis.json in case directory.
 
@@ -168,3 +191,82 @@ class ScenarioAnalyzer:
         diagnosis_path = self.config.case_dir / "diagnosis.json"
         diagnosis_path.write_text(result.to_json())
         return diagnosis_path
+
+
+def analyze_cases_in_batches(
+    case_dirs: Sequence[Path],
+    *,
+    provider: str = "anthropic",
+    model: str | None = None,
+    api_key: str | None = None,
+    response_cache: ResponseCache | None = None,
+    poll_interval: float | None = None,
+    on_case: Callable[[Path, AnalysisResult | Exception], None] | None = None,
+) -> dict[Path, AnalysisResult | Exception]:
+    """Analyze many frozen cases through the provider's batch API.
+
+    Each case's diagnosis.json is written as soon as its batch ends, so an
+    interrupted run keeps the diagnoses received so far.
+
+    Args:
+        case_dirs: Case directories to analyze.
+        provider: LLM provider with a batch API (anthropic, openai).
+        model: Specific model to use (provider-dependent).
+        api_key: Optional API key. If None, reads from environment.
+        response_cache: Optional cache answering repeated cases without a
+            batch request.
+        poll_interval: Delay before the first batch status check, in seconds
+            (defaults to the batch module's interval).
+        on_case: Optional callback receiving each case's result or error as
+            it arrives.
+
+    Returns:
+        Result or error per case directory.
+
+    Raises:
+        ValueError: If the provider has no batch API.
+        TimeoutError: If batches do not finish within the batch API window.
+    """
+    outcomes: dict[Path, AnalysisResult | Exception] = {}
+    # Batch custom ID ("case-<index>") -> analyzer and metadata of the case;
+    # batch APIs reject IDs such as paths
+    analyzers: dict[str, tuple[ScenarioAnalyzer, dict[str, Any]]] = {}
+    reports = {}
+
+    def record(case_dir: Path, outcome: AnalysisResult | Exception) -> None:
+        outcomes[case_dir] = outcome
+        if on_case is not None:
+            on_case(case_dir, outcome)
+
+    for index, case_dir in enumerate(case_dirs):
+        analyzer = ScenarioAnalyzer(
+            AnalyzeConfig(case_dir=case_dir, provider=provider, model=model, api_key=api_key)
+        )
+        try:
+            metadata = analyzer.load_metadata()
+            report = parse_playwright_report(case_dir / "report.json")
+        except (FileNotFoundError, ValueError) as e:
+            record(case_dir, e)
+            continue
+        analyzers[f"case-{index}"] = (analyzer, metadata)
+        reports[f"case-{index}"] = report
+
+    def deliver(key: str, ai_result: AIAnalysisResult | Exception) -> None:
+        analyzer, metadata = analyzers[key]
+        if isinstance(ai_result, Exception):
+            record(analyzer.config.case_dir, ai_result)
+            return
+        result = analyzer._build_result(metadata, ai_result)
+        analyzer._save_diagnosis(result)
+        record(analyzer.config.case_dir, result)
+
+    analyze_reports_in_batches(
+        reports,
+        deliver,
+        api_key=api_key,
+        provider=provider,
+        model=model,
+        response_cache=response_cache,
+        poll_interval=poll_interval,
+    )
+    return outcomes
@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
+import heapq
 import re
 from collections import Counter
+from collections.abc import Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
-
-from heisenberg.integrations.docker import ContainerLogs, LogEntry
+from typing import TYPE_CHECKING
+
+from heisenberg.integrations.docker import (
+    CompactContainerLogs,
+    CompactEntries,
+    ContainerLogs,
+    LogEntry,
+    datetime_to_ns,
+)
+from heisenberg.utils.log_templates import collapse_entries
+from heisenberg.utils.matching import MultiPatternMatcher, keyword_matcher
+
+if TYPE_CHECKING:
+    from heisenberg.llm.tokens import TokenCounter
+
+# NumPy is optional; priority scoring falls back to pure Python without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Common noisy patterns to filter
 NOISE_PATTERNS = [
@@ -19,6 +39,14 @@ NOISE_PATTERNS = [
     r"^\s*$",  # Empty lines
 ]
 
+# Keywords that raise an entry's priority (each one present adds to the score)
+ERROR_KEYWORDS = ("error", "exception", "fail", "timeout", "crash", "fatal")
+
+# Never shrink below this many lines when enforcing a token limit
+MIN_TOKEN_LIMITED_LINES = 10
+
+_NO_LOGS = "(no logs)"
+
 
 @dataclass
 class CompressedLogs:
@@ -30,6 +58,7 @@ class CompressedLogs:
     was_truncated: bool
     filtered_patterns: list[str] = field(default_factory=list)
     deduplicated_count: int = 0
+    token_counter: TokenCounter | None = field(default=None, repr=False, compare=False)
 
     @property
     def compression_ratio(self) -> float:
@@ -40,24 +69,45 @@ class CompressedLogs:
 
     @property
     def estimated_tokens(self) -> int:
-        """Estimate token count (rough approximation: 4 chars per token)."""
-        text = self.to_text()
-        return len(text) // 4
+        """Estimate token count.
+
+        Uses ``token_counter`` when set, otherwise the rough approximation
+        of 4 characters per token.
+        """
+        if self.token_counter is not None:
+            return self._measure(self.token_counter)
+        return self.text_length() // 4
+
+    def text_length(self) -> int:
+        """Length of ``to_text()`` computed without joining the full prompt text."""
+        return self._measure()
+
+    def _measure(self, counter: TokenCounter | None = None) -> int:
+        """Sum per-line costs of ``to_text()``; the last line has no newline."""
+        return max(0, sum(_line_cost(line, counter) for line in self._lines()) - 1)
 
     def to_text(self) -> str:
         """Convert compressed logs to text for LLM prompt."""
-        lines = []
+        return "\n".join(self._lines())
 
+    def _lines(self) -> Iterator[str]:
+        """Yield the lines of ``to_text()``."""
         for name, container_logs in self.logs.items():
-            lines.append(f"=== Container: {name} ===")
+            yield _container_header(name)
 
             if not container_logs.entries:
-                lines.append("(no logs)")
+                yield _NO_LOGS
             else:
                 for entry in container_logs.entries:
-                    lines.append(str(entry))
+                    yield str(entry)
+
+            yield ""
+
+        yield from self._summary_lines()
 
-            lines.append("")
+    def _summary_lines(self) -> list[str]:
+        """Trailing notes about truncation and deduplication."""
+        lines = []
 
         if self.was_truncated:
             lines.append(
@@ -67,7 +117,18 @@ class CompressedLogs:
         if self.deduplicated_count > 0:
             lines.append(f"[{self.deduplicated_count} duplicate entries collapsed]")
 
-        return "\n".join(lines)
+        return lines
+
+
+def _container_header(name: str) -> str:
+    return f"=== Container: {name} ==="
+
+
+def _line_cost(line: str, counter: TokenCounter | None = None) -> int:
+    """Cost of a line plus its newline: characters, or tokens when a counter is given."""
+    if counter is None:
+        return len(line) + 1
+    return counter.count(line) + 1
 
 
 class LogCompressor:
@@ -81,6 +142,8 @@ class LogCompressor:
         focus_timestamp: datetime | None = None,
         deduplicate: bool = False,
         filter_noise: bool = False,
+        token_counter: TokenCounter | None = None,
+        mine_templates: bool = False,
     ):
         """
         Initialize log compressor.
@@ -92,6 +155,12 @@ class LogCompressor:
             focus_timestamp: Prioritize logs around this timestamp.
             deduplicate: Remove repeated log messages.
             filter_noise: Filter common noisy log patterns.
+            token_counter: Counter used for ``max_tokens`` (see
+                ``heisenberg.llm.tokens.get_token_counter``). Defaults to
+                the 4-characters-per-token approximation.
+            mine_templates: Collapse near-duplicate lines (differing only in
+                IDs, durations, ...) into one line per template with counts
+                and sample values. Supersedes ``deduplicate``.
         """
         self.max_total_lines = max_total_lines
         self.max_lines_per_container = max_lines_per_container
@@ -99,16 +168,22 @@ class LogCompressor:
         self.focus_timestamp = focus_timestamp
         self.deduplicate = deduplicate
         self.filter_noise = filter_noise
+        self.token_counter = token_counter
+        self.mine_templates = mine_templates
 
-        # Compile noise patterns
-        self._noise_regexes = [re.compile(p, re.IGNORECASE) for p in NOISE_PATTERNS]
+        # Compile noise patterns into a single matcher
+        self._noise_matcher = MultiPatternMatcher({p: p for p in NOISE_PATTERNS}, re.IGNORECASE)
 
-    def compress(self, logs: dict[str, ContainerLogs]) -> CompressedLogs:
+    def compress(self, logs: Mapping[str, ContainerLogs | CompactContainerLogs]) -> CompressedLogs:
         """
         Compress logs for LLM consumption.
 
+        Entries are read through ``container.entries`` without copying, so
+        CompactContainerLogs inputs only materialize the entries that are
+        kept (or survive noise filtering).
+
         Args:
-            logs: Dictionary of container logs.
+            logs: Dictionary of container logs (regular or compact).
 
         Returns:
             CompressedLogs with compressed and filtered logs.
@@ -120,15 +195,18 @@ class LogCompressor:
         compressed_logs: dict[str, ContainerLogs] = {}
 
         for name, container_logs in logs.items():
-            entries = list(container_logs.entries)
+            entries: Sequence[LogEntry] = container_logs.entries
 
             # Step 1: Filter noise patterns
             if self.filter_noise:
                 entries, patterns = self._filter_noise(entries)
                 filtered_patterns.extend(patterns)
 
-            # Step 2: Deduplicate
-            if self.deduplicate:
+            # Step 2: Collapse templates (or exact duplicates)
+            if self.mine_templates:
+                entries, dedup_count = collapse_entries(entries)
+                deduplicated_count += dedup_count
+            elif self.deduplicate:
                 entries, dedup_count = self._deduplicate(entries)
                 deduplicated_count += dedup_count
 
@@ -137,7 +215,7 @@ class LogCompressor:
 
             compressed_logs[name] = ContainerLogs(
                 container_name=name,
-                entries=entries,
+                entries=list(entries),
             )
 
         # Step 4: Enforce total limit across containers
@@ -153,6 +231,7 @@ class LogCompressor:
             was_truncated=was_truncated,
             filtered_patterns=list(set(filtered_patterns)),
             deduplicated_count=deduplicated_count,
+            token_counter=self.token_counter,
         )
 
         # Step 5: Enforce token limit if specified
@@ -161,28 +240,17 @@ class LogCompressor:
 
         return result
 
-    def _filter_noise(self, entries: list[LogEntry]) -> tuple[list[LogEntry], list[str]]:
+    def _filter_noise(self, entries: Sequence[LogEntry]) -> tuple[list[LogEntry], list[str]]:
         """Filter out noisy log patterns."""
-        filtered = []
-        patterns_matched = []
-
-        for entry in entries:
-            is_noise = False
-            for regex in self._noise_regexes:
-                if regex.search(entry.message):
-                    is_noise = True
-                    patterns_matched.append(regex.pattern)
-                    break
-
-            if not is_noise:
-                filtered.append(entry)
-
-        return filtered, patterns_matched
+        # One scan over all messages; only matching entries are reported back
+        noise = dict(self._noise_matcher.iter_first_matches(e.message for e in entries))
+        filtered = [entry for i, entry in enumerate(entries) if i not in noise]
+        return filtered, list(noise.values())
 
-    def _deduplicate(self, entries: list[LogEntry]) -> tuple[list[LogEntry], int]:
+    def _deduplicate(self, entries: Sequence[LogEntry]) -> tuple[list[LogEntry], int]:
         """Deduplicate repeated log messages."""
         if not entries:
-            return entries, 0
+            return [], 0
 
         message_counts: Counter[str] = Counter()
         for entry in entries:
@@ -213,29 +281,85 @@ class LogCompressor:
 
         return deduplicated, total_duplicates
 
-    def _prioritize_and_truncate(self, entries: list[LogEntry]) -> list[LogEntry]:
-        """Prioritize important logs and truncate to limit."""
-        if len(entries) <= self.max_lines_per_container:
-            return entries
+    def _prioritize_and_truncate(self, entries: Sequence[LogEntry]) -> Sequence[LogEntry]:
+        """Prioritize important logs and truncate to limit.
 
-        # Score each entry for priority
-        scored: list[tuple[float, int, LogEntry]] = []
+        Keeps the ``max_lines_per_container`` highest-scoring entries (ties
+        go to earlier entries) in their original order. Only the kept
+        entries are ranked, so the cost is linear in the number of entries.
+        """
+        limit = self.max_lines_per_container
+        if len(entries) <= limit:
+            return entries
 
-        for i, entry in enumerate(entries):
-            score = self._calculate_priority_score(entry, i, len(entries))
-            scored.append((score, i, entry))
+        scores = self._priority_scores(entries)
+        if np is not None:
+            # Scores are small integers, so folding the reversed index into
+            # the key makes it unique and lets ties prefer earlier entries
+            total = len(entries)
+            keys = np.rint(scores).astype(np.int64) * total + np.arange(total - 1, -1, -1)
+            keep = np.sort(np.argpartition(keys, total - limit)[total - limit :]).tolist()
+        else:
+            keep = sorted(heapq.nlargest(limit, range(len(scores)), key=lambda i: (scores[i], -i)))
+
+        return [entries[i] for i in keep]
+
+    def _priority_scores(self, entries: Sequence[LogEntry]) -> Sequence[float]:
+        """Score all entries in one batch (see ``_calculate_priority_score``)."""
+        logs = entries.logs if isinstance(entries, CompactEntries) else None
+        messages = logs.iter_messages() if logs is not None else (e.message for e in entries)
+
+        # Count error keywords for all entries in one pass
+        keyword_counts = {
+            i: len(matched) for i, matched in keyword_matcher(ERROR_KEYWORDS).iter_matches(messages)
+        }
+
+        if np is None:
+            return [
+                self._calculate_priority_score(entry, i, len(entries), keyword_counts.get(i, 0))
+                for i, entry in enumerate(entries)
+            ]
+
+        total = len(entries)
+        if logs is not None:
+            # Columnar logs are scored without materializing any entry
+            stderr = np.frombuffer(logs.stderr_column, dtype=np.uint8).astype(bool)
+        else:
+            stderr = np.fromiter((e.stream == "stderr" for e in entries), dtype=bool, count=total)
+
+        scores = np.where(stderr, 10.0, 0.0)
+
+        if keyword_counts:
+            hits = np.fromiter(keyword_counts, dtype=np.int64, count=len(keyword_counts))
+            counts = np.fromiter(keyword_counts.values(), dtype=np.float64, count=len(hits))
+            scores[hits] += 5.0 * counts
 
-        # Sort by score (descending) and take top entries
-        scored.sort(key=lambda x: (-x[0], x[1]))
-        top_entries = scored[: self.max_lines_per_container]
+        if self.focus_timestamp:
+            if logs is not None:
+                # Entries carry microsecond timestamps; match their precision
+                timestamps = np.frombuffer(logs.timestamp_column, dtype=np.int64) // 1_000 * 1_000
+            else:
+                timestamps = np.fromiter(
+                    (datetime_to_ns(e.timestamp) for e in entries), dtype=np.int64, count=total
+                )
+            time_diff = np.abs(timestamps - datetime_to_ns(self.focus_timestamp)) / 1e9
+            scores += np.select(
+                [time_diff < 10, time_diff < 30, time_diff < 60], [8.0, 5.0, 2.0], 0.0
+            )
 
-        # Sort back by original order (timestamp)
-        top_entries.sort(key=lambda x: x[1])
+        index = np.arange(total)
+        scores += (index < total * 0.1) | (index > total * 0.9)
+        return scores
 
-        return [entry for _, _, entry in top_entries]
+    def _calculate_priority_score(
+        self, entry: LogEntry, index: int, total: int, keyword_count: int = 0
+    ) -> float:
+        """Calculate priority score for a log entry.
 
-    def _calculate_priority_score(self, entry: LogEntry, index: int, total: int) -> float:
-        """Calculate priority score for a log entry."""
+        ``keyword_count`` is the number of distinct ``ERROR_KEYWORDS`` in
+        the message, as counted by ``_priority_scores``. That method applies
+        the same rules to whole batches and must be kept in sync.
+        """
         score = 0.0
 
         # Stderr (errors) get higher priority
@@ -243,11 +367,7 @@ class LogCompressor:
             score += 10.0
 
         # Keywords indicating errors/issues
-        lower_msg = entry.message.lower()
-        error_keywords = ["error", "exception", "fail", "timeout", "crash", "fatal"]
-        for keyword in error_keywords:
-            if keyword in lower_msg:
-                score += 5.0
+        score += 5.0 * keyword_count
 
         # Proximity to focus timestamp
         if self.focus_timestamp:
@@ -288,50 +408,107 @@ class LogCompressor:
         return result
 
     def _enforce_token_limit(self, result: CompressedLogs) -> CompressedLogs:
-        """Reduce logs further if they exceed token limit."""
-        if self.max_tokens is None:
+        """
+        Reduce logs further if they exceed token limit.
+
+        Each entry is measured once (characters, or tokens when a counter
+        is configured) and lines are selected in a single pass against the
+        budget: stderr before stdout, round-robin across containers so every
+        container keeps its most important lines. Kept entries stay in their
+        original order.
+        """
+        if self.max_tokens is None or result.total_lines <= MIN_TOKEN_LIMITED_LINES:
             return result
-        while result.estimated_tokens > self.max_tokens and result.total_lines > 10:
-            # Reduce each container by 20%
-            new_logs = {}
-            for name, container in result.logs.items():
-                keep = max(1, int(len(container.entries) * 0.8))
-                # Keep entries with highest priority (errors first, then edges)
-                entries = container.entries
-                stderr_entries = [e for e in entries if e.stream == "stderr"]
-                stdout_entries = [e for e in entries if e.stream == "stdout"]
-
-                # Prioritize stderr
-                kept = stderr_entries[:keep]
-                remaining = keep - len(kept)
-                if remaining > 0:
-                    kept.extend(stdout_entries[:remaining])
-
-                # Sort by timestamp
-                kept.sort(key=lambda e: e.timestamp)
-
-                new_logs[name] = ContainerLogs(container_name=name, entries=kept)
-
-            total_lines = sum(len(c.entries) for c in new_logs.values())
-            result = CompressedLogs(
-                logs=new_logs,
-                original_lines=result.original_lines,
-                total_lines=total_lines,
-                was_truncated=True,
-                filtered_patterns=result.filtered_patterns,
-                deduplicated_count=result.deduplicated_count,
-            )
 
-        return result
+        counter = self.token_counter
+        containers = list(result.logs.values())
+        costs = [[_line_cost(str(entry), counter) for entry in c.entries] for c in containers]
+
+        if counter is None:
+            # Largest text length whose estimate (length // 4) still fits
+            budget = self.max_tokens * 4 + 3
+        else:
+            budget = self.max_tokens
+        placeholder_cost = _line_cost(_NO_LOGS, counter)
+        # Headers and blank separators; the final newline of the join is absent
+        layout = sum(
+            _line_cost(_container_header(name), counter) + _line_cost("", counter)
+            for name in result.logs
+        )
+        layout -= 1
+
+        current = layout + sum(sum(c) if c else placeholder_cost for c in costs)
+        current += sum(_line_cost(line, counter) for line in result._summary_lines())
+        if current <= budget:
+            return result
+
+        # Start from empty containers plus the truncation note (sized for the
+        # current line count, an upper bound for the final one)
+        truncated_note = CompressedLogs(
+            logs={},
+            original_lines=result.original_lines,
+            total_lines=result.total_lines,
+            was_truncated=True,
+            deduplicated_count=result.deduplicated_count,
+        )
+        used = layout + placeholder_cost * len(containers)
+        used += sum(_line_cost(line, counter) for line in truncated_note._summary_lines())
+
+        # Per-container priority order: stderr first, then stdout
+        ranked: list[list[int]] = []
+        for container in containers:
+            stderr = [i for i, e in enumerate(container.entries) if e.stream == "stderr"]
+            stdout = [i for i, e in enumerate(container.entries) if e.stream != "stderr"]
+            ranked.append(stderr + stdout)
+
+        # Round-robin over ranks so every container keeps its top lines
+        keep = [[False] * len(c.entries) for c in containers]
+        kept_counts = [0] * len(containers)
+        kept_total = 0
+        for rank in range(max((len(order) for order in ranked), default=0)):
+            for c, order in enumerate(ranked):
+                if rank >= len(order):
+                    continue
+                index = order[rank]
+                cost = costs[c][index]
+                if kept_counts[c] == 0:
+                    # The first entry replaces the "(no logs)" placeholder
+                    cost -= placeholder_cost
+                if used + cost > budget and kept_total >= MIN_TOKEN_LIMITED_LINES:
+                    continue
+                used += cost
+                keep[c][index] = True
+                kept_counts[c] += 1
+                kept_total += 1
+
+        new_logs = {
+            name: ContainerLogs(
+                container_name=name,
+                entries=[e for e, kept in zip(container.entries, keep[c], strict=True) if kept],
+            )
+            for c, (name, container) in enumerate(result.logs.items())
+        }
+
+        return CompressedLogs(
+            logs=new_logs,
+            original_lines=result.original_lines,
+            total_lines=kept_total,
+            was_truncated=True,
+            filtered_patterns=result.filtered_patterns,
+            deduplicated_count=result.deduplicated_count,
+            token_counter=self.token_counter,
+        )
 
 
 def compress_logs_for_llm(
-    logs: dict[str, ContainerLogs],
+    logs: Mapping[str, ContainerLogs | CompactContainerLogs],
     max_tokens: int | None = None,
     max_lines: int = 200,
     focus_timestamp: datetime | None = None,
     deduplicate: bool = True,
     filter_noise: bool = True,
+    token_counter: TokenCounter | None = None,
+    mine_templates: bool = False,
 ) -> CompressedLogs:
     """
     Convenience function to compress logs for LLM analysis.
@@ -343,6 +520,8 @@ def compress_logs_for_llm(
         focus_timestamp: Prioritize logs around this timestamp.
         deduplicate: Remove repeated messages.
         filter_noise: Filter common noisy patterns.
+        token_counter: Optional provider-specific token counter.
+        mine_templates: Collapse near-duplicate lines into templates.
 
     Returns:
         CompressedLogs ready for LLM prompt.
@@ -353,5 +532,7 @@ def compress_logs_for_llm(
         focus_timestamp=focus_timestamp,
         deduplicate=deduplicate,
         filter_noise=filter_noise,
+        token_counter=token_counter,
+        mine_templates=mine_templates,
     )
     return compressor.compress(logs)
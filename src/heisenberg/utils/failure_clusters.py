@@ -0,0 +1,287 @@
+"""Failure signature clustering for deduplicating cascading failures.
+
+Many failures of a run often share one root cause: the same timeout at the
+same selector, or the same 500 from one endpoint across 40 tests. Their
+errors differ only in numbers, IDs, file paths and line/column positions.
+Error messages and stack traces are normalized to strip those (keeping URL
+paths, HTTP status codes and quoted selectors and values), and failures
+with identical normalized text share a signature. Failures whose text
+differs slightly (e.g. an extra stack frame) but quotes the same literals
+are matched with MinHash over token shingles and banded LSH: only pairs
+landing in the same bucket of some band are compared, so clustering stays
+near-linear in the number of distinct signatures.
+
+Reference: Broder, "On the resemblance and containment of documents"
+(1997); Leskovec et al., "Mining of Massive Datasets", ch. 3.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from heisenberg.core.models import UnifiedFailure
+
+# Stack frames included in a signature; deeper frames are mostly runner code
+SIGNATURE_STACK_FRAMES = 5
+# MinHash permutations, split into LSH bands of NUM_PERMUTATIONS / LSH_BANDS rows
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Estimated Jaccard similarity at which two signatures are merged
+DEFAULT_SIMILARITY_THRESHOLD = 0.7
+# Tokens per shingle (error texts are short, so pairs rather than triples)
+SHINGLE_SIZE = 2
+
+_Replacement = tuple[re.Pattern[str], str | Callable[[re.Match[str]], str]]
+
+# Volatile parts of error messages, in the order they are replaced
+_MESSAGE_PATTERNS: tuple[_Replacement, ...] = (
+    (
+        re.compile(
+            r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE
+        ),
+        "<id>",
+    ),
+    # URLs keep their path but not host or port; numeric path segments are IDs
+    (re.compile(r"https?://[^\s/'\"]+"), "<host>"),
+    (re.compile(r"(?<=/)\d+(?=[/?#\s'\"]|$)"), "<id>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b", re.IGNORECASE), "<id>"),
+    # Standalone 3-digit numbers are kept: a 401 and a 500 are different failures
+    (
+        re.compile(r"(?<![\w.])([1-5]\d\d)(?![\w.])|\d+(?:\.\d+)?"),
+        lambda match: match.group(1) or "<n>",
+    ),
+)
+# Stack frames additionally lose file paths with line/column positions
+_FRAME_PATTERNS: tuple[_Replacement, ...] = (
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\w.@-]*[/\\])+[\w.@-]+(?::\d+){0,2}"), "<path>"),
+    (re.compile(r"\b[\w-]+\.(?:[cm]?[jt]sx?|py|java|rb|go|cs)(?::\d+){0,2}\b"), "<path>"),
+    *_MESSAGE_PATTERNS,
+)
+# Quoted literals (selectors, expected and received values)
+_QUOTED = re.compile(r"'([^'\n]*)'|\"([^\"\n]*)\"|`([^`\n]*)`")
+_WHITESPACE = re.compile(r"\s+")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations() -> list[tuple[int, int]]:
+    """Fixed (a, b) parameters of the MinHash permutations."""
+    params = []
+    for i in range(NUM_PERMUTATIONS):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+
+_PERMUTATIONS = _permutations()
+
+
+@dataclass
+class FailureCluster:
+    """Failures sharing one (near-)identical error."""
+
+    # First failure of the cluster in run order, shown in prompts
+    representative: UnifiedFailure
+    # All failures of the cluster including the representative, in run order
+    members: list[UnifiedFailure] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """Number of failures in the cluster."""
+        return len(self.members)
+
+    @property
+    def others(self) -> list[UnifiedFailure]:
+        """Members other than the representative."""
+        return self.members[1:]
+
+
+def normalize_error(text: str) -> str:
+    """
+    Strip numbers, IDs and stack frame locations from error text.
+
+    URL paths and HTTP status codes are kept, only their numeric and ID
+    segments are replaced. File paths with line/column positions are
+    stripped from stack frame lines (``at ...``) only.
+
+    Args:
+        text: Error message or stack trace.
+
+    Returns:
+        Normalized text with collapsed whitespace.
+    """
+    lines = []
+    for line in text.split("\n"):
+        patterns = _FRAME_PATTERNS if line.strip().startswith("at ") else _MESSAGE_PATTERNS
+        for pattern, placeholder in patterns:
+            line = pattern.sub(placeholder, line)
+        lines.append(line)
+    return _WHITESPACE.sub(" ", "\n".join(lines)).strip()
+
+
+def quoted_literals(text: str) -> tuple[str, ...]:
+    """
+    Quoted literals of normalized error text.
+
+    Args:
+        text: Normalized text.
+
+    Returns:
+        Contents of single-, double- and backtick-quoted strings in order.
+    """
+    return tuple("".join(groups) for groups in _QUOTED.findall(text))
+
+
+def failure_text(failure: UnifiedFailure) -> str:
+    """
+    Normalized error message plus the top stack frames of a failure.
+
+    Args:
+        failure: Test failure.
+
+    Returns:
+        Text the failure's signature is computed from.
+    """
+    parts = [normalize_error(failure.error.message)]
+    if failure.error.stack_trace:
+        frames = [
+            line.strip()
+            for line in failure.error.stack_trace.split("\n")
+            if line.strip().startswith("at ")
+        ]
+        parts.extend(normalize_error(frame) for frame in frames[:SIGNATURE_STACK_FRAMES])
+    return "\n".join(parts)
+
+
+def failure_signature(failure: UnifiedFailure) -> str:
+    """
+    Exact signature of a failure's normalized error.
+
+    Args:
+        failure: Test failure.
+
+    Returns:
+        Hex digest shared by failures with identical normalized errors.
+    """
+    return _digest(failure_text(failure))
+
+
+def _digest(text: str) -> str:
+    """Hex digest of a normalized failure text."""
+    return hashlib.sha1(text.encode(), usedforsecurity=False).hexdigest()
+
+
+def minhash(text: str) -> list[int]:
+    """
+    Compute the MinHash signature of a text's token shingles.
+
+    Args:
+        text: Normalized text.
+
+    Returns:
+        NUM_PERMUTATIONS minimum hash values.
+    """
+    tokens = text.split()
+    if len(tokens) <= SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {
+            " ".join(tokens[i : i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        }
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(first: list[int], second: list[int]) -> float:
+    """
+    Estimate the Jaccard similarity of two texts from their MinHashes.
+
+    Args:
+        first: MinHash of the first text.
+        second: MinHash of the second text.
+
+    Returns:
+        Fraction of equal hash values.
+    """
+    return sum(x == y for x, y in zip(first, second, strict=True)) / len(first)
+
+
+def cluster_failures(
+    failures: list[UnifiedFailure],
+    similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+) -> list[FailureCluster]:
+    """
+    Cluster failures by exact and near-duplicate error signatures.
+
+    Args:
+        failures: Failures in run order.
+        similarity_threshold: Minimum estimated Jaccard similarity of two
+            distinct signatures with equal quoted literals to merge their
+            clusters (1.0 merges exact duplicates only).
+
+    Returns:
+        Clusters ordered by their first failure.
+    """
+    # Exact signatures first: most cascades normalize to identical text
+    texts = [failure_text(failure) for failure in failures]
+    keys = [_digest(text) for text in texts]
+    first_text: dict[str, str] = {}
+    for key, text in zip(keys, texts, strict=True):
+        first_text.setdefault(key, text)
+
+    signatures = list(first_text)
+    parent = list(range(len(signatures)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if similarity_threshold < 1.0 and len(signatures) > 1:
+        hashes = [minhash(first_text[signature]) for signature in signatures]
+        literals = [quoted_literals(first_text[signature]) for signature in signatures]
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        for band in range(LSH_BANDS):
+            buckets: dict[tuple[int, ...], list[int]] = {}
+            for index, values in enumerate(hashes):
+                key = tuple(values[band * rows : (band + 1) * rows])
+                buckets.setdefault(key, []).append(index)
+            for candidates in buckets.values():
+                for position, first in enumerate(candidates):
+                    for other in candidates[position + 1 :]:
+                        if find(first) == find(other):
+                            continue
+                        # Near duplicates must still name the same selector
+                        # and values; only the surrounding text may differ
+                        if literals[first] != literals[other]:
+                            continue
+                        if (
+                            estimate_similarity(hashes[first], hashes[other])
+                            >= similarity_threshold
+                        ):
+                            # The earlier signature stays the root
+                            low, high = sorted((find(first), find(other)))
+                            parent[high] = low
+
+    # Root signature index -> cluster; iterating failures keeps run order
+    clusters: dict[int, FailureCluster] = {}
+    index_of = {signature: index for index, signature in enumerate(signatures)}
+    for failure, key in zip(failures, keys, strict=True):
+        root = find(index_of[key])
+        cluster = clusters.get(root)
+        if cluster is None:
+            cluster = clusters[root] = FailureCluster(representative=failure)
+        cluster.members.append(failure)
+    return list(clusters.values())
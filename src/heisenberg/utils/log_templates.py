@@ -0,0 +1,188 @@
+"""Online log template mining (Drain) for collapsing near-duplicate lines.
+
+Exact deduplication misses most repetition in service logs because lines
+differ in request IDs, durations and timestamps. Drain clusters lines into
+templates such as ``GET /users/<*> 200 in <*>`` with a fixed-depth parse
+tree: lines are routed by token count, then by their first few tokens, and
+compared only with the handful of clusters in that leaf. Each line is
+processed once, so mining is linear in the number of lines.
+
+Reference: He et al., "Drain: An Online Log Parsing Approach with Fixed
+Depth Tree" (ICWS 2017).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from heisenberg.integrations.docker import LogEntry
+
+WILDCARD = "<*>"
+
+
+@dataclass
+class LogCluster:
+    """A log template and the lines assigned to it."""
+
+    tokens: list[str]
+    count: int = 1
+    # Sample values per wildcard position, in first-seen order
+    samples: dict[int, list[str]] = field(default_factory=dict)
+
+    @property
+    def template(self) -> str:
+        """Template text with ``<*>`` in parameter slots."""
+        return " ".join(self.tokens)
+
+    def format(self) -> str:
+        """Format template with its count and sample parameter values."""
+        if self.count == 1:
+            return self.template
+        values = " | ".join(", ".join(self.samples[position]) for position in sorted(self.samples))
+        suffix = f"; values: {values}" if values else ""
+        return f"{self.template} (repeated {self.count}x{suffix})"
+
+
+@dataclass
+class _Node:
+    """Inner node of the parse tree."""
+
+    children: dict[str, _Node] = field(default_factory=dict)
+    clusters: list[LogCluster] = field(default_factory=list)
+
+
+class LogTemplateMiner:
+    """Drain-style online template miner."""
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity_threshold: float = 0.5,
+        max_children: int = 100,
+        max_samples: int = 3,
+    ):
+        """
+        Initialize miner.
+
+        Args:
+            depth: Tree depth including the root and length levels; lines are
+                routed by their first ``depth - 2`` tokens.
+            similarity_threshold: Minimum fraction of equal tokens for a line
+                to join an existing cluster.
+            max_children: Maximum children per node before new tokens are
+                routed to a shared wildcard child.
+            max_samples: Sample values kept per parameter slot.
+        """
+        self.depth = max(depth, 3)
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_samples = max_samples
+        self.clusters: list[LogCluster] = []
+        self._root = _Node()
+
+    def add(self, message: str) -> LogCluster:
+        """
+        Assign a line to a cluster, creating or generalizing templates.
+
+        Args:
+            message: Log message.
+
+        Returns:
+            The cluster the line was assigned to.
+        """
+        tokens = message.split()
+        leaf = self._route(tokens)
+        cluster = self._best_match(leaf.clusters, tokens)
+        if cluster is None:
+            cluster = LogCluster(tokens=tokens)
+            leaf.clusters.append(cluster)
+            self.clusters.append(cluster)
+            return cluster
+
+        self._merge(cluster, tokens)
+        return cluster
+
+    def _route(self, tokens: list[str]) -> _Node:
+        """Walk (and grow) the tree to the leaf for a token sequence."""
+        node = self._root.children.setdefault(str(len(tokens)), _Node())
+        for token in tokens[: self.depth - 2]:
+            # Tokens with digits are almost always parameters
+            key = WILDCARD if any(c.isdigit() for c in token) else token
+            child = node.children.get(key)
+            if child is None:
+                if len(node.children) >= self.max_children:
+                    key = WILDCARD
+                child = node.children.setdefault(key, _Node())
+            node = child
+        return node
+
+    def _best_match(self, clusters: list[LogCluster], tokens: list[str]) -> LogCluster | None:
+        """Find the most similar cluster above the threshold."""
+        best: LogCluster | None = None
+        best_key = (-1.0, -1)
+        for cluster in clusters:
+            equal = wildcards = 0
+            for template_token, token in zip(cluster.tokens, tokens, strict=True):
+                if template_token == WILDCARD:
+                    wildcards += 1
+                elif template_token == token:
+                    equal += 1
+            similarity = equal / len(tokens) if tokens else 1.0
+            # Ties prefer the more specific template
+            key = (similarity, -wildcards)
+            if key > best_key:
+                best, best_key = cluster, key
+        if best is None or best_key[0] < self.similarity_threshold:
+            return None
+        return best
+
+    def _merge(self, cluster: LogCluster, tokens: list[str]) -> None:
+        """Generalize a cluster's template with a new line."""
+        cluster.count += 1
+        for position, (template_token, token) in enumerate(
+            zip(cluster.tokens, tokens, strict=True)
+        ):
+            if template_token != WILDCARD and template_token != token:
+                cluster.tokens[position] = WILDCARD
+                cluster.samples[position] = [template_token]
+            if cluster.tokens[position] == WILDCARD:
+                values = cluster.samples.setdefault(position, [])
+                if len(values) < self.max_samples and token not in values:
+                    values.append(token)
+
+
+def collapse_entries(entries: Sequence[LogEntry]) -> tuple[list[LogEntry], int]:
+    """
+    Collapse log entries into one entry per template.
+
+    stdout and stderr are mined separately. Each template is shown once, at
+    the position and timestamp of its first line, with its repeat count and
+    sample parameter values. Templates seen once keep their original text.
+
+    Args:
+        entries: Log entries in order.
+
+    Returns:
+        Tuple of (collapsed entries, number of entries folded into templates).
+    """
+    miners: dict[str, LogTemplateMiner] = {}
+    firsts: dict[int, tuple[LogEntry, LogCluster]] = {}
+
+    for entry in entries:
+        miner = miners.get(entry.stream)
+        if miner is None:
+            miner = miners[entry.stream] = LogTemplateMiner()
+        cluster = miner.add(entry.message)
+        if cluster.count == 1:
+            firsts[id(cluster)] = (entry, cluster)
+
+    collapsed: list[LogEntry] = []
+    for entry, cluster in firsts.values():
+        if cluster.count == 1:
+            collapsed.append(entry)
+        else:
+            collapsed.append(
+                LogEntry(timestamp=entry.timestamp, message=cluster.format(), stream=entry.stream)
+            )
+    return collapsed, len(entries) - len(collapsed)
@@ -0,0 +1,202 @@
+"""Single-pass multi-pattern matching for log classification.
+
+Noise filtering, priority scoring and job-log error detection each check
+every line against a list of patterns. Running one regex (or substring
+scan) per pattern makes the cost proportional to lines x patterns, and
+most log lines match nothing. ``MultiPatternMatcher`` compiles all patterns
+into one alternation so a non-matching line costs a single scan, and only
+lines that do match are inspected further to report every matched pattern.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from functools import lru_cache
+
+# Escapes (\\S, \\W, ...) and named-group syntax may be uppercase without
+# being literals
+_REGEX_SYNTAX = re.compile(r"\\.|\(\?P[<=]")
+
+
+class MultiPatternMatcher:
+    """Classifies text against many named patterns in one pass.
+
+    All patterns are combined into one group-free alternation that acts as a
+    prefilter: a line that matches nothing costs a single scan. Only lines
+    that hit are checked pattern by pattern, so results are identical to
+    searching each pattern separately.
+
+    Case-insensitive matchers lowercase the text once instead of compiling
+    with ``re.IGNORECASE``, which keeps the regex engine's fast literal and
+    charset scanning. This applies when the patterns contain no uppercase
+    literals; otherwise ``re.IGNORECASE`` is used as given.
+
+    Patterns must not use numbered backreferences, since group numbers
+    change once they are combined.
+    """
+
+    def __init__(self, patterns: Mapping[str, str], flags: int = 0):
+        """
+        Initialize matcher.
+
+        Args:
+            patterns: Mapping of category name to regex, in priority order.
+            flags: Regex flags applied to every pattern (e.g. re.IGNORECASE).
+        """
+        self.categories: tuple[str, ...] = tuple(patterns)
+        sources = list(patterns.values())
+
+        self._lowercase = bool(flags & re.IGNORECASE) and not any(
+            _has_uppercase_literal(source) for source in sources
+        )
+        if self._lowercase:
+            flags &= ~re.IGNORECASE
+
+        self._patterns = [re.compile(source, flags) for source in sources]
+        # Anchored patterns would stop the engine from skipping ahead to
+        # candidate positions, so they get their own alternation that is
+        # only tried at the start of the text
+        floating = list(dict.fromkeys(s for s in sources if not s.startswith("^")))
+        anchored = list(dict.fromkeys(s for s in sources if s.startswith("^")))
+        self._search = _alternation(floating, flags).search if floating else None
+        self._match = _alternation(anchored, flags).match if anchored else None
+
+    def _candidates(self, lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+        """Yield (index, normalized line) for lines the prefilter accepts."""
+        search, match, lowercase = self._search, self._match, self._lowercase
+        for index, line in enumerate(lines):
+            text = line.lower() if lowercase else line
+            if (search is not None and search(text)) or (match is not None and match(text)):
+                yield index, text
+
+    @classmethod
+    def from_keywords(
+        cls, keywords: Sequence[str], flags: int = re.IGNORECASE
+    ) -> MultiPatternMatcher:
+        """
+        Build a matcher for literal keywords (case-insensitive by default).
+
+        Args:
+            keywords: Keywords in priority order; each is its own category.
+            flags: Regex flags.
+
+        Returns:
+            Matcher whose categories are the keywords themselves.
+        """
+        if flags & re.IGNORECASE:
+            return cls({k: re.escape(k.lower()) for k in keywords}, flags)
+        return cls({k: re.escape(k) for k in keywords}, flags)
+
+    def matches(self, text: str) -> list[str]:
+        """
+        Return every category whose pattern occurs in text.
+
+        Args:
+            text: Text to classify (typically a single log line).
+
+        Returns:
+            Matched categories in priority order (empty if none match).
+        """
+        for _, matched in self.iter_matches((text,)):
+            return matched
+        return []
+
+    def first_match(self, text: str) -> str | None:
+        """
+        Return the highest-priority category matching text.
+
+        Args:
+            text: Text to classify.
+
+        Returns:
+            First matched category in priority order, or None.
+        """
+        for _, category in self.iter_first_matches((text,)):
+            return category
+        return None
+
+    def iter_matches(self, lines: Iterable[str]) -> Iterator[tuple[int, list[str]]]:
+        """
+        Classify many lines, skipping those that match nothing.
+
+        Args:
+            lines: Lines to classify.
+
+        Yields:
+            (line index, matched categories in priority order).
+        """
+        patterns = list(zip(self.categories, self._patterns, strict=True))
+        for index, text in self._candidates(lines):
+            matched = [category for category, pattern in patterns if pattern.search(text)]
+            if matched:
+                yield index, matched
+
+    def iter_first_matches(self, lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+        """
+        Find the highest-priority category of each matching line.
+
+        Args:
+            lines: Lines to classify.
+
+        Yields:
+            (line index, first matched category in priority order).
+        """
+        patterns = list(zip(self.categories, self._patterns, strict=True))
+        for index, text in self._candidates(lines):
+            for category, pattern in patterns:
+                if pattern.search(text):
+                    yield index, category
+                    break
+
+    def label_lines(self, lines: Iterable[str]) -> Iterator[tuple[str, str | None]]:
+        """
+        Pair every line with its highest-priority category.
+
+        Unlike ``iter_first_matches``, non-matching lines are yielded too, so
+        one-shot streams can be classified without keeping the lines.
+
+        Args:
+            lines: Lines to classify (any iterable, consumed once).
+
+        Yields:
+            (line, first matched category or None).
+        """
+        search, match, lowercase = self._search, self._match, self._lowercase
+        patterns = list(zip(self.categories, self._patterns, strict=True))
+        for line in lines:
+            text = line.lower() if lowercase else line
+            category = None
+            if (search is not None and search(text)) or (match is not None and match(text)):
+                category = next((c for c, pattern in patterns if pattern.search(text)), None)
+            yield line, category
+
+    def search(self, text: str) -> bool:
+        """Return True if any pattern occurs in text."""
+        for _ in self._candidates((text,)):
+            return True
+        return False
+
+
+def _alternation(sources: list[str], flags: int) -> re.Pattern[str]:
+    """Compile patterns into one alternation without capturing groups."""
+    return re.compile("|".join(f"(?:{source})" for source in sources), flags)
+
+
+def _has_uppercase_literal(source: str) -> bool:
+    """Check whether a regex contains uppercase characters outside escapes."""
+    return any(c.isupper() for c in _REGEX_SYNTAX.sub("", source))
+
+
+@lru_cache(maxsize=32)
+def keyword_matcher(keywords: tuple[str, ...]) -> MultiPatternMatcher:
+    """
+    Get a shared case-insensitive matcher for a keyword list.
+
+    Args:
+        keywords: Keywords in priority order (as a tuple, for caching).
+
+    Returns:
+        Compiled matcher reused across calls with the same keywords.
+    """
+    return MultiPatternMatcher.from_keywords(keywords)
@@ -0,0 +1,129 @@
+"""Tests for confidence-driven model escalation."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from heisenberg.analysis.ai_analyzer import analyze_unified_run
+from heisenberg.analysis.escalation import escalation_reason
+from heisenberg.core.diagnosis import parse_diagnosis
+from heisenberg.llm.config import PROVIDER_CONFIGS
+from heisenberg.llm.providers.base import LLMProvider
+from tests.factories import (
+    SAMPLE_AI_RESPONSE,
+    make_llm_analysis,
+    make_unified_failure,
+    make_unified_run,
+)
+
+LOW_RESPONSE = SAMPLE_AI_RESPONSE.replace("HIGH (>80%)", "LOW (<50%)")
+FAST_MODEL = PROVIDER_CONFIGS["anthropic"].fast_model
+DEFAULT_MODEL = PROVIDER_CONFIGS["anthropic"].default_model
+
+
+class _ModelClients:
+    """Fake _get_llm_client_for_provider answering with one response per model."""
+
+    def __init__(self, responses: dict[str | None, str]):
+        self.responses = responses
+        self.models: list[str | None] = []
+
+    def __call__(self, provider, api_key=None, model=None, response_cache=None):
+        self.models.append(model)
+        llm = MagicMock(spec=LLMProvider)
+        llm.analyze.return_value = make_llm_analysis(
+            content=self.responses[model],
+            input_tokens=1000,
+            output_tokens=200,
+            model=model or DEFAULT_MODEL,
+        )
+        return llm
+
+
+def _analyze(clients: _ModelClients, **kwargs):
+    run = make_unified_run(failures=[make_unified_failure()], failed_tests=1)
+    with patch("heisenberg.analysis.ai_analyzer._get_llm_client_for_provider", side_effect=clients):
+        return analyze_unified_run(run, provider="anthropic", escalate=True, **kwargs)
+
+
+class TestEscalationReason:
+    """Test suite for deciding whether to escalate."""
+
+    def test_confident_complete_diagnosis_is_kept(self):
+        """A HIGH-confidence diagnosis with every section needs no escalation."""
+        assert escalation_reason(parse_diagnosis(SAMPLE_AI_RESPONSE)) is None
+
+    @pytest.mark.parametrize(
+        ("response", "reason"),
+        [
+            (LOW_RESPONSE, "confidence LOW"),
+            (SAMPLE_AI_RESPONSE.replace("HIGH (>80%)", "unsure"), "confidence UNKNOWN"),
+            ("The database timed out. Increase the pool size.", "missing sections: root_cause"),
+        ],
+    )
+    def test_unusable_diagnosis_escalates(self, response, reason):
+        """Low confidence and malformed responses should escalate."""
+        assert escalation_reason(parse_diagnosis(response)).startswith(reason)
+
+
+class TestAnalyzeWithEscalation:
+    """Test suite for escalating analyses to the default model."""
+
+    def test_confident_fast_answer_is_final(self):
+        """The default model should not be called when the fast model is confident."""
+        # Given
+        clients = _ModelClients({FAST_MODEL: SAMPLE_AI_RESPONSE})
+
+        # When
+        result = _analyze(clients)
+
+        # Then
+        assert clients.models == [FAST_MODEL]
+        assert result.model == FAST_MODEL
+        assert result.first_pass is None
+
+    def test_low_confidence_reruns_with_default_model(self):
+        """A LOW fast diagnosis should be replaced by the default model's."""
+        # Given
+        clients = _ModelClients({FAST_MODEL: LOW_RESPONSE, None: SAMPLE_AI_RESPONSE})
+
+        # When
+        result = _analyze(clients)
+
+        # Then
+        assert clients.models == [FAST_MODEL, None]
+        assert result.model == DEFAULT_MODEL
+        assert result.first_pass.model == FAST_MODEL
+        assert result.total_tokens == 2 * 1200
+        assert result.estimated_cost > result.first_pass.estimated_cost > 0
+        assert f"Escalated from {FAST_MODEL}" in result.to_markdown()
+
+    def test_accepted_fast_sections_are_reported(self):
+        """Streaming callers should still receive every section once."""
+        # Given
+        clients = _ModelClients({FAST_MODEL: SAMPLE_AI_RESPONSE})
+        sections = []
+
+        # When
+        _analyze(clients, on_section=sections.append)
+
+        # Then
+        assert [s.name for s in sections] == [
+            "root_cause",
+            "evidence",
+            "suggested_fix",
+            "confidence",
+        ]
+
+    def test_explicit_model_is_not_escalated(self):
+        """A model chosen by the caller should be used as is."""
+        # Given
+        clients = _ModelClients({"claude-3-opus-20240229": LOW_RESPONSE})
+
+        # When
+        _analyze(clients, model="claude-3-opus-20240229")
+
+        # Then
+        assert clients.models == ["claude-3-opus-20240229"]
@@ -0,0 +1,231 @@
+"""Tests for map-reduce analysis of runs with many failures."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from heisenberg.analysis.ai_analyzer import analyze_unified_run
+from heisenberg.analysis.map_reduce import analyze_in_groups, group_failures
+from heisenberg.core.diagnosis import ConfidenceLevel
+from heisenberg.llm.providers.base import LLMProvider
+from tests.factories import (
+    SAMPLE_AI_RESPONSE,
+    make_llm_analysis,
+    make_unified_failure,
+    make_unified_run,
+)
+
+
+def _failures(count: int, message: str | None = None, prefix: str = "t") -> list:
+    """Failures with the given error, or each with a distinct error if None."""
+    failures = []
+    for i in range(count):
+        # Numbers are normalized away, so distinct errors differ in letters
+        name = "".join(chr(ord("a") + int(digit)) for digit in f"{i:03d}") + prefix
+        error = message or f"Selector {name} broke on page {name}"
+        failures.append(
+            make_unified_failure(
+                test_id=f"{prefix}{i}", test_title=f"{prefix} {i}", error_message=error
+            )
+        )
+    return failures
+
+
+class _GroupProvider:
+    """Provider tracking how many group prompts are in flight."""
+
+    name = "anthropic"
+
+    def __init__(self, fail_when: str | None = None):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.group_prompts: list[str] = []
+        self.merge_prompts: list[str] = []
+        self.fail_when = fail_when
+
+    async def analyze_async(self, user_prompt, system_prompt=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            self.group_prompts.append(user_prompt)
+            if self.fail_when is not None and self.fail_when in user_prompt:
+                raise RuntimeError("group failed")
+            return make_llm_analysis(content=SAMPLE_AI_RESPONSE, input_tokens=1000)
+        finally:
+            self.in_flight -= 1
+
+    def analyze(self, user_prompt, system_prompt=None):
+        self.merge_prompts.append(user_prompt)
+        return make_llm_analysis(content=SAMPLE_AI_RESPONSE, input_tokens=300)
+
+
+class TestGroupFailures:
+    """Test suite for packing failure clusters into groups."""
+
+    def test_keeps_same_errors_together(self):
+        """Failures with the same error should share a group."""
+        # Given
+        failures = [
+            *_failures(3, "Timeout 30000ms exceeded", "a"),
+            *_failures(3, "Element not found: #login", "b"),
+        ]
+        failures.insert(1, failures.pop())
+
+        # When
+        groups = group_failures(failures, max_group_size=1)
+
+        # Then
+        assert [[f.test_id for f in group] for group in groups] == [
+            ["a0", "a1", "a2"],
+            ["b2", "b0", "b1"],
+        ]
+
+    def test_packs_clusters_up_to_group_size(self):
+        """Distinct errors should be packed max_group_size clusters per group."""
+        groups = group_failures(_failures(25), max_group_size=10)
+
+        assert [len(group) for group in groups] == [10, 10, 5]
+
+
+class TestAnalyzeInGroups:
+    """Test suite for the map and reduce calls."""
+
+    def test_groups_run_concurrently_and_merge(self):
+        """Groups should be analyzed in parallel and merged by one call."""
+        # Given
+        provider = _GroupProvider()
+        run = make_unified_run(failures=_failures(30), failed_tests=30, total_tests=30)
+
+        # When
+        result = analyze_in_groups(
+            run, provider, provider="anthropic", max_group_size=5, max_concurrency=2
+        )
+
+        # Then
+        assert len(provider.group_prompts) == 6
+        assert provider.max_in_flight == 2
+        assert len(provider.merge_prompts) == 1
+        assert "## Group 6: 5 failed tests" in provider.merge_prompts[0]
+        assert result.input_tokens == 6 * 1000 + 300
+        assert result.diagnosis.confidence == ConfidenceLevel.HIGH
+
+    def test_shared_context_is_sent_once_with_reduce(self):
+        """Logs and screenshots should reach the reduce prompt, not every group."""
+        # Given
+        provider = _GroupProvider()
+        run = make_unified_run(failures=_failures(30), failed_tests=30, total_tests=30)
+
+        # When
+        result = analyze_in_groups(
+            run,
+            provider,
+            provider="anthropic",
+            job_logs_context="## Job Logs\nERROR connection refused",
+            screenshot_context="## Screenshots\nBlank login page",
+            max_group_size=5,
+        )
+
+        # Then
+        assert not any("connection refused" in prompt for prompt in provider.group_prompts)
+        assert "connection refused" in provider.merge_prompts[0]
+        assert "Blank login page" in provider.merge_prompts[0]
+        assert result.groups == 6
+        assert "Map-reduce over 6 groups" in result.to_markdown()
+
+    def test_failed_group_is_reported_to_reduce(self):
+        """A failing group should not fail the whole analysis."""
+        # Given
+        provider = _GroupProvider(fail_when="Element not found")
+        failures = [*_failures(2, "Timeout", "a"), *_failures(2, "Element not found", "b")]
+        run = make_unified_run(failures=failures, failed_tests=4)
+
+        # When
+        analyze_in_groups(run, provider, provider="anthropic", max_group_size=1)
+
+        # Then
+        assert "*Analysis of this group failed.*" in provider.merge_prompts[0]
+
+    def test_all_groups_failing_raises(self):
+        """With no group diagnosis there is nothing to merge."""
+        # Given
+        provider = _GroupProvider(fail_when="Test Failure Analysis")
+        run = make_unified_run(failures=_failures(4), failed_tests=4)
+
+        # Then
+        with pytest.raises(RuntimeError, match="group failed"):
+            analyze_in_groups(run, provider, provider="anthropic", max_group_size=2)
+        assert provider.merge_prompts == []
+
+    @pytest.mark.asyncio
+    async def test_works_inside_running_event_loop(self):
+        """The sync API should also work when called from async code."""
+        # Given
+        provider = _GroupProvider()
+        run = make_unified_run(failures=_failures(4), failed_tests=4)
+
+        # When
+        result = analyze_in_groups(run, provider, provider="anthropic", max_group_size=2)
+
+        # Then
+        assert len(provider.group_prompts) == 2
+        assert result.diagnosis.root_cause
+
+
+class TestAutomaticMapReduce:
+    """Test suite for choosing map-reduce in analyze_unified_run."""
+
+    def test_large_runs_use_map_reduce(self):
+        """Runs with many distinct errors should be analyzed in groups."""
+        # Given
+        provider = _GroupProvider()
+        run = make_unified_run(failures=_failures(21), failed_tests=21)
+
+        # When
+        with patch(
+            "heisenberg.analysis.ai_analyzer._get_llm_client_for_provider",
+            return_value=provider,
+        ):
+            analyze_unified_run(run, provider="anthropic")
+
+        # Then
+        assert len(provider.group_prompts) == 3
+        assert len(provider.merge_prompts) == 1
+
+    @pytest.mark.parametrize("failures", [_failures(20), _failures(150, "Timeout 30000ms")])
+    def test_few_distinct_errors_use_one_prompt(self, failures):
+        """Runs with few failure clusters should keep the single prompt."""
+        # Given
+        llm = MagicMock(spec=LLMProvider)
+        llm.analyze.return_value = make_llm_analysis(content=SAMPLE_AI_RESPONSE)
+        run = make_unified_run(failures=failures, failed_tests=len(failures))
+
+        # When
+        with patch(
+            "heisenberg.analysis.ai_analyzer._get_llm_client_for_provider", return_value=llm
+        ):
+            analyze_unified_run(run, provider="anthropic")
+
+        # Then
+        llm.analyze.assert_called_once()
+        llm.analyze_async.assert_not_called()
+
+    def test_map_reduce_can_be_disabled(self):
+        """map_reduce=False should keep one prompt for a large run."""
+        # Given
+        llm = MagicMock(spec=LLMProvider)
+        llm.analyze.return_value = make_llm_analysis(content=SAMPLE_AI_RESPONSE)
+        run = make_unified_run(failures=_failures(21), failed_tests=21)
+
+        # When
+        with patch(
+            "heisenberg.analysis.ai_analyzer._get_llm_client_for_provider", return_value=llm
+        ):
+            result = analyze_unified_run(run, provider="anthropic", map_reduce=False)
+
+        # Then
+        llm.analyze.assert_called_once()
+        assert result.groups == 0
@@ -4,7 +4,7 @@ import argparse
 import asyncio
 import json
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -485,6 +485,21 @@ class TestLoadContainerLogs:
 class TestRunAIAnalysis:
     """Test suite for _run_ai_analysis helper."""
 
+    def test_map_reduce_flag_is_passed(self):
+        """--no-map-reduce should reach the analysis; the default is automatic."""
+        from heisenberg.cli.parsers import create_parser
+
+        parser = create_parser()
+        assert parser.parse_args(["analyze", "-r", "r.json"]).map_reduce is None
+        args = parser.parse_args(["analyze", "-r", "r.json", "--ai-analysis", "--no-map-reduce"])
+        result_mock = MagicMock()
+        result_mock.has_failures = True
+
+        with patch("heisenberg.cli.commands.analyze_with_ai") as analyze:
+            _run_ai_analysis(args, result_mock, None)
+
+        assert analyze.call_args.kwargs["map_reduce"] is False
+
     def test_returns_none_when_ai_analysis_disabled(self):
         """Should return None when ai_analysis is False."""
         args = MagicMock()
@@ -677,12 +677,37 @@ class TestFetchAndProcessJobLogs:
 
             assert result is None
 
+    @pytest.fixture
+    def archive_unavailable(self):
+        """Client whose run-level log archive cannot be fetched (gh fallback)."""
+        from heisenberg.integrations.github_artifacts import GitHubAPIError
+
+        with patch(
+            "heisenberg.integrations.github_artifacts.GitHubArtifactClient"
+        ) as mock_client_cls:
+            mock_client = MagicMock()
+            mock_client.get_workflow_jobs = AsyncMock(side_effect=GitHubAPIError("Not found", 404))
+            mock_client_cls.return_value = mock_client
+            yield mock_client
+
+    @staticmethod
+    def _run_logs_zip(files: dict[str, str]) -> bytes:
+        import io
+        import zipfile
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for name, content in files.items():
+                zf.writestr(name, content)
+        return buffer.getvalue()
+
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("archive_unavailable")
     async def test_returns_none_when_fetcher_returns_empty(self):
         """Should return None when no logs found."""
         with patch("heisenberg.integrations.github_logs.GitHubLogsFetcher") as mock_fetcher_cls:
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_logs_for_run.return_value = {}
+            mock_fetcher.get_failed_jobs.return_value = []
             mock_fetcher_cls.return_value = mock_fetcher
 
             result = await fetch_and_process_job_logs("token", "owner", "repo", 123)
@@ -690,6 +715,7 @@ class TestFetchAndProcessJobLogs:
             assert result is None
 
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("archive_unavailable")
     async def test_returns_formatted_snippets(self, capsys):
         """Should return formatted log snippets."""
         with (
@@ -697,11 +723,12 @@ class TestFetchAndProcessJobLogs:
             patch("heisenberg.parsers.job_logs.JobLogsProcessor") as mock_processor_cls,
         ):
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_logs_for_run.return_value = {"job1": "log content"}
+            mock_fetcher.get_failed_jobs.return_value = [{"id": 1, "name": "job1"}]
+            mock_fetcher.stream_job_logs.return_value = (line for line in ["log content"])
             mock_fetcher_cls.return_value = mock_fetcher
 
             mock_processor = MagicMock()
-            mock_processor.extract_snippets.return_value = ["snippet1", "snippet2"]
+            mock_processor.iter_snippets.return_value = iter(["snippet1", "snippet2"])
             mock_processor.format_for_prompt.return_value = "formatted logs"
             mock_processor_cls.return_value = mock_processor
 
@@ -712,6 +739,7 @@ class TestFetchAndProcessJobLogs:
             assert "2 relevant log snippet" in captured.err
 
     @pytest.mark.asyncio
+    @pytest.mark.usefixtures("archive_unavailable")
     async def test_returns_none_when_no_snippets_extracted(self, capsys):
         """Should return None when no error snippets found."""
         with (
@@ -719,11 +747,12 @@ class TestFetchAndProcessJobLogs:
             patch("heisenberg.parsers.job_logs.JobLogsProcessor") as mock_processor_cls,
         ):
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_logs_for_run.return_value = {"job1": "log content"}
+            mock_fetcher.get_failed_jobs.return_value = [{"id": 1, "name": "job1"}]
+            mock_fetcher.stream_job_logs.return_value = (line for line in ["log content"])
             mock_fetcher_cls.return_value = mock_fetcher
 
             mock_processor = MagicMock()
-            mock_processor.extract_snippets.return_value = []
+            mock_processor.iter_snippets.return_value = iter([])
             mock_processor_cls.return_value = mock_processor
 
             result = await fetch_and_process_job_logs("token", "owner", "repo", 123)
@@ -732,6 +761,128 @@ class TestFetchAndProcessJobLogs:
             captured = capsys.readouterr()
             assert "No error snippets" in captured.err
 
+    @pytest.mark.asyncio
+    async def test_reads_failed_steps_from_run_archive(self):
+        """Failed steps should be scanned straight from the run log archive."""
+        # Given
+        jobs = [
+            {
+                "id": 1,
+                "name": "e2e",
+                "conclusion": "failure",
+                "steps": [
+                    {"name": "Install", "number": 1, "conclusion": "success"},
+                    {"name": "Run tests", "number": 2, "conclusion": "failure"},
+                ],
+            },
+            {"id": 2, "name": "lint", "conclusion": "success", "steps": []},
+        ]
+        archive = self._run_logs_zip(
+            {
+                "0_e2e.txt": "install error: ignored\nError: checkout flow failed\n",
+                "e2e/1_Install.txt": "npm error: ignored\n",
+                "e2e/2_Run tests.txt": "Error: checkout flow failed\n",
+                "1_lint.txt": "lint error: ignored\n",
+            }
+        )
+
+        with (
+            patch(
+                "heisenberg.integrations.github_artifacts.GitHubArtifactClient"
+            ) as mock_client_cls,
+            patch("heisenberg.integrations.github_logs.GitHubLogsFetcher") as mock_fetcher_cls,
+        ):
+            mock_client = MagicMock()
+            mock_client.get_workflow_jobs = AsyncMock(return_value=jobs)
+            mock_client.download_run_logs = AsyncMock(return_value=archive)
+            mock_client_cls.return_value = mock_client
+
+            # When
+            result = await fetch_and_process_job_logs("token", "owner", "repo", 123)
+
+        # Then
+        assert result is not None
+        assert "checkout flow failed" in result
+        assert "ignored" not in result
+        mock_client.download_run_logs.assert_awaited_once_with("owner", "repo", 123)
+        mock_fetcher_cls.return_value.stream_job_logs.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_streams_jobs_missing_from_archive_concurrently(self):
+        """Jobs not in the archive should be downloaded in parallel over HTTP."""
+        # Given: every log stream waits until all of them have started
+        jobs = [
+            {"id": i, "name": f"e2e ({i})", "conclusion": "failure", "steps": []} for i in range(3)
+        ]
+        started: list[int] = []
+        all_started = asyncio.Event()
+
+        async def stream_job_logs(owner, repo, job_id):
+            started.append(job_id)
+            if len(started) == len(jobs):
+                all_started.set()
+            await asyncio.wait_for(all_started.wait(), timeout=1)
+            yield f"[error] job {job_id} failed"
+
+        with (
+            patch(
+                "heisenberg.integrations.github_artifacts.GitHubArtifactClient"
+            ) as mock_client_cls,
+            patch("heisenberg.integrations.github_logs.GitHubLogsFetcher") as mock_fetcher_cls,
+        ):
+            mock_client = MagicMock()
+            mock_client.get_workflow_jobs = AsyncMock(return_value=jobs)
+            mock_client.download_run_logs = AsyncMock(
+                return_value=self._run_logs_zip({"0_other.txt": ""})
+            )
+            mock_client.stream_job_logs = stream_job_logs
+            mock_client_cls.return_value = mock_client
+
+            # When
+            result = await fetch_and_process_job_logs("token", "owner", "repo", 123)
+
+        # Then: snippets keep the job order
+        assert result is not None
+        assert (
+            result.index("job 0 failed")
+            < result.index("job 1 failed")
+            < result.index("job 2 failed")
+        )
+        mock_fetcher_cls.return_value.stream_job_logs.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_download_is_skipped(self, capsys):
+        """A job whose log cannot be downloaded should not fail the others."""
+        from heisenberg.integrations.github_artifacts import GitHubAPIError
+
+        # Given
+        jobs = [
+            {"id": 1, "name": "gone", "conclusion": "failure", "steps": []},
+            {"id": 2, "name": "e2e", "conclusion": "failure", "steps": []},
+        ]
+
+        async def stream_job_logs(owner, repo, job_id):
+            if job_id == 1:
+                raise GitHubAPIError("Download failed: 410", status_code=410)
+            yield "[error] checkout failed"
+
+        with patch(
+            "heisenberg.integrations.github_artifacts.GitHubArtifactClient"
+        ) as mock_client_cls:
+            mock_client = MagicMock()
+            mock_client.get_workflow_jobs = AsyncMock(return_value=jobs)
+            mock_client.download_run_logs = AsyncMock(side_effect=GitHubAPIError("Gone", 410))
+            mock_client.stream_job_logs = stream_job_logs
+            mock_client_cls.return_value = mock_client
+
+            # When
+            result = await fetch_and_process_job_logs("token", "owner", "repo", 123)
+
+        # Then
+        assert result is not None
+        assert "checkout failed" in result
+        assert "Could not fetch logs for job gone" in capsys.readouterr().err
+
 
 class TestFetchAndAnalyzeScreenshots:
     """Tests for fetch_and_analyze_screenshots function."""
@@ -753,8 +904,8 @@ class TestFetchAndAnalyzeScreenshots:
             mock_client_cls.return_value = mock_client
 
             with patch(
-                "heisenberg.llm.vision.extract_screenshots_from_artifact",
-                return_value=[],
+                "heisenberg.llm.vision.iter_screenshots_from_artifact",
+                return_value=iter([]),
             ):
                 result = await fetch_and_analyze_screenshots(
                     "token", "owner", "repo", 123, "playwright"
@@ -780,10 +931,11 @@ class TestFetchAndAnalyzeScreenshots:
             mock_client_cls.return_value = mock_client
 
             mock_screenshot = MagicMock()
+            mock_screenshot.duplicate_tests = []
 
             with (
                 patch(
-                    "heisenberg.llm.vision.extract_screenshots_from_artifact",
+                    "heisenberg.llm.vision.prepare_screenshots",
                     return_value=[mock_screenshot],
                 ),
                 patch("heisenberg.llm.vision.ScreenshotAnalyzer") as mock_analyzer_cls,
@@ -793,7 +945,7 @@ class TestFetchAndAnalyzeScreenshots:
                 ),
             ):
                 mock_analyzer = MagicMock()
-                mock_analyzer.analyze_batch.return_value = [mock_screenshot]
+                mock_analyzer.analyze_batch_async = AsyncMock(return_value=[mock_screenshot])
                 mock_analyzer_cls.return_value = mock_analyzer
 
                 result = await fetch_and_analyze_screenshots(
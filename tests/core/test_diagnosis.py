@@ -5,6 +5,7 @@ import pytest
 from heisenberg.core.diagnosis import (
     ConfidenceLevel,
     Diagnosis,
+    DiagnosisStreamParser,
     _determine_confidence_level,
     _extract_confidence_explanation,
     _extract_evidence,
@@ -622,3 +623,133 @@ This is the real explanation."""
 
         # This kills mutant that changes default from None to ""
         assert diagnosis.confidence_explanation is None
+
+
+STREAMED_RESPONSE = """## Root Cause Analysis
+The login API times out under load.
+
+## Evidence
+- TimeoutError after 30000ms
+- 503 from auth-service
+
+## Suggested Fix
+Increase the auth-service pool size.
+
+## Confidence Score
+HIGH (>80%)
+The backend logs show the failure.
+"""
+
+
+class TestDiagnosisStreamParser:
+    """Test suite for incremental diagnosis parsing."""
+
+    def test_section_completes_when_next_header_starts(self):
+        """The root cause should be emitted before the rest is written."""
+        # Given
+        parser = DiagnosisStreamParser()
+
+        # When
+        first = parser.feed("## Root Cause Analysis\nThe login API ti")
+        second = parser.feed("mes out under load.\n\n## Evid")
+        third = parser.feed("ence\n")
+
+        # Then
+        assert first == second == []
+        assert [(s.name, s.content) for s in third] == [
+            ("root_cause", "The login API times out under load.")
+        ]
+
+    def test_character_by_character_matches_parse_diagnosis(self):
+        """Any split of the stream should give the non-streamed result."""
+        # Given
+        parser = DiagnosisStreamParser()
+
+        # When
+        sections = [s for char in STREAMED_RESPONSE for s in parser.feed(char)]
+        sections += parser.close()
+
+        # Then
+        assert [s.name for s in sections] == [
+            "root_cause",
+            "evidence",
+            "suggested_fix",
+            "confidence",
+        ]
+        assert parser.is_complete
+        assert parser.diagnosis() == parse_diagnosis(STREAMED_RESPONSE)
+
+    def test_complete_once_required_sections_arrived(self):
+        """Generation can stop as soon as every required section is closed."""
+        # Given
+        parser = DiagnosisStreamParser(required=("root_cause", "evidence"))
+        parser.feed("## Root Cause Analysis\nSlow API\n## Evidence\n- timeout\n")
+        assert not parser.is_complete
+
+        # When
+        parser.feed("## Suggested Fix\n")
+
+        # Then
+        assert parser.is_complete
+
+    def test_default_parser_completes_before_stream_ends(self):
+        """The confidence level and explanation paragraph should complete the response."""
+        # Given
+        parser = DiagnosisStreamParser()
+        response = STREAMED_RESPONSE + "\n"
+
+        # When
+        completed_at = None
+        for position, char in enumerate(response + "Anything else I should add?"):
+            parser.feed(char)
+            if parser.is_complete:
+                completed_at = position + 1
+                break
+
+        # Then
+        assert completed_at == len(response)
+        assert parser.diagnosis() == parse_diagnosis(response)
+
+    def test_multi_line_explanation_is_streamed_in_full(self):
+        """Every line of the explanation paragraph should reach the diagnosis."""
+        # Given
+        parser = DiagnosisStreamParser()
+        response = STREAMED_RESPONSE + "It matches the timeout in the trace.\n"
+
+        # When
+        parser.feed(response)
+        complete_before_blank_line = parser.is_complete
+        parser.feed("\n")
+
+        # Then
+        assert not complete_before_blank_line
+        assert parser.is_complete
+        assert parser.diagnosis().confidence_explanation == (
+            "The backend logs show the failure. It matches the timeout in the trace."
+        )
+        assert parser.diagnosis() == parse_diagnosis(response + "\n")
+
+    def test_confidence_level_alone_is_not_complete(self):
+        """The explanation after the level is still worth waiting for."""
+        # Given
+        parser = DiagnosisStreamParser()
+
+        # When
+        parser.feed(STREAMED_RESPONSE[: STREAMED_RESPONSE.index("The backend")])
+
+        # Then
+        assert not parser.is_complete
+
+    def test_preamble_and_unknown_sections(self):
+        """Text before the first header is ignored; other headers keep their name."""
+        # Given
+        parser = DiagnosisStreamParser()
+
+        # When
+        parser.feed("Here is my analysis.\n### Notes\nFlaky on CI")
+        sections = parser.close()
+
+        # Then
+        assert [(s.name, s.title, s.content) for s in sections] == [
+            ("notes", "Notes", "Flaky on CI")
+        ]
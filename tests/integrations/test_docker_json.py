@@ -0,0 +1,137 @@
+"""Tests for the direct Docker json-file log reader."""
+
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from heisenberg.integrations.docker import CompactContainerLogs, datetime_to_ns
+from heisenberg.integrations.docker_json import DockerJsonFileCollector, JsonFileLogReader
+
+CONTAINER_ID = "a1b2c3d4e5f6" + "0" * 52
+BASE_TIME = datetime(2024, 1, 15, 10, 0, 0, tzinfo=UTC)
+
+
+def _json_line(second: int, message: str, stream: str = "stdout") -> str:
+    # Docker trims trailing zeros from the fractional seconds
+    time = (BASE_TIME + timedelta(seconds=second)).strftime("%Y-%m-%dT%H:%M:%S") + ".5Z"
+    record = {"log": f"{message}\n", "stream": stream, "time": time}
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _write_log(path: Path, seconds: range) -> None:
+    path.write_text(
+        "".join(_json_line(s, f"line {s}", "stderr" if s % 7 == 0 else "stdout") for s in seconds)
+    )
+
+
+@pytest.fixture
+def containers_dir(tmp_path: Path) -> Path:
+    """Docker containers directory with one container and two rotations."""
+    container_dir = tmp_path / CONTAINER_ID
+    container_dir.mkdir()
+    (container_dir / "config.v2.json").write_text(
+        json.dumps(
+            {
+                "ID": CONTAINER_ID,
+                "Name": "/project-api-1",
+                "Config": {"Labels": {"com.docker.compose.service": "api"}},
+            }
+        )
+    )
+    log = container_dir / f"{CONTAINER_ID}-json.log"
+    _write_log(Path(f"{log}.2"), range(0, 1000))
+    _write_log(Path(f"{log}.1"), range(1000, 2000))
+    _write_log(log, range(2000, 3000))
+    Path(f"{log}.3.gz").write_bytes(b"\x1f\x8b ignored")
+    return tmp_path
+
+
+class TestJsonFileLogReader:
+    """Test suite for JsonFileLogReader."""
+
+    def test_read_window_matches_linear_scan(self, tmp_path: Path):
+        """Binary-searched windows should match a brute-force filter."""
+        # Given
+        path = tmp_path / "c-json.log"
+        _write_log(path, range(0, 500))
+        start = datetime_to_ns(BASE_TIME + timedelta(seconds=123))
+        end = datetime_to_ns(BASE_TIME + timedelta(seconds=140))
+
+        # When
+        logs = CompactContainerLogs("c")
+        JsonFileLogReader(path).read_window(logs, start, end)
+
+        # Then
+        assert list(logs.iter_messages()) == [f"line {s}" for s in range(123, 140)]
+        # line 126 is a multiple of 7, so it was written to stderr
+        assert logs.message(3) == "line 126"
+        assert logs.stream(3) == "stderr"
+
+    def test_read_window_outside_file_returns_nothing(self, tmp_path: Path):
+        """Windows outside the file's time range should not decode any lines."""
+        # Given
+        path = tmp_path / "c-json.log"
+        _write_log(path, range(0, 10))
+        later = datetime_to_ns(BASE_TIME + timedelta(hours=1))
+
+        # When
+        logs = CompactContainerLogs("c")
+        JsonFileLogReader(path).read_window(logs, later, later + 1)
+
+        # Then
+        assert len(logs) == 0
+
+    def test_read_tail(self, tmp_path: Path):
+        """read_tail should return the last lines in order."""
+        # Given
+        path = tmp_path / "c-json.log"
+        _write_log(path, range(0, 50))
+
+        # When
+        logs = CompactContainerLogs("c")
+        JsonFileLogReader(path).read_tail(logs, 3)
+
+        # Then
+        assert list(logs.iter_messages()) == ["line 47", "line 48", "line 49"]
+
+
+class TestDockerJsonFileCollector:
+    """Test suite for DockerJsonFileCollector."""
+
+    @pytest.mark.parametrize("service", ["api", "project-api-1", CONTAINER_ID[:12]])
+    def test_resolves_container_names(self, containers_dir: Path, service: str):
+        """Compose service, container name and ID prefix should all resolve."""
+        files = DockerJsonFileCollector([service], containers_dir).find_log_files(service)
+
+        log = f"{CONTAINER_ID}-json.log"
+        assert [f.name for f in files] == [f"{log}.2", f"{log}.1", log]
+
+    def test_window_spans_rotated_files(self, containers_dir: Path):
+        """A window crossing a rotation boundary should read from both files."""
+        # Given
+        collector = DockerJsonFileCollector(["api"], containers_dir)
+
+        # When
+        result = collector.collect_all(BASE_TIME + timedelta(seconds=1000), window_seconds=3)
+
+        # Then
+        messages = list(result["api"].iter_messages())
+        assert messages == [f"line {s}" for s in range(997, 1003)]
+
+    def test_tail_without_center(self, containers_dir: Path):
+        """Without a failure time the collector should read the tail."""
+        # When
+        logs = DockerJsonFileCollector(["api"], containers_dir).collect_tail("api", max_lines=1500)
+
+        # Then
+        assert len(logs) == 1500
+        assert logs.message(0) == "line 1500"
+        assert logs.message(len(logs) - 1) == "line 2999"
+
+    def test_unknown_service_is_skipped(self, containers_dir: Path):
+        """Services without a container directory should be omitted."""
+        result = DockerJsonFileCollector(["missing"], containers_dir).collect_all(BASE_TIME)
+
+        assert result == {}
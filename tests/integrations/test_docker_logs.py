@@ -1,13 +1,16 @@
 """Tests for Docker logs collector - TDD Red-Green-Refactor."""
 
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 from heisenberg.integrations.docker import (
+    CompactContainerLogs,
     ContainerLogs,
     DockerLogsCollector,
     LogEntry,
     collect_logs_around_timestamp,
+    datetime_to_ns,
+    parse_docker_timestamp_ns,
 )
 
 
@@ -226,6 +229,113 @@ class TestDockerLogsCollector:
         assert "--timestamps" in call_args or "-t" in call_args
 
 
+class TestCompactContainerLogs:
+    """Test suite for columnar CompactContainerLogs."""
+
+    def _make_logs(self) -> ContainerLogs:
+        base = datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC)
+        return ContainerLogs(
+            container_name="api",
+            entries=[
+                LogEntry(base + timedelta(seconds=i), f"message {i} \u2713", "stdout")
+                for i in range(100)
+            ]
+            + [LogEntry(base + timedelta(seconds=100), "fatal crash", "stderr")],
+        )
+
+    def test_round_trips_entries(self):
+        """Compact logs should expose the same entries as the source."""
+        # Given
+        logs = self._make_logs()
+
+        # When
+        compact = CompactContainerLogs.from_container_logs(logs)
+
+        # Then
+        assert len(compact.entries) == len(logs.entries)
+        assert list(compact.entries) == logs.entries
+        assert compact.entries[-1].stream == "stderr"
+        assert compact.entries[:2] == logs.entries[:2]
+
+    def test_has_errors_property(self):
+        """has_errors should reflect stderr flags."""
+        # Given
+        compact = CompactContainerLogs("api")
+        compact.append(0, "ok", "stdout")
+
+        # Then
+        assert not compact.has_errors
+        compact.append(1, "boom", "stderr")
+        assert compact.has_errors
+
+    def test_filters_by_time_window(self):
+        """Time window filter should match ContainerLogs semantics."""
+        # Given
+        logs = self._make_logs()
+        compact = CompactContainerLogs.from_container_logs(logs)
+        center = datetime(2024, 1, 15, 10, 30, 50, tzinfo=UTC)
+
+        # When
+        filtered = compact.filter_by_time_window(center, window_seconds=10)
+
+        # Then
+        assert isinstance(filtered, CompactContainerLogs)
+        assert list(filtered.entries) == logs.filter_by_time_window(center, 10).entries
+
+    def test_sort_orders_unsorted_appends(self):
+        """Out-of-order appends should be sorted by timestamp."""
+        # Given
+        compact = CompactContainerLogs("api")
+        compact.append(3_000, "third", "stdout")
+        compact.append(1_000, "first", "stderr")
+        compact.append(2_000, "second", "stdout")
+
+        # When
+        compact.sort()
+
+        # Then
+        assert list(compact.iter_messages()) == ["first", "second", "third"]
+        assert compact.stream(0) == "stderr"
+
+    def test_to_markdown_matches_container_logs(self):
+        """Markdown output should be identical to ContainerLogs."""
+        # Given
+        logs = self._make_logs()
+
+        # Then
+        assert CompactContainerLogs.from_container_logs(logs).to_markdown() == logs.to_markdown()
+        assert "*No logs available*" in CompactContainerLogs("api").to_markdown()
+
+    def test_parse_docker_timestamp_keeps_nanoseconds(self):
+        """Docker timestamps should be parsed with nanosecond precision."""
+        # When
+        ns = parse_docker_timestamp_ns("2024-01-15T10:30:00.123456789Z")
+
+        # Then
+        base = datetime_to_ns(datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC))
+        assert ns - base == 123_456_789
+
+    @patch("heisenberg.integrations.docker.subprocess.run")
+    def test_collector_builds_compact_logs(self, mock_run: MagicMock):
+        """Collector in compact mode should return sorted CompactContainerLogs."""
+        # Given
+        mock_run.return_value = MagicMock(
+            stdout="2024-01-15T10:30:02.000000000Z later line\n",
+            stderr="2024-01-15T10:30:01.000000000Z earlier error\n",
+            returncode=0,
+        )
+        collector = DockerLogsCollector(services=["api"], compact=True)
+
+        # When
+        results = collector.collect_all()
+
+        # Then
+        logs = results["api"]
+        assert isinstance(logs, CompactContainerLogs)
+        assert [e.message for e in logs.entries] == ["earlier error", "later line"]
+        assert logs.has_errors
+
+
 class TestCollectLogsAroundTimestamp:
     """Test suite for collect_logs_around_timestamp helper."""
 
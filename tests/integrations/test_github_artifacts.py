@@ -260,6 +260,103 @@ class TestDownloadArtifact:
             assert len(result) > 0
 
 
+class TestRunLogs:
+    """Test run-level job and log endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_get_workflow_jobs_returns_jobs_with_steps(self):
+        """get_workflow_jobs should return the jobs of a run."""
+        client = GitHubArtifactClient(token="test-token")
+        jobs = [{"id": 1, "name": "e2e", "conclusion": "failure", "steps": []}]
+
+        with patch.object(client, "_request", new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = {"total_count": 1, "jobs": jobs}
+
+            result = await client.get_workflow_jobs("owner", "repo", run_id=123)
+
+            assert result == jobs
+            assert mock_request.call_args.args[1] == "/repos/owner/repo/actions/runs/123/jobs"
+
+    @pytest.mark.asyncio
+    async def test_download_run_logs_uses_run_endpoint(self):
+        """download_run_logs should download the run-level archive once."""
+        client = GitHubArtifactClient(token="test-token")
+
+        with patch.object(client, "_download", new_callable=AsyncMock) as mock_download:
+            mock_download.return_value = b"PK"
+
+            result = await client.download_run_logs("owner", "repo", run_id=123)
+
+            assert result == b"PK"
+            mock_download.assert_awaited_once_with(
+                "https://api.github.com/repos/owner/repo/actions/runs/123/logs"
+            )
+
+    @pytest.mark.asyncio
+    async def test_context_manager_pools_connections(self):
+        """Requests inside ``async with`` should share one HTTP client."""
+        from unittest.mock import MagicMock
+
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"jobs": []}
+
+        with patch("heisenberg.integrations.github_artifacts.httpx.AsyncClient") as mock_client_cls:
+            http = mock_client_cls.return_value
+            http.request = AsyncMock(return_value=response)
+            http.aclose = AsyncMock()
+
+            async with GitHubArtifactClient(token="test-token") as client:
+                await client.get_workflow_jobs("owner", "repo", run_id=1)
+                await client.get_workflow_jobs("owner", "repo", run_id=2)
+
+            assert mock_client_cls.call_count == 1
+            assert http.request.await_count == 2
+            http.aclose.assert_awaited_once()
+
+
+class TestStreamJobLogs:
+    """Test streaming a single job log."""
+
+    @staticmethod
+    def _client_with(handler) -> GitHubArtifactClient:
+        import httpx
+
+        client = GitHubArtifactClient(token="test-token")
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_follows_redirect_and_yields_lines(self):
+        """The log redirect should be followed and lines yielded without endings."""
+        import httpx
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "api.github.com":
+                return httpx.Response(302, headers={"Location": "https://logs.example/job.txt"})
+            return httpx.Response(200, text="line 1\r\n[error] line 2\n")
+
+        client = self._client_with(handler)
+
+        lines = [line async for line in client.stream_job_logs("owner", "repo", 42)]
+        await client.aclose()
+
+        assert lines == ["line 1", "[error] line 2"]
+
+    @pytest.mark.asyncio
+    async def test_raises_api_error_on_failure(self):
+        """HTTP errors should raise GitHubAPIError."""
+        import httpx
+
+        client = self._client_with(lambda request: httpx.Response(410))
+
+        with pytest.raises(GitHubAPIError) as exc_info:
+            async for _ in client.stream_job_logs("owner", "repo", 42):
+                pass
+        await client.aclose()
+
+        assert exc_info.value.status_code == 410
+
+
 class TestExtractPlaywrightReport:
     """Test extract_playwright_report method."""
 
@@ -0,0 +1,156 @@
+"""Tests for the on-disk log ring buffer and docker logs follower."""
+
+import io
+import os
+import time
+from datetime import UTC
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from heisenberg.cli.parsers import create_parser
+from heisenberg.integrations.log_buffer import DockerLogsFollower, LogRingBuffer
+
+
+def _line(second: int, message: str) -> str:
+    return f"2024-01-15T10:30:{second:02d}.000000000Z {message}"
+
+
+class TestLogRingBuffer:
+    """Test suite for LogRingBuffer."""
+
+    def test_append_and_read_round_trip(self, tmp_path: Path):
+        """Buffered lines should be read back sorted with their streams."""
+        # Given
+        buffer = LogRingBuffer(tmp_path)
+        buffer.append("api", _line(2, "second"), "stdout")
+        buffer.append("api", _line(1, "first"), "stderr")
+        buffer.close()
+
+        # When
+        logs = buffer.read("api")
+
+        # Then
+        assert [e.message for e in logs.entries] == ["first", "second"]
+        assert logs.entries[0].stream == "stderr"
+        assert buffer.services() == ["api"]
+
+    def test_rotates_segments_and_evicts_by_size(self, tmp_path: Path):
+        """Oldest segments should be dropped once the size budget is exceeded."""
+        # Given
+        buffer = LogRingBuffer(tmp_path, max_bytes=400, segment_bytes=100)
+
+        # When
+        for i in range(50):
+            buffer.append("api", _line(i, f"message {i}"))
+        buffer.close()
+
+        # Then
+        segments = list((tmp_path / "api").glob("*.log"))
+        assert len(segments) > 1
+        assert sum(s.stat().st_size for s in segments) <= 400 + 100
+        messages = [e.message for e in buffer.read("api").entries]
+        assert messages[-1] == "message 49"
+        assert "message 0" not in messages
+
+    def test_evicts_segments_by_age(self, tmp_path: Path):
+        """Closed segments older than max_age_seconds should be evicted."""
+        # Given
+        buffer = LogRingBuffer(tmp_path, segment_bytes=60, max_age_seconds=60)
+        buffer.append("api", _line(0, "old message"))
+        old_segment = next((tmp_path / "api").glob("*.log"))
+        stale = time.time() - 120
+        os.utime(old_segment, (stale, stale))
+
+        # When
+        buffer.append("api", _line(1, "new message"))
+        buffer.evict_expired()
+        buffer.close()
+
+        # Then
+        assert [e.message for e in buffer.read("api").entries] == ["new message"]
+
+    def test_rejects_path_like_service_names(self, tmp_path: Path):
+        """Service names must not escape the buffer directory."""
+        buffer = LogRingBuffer(tmp_path)
+
+        with pytest.raises(ValueError):
+            buffer.append("../etc", _line(0, "x"))
+
+    def test_read_all_filters_services(self, tmp_path: Path):
+        """read_all should honour the requested services and skip empty ones."""
+        # Given
+        buffer = LogRingBuffer(tmp_path)
+        buffer.append("api", _line(0, "api line"))
+        buffer.append("db", _line(0, "db line"))
+        buffer.close()
+
+        # When
+        result = buffer.read_all(["db", "missing"])
+
+        # Then
+        assert list(result) == ["db"]
+
+
+class TestDockerLogsFollower:
+    """Test suite for DockerLogsFollower."""
+
+    @patch("heisenberg.integrations.log_buffer.subprocess.Popen")
+    def test_follower_pumps_docker_output_into_buffer(self, mock_popen: MagicMock, tmp_path: Path):
+        """Follower should stream both pipes and skip docker CLI messages."""
+        # Given
+        process = MagicMock()
+        process.stdout = io.StringIO(_line(1, "request served") + "\n")
+        process.stderr = io.StringIO("Error: No such container: api\n" + _line(2, "boom") + "\n")
+        process.poll.return_value = 0
+        mock_popen.return_value = process
+        buffer = LogRingBuffer(tmp_path)
+        follower = DockerLogsFollower(["api"], buffer)
+
+        # When
+        follower.start()
+        follower.stop()
+
+        # Then
+        args = mock_popen.call_args[0][0]
+        assert args[:4] == ["docker", "logs", "--follow", "--timestamps"]
+        logs = buffer.read("api")
+        assert [(e.message, e.stream) for e in logs.entries] == [
+            ("request served", "stdout"),
+            ("boom", "stderr"),
+        ]
+
+
+class TestLogBufferIntegration:
+    """Tests for CLI and pipeline wiring of the log buffer."""
+
+    def test_parser_accepts_logs_follow(self):
+        """The CLI should expose 'logs follow --services'."""
+        args = create_parser().parse_args(["logs", "follow", "--services", "api,db"])
+
+        assert args.command == "logs"
+        assert args.logs_command == "follow"
+        assert args.services == "api,db"
+
+    def test_analyzer_reads_from_buffer(self, tmp_path: Path, sample_report_path: Path):
+        """Analyzer should use buffered logs instead of calling docker."""
+        # Given
+        from heisenberg.analysis import Analyzer
+        from heisenberg.parsers.playwright import parse_playwright_report
+
+        report = parse_playwright_report(sample_report_path)
+        start = min(t.start_time for t in report.failed_tests if t.start_time)
+        stamp = start.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+        buffer = LogRingBuffer(tmp_path)
+        buffer.append("api", f"{stamp} upstream timeout", "stderr")
+        buffer.append("api", "2000-01-01T00:00:00.000000000Z ancient line", "stdout")
+        buffer.close()
+
+        # When
+        with patch("heisenberg.analysis.pipeline.DockerLogsCollector") as mock_collector:
+            result = Analyzer(report_path=sample_report_path, log_buffer_dir=tmp_path).analyze()
+
+        # Then
+        mock_collector.from_string.assert_not_called()
+        assert [e.message for e in result.container_logs["api"].entries] == ["upstream timeout"]
@@ -0,0 +1,382 @@
+"""Tests for batch-API analysis against a local stub server."""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from heisenberg.llm.batch import BatchProvider, BatchRequest, BatchResult, run_batches
+from heisenberg.llm.config import calculate_cost
+from heisenberg.llm.providers.anthropic import AnthropicProvider
+from heisenberg.llm.providers.openai import OpenAIProvider
+from heisenberg.playground.analyze import analyze_cases_in_batches
+
+DIAGNOSIS = """## Root Cause
+The login button selector changed.
+
+## Evidence
+- Timeout waiting for selector
+
+## Suggested Fix
+Update the selector.
+
+## Confidence
+HIGH
+"""
+
+FIXTURES = Path(__file__).parents[1] / "fixtures"
+
+# Status checks answered "still running" before a batch ends
+POLLS_BEFORE_DONE = 1
+
+
+class _StubState:
+    """Batches and files held by the stub server."""
+
+    def __init__(self) -> None:
+        self.batches: dict[str, dict] = {}
+        self.files: dict[str, str] = {}
+        self.submitted: list[list[dict]] = []
+
+    def add_batch(self, requests: list[dict], **fields) -> str:
+        batch_id = f"batch_{len(self.batches) + 1}"
+        self.batches[batch_id] = {"requests": requests, "polls": 0, **fields}
+        self.submitted.append(requests)
+        return batch_id
+
+    def poll(self, batch_id: str) -> bool:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        return batch["polls"] > POLLS_BEFORE_DONE
+
+
+def _answer(custom_id: str) -> str | None:
+    """Diagnosis text for a request, None for requests the stub fails."""
+    return None if custom_id.startswith("fail") else DIAGNOSIS
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Minimal Anthropic Message Batches and OpenAI Batch API routes."""
+
+    server: _StubServer
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, payload: dict | str) -> None:
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data.encode())))
+        self.end_headers()
+        self.wfile.write(data.encode())
+
+    def _send_error(self, status: int, error_type: str, message: str) -> None:
+        data = json.dumps({"type": "error", "error": {"type": error_type, "message": message}})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data.encode())))
+        self.end_headers()
+        self.wfile.write(data.encode())
+
+    def do_POST(self):  # noqa: N802
+        state = self.server.state
+        body = self._body()
+        if self.path == "/v1/messages/batches":
+            requests = json.loads(body)["requests"]
+            if not all(re.fullmatch(r"[a-zA-Z0-9_-]{1,64}", r["custom_id"]) for r in requests):
+                self._send_error(400, "invalid_request_error", "custom_id: invalid format")
+                return
+            self._send(_anthropic_batch(state.add_batch(requests), "in_progress"))
+        elif self.path == "/v1/files":
+            file_id = f"file_{len(state.files) + 1}"
+            # JSONL lines inside the multipart upload
+            lines = re.findall(rb'^\{"custom_id".*$', body, re.MULTILINE)
+            state.files[file_id] = b"\n".join(line.rstrip(b"\r") for line in lines).decode()
+            self._send({"id": file_id, "object": "file", "purpose": "batch", "bytes": len(body)})
+        elif self.path == "/v1/batches":
+            lines = state.files[json.loads(body)["input_file_id"]].splitlines()
+            batch_id = state.add_batch([json.loads(line) for line in lines])
+            self._send(_openai_batch(batch_id, "in_progress"))
+        else:
+            self.send_error(404)
+
+    def do_GET(self):  # noqa: N802
+        state = self.server.state
+        if match := re.fullmatch(r"/v1/messages/batches/(\w+)/results", self.path):
+            lines = [_anthropic_result(r["custom_id"]) for r in state.batches[match[1]]["requests"]]
+            self._send("\n".join(json.dumps(line) for line in lines))
+        elif match := re.fullmatch(r"/v1/messages/batches/(\w+)", self.path):
+            batch_id = match[1]
+            status = "ended" if state.poll(batch_id) else "in_progress"
+            results_url = f"{self.server.url}/v1/messages/batches/{batch_id}/results"
+            self._send(_anthropic_batch(batch_id, status, results_url))
+        elif match := re.fullmatch(r"/v1/batches/(\w+)", self.path):
+            batch_id = match[1]
+            if not state.poll(batch_id):
+                self._send(_openai_batch(batch_id, "in_progress"))
+                return
+            output = [_openai_result(r["custom_id"]) for r in state.batches[batch_id]["requests"]]
+            state.files[f"out_{batch_id}"] = "\n".join(json.dumps(line) for line in output)
+            self._send(_openai_batch(batch_id, "completed", f"out_{batch_id}"))
+        elif match := re.fullmatch(r"/v1/files/(\w+)/content", self.path):
+            self._send(state.files[match[1]])
+        else:
+            self.send_error(404)
+
+
+class _StubServer(ThreadingHTTPServer):
+    state: _StubState
+    url: str
+
+
+def _anthropic_batch(batch_id: str, status: str, results_url: str | None = None) -> dict:
+    return {
+        "id": batch_id,
+        "type": "message_batch",
+        "processing_status": status,
+        "request_counts": {"processing": 0, "succeeded": 0, "errored": 0},
+        "results_url": results_url if status == "ended" else None,
+        "created_at": "2026-01-01T00:00:00Z",
+        "expires_at": "2026-01-02T00:00:00Z",
+    }
+
+
+def _anthropic_result(custom_id: str) -> dict:
+    text = _answer(custom_id)
+    if text is None:
+        error = {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}
+        return {"custom_id": custom_id, "result": {"type": "errored", "error": error}}
+    message = {
+        "id": "msg_1",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-test",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 100, "output_tokens": 40},
+    }
+    return {"custom_id": custom_id, "result": {"type": "succeeded", "message": message}}
+
+
+def _openai_batch(batch_id: str, status: str, output_file_id: str | None = None) -> dict:
+    return {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": "/v1/chat/completions",
+        "input_file_id": "file_1",
+        "completion_window": "24h",
+        "status": status,
+        "output_file_id": output_file_id,
+        "error_file_id": None,
+        "created_at": 0,
+    }
+
+
+def _openai_result(custom_id: str) -> dict:
+    text = _answer(custom_id)
+    if text is None:
+        error = {"message": "Rate limited", "type": "rate_limit_error"}
+        return {
+            "custom_id": custom_id,
+            "response": {"status_code": 429, "body": {"error": error}},
+        }
+    body = {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+        "usage": {
+            "prompt_tokens": 100,
+            "completion_tokens": 40,
+            "prompt_tokens_details": {"cached_tokens": 64},
+        },
+    }
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": body}}
+
+
+@pytest.fixture
+def stub_server() -> Iterator[_StubServer]:
+    """Run the stub batch API on a free local port."""
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    server.state = _StubState()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(provider: BatchProvider, requests: list[BatchRequest], **kwargs) -> list[BatchResult]:
+    results: list[BatchResult] = []
+    run_batches(provider, requests, results.append, poll_interval=0, sleep=lambda _: None, **kwargs)
+    return sorted(results, key=lambda result: result.custom_id)
+
+
+class TestRunBatches:
+    """Test suite for batch submission and polling."""
+
+    def test_splits_requests_and_backs_off(self):
+        """Requests should be split by batch_size and polled with growing delays."""
+        # Given
+        provider = MagicMock(spec=BatchProvider)
+        provider.name = "fake"
+        provider.submit_batch.side_effect = ["b1", "b2"]
+        provider.is_batch_done.side_effect = [False, False, True, True]
+        provider.iter_batch_results.side_effect = lambda batch_id: iter(
+            [BatchResult(f"{batch_id}-done", error="x")]
+        )
+        delays: list[float] = []
+        requests = [BatchRequest(f"r{i}", "prompt") for i in range(3)]
+
+        # When
+        results: list[BatchResult] = []
+        run_batches(
+            provider,
+            requests,
+            results.append,
+            batch_size=2,
+            poll_interval=10,
+            max_poll_interval=12,
+            sleep=delays.append,
+        )
+
+        # Then
+        assert [len(call.args[0]) for call in provider.submit_batch.call_args_list] == [2, 1]
+        assert delays == [10, 12]
+        # Requests missing from a batch's results are reported as errors
+        assert sorted(r.custom_id for r in results) == ["r0", "r1", "r2"]
+        assert all(r.error and "No result" in r.error for r in results)
+
+    def test_rejects_duplicate_ids(self):
+        """Custom IDs must be unique to match results to requests."""
+        with pytest.raises(ValueError, match="unique"):
+            run_batches(MagicMock(), [BatchRequest("a", "x"), BatchRequest("a", "y")], print)
+
+    @pytest.mark.parametrize("custom_id", ["/tmp/cases/o-r-1", "", "x" * 65])
+    def test_rejects_ids_batch_apis_refuse(self, custom_id):
+        """Custom IDs must be 1-64 letters, digits, _ or -."""
+        provider = MagicMock(spec=BatchProvider)
+        with pytest.raises(ValueError, match="custom ID"):
+            run_batches(provider, [BatchRequest(custom_id, "x")], print)
+        provider.submit_batch.assert_not_called()
+
+    def test_times_out(self):
+        """Batches still running after the timeout should raise."""
+        # Given
+        provider = MagicMock(spec=BatchProvider)
+        provider.name = "fake"
+        provider.submit_batch.return_value = "b1"
+        provider.is_batch_done.return_value = False
+        now = iter(range(0, 1000, 10))
+
+        # Then
+        with pytest.raises(TimeoutError, match="b1"):
+            run_batches(
+                provider,
+                [BatchRequest("a", "x")],
+                print,
+                timeout=30,
+                sleep=lambda _: None,
+                clock=lambda: next(now),
+            )
+
+
+class TestProviderBatches:
+    """Test suite for provider batch APIs against the stub server."""
+
+    def test_anthropic_message_batches(self, stub_server):
+        """Anthropic results and errors should be matched by custom ID."""
+        # Given
+        provider = AnthropicProvider(api_key="test", base_url=stub_server.url)
+        requests = [BatchRequest("case-a", "prompt a", "system"), BatchRequest("fail-b", "b")]
+
+        # When
+        results = _run(provider, requests)
+
+        # Then
+        ok, failed = results
+        assert ok.custom_id == "case-a" and ok.analysis is not None
+        assert ok.analysis.content == DIAGNOSIS
+        assert (ok.analysis.input_tokens, ok.analysis.output_tokens) == (100, 40)
+        assert failed.analysis is None and "Overloaded" in (failed.error or "")
+        params = stub_server.state.submitted[0][0]["params"]
+        assert params["messages"][0]["content"] == "prompt a"
+
+    def test_openai_batch_api(self, stub_server):
+        """OpenAI JSONL output should be parsed into results."""
+        # Given
+        provider = OpenAIProvider(api_key="test", base_url=f"{stub_server.url}/v1")
+        requests = [BatchRequest(f"case-{i}", f"prompt {i}") for i in range(3)]
+        requests.append(BatchRequest("fail-x", "x"))
+
+        # When
+        results = _run(provider, requests, batch_size=2)
+
+        # Then
+        assert len(stub_server.state.submitted) == 2
+        assert [r.custom_id for r in results] == ["case-0", "case-1", "case-2", "fail-x"]
+        assert all(r.analysis is not None for r in results[:3])
+        assert results[0].analysis.cached_input_tokens == 64
+        assert results[3].error == "Rate limited"
+        line = stub_server.state.submitted[0][0]
+        assert (line["method"], line["url"]) == ("POST", "/v1/chat/completions")
+
+
+class TestCaseBatches:
+    """Test suite for batch analysis of frozen cases."""
+
+    def test_writes_diagnosis_per_case(self, stub_server, tmp_path, monkeypatch):
+        """Each case should get its diagnosis.json; broken cases are reported."""
+        # Given
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub_server.url)
+        report = json.loads((FIXTURES / "playwright_report.json").read_text())
+        case_dirs = []
+        for name in ("case-a", "case-b", "broken"):
+            case_dir = tmp_path / name
+            case_dir.mkdir()
+            (case_dir / "metadata.json").write_text(json.dumps({"repo": f"o/{name}", "run_id": 1}))
+            if name != "broken":
+                (case_dir / "report.json").write_text(json.dumps(report))
+            case_dirs.append(case_dir)
+        seen: list[str] = []
+
+        # When
+        outcomes = analyze_cases_in_batches(
+            case_dirs,
+            provider="anthropic",
+            poll_interval=0,
+            on_case=lambda case_dir, _: seen.append(case_dir.name),
+        )
+
+        # Then
+        assert sorted(seen) == ["broken", "case-a", "case-b"]
+        assert isinstance(outcomes[tmp_path / "broken"], FileNotFoundError)
+        saved = json.loads((tmp_path / "case-a" / "diagnosis.json").read_text())
+        assert saved["repo"] == "o/case-a"
+        assert saved["diagnosis"]["confidence"] == "HIGH"
+        assert len(stub_server.state.submitted[0]) == 2
+        # Batched answers are priced at half the synchronous rate
+        regular = calculate_cost(
+            saved["model"], saved["tokens"]["input"], saved["tokens"]["output"]
+        )
+        assert saved["estimated_cost"] == pytest.approx(float(regular) / 2)
+        assert saved["estimated_cost"] > 0
+
+    def test_gemini_is_rejected(self, tmp_path, monkeypatch):
+        """Providers without a batch API should fail fast."""
+        # Given
+        monkeypatch.setenv("GOOGLE_API_KEY", "test")
+
+        # Then
+        with pytest.raises(ValueError, match="not supported"):
+            analyze_cases_in_batches([], provider="google")
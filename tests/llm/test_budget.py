@@ -0,0 +1,115 @@
+"""Tests for prompt token-budget planning."""
+
+from heisenberg.llm.budget import (
+    OMITTED_LINES_NOTE,
+    SectionDemand,
+    count_tokens,
+    fit_lines,
+    plan_budget,
+)
+from heisenberg.llm.tokens import HeuristicTokenCounter
+
+
+class TestPlanBudget:
+    """Test suite for plan_budget water-filling."""
+
+    def test_everything_fits(self):
+        """Sections should get their full demand when the budget allows."""
+        # When
+        allocation = plan_budget([SectionDemand("a", 100), SectionDemand("b", 200)], 1000)
+
+        # Then
+        assert allocation == {"a": 100, "b": 200}
+
+    def test_small_sections_release_their_share(self):
+        """Unused share of a small section should go to the others."""
+        # Given: equal weights, so each share would be 500
+        sections = [
+            SectionDemand("small", 100),
+            SectionDemand("large", 5000),
+            SectionDemand("medium", 600),
+        ]
+
+        # When
+        allocation = plan_budget(sections, 1000)
+
+        # Then: "small" is filled, the remaining 900 are split between the others
+        assert allocation == {"small": 100, "large": 450, "medium": 450}
+
+    def test_shares_follow_weights(self):
+        """Heavier sections should get proportionally more of a scarce budget."""
+        # When
+        allocation = plan_budget(
+            [SectionDemand("failures", 10_000, weight=3), SectionDemand("logs", 10_000)], 4000
+        )
+
+        # Then
+        assert allocation == {"failures": 3000, "logs": 1000}
+
+    def test_minimum_is_granted_first(self):
+        """Minimums should be reserved before sharing."""
+        # When
+        allocation = plan_budget(
+            [SectionDemand("failures", 800, minimum=600), SectionDemand("logs", 10_000)], 1000
+        )
+
+        # Then: 400 are left to share and "failures" needs only 200 of them
+        assert allocation == {"failures": 800, "logs": 200}
+
+    def test_never_exceeds_total(self):
+        """Allocations should stay within the total budget."""
+        # Given
+        sections = [SectionDemand(f"s{i}", 100 * (i + 1), weight=i % 3 + 1) for i in range(10)]
+
+        # When
+        allocation = plan_budget(sections, 2500)
+
+        # Then
+        assert sum(allocation.values()) <= 2500
+        assert all(allocation[s.name] <= s.demand for s in sections)
+
+
+class TestFitLines:
+    """Test suite for fit_lines."""
+
+    def test_keeps_all_lines_within_budget(self):
+        """Lines that fit should be returned unchanged."""
+        # Given
+        counter = HeuristicTokenCounter()
+        lines = ["first line", "second line"]
+
+        # Then
+        assert fit_lines(lines, count_tokens(lines, counter), counter) == lines
+
+    def test_notes_omitted_lines(self):
+        """Lines over budget should be replaced by a note."""
+        # Given
+        counter = HeuristicTokenCounter()
+        lines = [f"line {i}" for i in range(10)]
+
+        # Room for three lines plus the note (and a possible closing fence)
+        budget = count_tokens(
+            [*lines[:3], "```", OMITTED_LINES_NOTE.format(count=len(lines))], counter
+        )
+
+        # When
+        kept = fit_lines(lines, budget, counter)
+
+        # Then
+        assert kept == ["line 0", "line 1", "line 2", "... (7 lines omitted to fit token budget)"]
+
+    def test_closes_open_code_fence(self):
+        """A cut inside a code fence should close the fence."""
+        # Given
+        counter = HeuristicTokenCounter()
+        lines = ["## Job Logs", "```", *(f"error {i}" for i in range(20)), "```"]
+
+        budget = count_tokens(
+            [*lines[:5], "```", OMITTED_LINES_NOTE.format(count=len(lines))], counter
+        )
+
+        # When
+        kept = fit_lines(lines, budget, counter)
+
+        # Then
+        assert kept[-2:] == ["```", "... (18 lines omitted to fit token budget)"]
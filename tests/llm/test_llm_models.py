@@ -9,6 +9,8 @@ Tests cover:
 
 from __future__ import annotations
 
+import pytest
+
 
 class TestLLMAnalysisModel:
     """Test suite for shared LLMAnalysis model."""
@@ -106,6 +108,44 @@ class TestLLMAnalysisModel:
         # Defaults: $3/1M input, $15/1M output
         assert analysis.estimated_cost == 18.0
 
+    def test_llm_analysis_cost_discounts_prompt_cache_reads(self):
+        """Input tokens read from the prompt cache should use the cache price."""
+        from heisenberg.llm.config import calculate_cost
+        from heisenberg.llm.models import LLMAnalysis
+
+        # Claude Sonnet 4: $3/1M input; cache reads cost 10% of that
+        analysis = LLMAnalysis(
+            content="Test",
+            input_tokens=1_000_000,
+            output_tokens=0,
+            model="claude-sonnet-4-20250514",
+            provider="anthropic",
+            cached_input_tokens=800_000,
+        )
+
+        # Expected: 200k * $3/1M + 800k * $0.30/1M = $0.60 + $0.24
+        assert analysis.estimated_cost == pytest.approx(0.84)
+        assert float(
+            calculate_cost(
+                analysis.model, 1_000_000, 0, cached_input_tokens=800_000, provider="anthropic"
+            )
+        ) == pytest.approx(0.84)
+
+    def test_batch_requests_are_discounted(self):
+        """Batch API requests should cost the provider's batch ratio of the regular price."""
+        from heisenberg.llm.config import calculate_cost
+
+        # Claude Sonnet 4: $3/1M input, $15/1M output; batches cost half
+        regular = calculate_cost("claude-sonnet-4-20250514", 1_000_000, 100_000)
+
+        assert float(regular) == pytest.approx(4.5)
+        assert calculate_cost(
+            "claude-sonnet-4-20250514", 1_000_000, 100_000, provider="anthropic", batch=True
+        ) == (regular / 2)
+        assert calculate_cost("gpt-4o", 1000, 100, batch=True) == calculate_cost(
+            "gpt-4o", 1000, 100
+        )
+
 
 class TestLLMPricing:
     """Test suite for LLM pricing configuration."""
@@ -424,6 +424,325 @@ class TestGeminiProvider:
         assert result.output_tokens == 0
 
 
+def _stream_context(items):
+    """Fake SDK stream: a context manager that iterates over items."""
+    stream = MagicMock()
+    stream.__enter__.return_value = iter(items)
+    return stream
+
+
+class TestProviderStreaming:
+    """Test suite for streamed provider responses."""
+
+    def test_anthropic_stream_yields_text_and_usage(self):
+        """Anthropic events should become text chunks with usage totals."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import AnthropicProvider
+        from heisenberg.llm.streaming import StreamCollector
+
+        # Given
+        events = [
+            SimpleNamespace(
+                type="message_start",
+                message=SimpleNamespace(usage=SimpleNamespace(input_tokens=120, output_tokens=1)),
+            ),
+            SimpleNamespace(type="content_block_start"),
+            SimpleNamespace(
+                type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="## Root")
+            ),
+            SimpleNamespace(
+                type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=" Cause")
+            ),
+            SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=4)),
+        ]
+        provider = AnthropicProvider(api_key="test-key")
+        mock_client = MagicMock()
+        mock_client.messages.create.return_value = _stream_context(events)
+
+        # When
+        with patch.object(provider, "_get_sync_client", return_value=mock_client):
+            collector = StreamCollector(provider.name, provider.model)
+            texts = [collector.add(chunk) for chunk in provider.stream("prompt")]
+
+        # Then
+        assert "".join(texts) == "## Root Cause"
+        result = collector.result()
+        assert (result.input_tokens, result.output_tokens) == (120, 4)
+        assert mock_client.messages.create.call_args.kwargs["stream"] is True
+
+    def test_anthropic_stream_closed_early_estimates_output(self):
+        """The message_start output placeholder must not count as final usage."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers.anthropic import _event_chunk
+        from heisenberg.llm.streaming import StreamCollector
+
+        # Given
+        events = [
+            SimpleNamespace(
+                type="message_start",
+                message=SimpleNamespace(usage=SimpleNamespace(input_tokens=120, output_tokens=1)),
+            ),
+            SimpleNamespace(
+                type="content_block_delta",
+                delta=SimpleNamespace(
+                    type="text_delta", text="## Root Cause Analysis\nThe login API times out."
+                ),
+            ),
+        ]
+        collector = StreamCollector("anthropic", "claude-sonnet-4-20250514")
+
+        # When (the stream stops before message_delta)
+        for event in events:
+            collector.add(_event_chunk(event))
+
+        # Then
+        result = collector.result()
+        assert result.input_tokens == 120
+        assert result.output_tokens > 1
+
+    def test_openai_stream_reads_final_usage_chunk(self, mocker):
+        """The usage-only final chunk should carry the token totals."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import OpenAIProvider
+
+        # Given
+        def delta(text):
+            choice = SimpleNamespace(delta=SimpleNamespace(content=text))
+            return SimpleNamespace(choices=[choice], usage=None)
+
+        usage = SimpleNamespace(prompt_tokens=80, completion_tokens=3)
+        chunks = [
+            delta("Root"),
+            delta(None),
+            delta(" cause"),
+            SimpleNamespace(choices=[], usage=usage),
+        ]
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = _stream_context(chunks)
+        mocker.patch("openai.OpenAI", return_value=mock_client)
+
+        # When
+        result = list(OpenAIProvider(api_key="test-key").stream("prompt"))
+
+        # Then
+        assert "".join(chunk.text for chunk in result) == "Root cause"
+        assert (result[-1].input_tokens, result[-1].output_tokens) == (80, 3)
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream_options"] == {"include_usage": True}
+
+    @pytest.mark.asyncio
+    async def test_gemini_stream_async(self, mocker):
+        """Gemini responses should stream with their running usage totals."""
+        from heisenberg.llm.providers import GeminiProvider
+
+        # Given
+        async def responses():
+            for text, output_tokens in (("Root", 1), (" cause", 2)):
+                response = MagicMock()
+                response.text = text
+                response.usage_metadata.prompt_token_count = 50
+                response.usage_metadata.candidates_token_count = output_tokens
+                yield response
+
+        mock_client = MagicMock()
+        mock_client.aio.models.generate_content_stream = AsyncMock(return_value=responses())
+        mocker.patch("google.genai.Client", return_value=mock_client)
+
+        # When
+        chunks = [chunk async for chunk in GeminiProvider(api_key="test-key").stream_async("p")]
+
+        # Then
+        assert [chunk.text for chunk in chunks] == ["Root", " cause"]
+        assert (chunks[-1].input_tokens, chunks[-1].output_tokens) == (50, 2)
+
+    def test_closing_stream_closes_connection(self):
+        """Stopping early should leave the SDK stream's context."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import AnthropicProvider
+
+        # Given
+        text = SimpleNamespace(
+            type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="x")
+        )
+        stream = _stream_context([text] * 10)
+        mock_client = MagicMock()
+        mock_client.messages.create.return_value = stream
+        provider = AnthropicProvider(api_key="test-key")
+
+        # When
+        with patch.object(provider, "_get_sync_client", return_value=mock_client):
+            chunks = provider.stream("prompt")
+            next(chunks)
+            chunks.close()
+
+        # Then
+        stream.__exit__.assert_called_once()
+
+
+class TestPromptCaching:
+    """Test suite for provider-side prompt caching."""
+
+    def test_anthropic_marks_system_prompt_for_caching(self):
+        """The system prompt should be a cache breakpoint and cache reads counted."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import AnthropicProvider
+
+        # Given
+        usage = SimpleNamespace(
+            input_tokens=50,
+            output_tokens=20,
+            cache_read_input_tokens=900,
+            cache_creation_input_tokens=0,
+        )
+        mock_client = MagicMock()
+        mock_client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text="answer")], usage=usage
+        )
+        provider = AnthropicProvider(api_key="test-key")
+
+        # When
+        with patch.object(provider, "_get_sync_client", return_value=mock_client):
+            result = provider.analyze("prompt", system_prompt="system")
+
+        # Then
+        system = mock_client.messages.create.call_args.kwargs["system"]
+        assert system == [
+            {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert (result.input_tokens, result.cached_input_tokens) == (950, 900)
+
+    def test_anthropic_caching_can_be_disabled(self):
+        """Without prompt caching the system prompt is sent as plain text."""
+        from heisenberg.llm.providers import AnthropicProvider
+
+        # Given
+        provider = AnthropicProvider(api_key="test-key", prompt_caching=False)
+
+        # When
+        kwargs = provider._build_kwargs("prompt", "system")
+
+        # Then
+        assert kwargs["system"] == "system"
+
+    def test_openai_sends_cache_key_and_reads_cached_tokens(self, mocker):
+        """Requests sharing a system prompt should share a prompt_cache_key."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import OpenAIProvider
+
+        # Given
+        usage = SimpleNamespace(
+            prompt_tokens=2000,
+            completion_tokens=10,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        )
+        message = SimpleNamespace(content="answer")
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=message)], usage=usage
+        )
+        mocker.patch("openai.OpenAI", return_value=mock_client)
+        provider = OpenAIProvider(api_key="test-key")
+
+        # When
+        result = provider.analyze("first", system_prompt="system")
+        provider.analyze("second", system_prompt="system")
+
+        # Then
+        first, second = (c.kwargs for c in mock_client.chat.completions.create.call_args_list)
+        assert first["extra_body"]["prompt_cache_key"] == second["extra_body"]["prompt_cache_key"]
+        assert result.cached_input_tokens == 1536
+
+    def test_anthropic_marks_stable_user_prefix(self):
+        """The failures and context before the run summary should be a breakpoint."""
+        from heisenberg.llm.providers import AnthropicProvider
+
+        # Given
+        provider = AnthropicProvider(api_key="test-key")
+
+        # When
+        kwargs = provider._build_kwargs(
+            "# Instructions\n\n## Failed Tests\nTimeout\n\n## Summary\n- Run ID: 7", "system"
+        )
+
+        # Then
+        assert kwargs["messages"][0]["content"] == [
+            {
+                "type": "text",
+                "text": "# Instructions\n\n## Failed Tests\nTimeout",
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": "## Summary\n- Run ID: 7"},
+        ]
+
+    def test_gemini_caches_repeated_prompt_prefix(self, mocker):
+        """A prefix sent twice should be cached and later requests send only the summary."""
+        from types import SimpleNamespace
+
+        from heisenberg.llm.providers import GeminiProvider
+
+        # Given
+        response = MagicMock()
+        response.text = "answer"
+        response.usage_metadata.prompt_token_count = 6000
+        response.usage_metadata.candidates_token_count = 10
+        response.usage_metadata.cached_content_token_count = 5000
+        mock_client = MagicMock()
+        mock_client.caches.create.return_value = SimpleNamespace(name="cachedContents/abc")
+        mock_client.models.generate_content.return_value = response
+        mocker.patch("google.genai.Client", return_value=mock_client)
+        provider = GeminiProvider(api_key="test-key")
+        prefix = "## Failed Tests\n" + "Timeout waiting for selector. " * 2000
+
+        # When
+        for run_id in range(3):
+            result = provider.analyze(
+                f"{prefix}\n\n## Summary\n- Run ID: {run_id}", system_prompt="sys"
+            )
+
+        # Then: first use inline, cached on the second, referenced afterwards
+        mock_client.caches.create.assert_called_once()
+        cache_config = mock_client.caches.create.call_args.kwargs["config"]
+        assert cache_config.contents[0].parts[0].text == prefix
+        first, second, third = (
+            c.kwargs for c in mock_client.models.generate_content.call_args_list
+        )
+        assert first["contents"].startswith(prefix)
+        assert first["config"].system_instruction == "sys"
+        assert third["contents"] == "## Summary\n- Run ID: 2"
+        assert third["config"].cached_content == "cachedContents/abc"
+        assert third["config"].system_instruction is None
+        assert result.cached_input_tokens == 5000
+
+    def test_gemini_small_or_failed_caches_send_prompt(self, mocker):
+        """Small prefixes skip explicit caching; failed creation falls back."""
+        from heisenberg.llm.providers import GeminiProvider
+
+        # Given
+        mock_client = MagicMock()
+        mock_client.caches.create.side_effect = RuntimeError("too small")
+        mock_client.models.generate_content.return_value = MagicMock(text="answer")
+        mocker.patch("google.genai.Client", return_value=mock_client)
+        provider = GeminiProvider(api_key="test-key")
+        small = "short\n\n## Summary\n- Run ID: 1"
+        large = "long " * 6000 + "\n\n## Summary\n- Run ID: 1"
+
+        # When
+        for prompt in (small, small, large, large, large):
+            provider.analyze(prompt, system_prompt="sys")
+
+        # Then: one failed attempt, remembered until the TTL passes
+        assert mock_client.caches.create.call_count == 1
+        kwargs = mock_client.models.generate_content.call_args.kwargs
+        assert kwargs["contents"] == large
+        assert kwargs["config"].system_instruction == "sys"
+
+
 class TestProviderFactory:
     """Test suite for LLM provider factory."""
 
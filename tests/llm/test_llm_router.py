@@ -329,3 +329,198 @@ class TestLLMRouterAllFail:
 
         with pytest.raises(httpx.ConnectError, match="API down"):
             await router.analyze_async(system_prompt="test", user_prompt="test")
+
+
+def _slow_provider(name: str, delay: float, error: Exception | None = None):
+    """Provider whose async call takes ``delay`` seconds, tracking cancellation."""
+    import asyncio
+
+    from heisenberg.llm.providers.base import LLMProvider
+
+    provider = MagicMock(spec=LLMProvider)
+    provider.name = name
+    provider.cancelled = False
+
+    async def analyze_async(user_prompt, *, system_prompt=None):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            provider.cancelled = True
+            raise
+        if error is not None:
+            raise error
+        return make_llm_analysis(content=name, provider=name)
+
+    provider.analyze_async = AsyncMock(side_effect=analyze_async)
+    return provider
+
+
+class TestHedgedRouting:
+    """Test suite for hedged requests in LLMRouter.analyze_async."""
+
+    @staticmethod
+    def _policy(**overrides):
+        from heisenberg.llm.hedging import HedgingPolicy
+
+        values = {"initial_delay": 0.05, "min_delay": 0.0}
+        values.update(overrides)
+        return HedgingPolicy(**values)
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """A slow primary should lose to the hedge and be cancelled."""
+        from heisenberg.llm.router import LLMRouter
+
+        # Given
+        primary = _slow_provider("primary", delay=5.0)
+        fallback = _slow_provider("fallback", delay=0.01)
+        router = LLMRouter([primary, fallback], hedging=self._policy())
+
+        # When
+        result = await router.analyze_async("prompt")
+
+        # Then
+        assert result.provider == "fallback"
+        assert primary.cancelled
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """Answers within the hedge delay should not start the fallback."""
+        from heisenberg.llm.router import LLMRouter
+
+        # Given
+        primary = _slow_provider("primary", delay=0.0)
+        fallback = _slow_provider("fallback", delay=0.0)
+        router = LLMRouter([primary, fallback], hedging=self._policy())
+
+        # When
+        result = await router.analyze_async("prompt")
+
+        # Then
+        assert result.provider == "primary"
+        fallback.analyze_async.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_primary_can_still_win_after_hedge(self):
+        """The first answer should win even if it comes from the primary."""
+        from heisenberg.llm.router import LLMRouter
+
+        # Given
+        primary = _slow_provider("primary", delay=0.1)
+        fallback = _slow_provider("fallback", delay=5.0)
+        router = LLMRouter([primary, fallback], hedging=self._policy())
+
+        # When
+        result = await router.analyze_async("prompt")
+
+        # Then
+        assert result.provider == "primary"
+        fallback.analyze_async.assert_called_once()
+        assert fallback.cancelled
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_waits_for_primary(self):
+        """A failing hedge should not abandon the running primary."""
+        import httpx
+
+        from heisenberg.llm.router import LLMRouter
+
+        # Given
+        primary = _slow_provider("primary", delay=0.1)
+        fallback = _slow_provider("fallback", delay=0.0, error=httpx.ConnectError("down"))
+        router = LLMRouter([primary, fallback], hedging=self._policy())
+
+        # When
+        result = await router.analyze_async("prompt")
+
+        # Then
+        assert result.provider == "primary"
+
+    @pytest.mark.asyncio
+    async def test_cost_cap_limits_hedges(self):
+        """Hedges beyond the allowed ratio should not be sent."""
+        from heisenberg.llm.router import LLMRouter
+
+        # Given: no ratio and a burst of one allows a single hedge
+        primary = _slow_provider("primary", delay=0.1)
+        fallback = _slow_provider("fallback", delay=5.0)
+        router = LLMRouter([primary, fallback], hedging=self._policy(max_hedge_ratio=0.0))
+
+        # When
+        for _ in range(3):
+            await router.analyze_async("prompt")
+
+        # Then
+        assert fallback.analyze_async.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_primaries_do_not_lower_delay(self):
+        """Primaries that lose to a hedge should still count as slow latencies."""
+        import asyncio
+
+        from heisenberg.llm.router import LLMRouter
+
+        # Given: every other primary call is slow and loses to the hedge
+        primary = _slow_provider("primary", delay=0.0)
+        delays = iter([0.0, 5.0] * 4)
+
+        async def analyze_async(user_prompt, *, system_prompt=None):
+            await asyncio.sleep(next(delays))
+            return make_llm_analysis(content="primary", provider="primary")
+
+        primary.analyze_async = AsyncMock(side_effect=analyze_async)
+        fallback = _slow_provider("fallback", delay=0.01)
+        policy = self._policy(percentile=0.75, min_samples=4, max_hedge_ratio=1.0)
+        router = LLMRouter([primary, fallback], hedging=policy)
+
+        # When
+        providers = [(await router.analyze_async("prompt")).provider for _ in range(8)]
+
+        # Then
+        assert providers == ["primary", "fallback"] * 4
+        assert router._hedger.delay() >= policy.initial_delay
+
+
+class TestHedger:
+    """Test suite for hedge delay and budget."""
+
+    def test_delay_follows_latency_percentile(self):
+        """The delay should be the configured percentile of recent latencies."""
+        from heisenberg.llm.hedging import Hedger, HedgingPolicy
+
+        # Given
+        hedger = Hedger(HedgingPolicy(percentile=0.9, min_samples=10, min_delay=0.0))
+
+        # When
+        for seconds in range(1, 11):
+            hedger.observe(float(seconds))
+
+        # Then
+        assert hedger.delay() == 9.0
+
+    def test_initial_delay_until_enough_samples(self):
+        """Too few latencies should fall back to the initial delay."""
+        from heisenberg.llm.hedging import Hedger, HedgingPolicy
+
+        # Given
+        hedger = Hedger(HedgingPolicy(initial_delay=15.0, min_samples=5))
+        hedger.observe(2.0)
+
+        # Then
+        assert hedger.delay() == 15.0
+
+    def test_budget_grows_with_requests(self):
+        """Hedges should be allowed at the configured ratio plus the burst."""
+        from heisenberg.llm.hedging import Hedger, HedgingPolicy
+
+        # Given
+        hedger = Hedger(HedgingPolicy(max_hedge_ratio=0.1, burst=1))
+
+        # When
+        allowed = 0
+        for _ in range(20):
+            hedger.start_request()
+            allowed += hedger.try_hedge()
+
+        # Then: one burst hedge plus one per ten requests
+        assert allowed == 3
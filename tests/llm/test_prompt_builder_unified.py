@@ -1,5 +1,7 @@
 """Tests for prompt_builder unified model functions."""
 
+from dataclasses import replace
+
 import pytest
 
 from heisenberg.core.models import (
@@ -11,11 +13,13 @@ from heisenberg.core.models import (
 )
 from heisenberg.integrations.docker import ContainerLogs, LogEntry
 from heisenberg.llm.prompts import (
+    ANALYSIS_INSTRUCTIONS,
     _build_container_logs_section,
-    _build_prompt_header,
+    _build_run_summary,
     _build_unified_user_prompt,
     _format_failure_for_prompt,
     build_unified_prompt,
+    split_cacheable_prefix,
 )
 
 
@@ -129,6 +133,32 @@ class TestBuildUnifiedPrompt:
         assert "should not crash" in user
         assert "Timeout exceeded" in user
 
+    def test_same_errors_are_shown_once(self, sample_unified_run):
+        """Failures sharing an error should collapse into one block with a count."""
+        # Given
+        template = sample_unified_run.failures[0]
+        sample_unified_run.failures = [
+            replace(
+                template,
+                test_id=f"test-{i}",
+                test_title=f"cascade {i}",
+                file_path=f"tests/page{i}.spec.ts",
+                error=ErrorInfo(
+                    message=f"GET /api/users/{i} returned 500 after {i * 10}ms",
+                    stack_trace=f"at tests/page{i}.spec.ts:{i}:3",
+                ),
+            )
+            for i in range(40)
+        ]
+
+        # When
+        _, user = build_unified_prompt(sample_unified_run)
+
+        # Then
+        assert user.count("#### Error") == 1
+        assert "Same error in 39 other tests:** cascade 1 (tests/page1.spec.ts)" in user
+        assert "(+29 more)" in user
+
 
 class TestBuildUnifiedUserPrompt:
     """Tests for _build_unified_user_prompt function."""
@@ -188,12 +218,48 @@ class TestBuildUnifiedUserPrompt:
         assert len(prompt) > 100  # Has meaningful content
 
 
-class TestBuildPromptHeader:
-    """Tests for _build_prompt_header helper."""
+class TestPromptLayout:
+    """Tests for the cache-friendly order of prompt sections."""
+
+    def test_stable_content_first_run_details_last(self, sample_unified_run):
+        """Two runs of the same failure should share everything but the summary."""
+        # Given
+        other_run = replace(sample_unified_run, run_id="run-456", total_tests=11)
+
+        # When
+        _, first = build_unified_prompt(sample_unified_run)
+        _, second = build_unified_prompt(other_run)
+
+        # Then
+        prefix = first.split("## Summary")[0]
+        assert second.startswith(prefix)
+        assert "## Failed Tests" in prefix
+        assert first.startswith(ANALYSIS_INSTRUCTIONS)
+
+    def test_cacheable_prefix_excludes_run_summary(self, sample_unified_run):
+        """The prefix providers cache should be shared by runs of the same failure."""
+        # Given
+        other_run = replace(sample_unified_run, run_id="run-456", total_tests=11)
+        _, first = build_unified_prompt(sample_unified_run)
+        _, second = build_unified_prompt(other_run)
+
+        # When
+        first_prefix, first_summary = split_cacheable_prefix(first)
+        second_prefix, second_summary = split_cacheable_prefix(second)
+
+        # Then
+        assert first_prefix == second_prefix
+        assert f"{first_prefix}\n\n{first_summary}" == first
+        assert "run-456" in second_summary
+        assert split_cacheable_prefix("no summary") == ("no summary", "")
+
+
+class TestBuildRunSummary:
+    """Tests for _build_run_summary helper."""
 
     def test_includes_summary_section(self, sample_unified_run):
         """Should include summary section with test counts."""
-        header = _build_prompt_header(sample_unified_run)
+        header = _build_run_summary(sample_unified_run)
 
         assert "Summary" in header
         assert "10" in header  # total tests
@@ -202,19 +268,19 @@ class TestBuildPromptHeader:
 
     def test_includes_repository_when_present(self, sample_unified_run):
         """Should include repository when set."""
-        header = _build_prompt_header(sample_unified_run)
+        header = _build_run_summary(sample_unified_run)
 
         assert "owner/repo" in header
 
     def test_includes_branch_when_present(self, sample_unified_run):
         """Should include branch when set."""
-        header = _build_prompt_header(sample_unified_run)
+        header = _build_run_summary(sample_unified_run)
 
         assert "main" in header
 
     def test_includes_run_id_when_present(self, sample_unified_run):
         """Should include run ID when set."""
-        header = _build_prompt_header(sample_unified_run)
+        header = _build_run_summary(sample_unified_run)
 
         assert "run-123" in header
 
@@ -233,7 +299,7 @@ class TestBuildPromptHeader:
             skipped_tests=0,
             failures=[],
         )
-        header = _build_prompt_header(run)
+        header = _build_run_summary(run)
 
         assert "5" in header
         assert "Repository" not in header
@@ -339,3 +405,159 @@ class TestBuildContainerLogsSection:
         result = _build_container_logs_section(logs)
 
         assert "Database connection failed" in result
+
+    def test_trims_entries_to_token_budget(self):
+        """With a token counter, lines beyond the budget should be omitted."""
+        from datetime import datetime
+
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # Given
+        entries = [
+            LogEntry(
+                timestamp=datetime(2024, 1, 15, 10, 30, i),
+                message=f"request {i} {chr(97 + i % 26) * (i + 1)}",
+            )
+            for i in range(40)
+        ]
+        logs = {"api": ContainerLogs(container_name="api", entries=entries)}
+
+        # When
+        result = _build_container_logs_section(
+            logs, token_counter=HeuristicTokenCounter(), token_budget=100
+        )
+
+        # Then
+        assert "request 0 a" in result
+        assert "request 39 " not in result
+        assert "lines omitted to fit token budget" in result
+
+    def test_quiet_containers_leave_budget_to_busy_ones(self):
+        """A container with few lines should not cap the others at an equal share."""
+        from datetime import datetime
+
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # Given
+        busy = [
+            LogEntry(timestamp=datetime(2024, 1, 15, 10, 30, i), message=f"GET /api/{i} {'x' * i}")
+            for i in range(40)
+        ]
+        quiet = [LogEntry(timestamp=datetime(2024, 1, 15, 10, 30, 0), message="db ready")]
+        logs = {
+            "api": ContainerLogs(container_name="api", entries=busy),
+            "db": ContainerLogs(container_name="db", entries=quiet),
+        }
+        counter = HeuristicTokenCounter()
+
+        # When
+        result = _build_container_logs_section(logs, token_counter=counter, token_budget=200)
+        equal_share = _build_container_logs_section(
+            {"api": logs["api"]}, token_counter=counter, token_budget=100
+        )
+
+        # Then
+        assert "db ready" in result
+        api_lines = result.split("### Container: db")[0].count("GET /api/")
+        assert api_lines > equal_share.count("GET /api/")
+
+
+class TestPromptTokenBudget:
+    """Tests for fitting the whole prompt into an input-token budget."""
+
+    @staticmethod
+    def _job_logs(lines: int) -> str:
+        body = "\n".join(
+            f"step {i}: ERROR request {i} failed with status 500" for i in range(lines)
+        )
+        return f"## GitHub Actions Job Logs\n```\n{body}\n```"
+
+    def test_small_prompt_is_unchanged(self, sample_unified_run):
+        """A prompt under budget should match the unbudgeted prompt."""
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # When
+        _, budgeted = build_unified_prompt(
+            sample_unified_run,
+            job_logs_context=self._job_logs(5),
+            token_counter=HeuristicTokenCounter(),
+        )
+        _, plain = build_unified_prompt(sample_unified_run, job_logs_context=self._job_logs(5))
+
+        # Then
+        assert budgeted == plain
+
+    def test_prompt_fits_input_budget(self, sample_unified_run):
+        """Oversized context should be trimmed so the prompts fit the budget."""
+        from heisenberg.llm.budget import count_tokens
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # Given
+        counter = HeuristicTokenCounter()
+
+        # When
+        system, user = build_unified_prompt(
+            sample_unified_run,
+            job_logs_context=self._job_logs(2000),
+            trace_context="## Trace\n" + "\n".join(f"GET /api/{i} 500" for i in range(2000)),
+            token_counter=counter,
+            input_token_budget=3000,
+        )
+
+        # Then
+        total = count_tokens(system.split("\n"), counter) + count_tokens(user.split("\n"), counter)
+        assert total <= 3000
+        assert "Expected true but got false" in user
+        assert "lines omitted to fit token budget" in user
+        assert user.startswith(ANALYSIS_INSTRUCTIONS)
+        assert user.endswith("- Run ID: run-123")
+
+    def test_short_sections_release_budget_to_long_ones(self, sample_unified_run):
+        """A short section should be kept whole while a long one absorbs the rest."""
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # When
+        _, user = build_unified_prompt(
+            sample_unified_run,
+            job_logs_context=self._job_logs(2000),
+            screenshot_context="## Screenshots\nLogin page shows a spinner",
+            token_counter=HeuristicTokenCounter(),
+            input_token_budget=3000,
+        )
+
+        # Then
+        assert "Login page shows a spinner" in user
+        assert "step 100:" in user
+
+    def test_trailing_failures_are_dropped_first(self, sample_unified_run):
+        """Failures that do not fit should be summarized by a note."""
+        from heisenberg.llm.tokens import HeuristicTokenCounter
+
+        # Given
+        template = sample_unified_run.failures[0]
+        # Distinct errors (differing in letters, since numbers are normalized)
+        names = ["".join(chr(ord("a") + int(d)) for d in f"{i:03d}") for i in range(100)]
+        sample_unified_run.failures = [
+            UnifiedFailure(
+                test_id=f"test-{i}",
+                file_path=template.file_path,
+                test_title=f"failing test number {i}",
+                suite_path=template.suite_path,
+                error=ErrorInfo(
+                    message=f"Expected {name} but got {name}Value",
+                    stack_trace="\n".join(f"at {name}{j} (app.js:{j})" for j in range(20)),
+                ),
+                metadata=template.metadata,
+            )
+            for i, name in enumerate(names)
+        ]
+
+        # When
+        _, user = build_unified_prompt(
+            sample_unified_run, token_counter=HeuristicTokenCounter(), input_token_budget=3000
+        )
+
+        # Then
+        assert "failing test number 0" in user
+        assert "failing test number 99" not in user
+        assert "more failed tests omitted to fit token budget" in user
@@ -0,0 +1,195 @@
+"""Tests for provider circuit breakers and health-based routing."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from heisenberg.llm.health import CircuitBreakerPolicy, CircuitState, ProviderHealth
+from heisenberg.llm.providers.base import LLMProvider
+from heisenberg.llm.router import LLMRouter
+from tests.factories import make_llm_analysis
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _provider(name: str, error: Exception | None = None) -> MagicMock:
+    provider = MagicMock(spec=LLMProvider)
+    provider.name = name
+    if error is not None:
+        provider.analyze.side_effect = error
+    else:
+        provider.analyze.return_value = make_llm_analysis(provider=name)
+    return provider
+
+
+POLICY = CircuitBreakerPolicy(min_calls=2, failure_rate_threshold=0.5, open_seconds=30.0)
+
+
+class TestProviderHealth:
+    """Test suite for ProviderHealth."""
+
+    def test_opens_at_failure_rate(self):
+        """The circuit should open once the error rate crosses the threshold."""
+        # Given
+        health = ProviderHealth(POLICY, clock=FakeClock())
+
+        # When
+        health.record_success(1.0)
+        health.record_failure()
+
+        # Then
+        assert health.state is CircuitState.OPEN
+        assert not health.allow_request()
+        assert health.score() == 0.0
+
+    def test_half_open_admits_one_probe(self):
+        """After the cool-down a single probe should be let through."""
+        # Given
+        clock = FakeClock()
+        health = ProviderHealth(POLICY, clock=clock)
+        health.record_failure()
+        health.record_failure()
+
+        # When
+        clock.now = 30.0
+
+        # Then
+        assert health.state is CircuitState.HALF_OPEN
+        assert health.allow_request()
+        assert not health.allow_request()
+
+    def test_probe_outcome_closes_or_reopens(self):
+        """A successful probe closes the circuit; a failed one reopens it."""
+        # Given
+        clock = FakeClock()
+        health = ProviderHealth(POLICY, clock=clock)
+        health.record_failure()
+        health.record_failure()
+        clock.now = 30.0
+        health.allow_request()
+
+        # When
+        health.record_failure()
+
+        # Then
+        assert health.state is CircuitState.OPEN
+
+        # When: the next probe succeeds
+        clock.now = 60.0
+        health.allow_request()
+        health.record_success(1.0)
+
+        # Then
+        assert health.state is CircuitState.CLOSED
+        assert health.score() == 1.0
+
+    def test_slow_calls_count_as_errors(self):
+        """Successful calls slower than slow_call_seconds should hurt the score."""
+        # Given
+        health = ProviderHealth(
+            CircuitBreakerPolicy(min_calls=10, slow_call_seconds=5.0), clock=FakeClock()
+        )
+
+        # When
+        health.record_success(1.0)
+        health.record_success(50.0)
+
+        # Then
+        assert health.score() == 0.5
+
+    def test_old_outcomes_expire(self):
+        """Outcomes outside the time window should not count."""
+        # Given
+        clock = FakeClock()
+        health = ProviderHealth(CircuitBreakerPolicy(min_calls=10, window_seconds=60), clock=clock)
+        health.record_failure()
+
+        # When
+        clock.now = 61.0
+
+        # Then
+        assert health.score() == 1.0
+
+
+class TestHealthRouting:
+    """Test suite for LLMRouter with circuit breakers."""
+
+    def test_open_circuit_skips_provider(self):
+        """A provider with an open circuit should not be called."""
+        # Given
+        primary = _provider("primary")
+        fallback = _provider("fallback")
+        router = LLMRouter([primary, fallback], circuit_breaker=POLICY)
+        assert router.health is not None
+        router.health[0].record_failure()
+        router.health[0].record_failure()
+
+        # When
+        result = router.analyze("prompt")
+
+        # Then
+        assert result.provider == "fallback"
+        primary.analyze.assert_not_called()
+
+    def test_healthier_provider_is_tried_first(self):
+        """Providers should be ordered by health score."""
+        # Given
+        primary = _provider("primary")
+        fallback = _provider("fallback")
+        router = LLMRouter([primary, fallback], circuit_breaker=CircuitBreakerPolicy(min_calls=100))
+        assert router.health is not None
+        router.health[0].record_failure()
+
+        # When
+        result = router.analyze("prompt")
+
+        # Then
+        assert result.provider == "fallback"
+        primary.analyze.assert_not_called()
+
+    def test_all_circuits_open_fails_fast(self):
+        """With every circuit open the router should raise without calling."""
+        # Given
+        primary = _provider("primary", httpx.ConnectError("down"))
+        router = LLMRouter([primary], circuit_breaker=POLICY)
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                router.analyze("prompt")
+
+        # When / Then
+        with pytest.raises(RuntimeError, match="circuits open"):
+            router.analyze("prompt")
+        assert primary.analyze.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_async_records_failures(self):
+        """Async failures should lower the provider's health score."""
+        from unittest.mock import AsyncMock
+
+        # Given
+        primary = _provider("primary")
+        primary.analyze_async = AsyncMock(side_effect=httpx.ConnectError("down"))
+        fallback = _provider("fallback")
+        fallback.analyze_async = AsyncMock(return_value=make_llm_analysis(provider="fallback"))
+        router = LLMRouter([primary, fallback], circuit_breaker=POLICY)
+
+        # When
+        for _ in range(3):
+            await router.analyze_async("prompt")
+
+        # Then: after one failure the primary drops behind the fallback
+        assert primary.analyze_async.call_count == 1
+        assert fallback.analyze_async.call_count == 3
+        assert router.health is not None
+        assert router.health[0].score() == 0.0
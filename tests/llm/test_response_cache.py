@@ -0,0 +1,242 @@
+"""Tests for the LLM response cache."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from heisenberg.llm.cache import (
+    CachedProvider,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    normalize_prompt,
+    prompt_fingerprint,
+)
+from heisenberg.llm.providers.base import LLMProvider
+from heisenberg.llm.router import LLMRouter
+from tests.factories import make_llm_analysis
+
+
+def _provider(name: str = "anthropic") -> MagicMock:
+    provider = MagicMock(spec=LLMProvider)
+    provider.name = name
+    provider.analyze.return_value = make_llm_analysis(content="diagnosis", provider=name)
+    provider.analyze_async = AsyncMock(
+        return_value=make_llm_analysis(content="async diagnosis", provider=name)
+    )
+    return provider
+
+
+class TestPromptFingerprint:
+    """Test suite for prompt normalization and keys."""
+
+    def test_strips_volatile_values(self):
+        """Run IDs, SHAs, UUIDs and timestamps should not change the key."""
+        # Given
+        first = (
+            "Run 12345678901 at 2024-01-15T10:30:00.123Z (sha 3f2a9c1e8b7d6a5f4e3d)\n"
+            "request 0b9f8e0c-3d1a-4b6e-9f2a-1c2d3e4f5a6b failed at 10:30:01"
+        )
+        second = (
+            "Run 12345679999 at 2024-02-01T08:00:00Z (sha 9a8b7c6d5e4f3a2b1c0d)\n"
+            "request 5e6f7a8b-1c2d-4e3f-8a9b-0c1d2e3f4a5b failed at 08:00:02  "
+        )
+
+        # Then
+        assert normalize_prompt(first) == normalize_prompt(second)
+        assert prompt_fingerprint("anthropic", "m", 0.3, first) == prompt_fingerprint(
+            "anthropic", "m", 0.3, second
+        )
+
+    def test_keeps_meaningful_numbers(self):
+        """Durations and line numbers should stay part of the key."""
+        assert normalize_prompt("Timeout 30000ms at login.spec.ts:42") == (
+            "Timeout 30000ms at login.spec.ts:42"
+        )
+
+    def test_request_parameters_change_key(self):
+        """Provider, model, temperature and system prompt should all count."""
+        # Given
+        base = prompt_fingerprint("anthropic", "m", 0.3, "prompt", "system")
+
+        # Then
+        assert base != prompt_fingerprint("openai", "m", 0.3, "prompt", "system")
+        assert base != prompt_fingerprint("anthropic", "m2", 0.3, "prompt", "system")
+        assert base != prompt_fingerprint("anthropic", "m", 0.7, "prompt", "system")
+        assert base != prompt_fingerprint("anthropic", "m", 0.3, "prompt", "other")
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache and its backends."""
+
+    def test_hit_reports_zero_cost(self):
+        """Cached responses should carry no token usage."""
+        # Given
+        cache = ResponseCache([MemoryCacheBackend()])
+        cache.put("key", make_llm_analysis(content="answer", input_tokens=900, model="m"))
+
+        # When
+        result = cache.get("key")
+
+        # Then
+        assert result is not None
+        assert (result.content, result.model, result.cached) == ("answer", "m", True)
+        assert result.estimated_cost == 0
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_expired_entries_are_dropped(self, monkeypatch):
+        """Entries older than the TTL should miss and be deleted."""
+        # Given
+        backend = MemoryCacheBackend()
+        cache = ResponseCache([backend], ttl_seconds=60)
+        monkeypatch.setattr("heisenberg.llm.cache.time.time", lambda: 1000.0)
+        cache.put("key", make_llm_analysis())
+
+        # When
+        monkeypatch.setattr("heisenberg.llm.cache.time.time", lambda: 1061.0)
+
+        # Then
+        assert cache.get("key") is None
+        assert backend.get("key") is None
+
+    def test_shared_hit_fills_local_backend(self):
+        """A hit in a later backend should be copied into earlier ones."""
+        # Given
+        local, shared = MemoryCacheBackend(), MemoryCacheBackend()
+        ResponseCache([shared]).put("key", make_llm_analysis(content="shared"))
+
+        # When
+        result = ResponseCache([local, shared]).get("key")
+
+        # Then
+        assert result is not None and result.content == "shared"
+        assert local.get("key") is not None
+
+    def test_broken_backend_is_a_miss(self):
+        """Backend errors should never fail the analysis."""
+        # Given
+        backend = MagicMock()
+        backend.get.side_effect = ConnectionError("down")
+        backend.set.side_effect = ConnectionError("down")
+        cache = ResponseCache([backend])
+
+        # When
+        cache.put("key", make_llm_analysis())
+
+        # Then
+        assert cache.get("key") is None
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        """The memory backend should keep at most max_entries."""
+        # Given
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", {"n": 1})
+        backend.set("b", {"n": 2})
+        backend.get("a")
+
+        # When
+        backend.set("c", {"n": 3})
+
+        # Then
+        assert backend.get("b") is None
+        assert backend.get("a") is not None
+
+    def test_disk_backend_round_trip(self, tmp_path):
+        """Entries should survive across backend instances."""
+        # Given
+        ResponseCache([DiskCacheBackend(tmp_path)]).put("ab12", make_llm_analysis(content="x"))
+
+        # When
+        result = ResponseCache.default(tmp_path).get("ab12")
+
+        # Then
+        assert result is not None and result.content == "x"
+
+    def test_disk_backend_evicts_oldest_over_size_limit(self, tmp_path):
+        """Writes should evict least recently used files beyond max_bytes."""
+        # Given
+        backend = DiskCacheBackend(tmp_path, max_bytes=250)
+        backend.set("aa01", {"payload": "x" * 100})
+        old = tmp_path / "aa" / "aa01.json"
+        os.utime(old, (1, 1))
+
+        # When
+        backend.set("bb02", {"payload": "y" * 100})
+        backend.set("cc03", {"payload": "z" * 100})
+
+        # Then
+        assert backend.get("aa01") is None
+        assert backend.get("cc03") is not None
+
+
+class TestCachedProvider:
+    """Test suite for CachedProvider."""
+
+    def test_second_call_is_served_from_cache(self):
+        """Repeated prompts should not call the provider again."""
+        # Given
+        provider = _provider()
+        cached = CachedProvider(provider, ResponseCache([MemoryCacheBackend()]))
+
+        # When
+        first = cached.analyze("Run 123456789012 failed", system_prompt="sys")
+        second = cached.analyze("Run 123456789099 failed", system_prompt="sys")
+
+        # Then
+        provider.analyze.assert_called_once()
+        assert first.cached is False
+        assert second.cached is True
+        assert second.content == "diagnosis"
+
+    @pytest.mark.asyncio
+    async def test_async_calls_share_the_cache(self):
+        """Async responses should be cached under the same key."""
+        # Given
+        provider = _provider()
+        cached = CachedProvider(provider, ResponseCache([MemoryCacheBackend()]))
+
+        # When
+        await cached.analyze_async("prompt")
+        result = cached.analyze("prompt")
+
+        # Then
+        provider.analyze.assert_not_called()
+        assert result.content == "async diagnosis"
+
+
+class TestRouterCache:
+    """Test suite for LLMRouter with a response cache."""
+
+    def test_cached_fallback_answer_skips_primary(self):
+        """A cached answer from any provider should avoid all calls."""
+        # Given
+        primary, fallback = _provider("anthropic"), _provider("openai")
+        cache = ResponseCache([MemoryCacheBackend()])
+        cache.put(cache.key_for(fallback, "prompt"), make_llm_analysis(content="from openai"))
+        router = LLMRouter([primary, fallback], cache=cache)
+
+        # When
+        result = router.analyze("prompt")
+
+        # Then
+        assert result.content == "from openai"
+        primary.analyze.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stores_answer_of_successful_provider(self):
+        """Responses should be cached under the provider that answered."""
+        # Given
+        primary = _provider("anthropic")
+        cache = ResponseCache([MemoryCacheBackend()])
+        router = LLMRouter([primary], cache=cache)
+
+        # When
+        await router.analyze_async("prompt", system_prompt="sys")
+        result = await router.analyze_async("prompt", system_prompt="sys")
+
+        # Then
+        primary.analyze_async.assert_awaited_once()
+        assert result.cached is True
@@ -6,14 +6,20 @@ from Playwright test failures using vision-capable LLMs.
 
 from __future__ import annotations
 
+import asyncio
 import base64
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
+from heisenberg.llm.cache import MemoryCacheBackend, ResponseCache
 from heisenberg.llm.vision import (
     ScreenshotAnalyzer,
     ScreenshotContext,
     extract_screenshots_from_artifact,
 )
+from heisenberg.llm.vision.screenshots import parse_screenshot_sections
+from tests.factories import make_llm_analysis
 
 
 class TestScreenshotExtraction:
@@ -193,6 +199,234 @@ class TestScreenshotAnalyzer:
         assert "describe" in prompt.lower() or "analyze" in prompt.lower()
 
 
+class _SlowVisionProvider:
+    """Vision provider tracking concurrent calls."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def analyze_with_image_async(self, user_prompt, image_data, mime_type="image/png"):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return make_llm_analysis(content=f"saw {image_data.decode()}")
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncScreenshotAnalyzer:
+    """Tests for concurrent screenshot analysis."""
+
+    @pytest.mark.asyncio
+    @patch("google.genai.Client")
+    async def test_gemini_async_vision_call(self, mock_client_class):
+        """The async path should use the SDK's async client."""
+        # Given
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.text = "A login form with an error banner."
+        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
+        mock_client_class.return_value = mock_client
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+
+        # When
+        result = await analyzer.analyze_async(ScreenshotContext("t", "f.ts", b"png", None))
+
+        # Then
+        assert result.description == "A login form with an error banner."
+        mock_client.aio.models.generate_content.assert_awaited_once()
+        mock_client.models.generate_content.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_is_concurrent_and_bounded(self):
+        """Screenshots should be analyzed in parallel, keeping input order."""
+        # Given
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+        provider = _SlowVisionProvider()
+        analyzer._gemini_provider = provider
+        screenshots = [
+            ScreenshotContext(f"t{i}", "f.ts", f"png{i}".encode(), None) for i in range(7)
+        ]
+
+        # When
+        results = await analyzer.analyze_batch_async(
+            screenshots, max_screenshots=6, max_concurrency=3
+        )
+
+        # Then
+        assert provider.max_in_flight == 3
+        assert [r.description for r in results[:6]] == [f"saw png{i}" for i in range(6)]
+        assert results[6].description == "[Screenshot not analyzed: limit reached]"
+
+    @pytest.mark.asyncio
+    async def test_slow_screenshot_times_out(self):
+        """A stuck vision call should not hold up the batch."""
+        # Given
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+        analyzer._gemini_provider = _SlowVisionProvider(delay=5)
+
+        # When
+        results = await analyzer.analyze_batch_async(
+            [ScreenshotContext("t", "f.ts", b"png", None)], timeout=0.01
+        )
+
+        # Then
+        assert results[0].description == "[Screenshot analysis timed out after 0s]"
+
+
+class TestScreenshotDescriptionCache:
+    """Tests for caching descriptions by image digest."""
+
+    @pytest.mark.asyncio
+    async def test_same_image_is_described_once(self):
+        """A screenshot seen before should be answered from the cache."""
+        # Given
+        cache = ResponseCache([MemoryCacheBackend()])
+        provider = _SlowVisionProvider(delay=0)
+        first = ScreenshotAnalyzer(provider="google", api_key="test-key", cache=cache)
+        second = ScreenshotAnalyzer(provider="google", api_key="test-key", cache=cache)
+        first._gemini_provider = second._gemini_provider = provider
+        provider.analyze_with_image_async = AsyncMock(wraps=provider.analyze_with_image_async)
+
+        # When
+        await first.analyze_async(ScreenshotContext("a", "f.ts", b"png1", None))
+        cached = await second.analyze_async(ScreenshotContext("b", "f.ts", b"png1", None))
+        other = await second.analyze_async(ScreenshotContext("c", "f.ts", b"png2", None))
+
+        # Then
+        assert cached.description == "saw png1"
+        assert other.description == "saw png2"
+        assert provider.analyze_with_image_async.await_count == 2
+
+    def test_sends_detected_mime_type(self):
+        """JPEG screenshots should not be sent as PNG."""
+        # Given
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+        analyzer._gemini_provider = MagicMock()
+        analyzer._gemini_provider.analyze_with_image.return_value = make_llm_analysis()
+
+        # When
+        analyzer.analyze(ScreenshotContext("t", "f.ts", b"jpeg", None, mime_type="image/jpeg"))
+
+        # Then
+        call = analyzer._gemini_provider.analyze_with_image.call_args
+        assert call.kwargs["mime_type"] == "image/jpeg"
+
+
+def _shots(count: int) -> list[ScreenshotContext]:
+    return [ScreenshotContext(f"test {i}", "f.ts", f"png{i}".encode(), None) for i in range(count)]
+
+
+def _combined_answer(user_prompt, images, system_prompt=None):
+    sections = [
+        f"### Screenshot {i}\nsaw {data.decode()}" for i, (_, data, _) in enumerate(images, 1)
+    ]
+    return make_llm_analysis(content="\n\n".join(sections))
+
+
+class TestCombinedScreenshotAnalysis:
+    """Tests for describing several screenshots in one request."""
+
+    @pytest.mark.asyncio
+    async def test_screenshots_share_requests(self):
+        """Screenshots should be packed images_per_request per request."""
+        # Given
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+        provider = MagicMock()
+        provider.analyze_with_images_async = AsyncMock(side_effect=_combined_answer)
+        provider.analyze_with_image_async = AsyncMock(return_value=make_llm_analysis("single"))
+        analyzer._gemini_provider = provider
+
+        # When
+        results = await analyzer.analyze_batch_async(
+            _shots(7), max_screenshots=7, images_per_request=3
+        )
+
+        # Then
+        assert provider.analyze_with_images_async.await_count == 2
+        assert provider.analyze_with_image_async.await_count == 1
+        assert [r.description for r in results] == [f"saw png{i}" for i in range(6)] + ["single"]
+        labels = [label for label, _, _ in provider.analyze_with_images_async.call_args[0][1]]
+        assert labels[0] == "Screenshot 1: test 3 (f.ts)"
+
+    def test_missing_section_is_analyzed_alone(self):
+        """A screenshot the combined answer skipped should get its own request."""
+        # Given
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+        provider = MagicMock()
+        provider.analyze_with_images.return_value = make_llm_analysis(
+            content="### Screenshot 2\nA blank page."
+        )
+        provider.analyze_with_image.return_value = make_llm_analysis(content="A login form.")
+        analyzer._gemini_provider = provider
+
+        # When
+        results = analyzer.analyze_batch(_shots(2), images_per_request=5)
+
+        # Then
+        assert [r.description for r in results] == ["A login form.", "A blank page."]
+        provider.analyze_with_images.assert_called_once()
+        provider.analyze_with_image.assert_called_once()
+
+    @patch("google.genai.Client")
+    def test_gemini_sends_labels_before_images(self, mock_client_class):
+        """Each image should directly follow its label."""
+        # Given
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value.text = "### Screenshot 1\nok"
+        mock_client_class.return_value = mock_client
+        analyzer = ScreenshotAnalyzer(provider="google", api_key="test-key")
+
+        # When
+        analyzer.analyze_combined(_shots(2))
+
+        # Then
+        contents = mock_client.models.generate_content.call_args_list[0].kwargs["contents"]
+        assert "Analyze these 2 screenshots" in contents[0]
+        assert contents[1] == "Screenshot 1: test 0 (f.ts)"
+        assert contents[3] == "Screenshot 2: test 1 (f.ts)"
+        assert contents[4].inline_data.data == b"png1"
+
+    def test_parses_heading_variants(self):
+        """Headings may be Markdown headings or bold labels."""
+        text = "Summary\n### Screenshot 1\nLogin.\n**Screenshot 2: checkout**\nBlank.\n"
+        text += "## Screenshot 7\nUnknown."
+
+        assert parse_screenshot_sections(text, 2) == {1: "Login.", 2: "Blank."}
+
+    def test_parse_sections_with_inline_labels(self):
+        """Text after a bold label on the same line should start the description."""
+        text = (
+            "**Screenshot 1:** Login page with error 'Bad password'.\n**Screenshot 2:** Blank page."
+        )
+
+        assert parse_screenshot_sections(text, 2) == {
+            1: "Login page with error 'Bad password'.",
+            2: "Blank page.",
+        }
+
+    def test_parse_sections_keeps_sentences_naming_the_screenshot(self):
+        """A description line starting with "Screenshot N" is not a heading."""
+        text = (
+            "### Screenshot 1\n"
+            "Screenshot 1 shows a red banner 'Invalid credentials'.\n"
+            "Screenshot 1 also shows an error: Session expired.\n"
+            "### Screenshot 2\n"
+            "Screenshot 2: Blank page."
+        )
+
+        assert parse_screenshot_sections(text, 2) == {
+            1: (
+                "Screenshot 1 shows a red banner 'Invalid credentials'.\n"
+                "Screenshot 1 also shows an error: Session expired."
+            ),
+            2: "Screenshot 2: Blank page.",
+        }
+
+
 class TestScreenshotPromptIntegration:
     """Tests for integrating screenshots into analysis prompts."""
 
@@ -0,0 +1,132 @@
+"""Tests for screenshot dedup and downscaling before vision calls."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+
+import pytest
+
+from heisenberg.llm.vision import (
+    ScreenshotContext,
+    downscale_image,
+    iter_screenshots_from_artifact,
+    perceptual_hash,
+    prepare_screenshots,
+)
+from heisenberg.llm.vision.preprocess import hash_distance
+
+
+def _screenshot(test_name: str, image_data: bytes) -> ScreenshotContext:
+    return ScreenshotContext(test_name, "app.spec.ts", image_data, None)
+
+
+def _page(banner: tuple[int, int, int] = (200, 30, 30), size=(1280, 720), dot=None) -> bytes:
+    """PNG of a page with a header, a banner and text-like stripes."""
+    image_module = pytest.importorskip("PIL.Image")
+    image = image_module.new("RGB", size, (250, 250, 250))
+    image.paste((40, 60, 120), (0, 0, size[0], 80))
+    image.paste(banner, (100, 150, size[0] - 100, 220))
+    for row in range(300, size[1] - 40, 24):
+        image.paste((90, 90, 90), (100, row, 100 + (row * 7) % 600 + 200, row + 8))
+    if dot is not None:
+        image.paste((0, 0, 0), (*dot, dot[0] + 3, dot[1] + 3))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestPrepareScreenshots:
+    """Test suite for collapsing duplicate screenshots."""
+
+    def test_identical_screenshots_are_collapsed(self):
+        """Byte-identical screenshots should be described once."""
+        # Given
+        screenshots = [
+            _screenshot("login (retry 0)", b"png-a"),
+            _screenshot("checkout", b"png-b"),
+            _screenshot("login (retry 1)", b"png-a"),
+        ]
+
+        # When
+        prepared = prepare_screenshots(iter(screenshots), max_dimension=None)
+
+        # Then
+        assert [s.test_name for s in prepared] == ["login (retry 0)", "checkout"]
+        assert prepared[0].duplicate_tests == ["login (retry 1)"]
+
+    def test_prompt_lists_collapsed_tests(self):
+        """The kept screenshot should name the tests it stands for."""
+        # Given
+        screenshot = _screenshot("login", b"png")
+        screenshot.description = "Login form with an error banner."
+        screenshot.duplicate_tests = ["signup", "signup", "reset"]
+
+        # Then
+        assert "*Same screen in 3 other screenshot(s): signup, reset*" in (
+            screenshot.format_for_prompt()
+        )
+
+    def test_iterates_artifact_lazily(self):
+        """Screenshots should be decompressed one at a time, with their type."""
+        # Given
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("test-results/a/failure.jpg", b"\xff\xd8jpeg")
+            zf.writestr("test-results/b/failure.png", b"\x89PNGpng")
+
+        # When
+        screenshots = iter_screenshots_from_artifact(buffer.getvalue())
+
+        # Then
+        assert next(screenshots).mime_type == "image/jpeg"
+        assert next(screenshots).mime_type == "image/png"
+
+
+class TestPerceptualDedup:
+    """Test suite for near-duplicate detection (requires Pillow)."""
+
+    def test_small_change_keeps_hash_close(self):
+        """A few changed pixels should not change the screen's hash much."""
+        # Given
+        first = perceptual_hash(_page())
+        second = perceptual_hash(_page(dot=(640, 400)))
+
+        # Then
+        assert first is not None and second is not None
+        assert hash_distance(first, second) <= 4
+
+    def test_retries_collapse_and_different_screens_stay(self):
+        """Retries of one screen collapse; the screen without the banner is kept."""
+        # Given
+        screenshots = [
+            _screenshot("login (retry 0)", _page()),
+            _screenshot("login (retry 1)", _page(dot=(640, 400))),
+            _screenshot("checkout", _page(banner=(250, 250, 250))),
+        ]
+
+        # When
+        prepared = prepare_screenshots(screenshots)
+
+        # Then
+        assert [s.test_name for s in prepared] == ["login (retry 0)", "checkout"]
+        assert prepared[0].duplicate_tests == ["login (retry 1)"]
+
+    def test_downscales_to_target_resolution(self):
+        """Large screenshots should be shrunk and re-encoded."""
+        # Given
+        image_module = pytest.importorskip("PIL.Image")
+        original = _page(size=(2560, 1440))
+
+        # When
+        data, mime_type = downscale_image(original, max_dimension=768)
+
+        # Then
+        assert len(data) < len(original)
+        with image_module.open(io.BytesIO(data)) as image:
+            assert image.size == (768, 432)
+            assert image.get_format_mimetype() == mime_type
+
+    def test_undecodable_image_is_kept(self):
+        """Data Pillow cannot read should be sent unchanged."""
+        assert downscale_image(b"\x89PNG-broken") == (b"\x89PNG-broken", "image/png")
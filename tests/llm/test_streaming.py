@@ -0,0 +1,154 @@
+"""Tests for streamed LLM responses."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from heisenberg.analysis.ai_analyzer import analyze_unified_run
+from heisenberg.core.diagnosis import ConfidenceLevel
+from heisenberg.llm.cache import CachedProvider, MemoryCacheBackend, ResponseCache
+from heisenberg.llm.models import StreamChunk
+from heisenberg.llm.providers.base import LLMProvider
+from heisenberg.llm.streaming import StreamCollector
+from tests.factories import make_unified_run
+
+RESPONSE = (
+    "## Root Cause Analysis\nSlow login API.\n\n"
+    "## Evidence\n- Timeout after 30s\n\n"
+    "## Suggested Fix\nRaise the pool size.\n\n"
+    "## Confidence Score\nHIGH\nLogs confirm it.\n\n"
+    "## Additional Notes\nThe model keeps writing here."
+)
+
+
+def _streaming_provider(text: str = RESPONSE, size: int = 7) -> MagicMock:
+    """Provider streaming text in fixed-size pieces, recording how far it got."""
+    provider = MagicMock(spec=LLMProvider)
+    provider.name = "anthropic"
+    provider.model = "claude-test"
+    provider.sent = 0
+
+    def stream(user_prompt, *, system_prompt=None):
+        yield StreamChunk(input_tokens=100)
+        for start in range(0, len(text), size):
+            provider.sent = start + size
+            yield StreamChunk(text=text[start : start + size])
+        yield StreamChunk(output_tokens=42)
+
+    async def stream_async(user_prompt, *, system_prompt=None):
+        for chunk in stream(user_prompt, system_prompt=system_prompt):
+            yield chunk
+
+    provider.stream.side_effect = stream
+    provider.stream_async.side_effect = stream_async
+    return provider
+
+
+class TestStreamCollector:
+    """Test suite for StreamCollector."""
+
+    def test_keeps_latest_usage_totals(self):
+        """Later usage reports should replace earlier ones."""
+        # Given
+        collector = StreamCollector("google", "gemini-test")
+
+        # When
+        collector.add(StreamChunk(text="a", input_tokens=10, output_tokens=1))
+        collector.add(StreamChunk(text="b", input_tokens=10, output_tokens=2))
+
+        # Then
+        result = collector.result()
+        assert (result.content, result.input_tokens, result.output_tokens) == ("ab", 10, 2)
+
+    def test_estimates_unreported_output_tokens(self):
+        """A stream closed before usage arrives should still be costed."""
+        # Given
+        collector = StreamCollector("anthropic", "claude-test")
+
+        # When
+        collector.add(StreamChunk(input_tokens=10))
+        collector.add(StreamChunk(text="word " * 40))
+
+        # Then
+        assert collector.result().output_tokens > 0
+
+
+class TestStreamedAnalysis:
+    """Test suite for analyze_unified_run with on_section."""
+
+    def test_reports_sections_and_stops_early(self, monkeypatch):
+        """Sections should arrive in order and generation stop once all are in."""
+        # Given
+        provider = _streaming_provider()
+        monkeypatch.setattr(
+            "heisenberg.analysis.ai_analyzer._get_llm_client_for_provider",
+            lambda *args: provider,
+        )
+        sections = []
+
+        # When
+        result = analyze_unified_run(
+            make_unified_run(), provider="anthropic", on_section=sections.append
+        )
+
+        # Then
+        assert [s.name for s in sections] == [
+            "root_cause",
+            "evidence",
+            "suggested_fix",
+            "confidence",
+        ]
+        assert provider.sent < len(RESPONSE)
+        assert result.diagnosis.root_cause == "Slow login API."
+        assert result.diagnosis.confidence is ConfidenceLevel.HIGH
+        assert result.input_tokens == 100
+        assert result.output_tokens > 0
+
+
+class TestCachedStreaming:
+    """Test suite for CachedProvider streaming."""
+
+    def test_complete_stream_is_replayed_from_cache(self):
+        """A finished stream should be cached and replayed as one chunk."""
+        # Given
+        provider = _streaming_provider("short answer")
+        cached = CachedProvider(provider, ResponseCache([MemoryCacheBackend()]))
+        list(cached.stream("prompt"))
+
+        # When
+        replay = list(cached.stream("prompt"))
+
+        # Then
+        provider.stream.assert_called_once()
+        assert [(c.text, c.cached) for c in replay] == [("short answer", True)]
+
+    def test_stream_stopped_early_is_not_cached(self):
+        """A truncated answer should never be stored."""
+        # Given
+        provider = _streaming_provider()
+        cache = ResponseCache([MemoryCacheBackend()])
+        chunks = CachedProvider(provider, cache).stream("prompt")
+
+        # When
+        next(chunks)
+        chunks.close()
+
+        # Then
+        assert cache.get(cache.key_for(provider, "prompt")) is None
+
+    @pytest.mark.asyncio
+    async def test_async_stream_is_cached(self):
+        """Async streams should share the cache with sync ones."""
+        # Given
+        provider = _streaming_provider("short answer")
+        cached = CachedProvider(provider, ResponseCache([MemoryCacheBackend()]))
+
+        # When
+        [chunk async for chunk in cached.stream_async("prompt")]
+        result = cached.analyze("prompt")
+
+        # Then
+        provider.analyze.assert_not_called()
+        assert result.content == "short answer"
@@ -0,0 +1,134 @@
+"""Tests for token counters."""
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from heisenberg.llm.tokens import (
+    CachingTokenCounter,
+    HeuristicTokenCounter,
+    TokenCounter,
+    get_token_counter,
+)
+
+LOG_LINE = "2024-01-15T10:30:05+00:00 [stderr] Database connection error: timeout"
+
+
+@pytest.fixture(autouse=True)
+def clear_counter_cache():
+    """Counters are shared per provider; start each test from a clean slate."""
+    get_token_counter.cache_clear()
+    yield
+    get_token_counter.cache_clear()
+
+
+class TestHeuristicTokenCounter:
+    """Test suite for HeuristicTokenCounter."""
+
+    def test_prose_is_close_to_four_chars_per_token(self):
+        """Plain English should count roughly one token per word."""
+        counter = HeuristicTokenCounter()
+
+        assert counter.count("Hello world, this is a simple sentence.") == 9
+
+    def test_logs_count_denser_than_char_estimate(self):
+        """Timestamps and punctuation should count as many small tokens."""
+        counter = HeuristicTokenCounter()
+
+        assert counter.count(LOG_LINE) > len(LOG_LINE) // 4
+
+    def test_scale_is_applied(self):
+        """Provider scale should inflate the raw estimate."""
+        base = HeuristicTokenCounter().count(LOG_LINE)
+
+        assert HeuristicTokenCounter(scale=1.5).count(LOG_LINE) > base
+
+    def test_empty_text_has_no_tokens(self):
+        """Empty strings should count as zero tokens."""
+        assert HeuristicTokenCounter().count("") == 0
+
+
+class TestCachingTokenCounter:
+    """Test suite for CachingTokenCounter."""
+
+    def test_repeated_lines_are_counted_once(self):
+        """Identical lines should hit the cache."""
+        # Given
+        inner = MagicMock(spec=HeuristicTokenCounter)
+        inner.count.return_value = 7
+        counter = CachingTokenCounter(inner)
+
+        # When
+        results = [counter.count("same line") for _ in range(5)]
+
+        # Then
+        assert results == [7] * 5
+        inner.count.assert_called_once_with("same line")
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """The cache should stay within maxsize."""
+        # Given
+        inner = MagicMock(spec=HeuristicTokenCounter)
+        inner.count.return_value = 1
+        counter = CachingTokenCounter(inner, maxsize=2)
+
+        # When
+        counter.count("a")
+        counter.count("b")
+        counter.count("a")
+        counter.count("c")  # evicts "b"
+        counter.count("b")
+
+        # Then
+        assert [c.args[0] for c in inner.count.call_args_list] == ["a", "b", "c", "b"]
+
+
+class TestGetTokenCounter:
+    """Test suite for get_token_counter."""
+
+    def test_returns_protocol_compliant_counter(self):
+        """Counters should satisfy the TokenCounter protocol."""
+        counter = get_token_counter("anthropic")
+
+        assert isinstance(counter, TokenCounter)
+        assert counter.name == "heuristic:1.15"
+
+    def test_counters_are_shared_per_provider(self):
+        """The same counter (and line cache) should be reused."""
+        assert get_token_counter("google") is get_token_counter("google")
+
+    def test_openai_falls_back_without_tiktoken(self):
+        """Missing tiktoken should fall back to the heuristic."""
+        with patch.dict(sys.modules, {"tiktoken": None}):
+            counter = get_token_counter("openai", "gpt-4o")
+
+        assert counter.name.startswith("heuristic")
+
+    def test_openai_uses_tiktoken_when_available(self):
+        """tiktoken encodings should be used for OpenAI models."""
+        # Given
+        encoding = MagicMock()
+        encoding.name = "o200k_base"
+        encoding.encode.return_value = [1, 2, 3]
+        tiktoken = MagicMock()
+        tiktoken.encoding_for_model.return_value = encoding
+
+        # When
+        with patch.dict(sys.modules, {"tiktoken": tiktoken}):
+            counter = get_token_counter("openai", "gpt-4o")
+            tokens = counter.count("hello")
+
+        # Then
+        assert counter.name == "tiktoken:o200k_base"
+        assert tokens == 3
+
+    def test_openai_falls_back_when_encoding_cannot_load(self):
+        """Offline runners without cached BPE files should use the heuristic."""
+        tiktoken = MagicMock()
+        tiktoken.encoding_for_model.side_effect = OSError("no network")
+
+        with patch.dict(sys.modules, {"tiktoken": tiktoken}):
+            counter = get_token_counter("openai", "gpt-4o")
+
+        assert counter.name.startswith("heuristic")
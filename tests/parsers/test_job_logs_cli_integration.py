@@ -81,6 +81,127 @@ class TestJobLogsFetching:
         assert failed_jobs[1]["id"] == 3
 
 
+class TestJobLogsStreaming:
+    """Tests for streaming job logs from the gh CLI."""
+
+    @patch("subprocess.Popen")
+    def test_stream_job_logs_yields_lines(self, mock_popen):
+        """Stream job logs line by line without trailing newlines."""
+        import io
+
+        from heisenberg.integrations.github_logs import GitHubLogsFetcher
+
+        # Given
+        process = MagicMock(stdout=io.StringIO("Log content here\n[error] Test failed\n"))
+        process.poll.return_value = 0
+        mock_popen.return_value = process
+
+        # When
+        lines = list(GitHubLogsFetcher().stream_job_logs("owner/repo", "12345"))
+
+        # Then
+        assert lines == ["Log content here", "[error] Test failed"]
+        assert mock_popen.call_args.args[0][-1] == "/repos/owner/repo/actions/jobs/12345/logs"
+        process.kill.assert_not_called()
+
+    @patch("subprocess.Popen")
+    def test_closing_stream_stops_download(self, mock_popen):
+        """Closing the stream early should kill the gh process."""
+        import io
+
+        from heisenberg.integrations.github_logs import GitHubLogsFetcher
+
+        # Given
+        process = MagicMock(stdout=io.StringIO("line 1\nline 2\nline 3\n"))
+        process.poll.return_value = None
+        mock_popen.return_value = process
+        stream = GitHubLogsFetcher().stream_job_logs("owner/repo", "12345")
+
+        # When
+        first = next(stream)
+        stream.close()
+
+        # Then
+        assert first == "line 1"
+        process.kill.assert_called_once()
+        process.wait.assert_called_once()
+
+    @patch("subprocess.Popen", side_effect=FileNotFoundError)
+    def test_stream_is_empty_without_gh(self, _mock_popen):
+        """Missing gh CLI should produce an empty stream."""
+        from heisenberg.integrations.github_logs import GitHubLogsFetcher
+
+        assert list(GitHubLogsFetcher().stream_job_logs("owner/repo", "12345")) == []
+
+
+class TestRunLogsArchive:
+    """Tests for reading run-level log archives."""
+
+    @staticmethod
+    def _archive(files: dict[str, str]) -> bytes:
+        import io
+        import zipfile
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for name, content in files.items():
+                zf.writestr(name, content)
+        return buffer.getvalue()
+
+    def test_selects_failed_step_files(self):
+        """Only the files of failed steps should be scanned."""
+        from heisenberg.integrations.github_logs import RunLogsArchive
+
+        # Given
+        archive = RunLogsArchive(
+            self._archive(
+                {
+                    "0_test (ubuntu, 18).txt": "full log",
+                    "test (ubuntu, 18)/1_Set up job.txt": "setup",
+                    "test (ubuntu, 18)/4_Run tests.txt": "failure",
+                }
+            )
+        )
+        job = {
+            "name": "test (ubuntu, 18)",
+            "conclusion": "failure",
+            "steps": [
+                {"name": "Set up job", "number": 1, "conclusion": "success"},
+                {"name": "Run tests", "number": 4, "conclusion": "failure"},
+            ],
+        }
+
+        # When
+        sources = archive.logs_for_job(job)
+
+        # Then
+        assert sources == [("test (ubuntu, 18) / Run tests", "test (ubuntu, 18)/4_Run tests.txt")]
+
+    def test_falls_back_to_full_job_log(self):
+        """Without step files, the whole job log should be used."""
+        from heisenberg.integrations.github_logs import RunLogsArchive
+
+        # Given: "/" and ":" are dropped from names in archive paths
+        archive = RunLogsArchive(self._archive({"2_build  deploy staging.txt": "log"}))
+        job = {"name": "build / deploy: staging", "conclusion": "failure", "steps": []}
+
+        # Then
+        assert archive.logs_for_job(job) == [
+            ("build / deploy: staging", "2_build  deploy staging.txt")
+        ]
+        assert archive.logs_for_job({"name": "missing", "steps": []}) == []
+
+    def test_iter_lines_streams_member(self):
+        """Lines should be decoded without the BOM and trailing newlines."""
+        from heisenberg.integrations.github_logs import RunLogsArchive
+
+        # Given
+        archive = RunLogsArchive(self._archive({"0_e2e.txt": "\ufeffline 1\r\nline 2\n"}))
+
+        # Then
+        assert list(archive.iter_lines("0_e2e.txt")) == ["line 1", "line 2"]
+
+
 class TestJobLogsIntegration:
     """Tests for integrating job logs with analysis."""
 
@@ -6,7 +6,7 @@ log snippets from GitHub Actions job logs to improve failure diagnosis.
 
 from __future__ import annotations
 
-from heisenberg.parsers.job_logs import JobLogsProcessor, LogSnippet
+from heisenberg.parsers.job_logs import JobLogsProcessor, LogSnippet, index_steps
 
 
 class TestLogSnippetExtraction:
@@ -269,3 +269,268 @@ class TestJobLogsProcessorIntegration:
         assert "### Relevant Job Log Snippets:" in formatted
         assert "First error" in formatted
         assert "Second error" in formatted
+
+
+class TestStreamingSnippetExtraction:
+    """Tests for extracting snippets from a line stream."""
+
+    LOG = "\n".join(
+        [
+            "Setting up job",
+            "Run npm test",
+            "  ✓ renders header",
+            "  ✗ checkout flow",
+            "Error: expected 200 but got 500",
+            "    at checkout.spec.ts:42",
+            "  ✓ renders footer",
+            *(f"step {i}" for i in range(30)),
+            "TimeoutError: waiting for selector",
+            "##[error]Process completed with exit code 1",
+        ]
+    )
+
+    def test_matches_extract_snippets(self):
+        """Streaming a file should give the same snippets as the joined text."""
+        import io
+
+        # Given
+        processor = JobLogsProcessor(context_before=3, context_after=4)
+
+        # When
+        streamed = list(processor.iter_snippets(io.StringIO(self.LOG)))
+
+        # Then
+        assert streamed == processor.extract_snippets(self.LOG)
+        assert [s.line_number for s in streamed] == [2, 35]
+
+    def test_merges_regions_within_context(self):
+        """A keyword within context_before of a region should extend it."""
+        # Given
+        lines = ["[error] first", "a", "b", "c", "[error] second", "d"]
+        processor = JobLogsProcessor(context_before=3, context_after=0)
+
+        # When
+        snippets = list(processor.iter_snippets(lines))
+
+        # Then
+        assert len(snippets) == 1
+        assert snippets[0].content == "\n".join(lines[:5])
+        assert snippets[0].keyword == "[error]"
+
+    def test_stops_reading_at_max_total_lines(self):
+        """The stream should not be read past the line limit."""
+        # Given
+        consumed = 0
+
+        def endless_log():
+            nonlocal consumed
+            while True:
+                consumed += 1
+                yield f"[error] failure {consumed}"
+
+        processor = JobLogsProcessor(context_before=2, context_after=2, max_total_lines=20)
+
+        # When
+        snippets = list(processor.iter_snippets(endless_log()))
+
+        # Then
+        assert sum(len(s.content.split("\n")) for s in snippets) == 20
+        assert consumed == 20
+
+    def test_filtered_regions_do_not_count(self):
+        """Regions removed by filter_tests should not use the line budget."""
+        # Given
+        lines = ["[error] other test"] + ["ok"] * 20 + ["[error] checkout flow"]
+        processor = JobLogsProcessor(context_before=0, context_after=0, max_total_lines=1)
+
+        # When
+        snippets = list(processor.iter_snippets(lines, filter_tests=["checkout flow"]))
+
+        # Then
+        assert [s.content for s in snippets] == ["[error] checkout flow"]
+
+    def test_extractor_accepts_pushed_lines(self):
+        """Lines pushed one by one should give the same snippets."""
+        # Given
+        processor = JobLogsProcessor(context_before=3, context_after=4)
+        extractor = processor.extractor()
+
+        # When
+        snippets = []
+        for line in self.LOG.split("\n"):
+            snippets.extend(extractor.feed(line))
+        snippets.extend(extractor.finish())
+
+        # Then
+        assert snippets == processor.extract_snippets(self.LOG)
+
+    def test_extractor_reports_done_at_line_limit(self):
+        """done should turn True once max_total_lines is reached."""
+        # Given
+        extractor = JobLogsProcessor(context_after=0, max_total_lines=2).extractor()
+
+        # When
+        first = extractor.feed("[error] one")
+        second = extractor.feed("[error] two")
+
+        # Then
+        assert first == []
+        assert [s.content for s in second] == ["[error] one\n[error] two"]
+        assert extractor.done
+        assert extractor.feed("[error] three") == []
+
+
+STEPPED_LOG = "\n".join(
+    [
+        "2024-01-15T10:00:00.0000000Z Current runner version: '2.311.0'",
+        "2024-01-15T10:00:01.0000000Z ##[group]Run actions/checkout@v4",
+        "2024-01-15T10:00:01.0000000Z with:",
+        "2024-01-15T10:00:01.0000000Z ##[endgroup]",
+        "2024-01-15T10:00:02.0000000Z Fetching the repository",
+        "2024-01-15T10:00:03.0000000Z ##[group]Run npm ci",
+        "2024-01-15T10:00:03.0000000Z npm ci",
+        "2024-01-15T10:00:03.0000000Z ##[endgroup]",
+        "2024-01-15T10:00:04.0000000Z npm WARN fetch failed, retrying",
+        "2024-01-15T10:00:05.0000000Z ##[group]Run npx playwright test",
+        "2024-01-15T10:00:05.0000000Z npx playwright test",
+        "2024-01-15T10:00:05.0000000Z ##[endgroup]",
+        "2024-01-15T10:00:06.0000000Z   1) login.spec.ts:10 should log in",
+        "2024-01-15T10:00:06.0000000Z     Error: expect(received).toBe(expected)",
+        "2024-01-15T10:00:07.0000000Z ##[error]Process completed with exit code 1.",
+        "2024-01-15T10:00:08.0000000Z Post job cleanup.",
+        "2024-01-15T10:00:08.0000000Z Cache save failed.",
+    ]
+)
+
+
+class TestStepIndex:
+    """Tests for index_steps."""
+
+    def test_finds_step_boundaries(self):
+        """Each step header should start a step that ends at the next one."""
+        # When
+        steps = index_steps(STEPPED_LOG.split("\n"))
+
+        # Then
+        assert [(s.name, s.first_line, s.end_line) for s in steps] == [
+            ("Set up job", 0, 1),
+            ("Run actions/checkout@v4", 1, 5),
+            ("Run npm ci", 5, 9),
+            ("Run npx playwright test", 9, 15),
+            ("Post job cleanup.", 15, 17),
+        ]
+        assert [s.failed for s in steps] == [False, False, False, True, False]
+        assert steps[3].command == "Run npx playwright test\nnpx playwright test"
+
+    def test_offsets_slice_step_text(self):
+        """Offsets should cover exactly the step's lines."""
+        # Given
+        lines = STEPPED_LOG.split("\n")
+
+        # When
+        steps = index_steps(line + "\n" for line in lines)
+
+        # Then
+        for step in steps:
+            text = STEPPED_LOG[step.start : step.end].removesuffix("\n")
+            assert text == "\n".join(lines[step.first_line : step.end_line])
+
+    def test_nested_groups_do_not_start_steps(self):
+        """Groups opened inside a step's header or output should not split it."""
+        # Given
+        lines = [
+            "##[group]Run ./ci.sh",
+            "##[group]Run inner",
+            "##[endgroup]",
+            "##[endgroup]",
+            "##[group]Installing",
+            "##[endgroup]",
+        ]
+
+        # When
+        steps = index_steps(lines)
+
+        # Then
+        assert [(s.name, s.end_line) for s in steps] == [("Run ./ci.sh", 6)]
+
+    def test_log_without_headers(self):
+        """Logs without step headers should give no steps."""
+        assert index_steps(["[error] something", "more"]) == []
+
+
+class TestRelevantStepExtraction:
+    """Tests for scanning only failed and test steps."""
+
+    def test_skips_setup_steps(self):
+        """Keywords in setup and cleanup steps should be ignored."""
+        # Given
+        processor = JobLogsProcessor(context_before=1, context_after=1, relevant_steps_only=True)
+
+        # When
+        snippets = processor.extract_snippets(STEPPED_LOG)
+
+        # Then: "fetch failed" (line 9) and "Cache save failed." (line 17) are skipped
+        assert [s.line_number for s in snippets] == [13]
+        assert (
+            JobLogsProcessor(context_before=1, context_after=1)
+            .extract_snippets(STEPPED_LOG)[0]
+            .line_number
+            == 8
+        )
+
+    def test_test_command_step_is_scanned_without_error(self):
+        """A step running the test command should be scanned even if not failed."""
+        # Given
+        log = STEPPED_LOG.replace("##[error]Process completed", "Process completed")
+        processor = JobLogsProcessor(context_before=0, context_after=0, relevant_steps_only=True)
+
+        # When
+        snippets = processor.extract_snippets(log)
+
+        # Then
+        assert [s.keyword for s in snippets] == ["error:"]
+
+    def test_falls_back_to_whole_log(self):
+        """Logs without relevant steps should be scanned in full."""
+        # Given
+        log = "##[group]Run make build\n##[endgroup]\nbuild failed"
+        processor = JobLogsProcessor(context_before=0, context_after=0, relevant_steps_only=True)
+
+        # Then
+        assert [s.line_number for s in processor.extract_snippets(log)] == [3]
+
+    def test_context_does_not_cross_skipped_steps(self):
+        """Context before a step's first keyword should stay inside the step."""
+        # Given
+        log = "\n".join(
+            ["##[group]Run setup", "##[endgroup]", "setup noise"]
+            + ["##[group]Run pytest", "##[endgroup]", "FAIL test_login"]
+        )
+        processor = JobLogsProcessor(context_before=5, context_after=0, relevant_steps_only=True)
+
+        # When
+        snippets = processor.extract_snippets(log)
+
+        # Then
+        assert [(s.line_number, s.content.split("\n")[0]) for s in snippets] == [
+            (4, "##[group]Run pytest")
+        ]
+
+    def test_streamed_log_matches_text(self):
+        """Two streaming passes should give the same snippets as the text."""
+        import io
+
+        # Given
+        processor = JobLogsProcessor(context_before=1, context_after=1, relevant_steps_only=True)
+        opened = []
+
+        def open_lines():
+            opened.append(1)
+            return iter(io.StringIO(STEPPED_LOG))
+
+        # When
+        snippets = list(processor.iter_relevant_snippets(open_lines))
+
+        # Then
+        assert snippets == processor.extract_snippets(STEPPED_LOG)
+        assert len(opened) == 2
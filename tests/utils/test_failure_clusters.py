@@ -0,0 +1,167 @@
+"""Tests for failure signature clustering."""
+
+from __future__ import annotations
+
+from heisenberg.utils.failure_clusters import (
+    cluster_failures,
+    estimate_similarity,
+    failure_signature,
+    minhash,
+    normalize_error,
+)
+from tests.factories import make_unified_failure
+
+TIMEOUT = "TimeoutError: locator.click: Timeout 15000ms exceeded waiting for locator('#submit')"
+
+
+class TestNormalizeError:
+    """Test suite for error text normalization."""
+
+    def test_strips_numbers_paths_and_positions(self):
+        """Durations, paths and line/column should not be part of the text."""
+        assert normalize_error(
+            "Timeout 30000ms exceeded\n    at /home/runner/work/app/tests/login.spec.ts:15:10"
+        ) == ("Timeout <n>ms exceeded at <path>")
+
+    def test_strips_ids_and_hosts(self):
+        """UUIDs, hex IDs and URL hosts should be replaced."""
+        assert normalize_error(
+            "GET http://localhost:3000/api/users/3f2a9c1e-8b7d-4a5f-9e3d-1c2d3e4f5a6b "
+            "failed (trace 0xdeadbeef)"
+        ) == ("GET <host>/api/users/<id> failed (trace <id>)")
+
+    def test_keeps_endpoints_and_status_codes(self):
+        """URL paths and HTTP status codes tell failures apart."""
+        assert normalize_error("GET /api/login returned 401") == "GET /api/login returned 401"
+
+    def test_keeps_message_paths_outside_stack_frames(self):
+        """Only stack frame lines should lose their file paths."""
+        assert normalize_error("ENOENT: no such file fixtures/users.json") == (
+            "ENOENT: no such file fixtures/users.json"
+        )
+
+
+class TestFailureSignature:
+    """Test suite for exact failure signatures."""
+
+    def test_cascade_shares_signature(self):
+        """The same error in different tests and files should match."""
+        # Given
+        first = make_unified_failure(
+            test_id="a",
+            error_message="GET /api/orders/17 returned 500",
+            stack_trace="at tests/orders.spec.ts:12:5",
+        )
+        second = make_unified_failure(
+            test_id="b",
+            error_message="GET /api/orders/4031 returned 500",
+            stack_trace="at tests/checkout.spec.ts:88:9",
+        )
+
+        # Then
+        assert failure_signature(first) == failure_signature(second)
+
+    def test_different_endpoints_and_statuses_differ(self):
+        """A 401 from the login endpoint is not the orders 500."""
+        # Given
+        orders = make_unified_failure(error_message="GET /api/orders/17 returned 500")
+        login = make_unified_failure(error_message="GET /api/login returned 401")
+
+        # Then
+        assert failure_signature(orders) != failure_signature(login)
+        assert len(cluster_failures([orders, login])) == 2
+
+    def test_different_errors_differ(self):
+        """Different messages should give different signatures."""
+        assert failure_signature(make_unified_failure(error_message="Timeout")) != (
+            failure_signature(make_unified_failure(error_message="Element not found"))
+        )
+
+
+class TestMinHash:
+    """Test suite for MinHash similarity estimates."""
+
+    def test_identical_texts_are_fully_similar(self):
+        """Equal texts should have equal MinHashes."""
+        assert estimate_similarity(minhash("a b c d"), minhash("a b c d")) == 1.0
+
+    def test_unrelated_texts_are_dissimilar(self):
+        """Texts without shared shingles should rarely share hash values."""
+        similarity = estimate_similarity(
+            minhash("timeout waiting for submit button"),
+            minhash("expected status ok but received forbidden"),
+        )
+        assert similarity < 0.2
+
+
+class TestClusterFailures:
+    """Test suite for clustering failures."""
+
+    def test_near_duplicates_are_merged(self):
+        """An extra stack frame should not split a cluster."""
+        # Given
+        stack = "at tests/signup.spec.ts:22:3\nat LoginPage.submit (pages/login.ts:30:5)"
+        failures = [
+            make_unified_failure(test_id="a", error_message=TIMEOUT, stack_trace=stack),
+            make_unified_failure(
+                test_id="b",
+                error_message=TIMEOUT,
+                stack_trace=stack + "\nat Context.retry (runner.ts:1:1)",
+            ),
+        ]
+
+        # When
+        clusters = cluster_failures(failures)
+
+        # Then
+        assert len(clusters) == 1
+        assert clusters[0].count == 2
+
+    def test_exact_mode_keeps_near_duplicates_apart(self):
+        """A threshold of 1.0 should only merge identical signatures."""
+        # Given
+        failures = [
+            make_unified_failure(test_id="a", error_message=TIMEOUT, stack_trace="at x"),
+            make_unified_failure(test_id="b", error_message=TIMEOUT, stack_trace="at x\nat y"),
+        ]
+
+        # Then
+        assert len(cluster_failures(failures, similarity_threshold=1.0)) == 2
+
+    def test_different_selectors_stay_apart(self):
+        """Timeouts at different selectors point to different problems."""
+        # Given: same action and stack, only the selector differs
+        stack = (
+            "at tests/signup.spec.ts:22:3\n"
+            "at LoginPage.submit (pages/login.ts:30:5)\n"
+            "at Context.retry (runner.ts:1:1)"
+        )
+        failures = [
+            make_unified_failure(test_id="a", error_message=TIMEOUT, stack_trace=stack),
+            make_unified_failure(
+                test_id="b",
+                error_message=TIMEOUT.replace("#submit", "#cancel"),
+                stack_trace=stack,
+            ),
+        ]
+
+        # Then
+        assert len(cluster_failures(failures)) == 2
+
+    def test_clusters_keep_run_order(self):
+        """Clusters should be ordered by their first member, members by run order."""
+        # Given
+        failures = [
+            make_unified_failure(test_id="1", error_message="Element not found"),
+            make_unified_failure(test_id="2", error_message="Timeout 100ms"),
+            make_unified_failure(test_id="3", error_message="Element not found"),
+            make_unified_failure(test_id="4", error_message="Timeout 200ms"),
+        ]
+
+        # When
+        clusters = cluster_failures(failures)
+
+        # Then
+        assert [[f.test_id for f in c.members] for c in clusters] == [["1", "3"], ["2", "4"]]
+        assert clusters[1].representative.test_id == "2"
+        assert [f.test_id for f in clusters[1].others] == ["4"]
@@ -4,8 +4,16 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 
-from heisenberg.integrations.docker import ContainerLogs, LogEntry
+from heisenberg.integrations.docker import (
+    CompactContainerLogs,
+    ContainerLogs,
+    LogEntry,
+    datetime_to_ns,
+)
+from heisenberg.llm.tokens import HeuristicTokenCounter
+from heisenberg.utils import compression
 from heisenberg.utils.compression import (
+    ERROR_KEYWORDS,
     CompressedLogs,
     LogCompressor,
     compress_logs_for_llm,
@@ -149,6 +157,163 @@ class TestLogCompressor:
         assert not any("health check" in m for m in messages)
         assert not any("heartbeat" in m for m in messages)
 
+    def test_compress_accepts_compact_logs(self, mixed_logs: dict[str, ContainerLogs]):
+        """Compact columnar logs should compress like regular ContainerLogs."""
+        # Given
+        compact = {
+            name: CompactContainerLogs.from_container_logs(logs)
+            for name, logs in mixed_logs.items()
+        }
+        compressor = LogCompressor(max_lines_per_container=10, filter_noise=True)
+
+        # When
+        expected = compressor.compress(mixed_logs)
+        result = compressor.compress(compact)
+
+        # Then
+        assert result.to_text() == expected.to_text()
+        assert result.original_lines == expected.original_lines
+
+    def test_token_limit_is_met_in_one_pass(self, mixed_logs: dict[str, ContainerLogs]):
+        """Token limit should be honoured exactly while keeping stderr lines."""
+        # Given
+        compressor = LogCompressor(max_tokens=150)
+
+        # When
+        result = compressor.compress(mixed_logs)
+
+        # Then
+        kept = result.logs["api"].entries
+        original = mixed_logs["api"].entries
+        assert result.estimated_tokens <= 150
+        assert result.was_truncated
+        assert result.total_lines == len(kept) < len(original)
+        assert sum(e.stream == "stderr" for e in kept) == 5
+        # Kept entries stay in their original order
+        positions = [original.index(e) for e in kept]
+        assert positions == sorted(positions)
+
+    def test_token_limit_keeps_lines_from_every_container(self):
+        """Each container should keep its highest-priority lines."""
+        # Given
+        base_time = datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC)
+        logs = {
+            name: ContainerLogs(
+                container_name=name,
+                entries=[
+                    LogEntry(base_time + timedelta(seconds=i), f"{name} line {i}", "stdout")
+                    for i in range(50)
+                ],
+            )
+            for name in ("api", "db")
+        }
+
+        # When
+        result = LogCompressor(max_total_lines=100, max_tokens=200).compress(logs)
+
+        # Then
+        assert result.estimated_tokens <= 200
+        assert len(result.logs["api"].entries) == len(result.logs["db"].entries)
+
+    def test_token_limit_uses_token_counter(self, mixed_logs: dict[str, ContainerLogs]):
+        """A token counter should replace the 4-chars-per-token estimate."""
+        # Given
+        counter = HeuristicTokenCounter()
+        compressor = LogCompressor(max_tokens=300, token_counter=counter)
+
+        # When
+        result = compressor.compress(mixed_logs)
+
+        # Then
+        lines = result.to_text().split("\n")
+        expected = sum(counter.count(line) for line in lines) + len(lines) - 1
+        assert result.estimated_tokens == expected
+        assert result.estimated_tokens <= 300
+        assert result.was_truncated
+
+
+def _sorted_top(compressor: LogCompressor, entries: list[LogEntry]) -> list[LogEntry]:
+    """Reference selection: score every entry, sort, keep the top in order."""
+    scored = []
+    for i, entry in enumerate(entries):
+        keywords = sum(keyword in entry.message.lower() for keyword in ERROR_KEYWORDS)
+        scored.append((compressor._calculate_priority_score(entry, i, len(entries), keywords), i))
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [entries[i] for i in sorted(i for _, i in scored[: compressor.max_lines_per_container])]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def scoring_backend(request, monkeypatch):
+    """Run a test with vectorized and pure-Python priority scoring."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(compression, "np", None)
+    return request.param
+
+
+@pytest.mark.usefixtures("scoring_backend")
+class TestPriorityTopK:
+    """Test suite for top-K priority selection."""
+
+    @staticmethod
+    def _entries(count: int) -> list[LogEntry]:
+        base_time = datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC)
+        messages = ["request ok", "query timeout", "fatal error: crash", "cache miss"]
+        return [
+            LogEntry(
+                timestamp=base_time + timedelta(milliseconds=250 * i),
+                message=f"{messages[i % 7 % 4]} {i}",
+                stream="stderr" if i % 11 == 0 else "stdout",
+            )
+            for i in range(count)
+        ]
+
+    @pytest.mark.parametrize("focus_seconds", [None, 5, 40])
+    def test_selection_matches_full_sort(self, focus_seconds: int | None):
+        """Top-K selection should keep exactly what sorting all entries keeps."""
+        # Given
+        entries = self._entries(1000)
+        focus = None
+        if focus_seconds is not None:
+            focus = entries[0].timestamp + timedelta(seconds=focus_seconds)
+        compressor = LogCompressor(max_lines_per_container=37, focus_timestamp=focus)
+
+        # When
+        kept = compressor._prioritize_and_truncate(entries)
+
+        # Then
+        assert kept == _sorted_top(compressor, entries)
+
+    def test_ties_prefer_earlier_entries(self):
+        """Entries with equal scores should be kept in first-come order."""
+        # Given
+        base_time = datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC)
+        entries = [LogEntry(base_time, f"line {i}", "stdout") for i in range(100)]
+        compressor = LogCompressor(max_lines_per_container=15)
+
+        # When
+        kept = compressor._prioritize_and_truncate(entries)
+
+        # Then: only the 19 edge entries score higher, and the earliest win
+        assert [e.message for e in kept] == [f"line {i}" for i in [*range(10), *range(91, 96)]]
+
+    def test_compact_logs_are_scored_from_columns(self):
+        """Compact logs should select the same entries as materialized ones."""
+        # Given
+        entries = self._entries(500)
+        compact = CompactContainerLogs("api")
+        for entry in entries:
+            compact.append(datetime_to_ns(entry.timestamp), entry.message, entry.stream)
+        focus = entries[100].timestamp
+        compressor = LogCompressor(max_lines_per_container=20, focus_timestamp=focus)
+
+        # When
+        kept = compressor._prioritize_and_truncate(compact.entries)
+
+        # Then
+        assert kept == _sorted_top(compressor, entries)
+
 
 class TestCompressedLogs:
     """Test suite for CompressedLogs data model."""
@@ -214,6 +379,20 @@ class TestCompressedLogs:
         # Then
         assert tokens > 0
 
+    def test_text_length_matches_rendered_text(self, sample_logs: dict[str, ContainerLogs]):
+        """text_length should equal len(to_text()) without rendering it."""
+        # Given
+        compressed = CompressedLogs(
+            logs={**sample_logs, "db": ContainerLogs(container_name="db")},
+            original_lines=10,
+            total_lines=2,
+            was_truncated=True,
+            deduplicated_count=3,
+        )
+
+        # Then
+        assert compressed.text_length() == len(compressed.to_text())
+
 
 class TestConvenienceFunction:
     """Test suite for compress_logs_for_llm helper."""
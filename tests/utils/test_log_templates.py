@@ -0,0 +1,100 @@
+"""Tests for Drain-style log template mining."""
+
+from datetime import UTC, datetime, timedelta
+
+from heisenberg.integrations.docker import ContainerLogs, LogEntry
+from heisenberg.utils.compression import LogCompressor
+from heisenberg.utils.log_templates import LogTemplateMiner, collapse_entries
+
+BASE_TIME = datetime(2024, 1, 15, 10, 30, 0, tzinfo=UTC)
+
+
+class TestLogTemplateMiner:
+    """Test suite for LogTemplateMiner."""
+
+    def test_lines_differing_in_parameters_share_a_template(self):
+        """IDs and durations should become parameter slots."""
+        # Given
+        miner = LogTemplateMiner()
+
+        # When
+        for i in range(20):
+            miner.add(f"GET /api/users/{i} 200 in {i * 3}ms")
+
+        # Then
+        assert len(miner.clusters) == 1
+        cluster = miner.clusters[0]
+        assert cluster.template == "GET <*> 200 in <*>"
+        assert cluster.count == 20
+        assert cluster.samples[1] == ["/api/users/0", "/api/users/1", "/api/users/2"]
+
+    def test_dissimilar_lines_stay_separate(self):
+        """Lines sharing too few tokens should not be merged."""
+        # Given
+        miner = LogTemplateMiner()
+
+        # When
+        miner.add("GET /api/users/1 200 in 3ms")
+        miner.add("GET /api/orders/2 500 in 30s")
+        miner.add("Connected to database")
+
+        # Then
+        assert [c.template for c in miner.clusters] == [
+            "GET /api/users/1 200 in 3ms",
+            "GET /api/orders/2 500 in 30s",
+            "Connected to database",
+        ]
+
+    def test_format_includes_count_and_samples(self):
+        """Formatted templates should show counts and sample values."""
+        # Given
+        miner = LogTemplateMiner(max_samples=2)
+        for user in ("alice", "bob", "carol"):
+            cluster = miner.add(f"login succeeded for {user}")
+
+        # Then
+        assert cluster.format() == "login succeeded for <*> (repeated 3x; values: alice, bob)"
+
+
+class TestCollapseEntries:
+    """Test suite for collapse_entries."""
+
+    def test_collapses_per_stream_in_first_seen_order(self):
+        """Each template should appear once, at its first line, per stream."""
+        # Given
+        entries = [
+            LogEntry(BASE_TIME, "worker 1 started"),
+            LogEntry(BASE_TIME + timedelta(seconds=1), "query 17 failed: timeout", "stderr"),
+            LogEntry(BASE_TIME + timedelta(seconds=2), "worker 2 started"),
+            LogEntry(BASE_TIME + timedelta(seconds=3), "query 18 failed: timeout", "stderr"),
+            LogEntry(BASE_TIME + timedelta(seconds=4), "shutting down"),
+        ]
+
+        # When
+        collapsed, folded = collapse_entries(entries)
+
+        # Then
+        assert folded == 2
+        assert [(e.message, e.stream) for e in collapsed] == [
+            ("worker <*> started (repeated 2x; values: 1, 2)", "stdout"),
+            ("query <*> failed: timeout (repeated 2x; values: 17, 18)", "stderr"),
+            ("shutting down", "stdout"),
+        ]
+        assert collapsed[1].timestamp == entries[1].timestamp
+
+    def test_compressor_mines_templates(self):
+        """LogCompressor(mine_templates=True) should fold near-duplicates."""
+        # Given
+        entries = [
+            LogEntry(BASE_TIME + timedelta(seconds=i), f"request id={i:04x} served in {i}ms")
+            for i in range(100)
+        ]
+        logs = {"api": ContainerLogs(container_name="api", entries=entries)}
+
+        # When
+        result = LogCompressor(mine_templates=True).compress(logs)
+
+        # Then
+        assert result.total_lines == 1
+        assert result.deduplicated_count == 99
+        assert "(repeated 100x" in result.logs["api"].entries[0].message
@@ -0,0 +1,81 @@
+"""Tests for the multi-pattern log matcher."""
+
+import re
+
+import pytest
+
+from heisenberg.utils.compression import NOISE_PATTERNS
+from heisenberg.utils.matching import MultiPatternMatcher, keyword_matcher
+
+JOB_KEYWORDS = ("[error]", "error:", "ERROR", "timeout", "TimeoutError", "Failed", "failed")
+
+LINES = [
+    "",
+    "   ",
+    "2024-01-15T10:30:00Z Health check passed",
+    "Sending heartbeat to coordinator",
+    "TimeoutError: Timeout 30000ms exceeded",
+    "##[error]Process completed with exit code 1",
+    "  1 failed, 12 passed",
+    "INFO request served in 12ms",
+    "keepalive ping pong metrics collected",
+]
+
+
+class TestMultiPatternMatcher:
+    """Test suite for MultiPatternMatcher."""
+
+    @pytest.mark.parametrize("line", LINES)
+    def test_matches_equal_separate_searches(self, line: str):
+        """Results should equal searching every pattern on its own."""
+        # Given
+        matcher = MultiPatternMatcher({p: p for p in NOISE_PATTERNS}, re.IGNORECASE)
+
+        # When
+        result = matcher.matches(line)
+
+        # Then
+        expected = [p for p in NOISE_PATTERNS if re.search(p, line, re.IGNORECASE)]
+        assert result == expected
+
+    @pytest.mark.parametrize("line", LINES)
+    def test_keywords_match_case_insensitive_substrings(self, line: str):
+        """Keyword matching should equal lowercase substring checks, overlaps included."""
+        result = keyword_matcher(JOB_KEYWORDS).matches(line)
+
+        assert result == [k for k in JOB_KEYWORDS if k.lower() in line.lower()]
+
+    def test_first_match_follows_priority_order(self):
+        """first_match should return the earliest category, not the leftmost hit."""
+        matcher = MultiPatternMatcher.from_keywords(["failed", "timeout"])
+
+        assert matcher.first_match("timeout while test failed") == "failed"
+        assert matcher.first_match("all good") is None
+
+    def test_empty_matcher_matches_nothing(self):
+        """A matcher without patterns should never match."""
+        matcher = MultiPatternMatcher({})
+
+        assert matcher.matches("anything") == []
+        assert not matcher.search("anything")
+
+    def test_keyword_matcher_is_shared(self):
+        """Matchers for the same keywords should be compiled once."""
+        assert keyword_matcher(JOB_KEYWORDS) is keyword_matcher(JOB_KEYWORDS)
+
+    def test_iter_first_matches_reports_matching_lines_only(self):
+        """Batch classification should yield (index, category) for hits only."""
+        matcher = keyword_matcher(JOB_KEYWORDS)
+
+        result = list(matcher.iter_first_matches(LINES))
+
+        assert result == [(4, "error:"), (5, "[error]"), (6, "Failed")]
+
+    def test_label_lines_pairs_every_line(self):
+        """label_lines should keep every line of a one-shot stream in order."""
+        matcher = keyword_matcher(JOB_KEYWORDS)
+
+        result = list(matcher.label_lines(iter(LINES)))
+
+        expected = dict(matcher.iter_first_matches(LINES))
+        assert result == [(line, expected.get(i)) for i, line in enumerate(LINES)]